@@ -10,11 +10,12 @@ import os
 from datetime import datetime, timezone
 from enum import Enum
 import json
-import aiohttp
 import asyncio
 from dataclasses import dataclass, field, asdict
 import re
 
+from .utils.log_pipeline import add_log_file
+
 # Define enums before they're used
 class AARType(Enum):
     COMBAT = "Combat Operation"
@@ -63,12 +64,7 @@ if TYPE_CHECKING:
 
 # Configure logging
 logger = logging.getLogger('aar')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='aar.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'aar.log')
 
 # Load environment variables
 GUILD_ID = int(os.getenv('GUILD_ID', 0))
@@ -1460,10 +1456,10 @@ class AARCommands(commands.GroupCog, name="aar"):
         super().__init__()
         self.bot = bot
         self.guild_id = GUILD_ID
-        self.session = aiohttp.ClientSession()
         self.reports: Dict[str, AAR] = {}
         self.column_cache: Dict[str, str] = {}
         self.last_column_fetch: Optional[datetime] = None
+        self._store = bot.document_store.collection('aars')
         self.load_reports()
         self.aar_channel_id = AAR_CHANNEL_ID
         self.staff_notification_channel_id = STAFF_NOTIFICATION_CHANNEL_ID
@@ -1474,39 +1470,36 @@ class AARCommands(commands.GroupCog, name="aar"):
         return self.bot.get_cog('ProfileCog')
         
     def load_reports(self):
-        """Load AARs from file with backward compatibility."""
+        """Load AARs from the document store with backward compatibility."""
         try:
-            if os.path.exists('aar_data.json'):
-                with open('aar_data.json', 'r') as f:
-                    data = json.load(f)
-                    self.reports = {}
-                    for aar_id, aar_data in data.items():
-                        try:
-                            # Create AAR object
-                            aar = AAR.from_dict(aar_data)
-                            self.reports[aar_id] = aar
-                        except Exception as conversion_error:
-                            logger.error(f"Error converting AAR {aar_id}: {conversion_error}")
+            data = self._store.load(self._load_legacy_reports)
+            self.reports = {}
+            for aar_id, aar_data in data.items():
+                try:
+                    # Create AAR object
+                    aar = AAR.from_dict(aar_data)
+                    self.reports[aar_id] = aar
+                except Exception as conversion_error:
+                    logger.error(f"Error converting AAR {aar_id}: {conversion_error}")
 
-                    logger.info(f"Loaded {len(self.reports)} AARs from file")
-            else:
-                logger.info("No AAR data file found, initializing empty reports dictionary")
-                self.reports = {}
+            logger.info(f"Loaded {len(self.reports)} AARs")
         except Exception as e:
             logger.error(f"Error loading AARs: {e}")
             self.reports = {}
 
-    def save_reports(self):
-        """Save AARs to file."""
+    def _load_legacy_reports(self) -> Dict[str, Any]:
+        """Read AARs from the old JSON file for a one-time import."""
+        if not os.path.exists('aar_data.json'):
+            logger.info("No AAR data file found, initializing empty reports dictionary")
+            return {}
+        with open('aar_data.json', 'r') as f:
+            return json.load(f)
+
+    def save_reports(self, *reports: AAR):
+        """Persist the AARs that changed; the store writes them in the background."""
         try:
-            # Only save if there are actually reports
-            if self.reports:
-                data = {aar_id: aar.to_dict() for aar_id, aar in self.reports.items()}
-                with open('aar_data.json', 'w') as f:
-                    json.dump(data, f, indent=2)
-                logger.info(f"Saved {len(self.reports)} AARs to file")
-            else:
-                logger.warning("No AARs to save - skipping file write")
+            for aar in reports:
+                self._store.put(aar.aar_id, aar.to_dict())
         except Exception as e:
             logger.error(f"Error saving AARs: {e}")
 
@@ -1514,7 +1507,7 @@ class AARCommands(commands.GroupCog, name="aar"):
         """Save a single AAR and update storage."""
         try:
             self.reports[aar.aar_id] = aar
-            self.save_reports()
+            self.save_reports(aar)
             # Also update the message if it exists
             if self.aar_channel_id and aar.message_id:
                 channel = self.bot.get_channel(self.aar_channel_id)
@@ -1643,7 +1636,7 @@ class AARCommands(commands.GroupCog, name="aar"):
 
             # Save the AAR
             self.reports[aar.aar_id] = aar
-            self.save_reports()
+            self.save_reports(aar)
 
             # Send to AAR channel if configured
             if self.aar_channel_id:
@@ -1653,7 +1646,7 @@ class AARCommands(commands.GroupCog, name="aar"):
                         view = AARFeedbackView(self, aar)
                         message = await channel.send(embed=aar.to_embed(self.bot), view=view)
                         aar.message_id = message.id  # Store the message ID
-                        self.save_reports()
+                        self.save_reports(aar)
                 except Exception as e:
                     logger.error(f"Failed to send AAR notification: {e}")
 
@@ -1996,7 +1989,7 @@ class AARCommands(commands.GroupCog, name="aar"):
                 # Remove from reports dictionary
                 if aar_id in self.reports:
                     del self.reports[aar_id]
-                    self.save_reports()
+                    self._store.delete(aar_id)
                     
                 await confirm_interaction.response.edit_message(
                     content=f"✅ AAR for mission '{aar.mission_name}' has been deleted.",
@@ -2217,11 +2210,6 @@ class AARCommands(commands.GroupCog, name="aar"):
             if not aar.finalized:
                 self.bot.add_view(AARFeedbackView(self, aar))
 
-    async def cog_unload(self):
-        """Save data when the cog is unloaded."""
-        self.save_reports()
-        await self.session.close()
-
 async def setup(bot: commands.Bot):
     """Setup the AAR cog."""
     await bot.add_cog(AARCommands(bot))
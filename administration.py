@@ -10,7 +10,6 @@ from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING, Literal, Uni
 from datetime import datetime, timezone, timedelta
 import asyncio
 import time
-from discord.ext import tasks
 
 from .managers.promotion_manager import PromotionManager
 from .managers.role_manager import RoleManager
@@ -76,16 +75,30 @@ class AdministrationCog(commands.Cog):
 
         # Initialize these after bot is ready
         self.promotion_manager = None
+
+        # Autocomplete indexes over the static rank and certification lists
+        self.rank_index = bot.autocomplete.index('ranks')
+        self.rank_index.rebuild((rank[0], rank[0], rank[0], None) for rank in RANKS)
+        self.certification_index = bot.autocomplete.index('certifications')
+        self.certification_index.rebuild(
+            (cert_id, f"[{category.title()}] {name}", cert_id, (name, category))
+            for cert_id, name, category in self._all_certifications()
+        )
         
-        # Start scheduled tasks after bot is ready
-        self.certification_expiry_check.start()
-        self.daily_certification_report.start()
+        # Daily certification jobs at 07:00 and 08:00 UTC
+        scheduler = bot.services.get('scheduler')
+        scheduler.add('administration.certification_report', '0 7 * * *', self.daily_certification_report, heavy=True)
+        scheduler.add('administration.certification_expiry', '0 8 * * *', self.certification_expiry_check, heavy=True)
 
-    def cog_unload(self):
-        """Called when the cog is unloaded."""
-        # Stop scheduled tasks
-        self.certification_expiry_check.cancel()
-        self.daily_certification_report.cancel()
+    @staticmethod
+    def _all_certifications() -> List[Tuple[str, str, str]]:
+        """(cert_id, name, category) for every certification, ship ones included."""
+        all_certs = []
+        for cert_id, info in CERTIFICATIONS.items():
+            all_certs.append((cert_id, info.get('name', cert_id), info.get('category', 'other')))
+        for cert_id, info in SHIP_CERTIFICATIONS.items():
+            all_certs.append((cert_id, info.get('name', cert_id), 'ship'))
+        return all_certs
 
     @property
     async def guild(self) -> Optional[discord.Guild]:
@@ -310,12 +323,7 @@ class AdministrationCog(commands.Cog):
         current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete for rank names."""
-        ranks = [rank[0] for rank in RANKS]
-        return [
-            app_commands.Choice(name=rank, value=rank)
-            for rank in ranks
-            if current.lower() in rank.lower()
-        ][:25]
+        return self.rank_index.choices(current)
 
     @promote_member.autocomplete('specialization')
     async def specialization_autocomplete(
@@ -1069,40 +1077,44 @@ class AdministrationCog(commands.Cog):
             async def confirm_callback(confirm_interaction: discord.Interaction):
                 await confirm_interaction.response.defer(ephemeral=True)
                 
-                # Grant certification to all target members
-                success_count = 0
-                failed_count = 0
-                already_had_count = 0
+                async def lacks_certification(member: discord.Member) -> bool:
+                    # Members who already hold the certification count as unchanged
+                    return not await self.coda_manager.check_certification(member.id, certification)
                 
-                for member in target_members:
-                    # Check if member already has certification
-                    has_cert = await self.coda_manager.check_certification(member.id, certification)
-                    if has_cert:
-                        already_had_count += 1
-                        continue
-                    
+                async def grant(member: discord.Member) -> bool:
                     # Grant certification
-                    success = await self.coda_manager.add_certification(member.id, certification)
-                    if success:
-                        success_count += 1
-                        
-                        # Log the action
-                        await self.coda_manager.log_certification_change(
-                            member.id,
-                            certification,
-                            'granted',
-                            interaction.user.id
-                        )
-                        
-                        # Set certification expiry date if configured
-                        if self.config.get('CERT_EXPIRY_DAYS'):
-                            expiry_date = datetime.now() + timedelta(days=self.config['CERT_EXPIRY_DAYS'])
-                            await self.set_certification_expiry(member.id, certification, expiry_date)
-                        
-                        # Update certification roles
-                        await self.update_certification_roles(member)
-                    else:
-                        failed_count += 1
+                    if not await self.coda_manager.add_certification(member.id, certification):
+                        raise RuntimeError(f"Could not add {certification}")
+                    
+                    # Log the action
+                    await self.coda_manager.log_certification_change(
+                        member.id,
+                        certification,
+                        'granted',
+                        interaction.user.id
+                    )
+                    
+                    # Set certification expiry date if configured
+                    if self.config.get('CERT_EXPIRY_DAYS'):
+                        expiry_date = datetime.now() + timedelta(days=self.config['CERT_EXPIRY_DAYS'])
+                        await self.set_certification_expiry(member.id, certification, expiry_date)
+                    
+                    # Update certification roles
+                    await self.update_certification_roles(member)
+                    return True
+                
+                # Grant certification to all target members, with live progress
+                result = await self.bot.services.get('bulk_operations').run(
+                    f"grant_certification:{certification}:{interaction.guild.id}",
+                    target_members,
+                    grant,
+                    title=f"Granting {cert_name}",
+                    interaction=confirm_interaction,
+                    needs_change=lacks_certification
+                )
+                success_count = result['changed'] + result['resumed']
+                already_had_count = result['unchanged']
+                failed_count = result['failed']
                 
                 # Send result
                 result_embed = discord.Embed(
@@ -1355,41 +1367,8 @@ class AdministrationCog(commands.Cog):
         current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete for certification names."""
-        # Get all certifications from both dictionaries
-        all_certs = []
-        
-        # Add from CERTIFICATIONS
-        for cert_id, info in CERTIFICATIONS.items():
-            all_certs.append((cert_id, info.get('name', cert_id), info.get('category', 'other')))
-        
-        # Add from SHIP_CERTIFICATIONS
-        for cert_id, info in SHIP_CERTIFICATIONS.items():
-            all_certs.append((cert_id, info.get('name', cert_id), 'ship'))
-        
-        # Filter based on search term
-        filtered_certs = []
-        if current:
-            # Filter by name or category
-            filtered_certs = [
-                (cert_id, name, category) 
-                for cert_id, name, category in all_certs
-                if current.lower() in name.lower() or current.lower() in category.lower()
-            ]
-        else:
-            # No filter, return all
-            filtered_certs = all_certs
-        
-        # Sort by category and name
-        filtered_certs.sort(key=lambda x: (x[2], x[1]))
-        
-        # Create choices with category prefix
-        return [
-            app_commands.Choice(
-                name=f"[{category.title()}] {name}",
-                value=cert_id
-            )
-            for cert_id, name, category in filtered_certs[:25]  # Discord limit
-        ]
+        # Matches by name or category; "[Category] name" labels
+        return self.certification_index.choices(current)
 
     @manage_certification.autocomplete('bulk_target')
     async def bulk_target_autocomplete(
@@ -2044,6 +2023,7 @@ class AdministrationCog(commands.Cog):
             member_certs = await self.coda_manager.get_member_certifications(member.id)
             
             # Check each role mapping
+            grant, revoke = [], []
             for cert_id, role_id in CERTIFICATION_ROLES.items():
                 if not role_id:  # Skip mappings without role IDs
                     continue
@@ -2056,13 +2036,16 @@ class AdministrationCog(commands.Cog):
                 has_role = role in member.roles
                 
                 if has_cert and not has_role:
-                    # Grant role
-                    await member.add_roles(role, reason=f"Certified in {cert_id}")
-                    logger.info(f"Granted {role.name} role to {member.name} based on certification")
+                    grant.append(role.name)
                 elif not has_cert and has_role:
-                    # Remove role
-                    await member.remove_roles(role, reason=f"No longer certified in {cert_id}")
-                    logger.info(f"Removed {role.name} role from {member.name} based on certification")
+                    revoke.append(role.name)
+            
+            # Apply every change in one edit
+            if grant or revoke:
+                await self.bot.services.get('member_reconciler').reconcile(
+                    member, roles=grant, remove_roles=revoke, reason="Certification roles"
+                )
+                logger.info(f"Updated certification roles for {member.name}: +{grant} -{revoke}")
         except Exception as e:
             logger.error(f"Error updating certification roles: {e}")
 
@@ -2135,17 +2118,47 @@ class AdministrationCog(commands.Cog):
             logger.error(f"Error removing certification expiry: {e}")
             return False
 
-    @tasks.loop(hours=24)
+    # === SCHEDULED JOBS ===
+
+    @admin.command(name="jobs")
+    async def scheduled_jobs(self, interaction: discord.Interaction):
+        """Show background job schedules, last runs and durations, and the profile sync queue."""
+        if not await self.admin_command_permissions(interaction):
+            return
+
+        embed = discord.Embed(
+            title="Scheduled Jobs",
+            color=discord.Color.blue(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        if self.bot.services.has('profile_sync'):
+            sync = await self.bot.services.get('profile_sync').stats()
+            embed.description = (
+                f"**Profile sync:** {sync['queue_depth']} queued (oldest {sync['oldest_pending']:.0f}s) · "
+                f"Flushed: {sync['flushed']} · Failed: {sync['failed']} · "
+                f"Latency: last {sync['last_flush_latency']:.1f}s · max {sync['max_flush_latency']:.1f}s"
+            )
+        for name, stats in sorted(self.bot.services.get('scheduler').stats().items())[:25]:
+            last_run = stats['last_run'][:16].replace('T', ' ') if stats['last_run'] else 'never'
+            next_run = stats['next_run'][:16].replace('T', ' ') if stats['next_run'] else '-'
+            embed.add_field(
+                name=f"{'▶️ ' if stats['running'] else ''}{name}",
+                value=(
+                    f"`{stats['schedule']}`{' (heavy)' if stats['heavy'] else ''}\n"
+                    f"Last: {last_run} · Next: {next_run} UTC\n"
+                    f"Runs: {stats['runs']} · Failed: {stats['failures']} · Skipped: {stats['skipped']}\n"
+                    f"Duration: last {stats['last_duration']:.1f}s · avg {stats['avg_duration']:.1f}s · "
+                    f"max {stats['max_duration']:.1f}s"
+                ),
+                inline=False
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     async def certification_expiry_check(self):
         """Check for certifications that need renewal."""
         if not self._ready.is_set():
             await self._ready.wait()
             
-        # Set to run at a specific time
-        now = datetime.now()
-        if now.hour != 8 or now.minute != 0:  # 8:00 AM
-            return
-            
         try:
             # Get all members
             all_members = await self.coda_manager.get_all_members()
@@ -2242,17 +2255,11 @@ class AdministrationCog(commands.Cog):
         except Exception as e:
             logger.error(f"Error checking certification expirations: {e}")
 
-    @tasks.loop(hours=24)
     async def daily_certification_report(self):
         """Send a daily certification report to command staff."""
         if not self._ready.is_set():
             await self._ready.wait()
             
-        # Set to run at a specific time
-        now = datetime.now()
-        if now.hour != 7 or now.minute != 0:  # 7:00 AM
-            return
-            
         # Get certification statistics
         report = await self.coda_manager.get_certification_report()
         if not report:
@@ -2303,7 +2310,10 @@ class AdministrationCog(commands.Cog):
     async def cog_unload(self) -> None:
         """Called when the cog is unloaded."""
         logger.info("Unloading AdministrationCog...")
-        # Cleanup code here if needed
+        # Unregister the scheduled certification jobs
+        scheduler = self.bot.services.get('scheduler')
+        scheduler.remove('administration.certification_report')
+        scheduler.remove('administration.certification_expiry')
 
 async def setup(bot: commands.Bot):
     """Set up the AdministrationCog."""
@@ -8,7 +8,8 @@ from enum import Enum
 from datetime import datetime, timedelta
 import asyncio
 from dataclasses import dataclass
-from logging.handlers import RotatingFileHandler
+
+from .utils.log_pipeline import add_log_file
 
 # Alert level definitions
 class AlertLevel(Enum):
@@ -85,17 +86,10 @@ class AlertCog(commands.Cog):
         
         # Setup logging
         self.logger = logging.getLogger('alert_system')
-        self.logger.setLevel(logging.INFO)
-        handler = RotatingFileHandler(
-            filename='logs/alert_system.log',
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=5,
-            encoding='utf-8'
+        add_log_file(
+            self.logger.name, 'logs/alert_system.log',
+            fmt='%(asctime)s - %(levelname)s - [%(name)s] - %(message)s'
         )
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] - %(message)s')
-        handler.setFormatter(formatter)
-        if not self.logger.handlers:
-            self.logger.addHandler(handler)
 
     async def send_alert_message(self, level: AlertLevel, reason: Optional[str] = None):
         """Send or update alert level message."""
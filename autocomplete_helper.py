@@ -7,16 +7,15 @@ from discord.ext import commands
 import logging
 import asyncio
 
+from .utils.autocomplete_index import AutocompleteIndex
+from .utils.log_pipeline import add_log_file
+
 if TYPE_CHECKING:
     from discord import Interaction
     from .commandhub import CommandHubCog
 
 logger = logging.getLogger('autocomplete_helper')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='autocomplete_helper.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+add_log_file(logger.name, 'autocomplete_helper.log')
 
 class AutocompleteHelper(commands.Cog):
     """Helper cog to manage autocomplete data across the bot"""
@@ -33,6 +32,10 @@ class AutocompleteHelper(commands.Cog):
             'awards': []
         }
         self.last_update = {}
+        # Search indexes over autocomplete_data, rebuilt on every refresh
+        self.indexes: Dict[str, AutocompleteIndex] = {
+            kind: AutocompleteIndex(kind) for kind in self.autocomplete_data if kind != 'users'
+        }
         self._task = bot.loop.create_task(self.background_refresh_task())
         logger.info("AutocompleteHelper cog initialized")
     
@@ -54,6 +57,16 @@ class AutocompleteHelper(commands.Cog):
         except Exception as e:
             logger.error(f"Error in background refresh task: {e}")
     
+    def reindex(self, kind: str):
+        """Rebuild the search index for one kind of autocomplete data."""
+        entries = []
+        for item in self.autocomplete_data[kind]:
+            if isinstance(item, dict):
+                entries.append((str(item['id']), item['name'], str(item['id']), None))
+            else:
+                entries.append((item, item, item, None))
+        self.indexes[kind].rebuild(entries)
+    
     async def refresh_all_data(self):
         """Refresh all autocomplete data"""
         try:
@@ -81,6 +94,7 @@ class AutocompleteHelper(commands.Cog):
             ships_cog = self.bot.get_cog('IntegratedShipsCog')
             if ships_cog and hasattr(ships_cog, 'get_ship_names'):
                 self.autocomplete_data['ships'] = await ships_cog.get_ship_names()
+                self.reindex('ships')
                 self.last_update['ships'] = discord.utils.utcnow()
                 logger.info(f"Refreshed ship data: {len(self.autocomplete_data['ships'])} ships")
         except Exception as e:
@@ -92,6 +106,7 @@ class AutocompleteHelper(commands.Cog):
             mission_cog = self.bot.get_cog('MissionCog')
             if mission_cog and hasattr(mission_cog, 'get_active_missions'):
                 self.autocomplete_data['missions'] = await mission_cog.get_active_missions()
+                self.reindex('missions')
                 self.last_update['missions'] = discord.utils.utcnow()
                 logger.info(f"Refreshed mission data: {len(self.autocomplete_data['missions'])} missions")
         except Exception as e:
@@ -103,13 +118,17 @@ class AutocompleteHelper(commands.Cog):
             radio_cog = self.bot.get_cog('RadioCog')
             if radio_cog and hasattr(radio_cog, 'get_stations'):
                 self.autocomplete_data['stations'] = await radio_cog.get_stations()
+                self.reindex('stations')
                 self.last_update['stations'] = discord.utils.utcnow()
                 logger.info(f"Refreshed station data: {len(self.autocomplete_data['stations'])} stations")
         except Exception as e:
             logger.error(f"Error refreshing station data: {e}")
     
     async def refresh_user_data(self):
-        """Cache member data for user autocomplete"""
+        """
+        Cache member data for user autocomplete. Searches use the shared
+        member indexes, which follow join, leave and nickname events.
+        """
         try:
             # We'll only store basic member info to keep memory usage reasonable
             members = []
@@ -134,6 +153,7 @@ class AutocompleteHelper(commands.Cog):
             division_cog = self.bot.get_cog('DivisionSelectionCog')
             if division_cog and hasattr(division_cog, 'get_divisions'):
                 self.autocomplete_data['divisions'] = await division_cog.get_divisions()
+                self.reindex('divisions')
                 self.last_update['divisions'] = discord.utils.utcnow()
                 logger.info(f"Refreshed division data: {len(self.autocomplete_data['divisions'])} divisions")
         except Exception as e:
@@ -145,6 +165,7 @@ class AutocompleteHelper(commands.Cog):
             admin_cog = self.bot.get_cog('AdministrationCog')
             if admin_cog and hasattr(admin_cog, 'get_ranks'):
                 self.autocomplete_data['ranks'] = await admin_cog.get_ranks()
+                self.reindex('ranks')
                 self.last_update['ranks'] = discord.utils.utcnow()
                 logger.info(f"Refreshed rank data: {len(self.autocomplete_data['ranks'])} ranks")
         except Exception as e:
@@ -156,6 +177,7 @@ class AutocompleteHelper(commands.Cog):
             admin_cog = self.bot.get_cog('AdministrationCog')
             if admin_cog and hasattr(admin_cog, 'get_certifications'):
                 self.autocomplete_data['certifications'] = await admin_cog.get_certifications()
+                self.reindex('certifications')
                 self.last_update['certifications'] = discord.utils.utcnow()
                 logger.info(f"Refreshed certification data: {len(self.autocomplete_data['certifications'])} certifications")
         except Exception as e:
@@ -167,6 +189,7 @@ class AutocompleteHelper(commands.Cog):
             profile_cog = self.bot.get_cog('ProfileCog')
             if profile_cog and hasattr(profile_cog, 'get_awards'):
                 self.autocomplete_data['awards'] = await profile_cog.get_awards()
+                self.reindex('awards')
                 self.last_update['awards'] = discord.utils.utcnow()
                 logger.info(f"Refreshed award data: {len(self.autocomplete_data['awards'])} awards")
         except Exception as e:
@@ -179,35 +202,15 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['ships']:
             await self.refresh_ship_data()
         
-        ships = self.autocomplete_data['ships']
-        
-        # Filter ships that match the current input
-        matches = [ship for ship in ships if current.lower() in ship.lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=ship, value=ship)
-            for ship in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['ships'].choices(current)
     
     async def autocomplete_user(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for users"""
-        # For users, we'll do a live search of the guild to ensure most up-to-date data
-        members = interaction.guild.members
-        
-        # Filter members that match the current input
-        matches = []
-        for member in members:
-            if (current.lower() in member.name.lower() or 
-                current.lower() in member.display_name.lower() or
-                (member.nick and current.lower() in member.nick.lower())):
-                matches.append(member)
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=f"{member.display_name} ({member.name})", value=str(member.id))
-            for member in matches[:25]
-        ]
+        if interaction.guild is None:
+            return []
+        # Indexed per guild and kept current from member events
+        return self.bot.autocomplete.members.search(interaction.guild, current)
     
     async def autocomplete_mission(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for mission names"""
@@ -215,16 +218,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['missions']:
             await self.refresh_mission_data()
         
-        missions = self.autocomplete_data['missions']
-        
-        # Filter missions that match the current input
-        matches = [mission for mission in missions if current.lower() in mission['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=mission['name'], value=str(mission['id']))
-            for mission in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['missions'].choices(current)
     
     async def autocomplete_station(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for radio stations"""
@@ -232,16 +227,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['stations']:
             await self.refresh_station_data()
         
-        stations = self.autocomplete_data['stations']
-        
-        # Filter stations that match the current input
-        matches = [station for station in stations if current.lower() in station['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=station['name'], value=station['id'])
-            for station in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['stations'].choices(current)
     
     async def autocomplete_division(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for divisions"""
@@ -249,16 +236,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['divisions']:
             await self.refresh_division_data()
         
-        divisions = self.autocomplete_data['divisions']
-        
-        # Filter divisions that match the current input
-        matches = [div for div in divisions if current.lower() in div['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=div['name'], value=div['id'])
-            for div in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['divisions'].choices(current)
     
     async def autocomplete_rank(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for ranks"""
@@ -266,16 +245,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['ranks']:
             await self.refresh_rank_data()
         
-        ranks = self.autocomplete_data['ranks']
-        
-        # Filter ranks that match the current input
-        matches = [rank for rank in ranks if current.lower() in rank['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=rank['name'], value=rank['id'])
-            for rank in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['ranks'].choices(current)
     
     async def autocomplete_certification(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for certifications"""
@@ -283,16 +254,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['certifications']:
             await self.refresh_certification_data()
         
-        certifications = self.autocomplete_data['certifications']
-        
-        # Filter certifications that match the current input
-        matches = [cert for cert in certifications if current.lower() in cert['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=cert['name'], value=cert['id'])
-            for cert in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['certifications'].choices(current)
     
     async def autocomplete_award(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for awards"""
@@ -300,16 +263,8 @@ class AutocompleteHelper(commands.Cog):
         if not self.autocomplete_data['awards']:
             await self.refresh_award_data()
         
-        awards = self.autocomplete_data['awards']
-        
-        # Filter awards that match the current input
-        matches = [award for award in awards if current.lower() in award['name'].lower()]
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=award['name'], value=award['id'])
-            for award in matches[:25]
-        ]
+        # Ranked matches from the index, up to 25 choices (Discord's limit)
+        return self.indexes['awards'].choices(current)
     
     # Helper method to register autocomplete with app commands
     def register_autocomplete(self, command: app_commands.Command, param_name: str, autocomplete_type: str):
@@ -6,11 +6,9 @@ from typing import Dict, List, Optional, Any, Set, Tuple, TYPE_CHECKING, Union,
 from decimal import Decimal
 from enum import Enum
 from dataclasses import dataclass, field
-import asyncio
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands, ui
-import aiohttp
 import logging
 import os
 from datetime import datetime, timezone, timedelta
@@ -25,6 +23,12 @@ import time
 from dotenv import load_dotenv
 load_dotenv()
 
+from .utils.coda_api import CodaAPIClient, CodaRequestError, MAX_PAGE_SIZE, PRIORITY_BACKGROUND
+from .utils.banking_ledger import BankingLedger, TRANSACTION_COLUMNS, parse_user_id
+from .utils.row_index import CodaRowIndex, LOANS
+from .utils.coda_replica import ACCOUNTS_TABLE
+from .utils.log_pipeline import add_log_file
+
 if TYPE_CHECKING:
     from .utils.profile_events import ProfileEvent, ProfileEventType
     from .utils.sc_profile_types import CareerPath, ExperienceLevel
@@ -99,11 +103,7 @@ NOTE_UPDATED_AT_COLUMN = "c-wxha_c37cY"  # Last Updated column ID
 
 # Setup Logging
 logger = logging.getLogger('banking')
-logger.setLevel(logging.DEBUG)
-handler = logging.FileHandler(filename='banking.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+add_log_file(logger.name, 'banking.log')
 
 class TransactionType(Enum):
     """Enumeration of transaction types for better type safety."""
@@ -281,61 +281,6 @@ class ProjectData:
     contributors: List[int] = field(default_factory=list)
     notes: Optional[str] = None
 
-class BankingCache:
-    """Cache manager for banking operations."""
-    def __init__(self, ttl: int = 300):  # 5 minutes default TTL
-        self.balance_cache = {}
-        self.lock = asyncio.Lock()
-        self.ttl = ttl
-        self._cleanup_task = None
-        self.last_rate_limit = 0
-
-    def check_rate_limit(self) -> bool:
-        """Check if we're currently rate limited by Coda API."""
-        current_time = time.time()
-        
-        # Check if we've made a rate limit request in the last 60 seconds
-        if current_time - self.last_rate_limit < 60:
-            return True
-        
-        return False
-
-    async def get_balance(self, user_id: int) -> Optional[Decimal]:
-        """Get user's balance from cache if available."""
-        async with self.lock:
-            cached_data = self.balance_cache.get(user_id)
-            if cached_data:
-                timestamp, balance = cached_data
-                current_time = datetime.now().timestamp()
-                if current_time - timestamp < self.ttl:
-                    return balance
-        return None
-
-    async def set_balance(self, user_id: int, balance: Decimal):
-        """Cache a user's balance."""
-        async with self.lock:
-            self.balance_cache[user_id] = (datetime.now().timestamp(), balance)
-
-    async def invalidate(self, user_id: int):
-        """Invalidate cached balance for a user."""
-        async with self.lock:
-            self.balance_cache.pop(user_id, None)
-
-    async def start_cleanup(self):
-        """Start the cache cleanup task."""
-        if self._cleanup_task is None:
-            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-
-    async def _cleanup_loop(self):
-        """Periodically clean up expired cache entries."""
-        while True:
-            await asyncio.sleep(self.ttl)
-            current_time = datetime.now().timestamp()
-            async with self.lock:
-                for user_id, (timestamp, _) in list(self.balance_cache.items()):
-                    if current_time - timestamp >= self.ttl:
-                        del self.balance_cache[user_id]
-
 class BankingHomeView(discord.ui.View):
     """Main UI view for banking system navigation."""
     def __init__(self, cog: 'BankingCog'):
@@ -1574,15 +1519,22 @@ class CategorySummaryView(discord.ui.View):
             else:  # year
                 start_date = now - timedelta(days=365)
 
-            transactions = await self.cog.get_transactions(
+            stats = await self.cog.get_transaction_stats(
                 interaction.user.id,
-                start_date=start_date
+                start_date=start_date,
+                category=self.category
             )
+            if "error" in stats:
+                raise RuntimeError(stats["error"])
 
-            if not transactions:
+            if not stats["transaction_count"]:
+                if self.category:
+                    description = f"No transactions found for category {self.category.value} in the selected timeframe ({self.timeframe})."
+                else:
+                    description = f"No transactions found for the selected timeframe ({self.timeframe})."
                 embed = discord.Embed(
                     title="No Transactions Found",
-                    description=f"No transactions found for the selected timeframe ({self.timeframe}).",
+                    description=description,
                     color=discord.Color.orange()
                 )
                 view = discord.ui.View()
@@ -1590,21 +1542,6 @@ class CategorySummaryView(discord.ui.View):
                 await interaction.followup.edit_message(interaction.message.id, embed=embed, view=view)
                 return
 
-            # Filter by category if specified
-            if self.category:
-                filtered_transactions = [t for t in transactions if t.category == self.category]
-                if not filtered_transactions:
-                    embed = discord.Embed(
-                        title="No Transactions Found",
-                        description=f"No transactions found for category {self.category.value} in the selected timeframe ({self.timeframe}).",
-                        color=discord.Color.orange()
-                    )
-                    view = discord.ui.View()
-                    view.add_item(BackToMainMenuButton(self.cog))
-                    await interaction.followup.edit_message(interaction.message.id, embed=embed, view=view)
-                    return
-                transactions = filtered_transactions
-
             embed = discord.Embed(
                 title=f"Category Summary ({self.timeframe})",
                 color=discord.Color.blue(),
@@ -1613,28 +1550,27 @@ class CategorySummaryView(discord.ui.View):
 
             if self.category:
                 # Detailed view of single category
-                total_amount = sum(t.amount for t in transactions)
-                avg_amount = total_amount / len(transactions) if transactions else Decimal('0')
-                largest_transaction = max(transactions, key=lambda t: abs(t.amount))
+                largest_transaction = stats["largest_transaction"]
                 
                 emoji = self.cog.get_category_emoji(self.category)
                 embed.add_field(
                     name=f"{emoji} {self.category.value.title()} Summary",
                     value=(
-                        f"Total Amount: {total_amount:,.2f} aUEC\n"
-                        f"Transaction Count: {len(transactions)}\n"
-                        f"Average Amount: {avg_amount:,.2f} aUEC\n"
+                        f"Total Amount: {stats['net_change']:,.2f} aUEC\n"
+                        f"Transaction Count: {stats['transaction_count']}\n"
+                        f"Average Amount: {stats['average_transaction']:,.2f} aUEC\n"
                         f"Largest Transaction: {largest_transaction.amount:,.2f} aUEC"
                     ),
                     inline=False
                 )
 
                 # Show recent transactions
-                recent_transactions = sorted(
-                    transactions,
-                    key=lambda t: datetime.fromisoformat(t.metadata['created_at'].replace('Z', '+00:00')),
-                    reverse=True
-                )[:5]
+                recent_transactions = await self.cog.get_transactions(
+                    interaction.user.id,
+                    start_date=start_date,
+                    category=self.category,
+                    limit=5
+                )
 
                 for transaction in recent_transactions:
                     trans_time = datetime.fromisoformat(
@@ -1651,37 +1587,34 @@ class CategorySummaryView(discord.ui.View):
 
             else:
                 # Overall category summary
-                category_data = defaultdict(list)
-                for trans in transactions:
-                    if trans.category:
-                        category_data[trans.category].append(trans)
-
-                for cat, cat_transactions in sorted(
-                    category_data.items(),
-                    key=lambda x: sum(abs(t.amount) for t in x[1]),
+                for name, bucket in sorted(
+                    stats["categories"].items(),
+                    key=lambda x: abs(x[1]["total"]),
                     reverse=True
                 ):
+                    try:
+                        cat = TransactionCategory(name)
+                    except ValueError:
+                        continue
                     emoji = self.cog.get_category_emoji(cat)
-                    total = sum(t.amount for t in cat_transactions)
-                    avg = total / len(cat_transactions)
+                    avg = bucket["total"] / bucket["count"]
                     
                     embed.add_field(
                         name=f"{emoji} {cat.value.title()}",
                         value=(
-                            f"Total: {total:,.2f} aUEC\n"
-                            f"Count: {len(cat_transactions)}\n"
+                            f"Total: {bucket['total']:,.2f} aUEC\n"
+                            f"Count: {bucket['count']}\n"
                             f"Average: {avg:,.2f} aUEC"
                         ),
                         inline=True
                     )
 
             # Add overall statistics
-            total_amount = sum(t.amount for t in transactions)
             embed.add_field(
                 name="📊 Overall Statistics",
                 value=(
-                    f"Total Transactions: {len(transactions)}\n"
-                    f"Total Amount: {total_amount:,.2f} aUEC\n"
+                    f"Total Transactions: {stats['transaction_count']}\n"
+                    f"Total Amount: {stats['net_change']:,.2f} aUEC\n"
                     f"Period: {self.timeframe}"
                 ),
                 inline=False
@@ -1777,7 +1710,8 @@ class ExportOptionsView(discord.ui.View):
 
             transactions = await self.cog.get_transactions(
                 interaction.user.id,
-                start_date=start_date
+                start_date=start_date,
+                limit=None
             )
 
             if not transactions:
@@ -3334,7 +3268,6 @@ class BankingCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._profile_cog = None
-        self.cache = BankingCache()
         self.rate_limits = defaultdict(lambda: {"last_update": 0, "count": 0})
         self.RATE_LIMIT_WINDOW = 60  # 1 minute
         self.MAX_OPERATIONS = 10  # Max operations per minute
@@ -3353,14 +3286,18 @@ class BankingCog(commands.Cog):
         self.org_budget_cache_time = 0
         self.ORG_BUDGET_CACHE_TTL = 300  # 5 minutes
         
-        # Start cache cleanup
-        asyncio.create_task(self.cache.start_cleanup())
-        
-        # Start the sync usernames task
-        self.sync_usernames.start()
+        # Local write-behind ledger: authoritative for balances and new transactions
+        self.ledger = BankingLedger(
+            self.coda_client,
+            DOC_ID,
+            ACCOUNTS_TABLE_ID,
+            TRANSACTIONS_TABLE_ID
+        )
         
-        # Start the loan due date check task
-        self.check_loan_due_dates.start()
+        # Daily username sync and twice-daily loan checks, offset from other Coda-heavy jobs
+        scheduler = bot.services.get('scheduler')
+        scheduler.add('banking.sync_usernames', '0 4 * * *', self.sync_usernames, heavy=True)
+        scheduler.add('banking.loan_due_dates', '20 */12 * * *', self.check_loan_due_dates, heavy=True)
         
 
     # ====================== CORE API METHODS ======================
@@ -3394,142 +3331,79 @@ class BankingCog(commands.Cog):
             logger.error(f"Error verifying column IDs: {e}")
             # We'll continue using the predefined IDs even if verification fails
         
+    @property
+    def row_index(self) -> Optional[CodaRowIndex]:
+        """Shared Coda row ID index (loans are keyed by Loan ID)."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('row_index'):
+            return self.bot.services.get('row_index')
+        return getattr(self.bot, 'row_index', None)
+
+    @property
+    def coda_replica(self):
+        """Local read replica of the Coda tables, if the bot provides one."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_replica'):
+            return self.bot.services.get('coda_replica')
+        return getattr(self.bot, 'coda_replica', None)
+
+    @property
+    def coda_client(self) -> Optional[CodaAPIClient]:
+        """Shared pooled Coda client registered in the bot's service registry."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_client'):
+            return self.bot.services.get('coda_client')
+        return getattr(self.bot, 'coda_client', None)
+
+    def check_rate_limit(self) -> bool:
+        """Check if Coda requests are currently backed off after a 429."""
+        client = self.coda_client
+        return bool(client and client.rate_limiter.is_rate_limited())
+
     async def coda_api_request(self, method, endpoint, params=None, data=None):
-        """Make a request to the Coda API with improved error handling and rate limiting."""
-        if not CODA_API_TOKEN:
-            logger.error("Coda API token not found")
+        """
+        Make a request to the Coda API through the shared pooled client.
+
+        Connection reuse, retries and 429 back-off are handled by CodaAPIClient;
+        this wrapper keeps the banking contract of returning None on failure and
+        True for a successful DELETE.
+        """
+        client = self.coda_client
+        if not client or not client.api_token:
+            logger.error("Coda API client not available")
             return None
-            
-        headers = {
-            'Authorization': f'Bearer {CODA_API_TOKEN}',
-            'Content-Type': 'application/json'
-        }
-        
-        url = f'https://coda.io/apis/v1/{endpoint}'
-        
-        # Add exponential backoff and retry for rate limits
-        max_retries = 3
-        base_sleep_time = 1  # Start with 1 second
-        
-        for retry_count in range(max_retries):
-            try:
-                async with aiohttp.ClientSession() as session:
-                    if method == 'GET':
-                        async with session.get(url, headers=headers, params=params) as response:
-                            if response.status == 200:
-                                return await response.json()
-                            elif response.status == 429:  # Rate limited
-                                # Store the last rate limit time
-                                self.cache.last_rate_limit = time.time()
-                                
-                                # Get retry-after header if available
-                                retry_after = int(response.headers.get('Retry-After', 60))
-                                
-                                logger.warning(f"Rate limited by Coda API. Retry after {retry_after} seconds.")
-                                
-                                # If this is not the final retry, wait and try again
-                                if retry_count < max_retries - 1:
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    logger.error(f"API request failed after {max_retries} retries: {response.status} - {await response.text()}")
-                                    return None
-                            else:
-                                logger.error(f"API request failed: {response.status} - {await response.text()}")
-                                return None
-                    elif method == 'POST':
-                        async with session.post(url, headers=headers, json=data) as response:
-                            if response.status in [200, 201, 202]:
-                                return await response.json()
-                            elif response.status == 429:  # Rate limited
-                                # Store the last rate limit time
-                                self.cache.last_rate_limit = time.time()
-                                
-                                # Get retry-after header if available
-                                retry_after = int(response.headers.get('Retry-After', 60))
-                                
-                                logger.warning(f"Rate limited by Coda API. Retry after {retry_after} seconds.")
-                                
-                                # If this is not the final retry, wait and try again
-                                if retry_count < max_retries - 1:
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    logger.error(f"API request failed after {max_retries} retries: {response.status} - {await response.text()}")
-                                    return None
-                            else:
-                                error_text = await response.text()
-                                logger.error(f"API request failed: {response.status} - {error_text}")
-                                
-                                # Try to parse the response as JSON to get more detailed error
-                                try:
-                                    error_json = json.loads(error_text)
-                                    if 'message' in error_json:
-                                        logger.error(f"Error message: {error_json['message']}")
-                                except:
-                                    pass
-                                    
-                                return None
-                    elif method == 'PUT':
-                        async with session.put(url, headers=headers, json=data) as response:
-                            if response.status in [200, 201, 202]:
-                                return await response.json()
-                            elif response.status == 429:  # Rate limited
-                                self.cache.last_rate_limit = time.time()
-                                retry_after = int(response.headers.get('Retry-After', 60))
-                                if retry_count < max_retries - 1:
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    logger.error(f"API request failed after {max_retries} retries: {response.status} - {await response.text()}")
-                                    return None
-                            else:
-                                logger.error(f"API request failed: {response.status} - {await response.text()}")
-                                return None
-                    elif method == 'DELETE':
-                        async with session.delete(url, headers=headers) as response:
-                            if response.status in [200, 204]:
-                                return True
-                            elif response.status == 429:  # Rate limited
-                                self.cache.last_rate_limit = time.time()
-                                retry_after = int(response.headers.get('Retry-After', 60))
-                                if retry_count < max_retries - 1:
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    logger.error(f"API request failed after {max_retries} retries: {response.status} - {await response.text()}")
-                                    return None
-                            else:
-                                logger.error(f"API request failed: {response.status} - {await response.text()}")
-                                return None
-                                
-                # If we got here without a continue, the request was successful or failed for reasons other than rate limiting
-                break
-                    
-            except Exception as e:
-                logger.error(f"Error making API request: {e}")
-                
-                # Exponential backoff if we should retry
-                if retry_count < max_retries - 1:
-                    sleep_time = base_sleep_time * (2 ** retry_count)  # Exponential backoff
-                    logger.info(f"Retrying in {sleep_time} seconds...")
-                    await asyncio.sleep(sleep_time)
-                else:
-                    return None
-                    
-        # If we exhausted all retries
-        return None
+
+        try:
+            response = await client.request(method, endpoint, data=data, params=params)
+        except CodaRequestError as e:
+            logger.error(f"API request failed: {method} {endpoint} - {e}")
+            return None
+
+        if response is None:
+            # Retries exhausted (rate limited)
+            logger.error(f"API request failed after retries: {method} {endpoint}")
+            return None
+
+        if method == 'DELETE':
+            return True
+        return response
     
     # ====================== BALANCE METHODS ======================
     
     async def get_balance(self, user_id: int) -> Decimal:
-        """Get user's current balance from database or cache."""
-        # Try cache first
-        cached_balance = await self.cache.get_balance(user_id)
-        if cached_balance is not None:
-            return cached_balance
-            
-        # Fetch from Coda if not in cache
+        """Get user's current balance from the local ledger, loading it from Coda on first use."""
+        balance = await self._ensure_account_loaded(user_id)
+        return balance if balance is not None else Decimal('0')
+
+    async def _ensure_account_loaded(self, user_id: int) -> Optional[Decimal]:
+        """
+        Make sure the user's account is in the ledger and return its balance.
+
+        Returns None if the account could not be loaded (e.g. Coda is down and
+        the user has never been seen), so callers never overwrite an unknown
+        balance.
+        """
+        balance = await self.ledger.get_balance(user_id)
+        if balance is not None:
+            return balance
+
         try:
             # Query accounts table for the user
             endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
@@ -3540,71 +3414,68 @@ class BankingCog(commands.Cog):
             
             response = await self.coda_api_request('GET', endpoint, params=params)
             
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if response is None:
+                logger.error(f"Could not load account for user {user_id} from Coda")
+                return None
+
+            if 'items' not in response or len(response['items']) == 0:
                 # User not found, create new account with 0 balance
                 return await self.create_account(user_id)
                 
             # Extract balance from response
-            balance_str = response['items'][0]['values'].get('Balance', '0')
-            balance = Decimal(balance_str)
+            item = response['items'][0]
+            balance = Decimal(str(item['values'].get('Balance', '0') or '0'))
             
-            # Cache the balance
-            await self.cache.set_balance(user_id, balance)
-            
-            return balance
+            return await self.ledger.seed_account(user_id, balance, row_id=item.get('id'))
         except Exception as e:
             logger.error(f"Error getting balance for user {user_id}: {e}")
-            return Decimal('0')
+            return None
     
+    async def _ensure_accounts_loaded(self, user_ids: List[int]) -> Dict[int, Optional[Decimal]]:
+        """
+        Bulk version of _ensure_account_loaded.
+
+        Users missing from the ledger are resolved with a single scan of the
+        Accounts table; users with no account get one created. Users whose
+        account could not be loaded map to None.
+        """
+        balances = await self.ledger.get_balances(user_ids)
+        missing = {user_id for user_id in user_ids if balances.get(user_id) is None}
+        if not missing:
+            return balances
+
+        try:
+            # Always scan live: seeding from a lagging copy could overwrite a real
+            # balance, and a scan that fails part-way raises instead of looking empty
+            rows, _ = await self.coda_client.get_changed_rows(DOC_ID, ACCOUNTS_TABLE_ID, use_column_names=True)
+            for row in rows:
+                try:
+                    user_id = parse_user_id(row['values'].get('Discord User ID'))
+                except (TypeError, ValueError):
+                    continue
+                if user_id in missing:
+                    balance = Decimal(str(row['values'].get('Balance', '0') or '0'))
+                    balances[user_id] = await self.ledger.seed_account(user_id, balance, row_id=row.get('id'))
+                    missing.discard(user_id)
+        except Exception as e:
+            logger.error(f"Could not load accounts from Coda: {e}")
+            return {user_id: balances.get(user_id) for user_id in user_ids}
+
+        for user_id in missing:
+            balances[user_id] = await self.create_account(user_id)
+        return balances
+
     async def create_account(self, user_id: int) -> Decimal:
-        """Create a new account for user with 0 balance."""
+        """Create a new account for user with 0 balance; the Coda row is created by the ledger sync."""
         try:
-            # Check for rate limiting
-            if self.check_rate_limit():
-                logger.warning(f"Rate limited while creating account for user {user_id}")
-                return Decimal('0')  # Return 0 balance for now to avoid further requests
-            
             # Fetch user info from Discord
-            user = await self.bot.fetch_user(user_id)
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
             username = user.name if user else f"User-{user_id}"
-            
-            # Create row in accounts table
-            endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
-            
-            # Prepare cells based on known column IDs
-            cells = [
-                {'column': DISCORD_USER_ID_COLUMN, 'value': str(user_id)}
-            ]
-            
-            if USERNAME_COLUMN:
-                cells.append({'column': USERNAME_COLUMN, 'value': username})
-            
-            if BALANCE_COLUMN:
-                cells.append({'column': BALANCE_COLUMN, 'value': '0'})
-            
-            data = {
-                'rows': [{
-                    'cells': cells
-                }]
-            }
-            
+
             logger.info(f"Creating account for user {user_id}")
-            
-            response = await self.coda_api_request('POST', endpoint, data=data)
-            
-            if response and 'items' in response and len(response['items']) > 0:
-                logger.info(f"Successfully created account for user {user_id}")
-                
-                # Cache the new balance
-                await self.cache.set_balance(user_id, Decimal('0'))
-                
-                return Decimal('0')
-            else:
-                logger.error(f"Failed to create account for user {user_id}")
-                # Check for error details in response
-                if response and 'message' in response:
-                    logger.error(f"Error message: {response['message']}")
-                return Decimal('0')
+            return await self.ledger.seed_account(
+                user_id, Decimal('0'), username=username, push=True
+            )
         except Exception as e:
             logger.error(f"Error creating account for user {user_id}: {e}")
             return Decimal('0')
@@ -3613,54 +3484,17 @@ class BankingCog(commands.Cog):
     async def update_balance(self, user_id: int, amount: Decimal) -> bool:
         """Update user's balance by adding the specified amount (can be negative)."""
         try:
-            # Get current balance
-            current_balance = await self.get_balance(user_id)
-            new_balance = current_balance + amount
-            
-            # Prevent negative balance
-            if new_balance < 0:
-                logger.warning(f"Attempted to set negative balance for user {user_id}")
+            current_balance = await self._ensure_account_loaded(user_id)
+            if current_balance is None:
                 return False
-                
-            # Query accounts table for the user to get row ID
-            endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
-            params = {
-                'query': f'Discord User ID = {user_id}',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response or len(response['items']) == 0:
-                # User not found, create new account
-                if amount >= 0:
-                    await self.create_account(user_id)
-                    await self.update_balance(user_id, amount)
-                    return True
-                else:
-                    return False
-                    
-            row_id = response['items'][0]['id']
-            
-            # Update balance in the table
-            update_endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows/{row_id}'
-            
-            data = {
-                'row': {
-                    'cells': [
-                        {'column': 'Balance', 'value': str(new_balance)}
-                    ]
-                }
-            }
-            
-            update_response = await self.coda_api_request('PUT', update_endpoint, data=data)
-            
-            if update_response:
-                # Update the cache
-                await self.cache.set_balance(user_id, new_balance)
-                return True
-            else:
+
+            # The ledger rejects changes that would leave a negative balance
+            new_balance = await self.ledger.apply_delta(user_id, amount)
+            if new_balance is None:
+                logger.warning(f"Attempted to set negative balance for user {user_id}")
                 return False
+            self.bot.cache_service.invalidate_user(user_id)
+            return True
         except Exception as e:
             logger.error(f"Error updating balance for user {user_id}: {e}")
             return False
@@ -3674,7 +3508,7 @@ class BankingCog(commands.Cog):
                           session_id: Optional[str] = None,
                           goal_id: Optional[str] = None,
                           loan_id: Optional[str] = None) -> Optional[str]:
-        """Record a transaction in the database."""
+        """Record a transaction in the local ledger; it is synced to Coda in the background."""
         try:
             # Generate transaction ID
             transaction_id = str(uuid.uuid4())
@@ -3686,48 +3520,21 @@ class BankingCog(commands.Cog):
             if category is None:
                 category = self.get_default_category(trans_type)
                 
-            # Create transaction data
-            endpoint = f'docs/{DOC_ID}/tables/{TRANSACTIONS_TABLE_ID}/rows'
-            
-            data = {
-                'rows': [{
-                    'cells': [
-                        {'column': 'Transaction ID', 'value': transaction_id},
-                        {'column': 'Discord User ID', 'value': str(user_id)},
-                        {'column': 'Type', 'value': trans_type},
-                        {'column': 'Amount', 'value': str(amount)},
-                        {'column': 'Status', 'value': status.value},
-                        {'column': 'Created At', 'value': timestamp}
-                    ]
-                }]
-            }
-            
-            # Add optional fields if provided
-            if target_user_id:
-                data['rows'][0]['cells'].append({'column': 'Target User ID', 'value': str(target_user_id)})
-                
-            if description:
-                data['rows'][0]['cells'].append({'column': 'Description', 'value': description})
-                
-            if category:
-                data['rows'][0]['cells'].append({'column': 'Category', 'value': category.value})
-                
-            if session_id:
-                data['rows'][0]['cells'].append({'column': 'Session ID', 'value': session_id})
-                
-            if goal_id:
-                data['rows'][0]['cells'].append({'column': 'Goal ID', 'value': goal_id})
-                
-            if loan_id:
-                data['rows'][0]['cells'].append({'column': 'Loan ID', 'value': loan_id})
-                
-            response = await self.coda_api_request('POST', endpoint, data=data)
-            
-            if response and 'items' in response and len(response['items']) > 0:
-                return transaction_id
-            else:
-                logger.error(f"Failed to record transaction for user {user_id}")
-                return None
+            await self.ledger.record_transactions([{
+                'transaction_id': transaction_id,
+                'user_id': user_id,
+                'type': trans_type,
+                'amount': str(amount),
+                'status': status.value,
+                'created_at': timestamp,
+                'target_user_id': target_user_id,
+                'description': description,
+                'category': category.value if category else None,
+                'session_id': session_id,
+                'goal_id': goal_id,
+                'loan_id': loan_id
+            }])
+            return transaction_id
         except Exception as e:
             logger.error(f"Error recording transaction for user {user_id}: {e}")
             return None
@@ -3759,9 +3566,16 @@ class BankingCog(commands.Cog):
                               end_date: Optional[datetime] = None, 
                               trans_type: Optional[str] = None,
                               category: Optional[TransactionCategory] = None,
-                              limit: int = 100) -> List[TransactionData]:
-        """Get user transactions with optional filters."""
+                              limit: Optional[int] = 100) -> List[TransactionData]:
+        """Get user transactions with optional filters. ``limit=None`` returns the full local history."""
         try:
+            if self.ledger.history_ready:
+                records = await self.ledger.get_history(
+                    user_id, start_date, end_date, trans_type,
+                    category.value if category else None, limit
+                )
+                return [self._transaction_from_record(record) for record in records]
+
             # Build query
             query_parts = [f'Discord User ID = {user_id}']
             
@@ -3784,70 +3598,94 @@ class BankingCog(commands.Cog):
             params = {
                 'query': query,
                 'useColumnNames': 'true',
-                'limit': limit,
+                'limit': limit or MAX_PAGE_SIZE,
                 'sortBy': 'Created At',
                 'sortDirection': 'desc'
             }
             
             response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response:
-                return []
+            items = response.get('items', []) if response else []
                 
             # Convert response to TransactionData objects
-            transactions = []
-            for item in response['items']:
-                values = item['values']
-                
-                # Parse transaction type
-                try:
-                    trans_type_value = values.get('Type')
-                    trans_type_enum = TransactionType(trans_type_value) if trans_type_value else None
-                except ValueError:
-                    trans_type_enum = None
-                    
-                # Parse category
-                try:
-                    category_value = values.get('Category')
-                    category_enum = TransactionCategory(category_value) if category_value else None
-                except ValueError:
-                    category_enum = None
-                    
-                # Parse status
-                try:
-                    status_value = values.get('Status', 'completed')
-                    status_enum = TransactionStatus(status_value)
-                except ValueError:
-                    status_enum = TransactionStatus.COMPLETED
-                    
-                # Build metadata
-                metadata = {
-                    'created_at': values.get('Created At', ''),
-                    'row_id': item.get('id', '')
-                }
-                
-                # Create TransactionData object
-                transaction = TransactionData(
-                    user_id=int(values.get('Discord User ID', '0')),
-                    trans_type=trans_type_enum,
-                    amount=Decimal(values.get('Amount', '0')),
-                    target_user_id=int(values.get('Target User ID', '0')) if values.get('Target User ID') else None,
-                    description=values.get('Description'),
-                    status=status_enum,
-                    category=category_enum,
-                    transaction_id=values.get('Transaction ID'),
-                    session_id=values.get('Session ID'),
-                    goal_id=values.get('Goal ID'),
-                    loan_id=values.get('Loan ID'),
-                    metadata=metadata
-                )
-                
-                transactions.append(transaction)
-                
-            return transactions
+            transactions = [
+                self._transaction_from_values(item['values'], item.get('id', ''))
+                for item in items
+            ]
+
+            # Include recent transactions that are still waiting in the ledger outbox
+            seen_ids = {t.transaction_id for t in transactions}
+            for record in await self.ledger.get_unsynced_transactions(user_id):
+                if record['transaction_id'] in seen_ids:
+                    continue
+                created_at = record.get('created_at', '')
+                if start_date and created_at < start_date.isoformat():
+                    continue
+                if end_date and created_at > end_date.isoformat():
+                    continue
+                if trans_type and record.get('type') != trans_type:
+                    continue
+                if category and record.get('category') != category.value:
+                    continue
+                transactions.append(self._transaction_from_record(record))
+
+            transactions.sort(key=lambda t: t.metadata.get('created_at', ''), reverse=True)
+            return transactions[:limit]
         except Exception as e:
             logger.error(f"Error getting transactions for user {user_id}: {e}")
             return []
+
+    def _transaction_from_record(self, record: Dict[str, Any]) -> TransactionData:
+        """Build a TransactionData from a ledger transaction record."""
+        values = {
+            column: record[key]
+            for key, column in TRANSACTION_COLUMNS.items()
+            if record.get(key) is not None
+        }
+        return self._transaction_from_values(values, '')
+
+    def _transaction_from_values(self, values: Dict[str, Any], row_id: str) -> TransactionData:
+        """Build a TransactionData from a Transactions row keyed by column name."""
+        # Parse transaction type
+        try:
+            trans_type_value = values.get('Type')
+            trans_type_enum = TransactionType(trans_type_value) if trans_type_value else None
+        except ValueError:
+            trans_type_enum = None
+            
+        # Parse category
+        try:
+            category_value = values.get('Category')
+            category_enum = TransactionCategory(category_value) if category_value else None
+        except ValueError:
+            category_enum = None
+            
+        # Parse status
+        try:
+            status_value = values.get('Status', 'completed')
+            status_enum = TransactionStatus(status_value)
+        except ValueError:
+            status_enum = TransactionStatus.COMPLETED
+            
+        # Build metadata
+        metadata = {
+            'created_at': values.get('Created At', ''),
+            'row_id': row_id
+        }
+        
+        return TransactionData(
+            user_id=int(values.get('Discord User ID', '0')),
+            trans_type=trans_type_enum,
+            amount=Decimal(str(values.get('Amount', '0'))),
+            target_user_id=int(values.get('Target User ID', '0')) if values.get('Target User ID') else None,
+            description=values.get('Description'),
+            status=status_enum,
+            category=category_enum,
+            transaction_id=values.get('Transaction ID'),
+            session_id=values.get('Session ID'),
+            goal_id=values.get('Goal ID'),
+            loan_id=values.get('Loan ID'),
+            metadata=metadata
+        )
     
     async def add_transaction_note(self, transaction_id: str, user_id: int, note: str) -> bool:
         """Add a note to a transaction."""
@@ -3896,7 +3734,8 @@ class BankingCog(commands.Cog):
         self,
         user_id: int,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        category: Optional[TransactionCategory] = None
     ) -> Dict[str, Any]:
         """Get detailed transaction statistics for a user.
         
@@ -3904,12 +3743,20 @@ class BankingCog(commands.Cog):
             user_id: Discord user ID
             start_date: Optional start date for filtering
             end_date: Optional end date for filtering
+            category: Optional category to restrict the statistics to
             
         Returns:
             Dictionary with various statistics about transactions
         """
         try:
-            transactions = await self.get_transactions(user_id, start_date, end_date)
+            if self.ledger.history_ready:
+                # Exact totals from the ledger rollups, no Coda calls
+                summary = await self.ledger.summarize(
+                    user_id, start_date, end_date, category.value if category else None
+                )
+                return self._stats_from_summary(summary)
+
+            transactions = await self.get_transactions(user_id, start_date, end_date, category=category)
             
             if not transactions:
                 return {
@@ -4022,6 +3869,39 @@ class BankingCog(commands.Cog):
                 "transaction_count": 0
             }
     
+    def _stats_from_summary(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a ledger summary like the result of ``get_transaction_stats``."""
+        count = summary['count']
+        stats = {
+            "transaction_count": count,
+            "total_in": summary['total_in'],
+            "total_out": summary['total_out'],
+            "net_change": summary['net_change'],
+            "categories": summary['categories'],
+            "types": summary['types']
+        }
+        if not count:
+            return stats
+
+        def parse_date(value: Optional[str]) -> Optional[datetime]:
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+            except ValueError:
+                return None
+
+        stats.update({
+            "largest_transaction": self._transaction_from_record(summary['largest']) if summary['largest'] else None,
+            "smallest_transaction": self._transaction_from_record(summary['smallest']) if summary['smallest'] else None,
+            "average_transaction": summary['net_change'] / count,
+            "first_transaction_date": parse_date(summary['first_created_at']),
+            "last_transaction_date": parse_date(summary['last_created_at'])
+        })
+        for group, key in (("categories", "most_common_category"), ("types", "most_common_type")):
+            if summary[group]:
+                name, bucket = max(summary[group].items(), key=lambda x: x[1]["count"])
+                stats[key] = {"name": name, "count": bucket["count"], "total": bucket["total"]}
+        return stats
+
     async def search_transactions(
         self,
         user_id: int,
@@ -4108,8 +3988,7 @@ class BankingCog(commands.Cog):
             List of transaction IDs or None for failed transactions.
         """
         try:
-            # Prepare batch data for Coda API
-            batch_rows = []
+            records = []
             transaction_ids = []
             
             for transaction in transactions:
@@ -4119,64 +3998,26 @@ class BankingCog(commands.Cog):
                 transaction_id = str(uuid.uuid4())
                 transaction_ids.append(transaction_id)
                 
-                # Generate timestamp
-                timestamp = datetime.now(timezone.utc).isoformat()
-                
                 # Determine category if not provided
                 if category is None:
                     category = self.get_default_category(trans_type)
                     
-                # Prepare cells for this transaction
-                cells = [
-                    {'column': TRANS_ID_COLUMN, 'value': transaction_id},
-                    {'column': TRANS_USER_ID_COLUMN, 'value': str(user_id)},
-                    {'column': TRANS_TYPE_COLUMN, 'value': trans_type},
-                    {'column': TRANS_AMOUNT_COLUMN, 'value': str(amount)},
-                    {'column': TRANS_STATUS_COLUMN, 'value': TransactionStatus.COMPLETED.value},
-                    {'column': TRANS_CREATED_AT_COLUMN, 'value': timestamp}
-                ]
-                
-                # Add optional fields if provided
-                if target_user_id:
-                    cells.append({'column': TRANS_TARGET_USER_COLUMN, 'value': str(target_user_id)})
-                    
-                if description:
-                    cells.append({'column': TRANS_DESC_COLUMN, 'value': description})
-                    
-                if category:
-                    cells.append({'column': TRANS_CATEGORY_COLUMN, 'value': category.value})
-                    
-                if session_id:
-                    cells.append({'column': TRANS_SESSION_ID_COLUMN, 'value': session_id})
-                    
-                # Add this row to the batch
-                batch_rows.append({'cells': cells})
-                
-            # Send batch request to Coda API
-            if batch_rows:
-                endpoint = f'docs/{DOC_ID}/tables/{TRANSACTIONS_TABLE_ID}/rows'
-                
-                data = {
-                    'rows': batch_rows
-                }
-                
-                response = await self.coda_api_request('POST', endpoint, data=data)
-                
-                if not response or 'items' not in response:
-                    # If batch request failed, fall back to individual requests
-                    logger.warning("Batch transaction add failed, falling back to individual requests")
-                    result_ids = []
-                    for i, transaction in enumerate(transactions):
-                        user_id, trans_type, amount, target_user_id, description, category, session_id = transaction
-                        trans_id = await self.add_transaction(
-                            user_id, trans_type, amount, target_user_id, description, TransactionStatus.COMPLETED, category, session_id
-                        )
-                        result_ids.append(trans_id)
-                    return result_ids
+                records.append({
+                    'transaction_id': transaction_id,
+                    'user_id': user_id,
+                    'type': trans_type,
+                    'amount': str(amount),
+                    'status': TransactionStatus.COMPLETED.value,
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'target_user_id': target_user_id,
+                    'description': description,
+                    'category': category.value if category else None,
+                    'session_id': session_id
+                })
                 
-                return transaction_ids
-            else:
-                return []
+            # One local commit; the ledger pushes them to Coda as a bulk insert
+            await self.ledger.record_transactions(records)
+            return transaction_ids
                 
         except Exception as e:
             logger.error(f"Error adding batch transactions: {e}")
@@ -4189,48 +4030,53 @@ class BankingCog(commands.Cog):
     ) -> List[bool]:
         """Process multiple payouts efficiently in batches.
         
+        All accounts are resolved up front (one Accounts scan for users not
+        yet in the ledger), balances are changed locally in batches, and every
+        transaction is recorded in one go. The ledger then pushes the new
+        balances to Coda as bulk upserts.
+        
         Args:
             payouts: List of tuples (user_id, amount, description, category)
-            batch_size: Number of payouts to process in each batch
+            batch_size: Number of payouts applied per local ledger transaction
             
         Returns:
             List of success flags for each payout
         """
-        results = []
+        if not payouts:
+            return []
+        
+        loaded = await self._ensure_accounts_loaded([user_id for user_id, _, _, _ in payouts])
         
-        # Process in batches to avoid overloading the API
+        results = []
         for i in range(0, len(payouts), batch_size):
             batch = payouts[i:i+batch_size]
-            batch_results = []
-            
-            # First update all balances in this batch
-            for user_id, amount, _, _ in batch:
-                success = await self.update_balance(user_id, amount)
-                batch_results.append(success)
-            
-            # Then record transactions for successful balance updates
-            transaction_batch = []
-            for j, (user_id, amount, description, category) in enumerate(batch):
-                if batch_results[j]:
-                    transaction_batch.append((
-                        user_id, 
-                        TransactionType.VC_PAYOUT.value, 
-                        amount, 
-                        None, 
-                        description,
-                        category or TransactionCategory.PAYOUT,
-                        None
-                    ))
-            
-            # Add transactions in batch
-            if transaction_batch:
-                await self.add_batch_transactions(transaction_batch)
             
-            results.extend(batch_results)
+            # Users whose account could not be loaded fail without touching the ledger
+            deltas = [(user_id, amount) for user_id, amount, _, _ in batch if loaded.get(user_id) is not None]
+            new_balances = iter(await self.ledger.apply_deltas(deltas))
+            for user_id, _, _, _ in batch:
+                results.append(loaded.get(user_id) is not None and next(new_balances) is not None)
+                if results[-1]:
+                    self.bot.cache_service.invalidate_user(user_id)
             
-            # Add a small delay between batches to avoid rate limiting
-            if i + batch_size < len(payouts):
-                await asyncio.sleep(1)
+            logger.info(f"Applied payouts {min(i + batch_size, len(payouts))}/{len(payouts)}")
+        
+        # Record transactions for every successful payout in one batch
+        transaction_batch = [
+            (
+                user_id,
+                TransactionType.VC_PAYOUT.value,
+                amount,
+                None,
+                description,
+                category or TransactionCategory.PAYOUT,
+                None
+            )
+            for (user_id, amount, description, category), success in zip(payouts, results)
+            if success
+        ]
+        if transaction_batch:
+            await self.add_batch_transactions(transaction_batch)
         
         return results
     
@@ -4633,6 +4479,9 @@ class BankingCog(commands.Cog):
             
             response = await self.coda_api_request('POST', endpoint, data=data)
             
+            if response and response.get('addedRowIds') and self.row_index:
+                self.row_index.set(LOANS, loan_id, response['addedRowIds'][0])
+            
             if response and 'items' in response and len(response['items']) > 0:
                 # Return loan data
                 return LoanData(
@@ -4652,6 +4501,43 @@ class BankingCog(commands.Cog):
             logger.error(f"Error creating loan application for user {user_id}: {e}")
             return None
     
+    async def _fetch_loan_row(self, loan_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a loan row, going straight to the indexed row ID when known."""
+        row_id = self.row_index.get(LOANS, loan_id) if self.row_index else None
+        if row_id:
+            response = await self.coda_api_request(
+                'GET',
+                f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}',
+                params={'useColumnNames': 'true'}
+            )
+            if response and response.get('values', {}).get('Loan ID') == loan_id:
+                return response
+            self.row_index.discard(LOANS, loan_id)
+
+        endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
+        params = {
+            'query': f'Loan ID = "{loan_id}"',
+            'useColumnNames': 'true'
+        }
+        
+        response = await self.coda_api_request('GET', endpoint, params=params)
+        
+        if not response or 'items' not in response or len(response['items']) == 0:
+            return None
+            
+        item = response['items'][0]
+        if self.row_index:
+            self.row_index.set(LOANS, loan_id, item['id'])
+        return item
+
+    async def get_loan_row_id(self, loan_id: str) -> Optional[str]:
+        """Return the Coda row ID for a loan, skipping the lookup when it is indexed."""
+        row_id = self.row_index.get(LOANS, loan_id) if self.row_index else None
+        if row_id:
+            return row_id
+        item = await self._fetch_loan_row(loan_id)
+        return item['id'] if item else None
+
     async def get_user_loans(self, user_id: int, status: Optional[List[LoanStatus]] = None) -> List[LoanData]:
         """Get user's loans with optional status filter."""
         try:
@@ -4678,6 +4564,9 @@ class BankingCog(commands.Cog):
             
             if not response or 'items' not in response:
                 return []
+            
+            if self.row_index:
+                self.row_index.learn(LOANS, response['items'], 'Loan ID')
                 
             # Convert response to LoanData objects
             loans = []
@@ -4740,20 +4629,12 @@ class BankingCog(commands.Cog):
     async def get_loan(self, loan_id: str) -> Optional[LoanData]:
         """Get loan by ID."""
         try:
-            # Query loan table for the specific loan
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response or len(response['items']) == 0:
+            item = await self._fetch_loan_row(loan_id)
+            if not item:
                 return None
                 
             # Parse loan data
-            values = response['items'][0]['values']
+            values = item['values']
             
             # Parse loan status
             try:
@@ -4818,18 +4699,10 @@ class BankingCog(commands.Cog):
             new_repaid_amount = loan.repaid_amount + amount
             
             # Update loan in database
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
+            row_id = await self.get_loan_row_id(loan_id)
             
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if not row_id:
                 return False
-                
-            row_id = response['items'][0]['id']
             
             # Prepare update data
             data = {
@@ -4851,6 +4724,7 @@ class BankingCog(commands.Cog):
             if new_repaid_amount >= total_due and loan.status in [LoanStatus.ACTIVE, LoanStatus.APPROVED]:
                 data['row']['cells'].append({'column': 'Status', 'value': LoanStatus.COMPLETED.value})
                 
+            update_endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}'
             update_response = await self.coda_api_request('PUT', update_endpoint, data=data)
             
             if update_response:
@@ -4910,18 +4784,10 @@ class BankingCog(commands.Cog):
                 return False
                 
             # Update loan in database
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
+            row_id = await self.get_loan_row_id(loan_id)
             
-            response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if not row_id:
                 return False
-                
-            row_id = response['items'][0]['id']
             
             # Prepare update data
             current_time = datetime.now(timezone.utc)
@@ -4942,6 +4808,7 @@ class BankingCog(commands.Cog):
                 
             data = {'row': {'cells': cells}}
             
+            update_endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}'
             update_response = await self.coda_api_request('PUT', update_endpoint, data=data)
             
             if update_response and disburse_now:
@@ -4980,18 +4847,10 @@ class BankingCog(commands.Cog):
                 return False
                 
             # Update loan in database
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
+            row_id = await self.get_loan_row_id(loan_id)
             
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if not row_id:
                 return False
-                
-            row_id = response['items'][0]['id']
             
             # Prepare update data
             data = {
@@ -5003,6 +4862,7 @@ class BankingCog(commands.Cog):
                 }
             }
             
+            update_endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}'
             update_response = await self.coda_api_request('PUT', update_endpoint, data=data)
             
             if update_response:
@@ -5027,18 +4887,10 @@ class BankingCog(commands.Cog):
             if not loan:
                 return None
                 
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
+            row_id = await self.get_loan_row_id(loan_id)
             
-            response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if not row_id:
                 return None
-                
-            row_id = response['items'][0]['id']
             
             current_notes = loan.notes or ""
             updated_notes = f"{current_notes}\n\nINCIDENT REPORT ({datetime.now(timezone.utc).strftime('%Y-%m-%d')}): {description}\nLocation: {location}\nAmount Lost: {amount_lost} aUEC\nStatus: Under Review"
@@ -5051,6 +4903,7 @@ class BankingCog(commands.Cog):
                 }
             }
             
+            update_endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}'
             update_response = await self.coda_api_request('PUT', update_endpoint, data=data)
             
             if update_response:
@@ -5510,30 +5363,37 @@ class BankingCog(commands.Cog):
             
     # ====================== SCHEDULED TASKS ======================
     
-    @tasks.loop(hours=24)
     async def sync_usernames(self):
         """Sync Discord usernames with account records daily."""
         try:
-            endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
-            response = await self.coda_api_request('GET', endpoint)
-            
-            if response and 'items' in response:
-                for item in response['items']:
-                    user_id = int(item['values'].get('Discord User ID', '0'))
+            # Background lane: the scheduler paces these requests behind interactive commands
+            with CodaAPIClient.priority(PRIORITY_BACKGROUND):
+                replica = self.coda_replica
+                if replica and replica.is_ready(ACCOUNTS_TABLE):
+                    items = replica.rows(ACCOUNTS_TABLE)
+                else:
+                    endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
+                    response = await self.coda_api_request('GET', endpoint, params={'useColumnNames': 'true'})
+                    items = response.get('items', []) if response else []
+                
+                for item in items:
+                    try:
+                        user_id = parse_user_id(item['values'].get('Discord User ID'))
+                    except ValueError:
+                        continue
                     if user_id:
                         await self.sync_username(user_id)
-                    await asyncio.sleep(1)  # Rate limiting
         except Exception as e:
             logger.error(f"Error in username sync task: {e}")
 
-    @sync_usernames.before_loop
-    async def before_sync_usernames(self):
-        """Wait until the bot is ready before starting the task."""
-        await self.bot.wait_until_ready()
-        
-    @tasks.loop(hours=12)
     async def check_loan_due_dates(self):
         """Check for overdue loans and send reminders."""
+        # Background lane: the scheduler paces these requests behind interactive commands
+        with CodaAPIClient.priority(PRIORITY_BACKGROUND):
+            await self._check_loan_due_dates()
+
+    async def _check_loan_due_dates(self):
+        """Send reminders for loans due soon and default long-overdue loans."""
         try:
             # Get all active loans
             endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
@@ -5574,17 +5434,9 @@ class BankingCog(commands.Cog):
                         
                 except Exception as e:
                     logger.error(f"Error processing loan {item.get('id')}: {e}")
-                    
-                # Sleep briefly to avoid rate limits
-                await asyncio.sleep(1)
                 
         except Exception as e:
             logger.error(f"Error in loan due date check task: {e}")
-            
-    @check_loan_due_dates.before_loop
-    async def before_check_loan_due_dates(self):
-        """Wait until the bot is ready before starting the task."""
-        await self.bot.wait_until_ready()
     
     # ====================== UTILITY METHODS ======================
     
@@ -5609,20 +5461,13 @@ class BankingCog(commands.Cog):
             if not user:
                 return False
                 
-            # Query accounts table for the user
-            endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows'
-            params = {
-                'query': f'Discord User ID = {user_id}',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
-            
-            if not response or 'items' not in response or len(response['items']) == 0:
+            # The ledger remembers each account's Coda row ID
+            row_id = await self.ledger.get_row_id(user_id)
+            if not row_id:
+                row_id = await self.ledger.lookup_account_row(user_id)
+            if not row_id:
                 # User not found, skip update
                 return False
-                
-            row_id = response['items'][0]['id']
             
             # Update username in the table
             update_endpoint = f'docs/{DOC_ID}/tables/{ACCOUNTS_TABLE_ID}/rows/{row_id}'
@@ -5725,18 +5570,10 @@ class BankingCog(commands.Cog):
                 return False
                 
             # Update loan status to defaulted
-            endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-            params = {
-                'query': f'Loan ID = "{loan_id}"',
-                'useColumnNames': 'true'
-            }
-            
-            response = await self.coda_api_request('GET', endpoint, params=params)
+            row_id = await self.get_loan_row_id(loan_id)
             
-            if not response or 'items' not in response or len(response['items']) == 0:
+            if not row_id:
                 return False
-                
-            row_id = response['items'][0]['id']
             
             # Update loan row
             update_endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows/{row_id}'
@@ -6357,22 +6194,14 @@ class BankingCog(commands.Cog):
                 new_due_date = loan.repayment_due_date + timedelta(days=days_extension)
                 
                 # Update loan due date
-                endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-                params = {
-                    'query': f'Loan ID = "{loan_id}"',
-                    'useColumnNames': 'true'
-                }
-                
-                response = await self.coda_api_request('GET', endpoint, params=params)
+                row_id = await self.get_loan_row_id(loan_id)
                 
-                if not response or 'items' not in response or len(response['items']) == 0:
+                if not row_id:
                     await interaction.followup.send(
                         "Failed to find loan. Please check the loan ID.",
                         ephemeral=True
                     )
                     return
-                    
-                row_id = response['items'][0]['id']
                 
                 data = {
                     'row': {
@@ -6411,22 +6240,14 @@ class BankingCog(commands.Cog):
                     return
                     
                 # Mark loan as defaulted
-                endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-                params = {
-                    'query': f'Loan ID = "{loan_id}"',
-                    'useColumnNames': 'true'
-                }
+                row_id = await self.get_loan_row_id(loan_id)
                 
-                response = await self.coda_api_request('GET', endpoint, params=params)
-                
-                if not response or 'items' not in response or len(response['items']) == 0:
+                if not row_id:
                     await interaction.followup.send(
                         "Failed to find loan. Please check the loan ID.",
                         ephemeral=True
                     )
                     return
-                    
-                row_id = response['items'][0]['id']
                 
                 data = {
                     'row': {
@@ -6500,22 +6321,14 @@ class BankingCog(commands.Cog):
                     return
                     
                 # Update loan tax_waived field
-                endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-                params = {
-                    'query': f'Loan ID = "{loan_id}"',
-                    'useColumnNames': 'true'
-                }
+                row_id = await self.get_loan_row_id(loan_id)
                 
-                response = await self.coda_api_request('GET', endpoint, params=params)
-                
-                if not response or 'items' not in response or len(response['items']) == 0:
+                if not row_id:
                     await interaction.followup.send(
                         "Failed to find loan. Please check the loan ID.",
                         ephemeral=True
                     )
                     return
-                    
-                row_id = response['items'][0]['id']
                 
                 data = {
                     'row': {
@@ -6589,22 +6402,14 @@ class BankingCog(commands.Cog):
                     return
                     
                 # Update loan security_fee_waived field
-                endpoint = f'docs/{DOC_ID}/tables/{LOANS_TABLE_ID}/rows'
-                params = {
-                    'query': f'Loan ID = "{loan_id}"',
-                    'useColumnNames': 'true'
-                }
+                row_id = await self.get_loan_row_id(loan_id)
                 
-                response = await self.coda_api_request('GET', endpoint, params=params)
-                
-                if not response or 'items' not in response or len(response['items']) == 0:
+                if not row_id:
                     await interaction.followup.send(
                         "Failed to find loan. Please check the loan ID.",
                         ephemeral=True
                     )
                     return
-                    
-                row_id = response['items'][0]['id']
                 
                 data = {
                     'row': {
@@ -7305,15 +7110,20 @@ class BankingCog(commands.Cog):
                 ephemeral=True
             )
             
+    async def cog_load(self):
+        """Open the local ledger and start syncing it to Coda."""
+        await self.ledger.open()
+        self.ledger.start()
+
     async def cog_unload(self):
         """Cleanup when cog is unloaded."""
-        # Cancel the username sync task if it's running
-        if self.sync_usernames.is_running():
-            self.sync_usernames.cancel()
-            
-        # Cancel the loan due date check task if it's running
-        if self.check_loan_due_dates.is_running():
-            self.check_loan_due_dates.cancel()
+        # Flush pending ledger writes and close the database
+        await self.ledger.stop()
+        
+        # Unregister the scheduled username sync and loan checks
+        scheduler = self.bot.services.get('scheduler')
+        scheduler.remove('banking.sync_usernames')
+        scheduler.remove('banking.loan_due_dates')
         
         logger.info("BankingCog has been unloaded.")
 
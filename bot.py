@@ -5,11 +5,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-import logging.handlers
 import os
 import asyncio
 import json
-import time
 from datetime import datetime
 from functools import wraps
 
@@ -17,6 +15,19 @@ from functools import wraps
 from cogs.utils.shared_utils import BackupManager, SharedAuditLogger
 from cogs.utils.profile_sync import ProfileSyncManager
 from cogs.utils.coda_api import CodaAPIClient
+from cogs.utils.row_index import CodaRowIndex
+from cogs.utils.cache_service import CacheService
+from cogs.utils.document_store import DocumentStore
+from cogs.utils.http_pool import HTTPPool
+from cogs.utils.render_pool import RenderPool
+from cogs.utils.autocomplete_index import AutocompleteService
+from cogs.utils.member_reconciler import MemberReconciler
+from cogs.utils.bulk_operations import BulkOperationEngine
+from cogs.utils.job_scheduler import JobScheduler
+from cogs.utils import log_pipeline
+from cogs.utils.coda_replica import (
+    CodaReplica, PROFILES_TABLE, ACCOUNTS_TABLE
+)
 from cogs.utils.daily_limit_manager import DailyLimitManager
 from cogs.utils.rate_limit_manager import RateLimitManager
 from cogs.utils.command_state_manager import CommandStateManager
@@ -106,18 +117,18 @@ def event_listener(event_name):
 ##############################################################################
 # State Manager for Shared State
 ##############################################################################
+_MISSING = object()
+
 class StateManager:
     """
     Manages shared state between cogs with persistence and caching.
     """
-    def __init__(self, bot, cache_ttl=300, save_interval=60):
+    def __init__(self, bot, cache_ttl=300, save_interval=60, cache_service=None):
         self.bot = bot
         self.cache_ttl = cache_ttl  # Time to live for cache entries in seconds
         self.save_interval = save_interval  # How often to save state to disk in seconds
         self._state = {}
-        self._cache = {}  # Cache with timestamps
-        self._cache_hits = 0
-        self._cache_misses = 0
+        self._cache = (cache_service or CacheService()).namespace('state', maxsize=4096, ttl=cache_ttl)
         self._dirty = False  # Tracks if state has changed since last save
         self._state_file = "bot_state.json"
         self._lock = asyncio.Lock()
@@ -183,40 +194,20 @@ class StateManager:
             while True:
                 await asyncio.sleep(self.save_interval)
                 await self._save_state()
-                # Clean expired cache entries
-                self._clean_cache()
         except asyncio.CancelledError:
             logger.info("Background save task cancelled")
             raise
         except Exception as e:
             logger.error(f"Error in background save task: {e}")
             
-    def _clean_cache(self):
-        """Remove expired cache entries."""
-        now = time.time()
-        expired_keys = [k for k, (_, timestamp) in self._cache.items() 
-                       if now - timestamp > self.cache_ttl]
-        
-        for key in expired_keys:
-            del self._cache[key]
-            
-        if expired_keys:
-            logger.debug(f"Cleaned {len(expired_keys)} expired cache entries")
-            
     async def get(self, namespace: str, key: str, default=None):
         """Get a value from state."""
         cache_key = f"{namespace}:{key}"
         
         # Check cache first
-        if cache_key in self._cache:
-            value, timestamp = self._cache[cache_key]
-            # Check if expired
-            if time.time() - timestamp <= self.cache_ttl:
-                self._cache_hits += 1
-                return value
-                
-        # Cache miss or expired
-        self._cache_misses += 1
+        value = self._cache.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            return value
         
         async with self._lock:
             # Namespace doesn't exist
@@ -230,7 +221,7 @@ class StateManager:
             value = self._state[namespace][key]
             
             # Update cache
-            self._cache[cache_key] = (value, time.time())
+            self._cache.set(cache_key, value)
             
             return value
             
@@ -246,15 +237,14 @@ class StateManager:
             self._dirty = True
             
             # Update cache
-            self._cache[f"{namespace}:{key}"] = (value, time.time())
+            self._cache.set(f"{namespace}:{key}", value)
             
     async def delete(self, namespace: str, key: str):
         """Delete a key from state. Returns True if key existed."""
         cache_key = f"{namespace}:{key}"
         
         # Remove from cache
-        if cache_key in self._cache:
-            del self._cache[cache_key]
+        self._cache.invalidate(cache_key)
             
         async with self._lock:
             # Namespace doesn't exist
@@ -279,54 +269,40 @@ class StateManager:
 # 1) Logging setup
 ##############################################################################
 def setup_logging():
+    """
+    Route all logging through the queued pipeline so file and console I/O
+    happen off the event loop. LOG_LEVEL sets the default level and
+    LOG_LEVELS per-subsystem overrides, e.g. "coda_api=DEBUG,banking=INFO".
+    """
     log_level_name = os.getenv('LOG_LEVEL', 'INFO').upper()
     log_level = getattr(logging, log_level_name, logging.INFO)
     
-    detailed_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    simple_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    root_logger.handlers.clear()
-
-    file_handler = logging.handlers.RotatingFileHandler(
-        filename='bot.log',
-        encoding='utf-8',
-        maxBytes=5 * 1024 * 1024,  # 5 MB
-        backupCount=5,
-        mode='a'
-    )
-    file_handler.setFormatter(detailed_formatter)
-    file_handler.setLevel(log_level)
-
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(simple_formatter)
-    console_handler.setLevel(log_level)
-
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-
-    # Suppress overly verbose logs
-    logging.getLogger('discord').setLevel(logging.WARNING)
-    logging.getLogger('discord.http').setLevel(logging.WARNING)
-    logging.getLogger('discord.gateway').setLevel(logging.WARNING)
+    # Suppress overly verbose logs unless overridden
+    levels = {
+        'discord': logging.WARNING,
+        'discord.http': logging.WARNING,
+        'discord.gateway': logging.WARNING,
+    }
+    levels.update(log_pipeline.parse_levels(os.getenv('LOG_LEVELS')))
+    log_pipeline.configure(level=log_level, filename='bot.log', levels=levels)
     
     logger = logging.getLogger('bot')
-    logger.setLevel(log_level)
+    logger.setLevel(levels.get('bot', log_level))
     return logger
 
-logger = setup_logging()
-logger.info(f"Logging configured with level: {logging.getLevelName(logger.getEffectiveLevel())}")
+# Configured by the entry point; render workers import this module and must not touch bot.log
+logger = logging.getLogger('bot')
 
 ##############################################################################
 # 2) Load environment variables and check token
 ##############################################################################
-TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-if not TOKEN:
-    logger.error("ERROR: DISCORD_BOT_TOKEN is empty or not set. Please check your .env file.")
-    raise ValueError("DISCORD_BOT_TOKEN not found!")
-
-logger.info(f"Token length is {len(TOKEN)} characters. (This is just to confirm non-empty.)")
+def load_token() -> str:
+    token = os.getenv('DISCORD_BOT_TOKEN')
+    if not token:
+        logger.error("ERROR: DISCORD_BOT_TOKEN is empty or not set. Please check your .env file.")
+        raise ValueError("DISCORD_BOT_TOKEN not found!")
+    logger.info(f"Token length is {len(token)} characters. (This is just to confirm non-empty.)")
+    return token
 
 # If you only want global commands, the guild IDs won't be used, but we'll still parse them in case
 # you decide later to revert to guild-based commands.
@@ -348,7 +324,6 @@ def validate_guild_ids():
                 raise ValueError("GUILD_ID must contain valid positive integers, comma separated")
     return guild_ids
 
-GUILD_IDS = validate_guild_ids()
 
 def validate_env_variables():
     """Validate critical environment variables."""
@@ -434,6 +409,18 @@ class BaseCog(commands.Cog):
     @property
     def event_dispatcher(self):
         return self.bot.services.get('event_dispatcher')
+    
+    @property
+    def row_index(self):
+        return self.bot.services.get('row_index')
+    
+    @property
+    def cache_service(self):
+        return self.bot.services.get('cache')
+    
+    @property
+    def coda_replica(self):
+        return self.bot.services.get('coda_replica')
         
     def log_command_use(self, interaction, command_name):
         """Standard method to log command usage."""
@@ -483,8 +470,11 @@ class BaseCog(commands.Cog):
 
 class MyBot(commands.Bot):
     def __init__(self):
+        # Created first so Discord's rate limit headers reach it from every request
+        rate_limiter = RateLimitManager()
         super().__init__(
             command_prefix=commands.when_mentioned,
+            http_trace=rate_limiter.trace_config(),
             intents=intents,
             default_permissions=discord.Permissions(
                 send_messages=True,
@@ -499,7 +489,7 @@ class MyBot(commands.Bot):
         )
         
         # Store guild IDs, though for global commands we won't use them
-        self.guild_ids = GUILD_IDS
+        self.guild_ids = validate_guild_ids()
         # Fix: Add a singular guild_id attribute (e.g. first guild) for compatibility
         self.guild_id = self.guild_ids[0] if self.guild_ids else None
         
@@ -529,38 +519,94 @@ class MyBot(commands.Bot):
 
         # Initialize service registry
         self.services = ServiceRegistry(self)
+        self._startup_sync_task = None
         
         # Initialize event dispatcher
         self.event_dispatcher = EventDispatcher(self)
         self.services.register('event_dispatcher', self.event_dispatcher)
         
+        # Shared cache service with named, size-bounded namespaces
+        self.cache_service = CacheService()
+        self.services.register('cache', self.cache_service)
+        
+        # Per-record storage for missions, AARs and orders
+        self.document_store = DocumentStore()
+        self.services.register('documents', self.document_store)
+        
+        # Shared keep-alive HTTP pool for feeds and other third-party requests
+        self.http_pool = HTTPPool()
+        self.services.register('http', self.http_pool)
+        
+        # Worker processes for profile charts and PDFs, with a result cache
+        self.render_pool = RenderPool(cache_service=self.cache_service)
+        self.services.register('render', self.render_pool)
+        
+        # Shared autocomplete indexes; member indexes follow join/leave/update events
+        self.autocomplete = AutocompleteService(self)
+        self.services.register('autocomplete', self.autocomplete)
+        
+        # Desired-state role and nickname writes, one member.edit per member
+        self.member_reconciler = MemberReconciler(self)
+        self.services.register('member_reconciler', self.member_reconciler)
+        
+        # Cron-style background jobs with persisted last runs and a heavy-job cap
+        self.scheduler = JobScheduler(self, max_heavy=int(os.getenv('SCHEDULER_MAX_HEAVY', '2')))
+        self.services.register('scheduler', self.scheduler)
+        
         # Initialize state manager
-        self.state_manager = StateManager(self)
+        self.state_manager = StateManager(self, cache_service=self.cache_service)
         self.services.register('state_manager', self.state_manager)
         
         # Initialize CodaAPIClient first
         coda_client = CodaAPIClient(os.getenv('CODA_API_TOKEN'))
         self.services.register('coda_client', coda_client)
         
+        # Persistent Discord ID -> Coda row ID index shared by all cogs
+        self.row_index = CodaRowIndex()
+        self.services.register('row_index', self.row_index)
+        
+        # Local read replica of hot Coda tables for reports
+        self.coda_replica = CodaReplica(coda_client, os.getenv('DOC_ID'))
+        self.coda_replica.register_table(PROFILES_TABLE, os.getenv('TABLE_ID'))
+        self.coda_replica.register_table(ACCOUNTS_TABLE, os.getenv('ACCOUNTS_TABLE_ID'))
+        self.services.register('coda_replica', self.coda_replica)
+        
         # Initialize CodaManager with the client
         coda_manager = CodaManager(
             coda_client=coda_client,
             doc_id=os.getenv('DOC_ID'),
             profile_table_id=os.getenv('TABLE_ID'),
-            promotion_requests_table_id=os.getenv('PROMOTION_REQUESTS_TABLE_ID')
+            promotion_requests_table_id=os.getenv('PROMOTION_REQUESTS_TABLE_ID'),
+            row_index=self.row_index,
+            cache_service=self.cache_service,
+            replica=self.coda_replica
         )
         self.services.register('coda_manager', coda_manager)
         
+        # Hourly deduplicated member-table snapshot
+        self.scheduler.add('coda_manager.backup', '@hourly', coda_manager.backup_data, heavy=True)
+        
         # Register all services in the registry
         self.services.register('daily_limit', DailyLimitManager())
-        self.services.register('rate_limiter', RateLimitManager())
+        self.services.register('rate_limiter', rate_limiter)
         self.services.register('command_state', CommandStateManager(self))
-        self.services.register('profile_sync', ProfileSyncManager(self))
+        self.services.register('profile_sync', ProfileSyncManager(self, coda_client=coda_client))
         self.services.register('audit_logger', SharedAuditLogger(self, int(os.getenv('AUDIT_LOG_CHANNEL_ID', 0))))
         self.services.register('backup_manager', BackupManager())
         
+        # Guild-wide member mutations paced by Discord's buckets, resumable via state
+        self.bulk_operations = BulkOperationEngine(
+            rate_limiter=rate_limiter,
+            state_manager=self.state_manager
+        )
+        self.services.register('bulk_operations', self.bulk_operations)
+        
         # NicknameManager requires coda_manager, so get it from the registry
-        self.services.register('nickname_manager', NicknameManager(coda_manager=coda_manager))
+        self.services.register('nickname_manager', NicknameManager(
+            coda_manager=coda_manager,
+            reconciler=self.member_reconciler,
+            bulk_operations=self.bulk_operations
+        ))
         
         # For backward compatibility, provide direct references to services
         self.daily_limit_manager = self.services.get('daily_limit')
@@ -640,8 +686,19 @@ class MyBot(commands.Bot):
         # 7) Register all event listeners from loaded cogs
         self._register_event_listeners()
         
-        # 8) Start the state manager background task
+        # 8) Start the state manager, row index, cache, document store, profile sync, replica and job scheduler background tasks
         self.state_manager.start()
+        self.row_index.start()
+        self.cache_service.start()
+        self.document_store.start()
+        self.profile_sync.start()
+        try:
+            await self.coda_replica.open()
+            self.coda_replica.start()
+        except Exception as e:
+            logger.error(f"Failed to start Coda replica: {e}")
+        # Cogs registered their jobs while loading
+        self.scheduler.start()
         
         # 9) Initialize CodaManager columns if available
         if hasattr(self.coda_manager, 'initialize_columns'):
@@ -651,10 +708,21 @@ class MyBot(commands.Bot):
             except Exception as e:
                 logger.error(f"Failed to initialize CodaManager columns: {e}")
         
-        # 10) IMPORTANT: Do NOT sync here - let the SyncCommandsCog handle syncing
-        logger.info("Command setup complete. Not syncing commands automatically.")
-        logger.info("Commands will be synced by SyncCommandsCog based on rate limits.")
-        logger.info("Use /sync_commands to manually sync, or /sync_status to check status.")
+        # 10) Minimal command sync: only new, changed or removed commands are sent,
+        # with creates kept within the daily quota. Runs in the background.
+        if sync_cog:
+            # Keep a reference so the task is not garbage-collected mid-sync
+            self._startup_sync_task = asyncio.create_task(sync_cog.auto_sync())
+            self._startup_sync_task.add_done_callback(self._log_task_failure)
+            logger.info("Command setup complete. Syncing changed commands in the background.")
+        else:
+            logger.info("Command setup complete. No sync cog loaded, so commands were not synced.")
+        logger.info("Use /sync_commands to sync manually, or /sync_status to check status.")
+    
+    @staticmethod
+    def _log_task_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task failed: {task.exception()!r}", exc_info=task.exception())
     
     def _register_event_listeners(self):
         """Find and register all event listeners in loaded cogs."""
@@ -718,6 +786,23 @@ class MyBot(commands.Bot):
         """Override close to properly shut down custom components."""
         logger.info("Bot is shutting down, cleaning up resources...")
         
+        # A startup command sync still running has nothing left to do
+        if self._startup_sync_task and not self._startup_sync_task.done():
+            self._startup_sync_task.cancel()
+        
+        # Stop background jobs first so none start against closing services
+        try:
+            await self.scheduler.stop()
+        except Exception as e:
+            logger.error(f"Error stopping job scheduler: {e}")
+        
+        # Unload cogs while the services their cog_unload saves go through are running
+        for name in tuple(self.cogs):
+            try:
+                await self.remove_cog(name)
+            except Exception as e:
+                logger.error(f"Error unloading cog {name}: {e}")
+        
         # Stop the state manager background task
         try:
             await self.state_manager.stop()
@@ -725,6 +810,36 @@ class MyBot(commands.Bot):
         except Exception as e:
             logger.error(f"Error stopping state manager: {e}")
         
+        # Persist the row index
+        try:
+            await self.row_index.stop()
+        except Exception as e:
+            logger.error(f"Error saving row index: {e}")
+        
+        # Stop the replica sync task
+        try:
+            await self.coda_replica.stop()
+        except Exception as e:
+            logger.error(f"Error stopping Coda replica: {e}")
+        
+        # Stop the cache sweep task
+        try:
+            await self.cache_service.stop()
+        except Exception as e:
+            logger.error(f"Error stopping cache service: {e}")
+        
+        # Flush queued profile updates; anything left is replayed on the next start
+        try:
+            await self.profile_sync.stop()
+        except Exception as e:
+            logger.error(f"Error stopping profile sync: {e}")
+        
+        # Write pending mission, AAR and order changes
+        try:
+            await self.document_store.stop()
+        except Exception as e:
+            logger.error(f"Error stopping document store: {e}")
+        
         # Backup Coda data if coda_manager exists and has backup method
         if hasattr(self, 'coda_manager') and hasattr(self.coda_manager, 'backup_data'):
             try:
@@ -733,6 +848,25 @@ class MyBot(commands.Bot):
             except Exception as e:
                 logger.error(f"Error backing up Coda data: {e}")
         
+        # Close the shared Coda connection pool
+        if hasattr(self, 'coda_client'):
+            try:
+                await self.coda_client.close()
+            except Exception as e:
+                logger.error(f"Error closing Coda client: {e}")
+        
+        # Stop the render workers
+        try:
+            self.render_pool.close()
+        except Exception as e:
+            logger.error(f"Error stopping render pool: {e}")
+        
+        # Close the shared HTTP pool
+        try:
+            await self.http_pool.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP pool: {e}")
+        
         # Continue with normal shutdown
         logger.info("Proceeding with normal shutdown")
         await super().close()
@@ -741,17 +875,23 @@ class MyBot(commands.Bot):
 # 4) Main entry point
 ##############################################################################
 async def main():
+    token = load_token()
     bot = MyBot()
     # Add any custom checks or environment validations here
     validate_env_variables()
     async with bot:
-        await bot.start(TOKEN)
+        await bot.start(token)
 
 if __name__ == "__main__":
+    setup_logging()
+    logger.info(f"Logging configured with level: {logging.getLevelName(logger.getEffectiveLevel())}")
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot shutdown by user")
     except Exception as e:
         logger.error(f"Bot crashed: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        # Flush queued log records before the process exits
+        log_pipeline.shutdown()
\ No newline at end of file
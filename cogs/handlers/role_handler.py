@@ -2,13 +2,15 @@ import discord
 import logging
 from typing import Tuple, Optional, List
 from ..constants import RANK_ABBREVIATIONS
+from ..utils.member_reconciler import MemberReconciler
 
 logger = logging.getLogger('onboarding')
 
 class RoleHandler:
-    def __init__(self, guild: discord.Guild):
+    def __init__(self, guild: discord.Guild, reconciler: Optional[MemberReconciler] = None):
         self.guild = guild
         self.role_cache = {}
+        self.reconciler = reconciler or MemberReconciler()
 
     def get_role(self, role_name: str) -> Optional[discord.Role]:
         """Get role with caching."""
@@ -27,33 +29,21 @@ class RoleHandler:
         Associates get Associate role
         """
         try:
-            roles_to_add = []
-            
-            # Remove any existing rank roles
-            current_rank_roles = [
-                role for role in member.roles 
-                if any(rank_name in role.name for rank_name, _ in RANK_ABBREVIATIONS.items())
-            ]
-            if current_rank_roles:
-                await member.remove_roles(*current_rank_roles, reason="Onboarding reset")
-            
-            # Assign new roles
+            # Members get Non-Division + Crewman Recruit, Associates get Associate
             if member_type == "Member":
-                non_div_role = self.get_role('Non-Division')
-                rank_role = self.get_role('Crewman Recruit')
-                if non_div_role and rank_role:
-                    roles_to_add.extend([non_div_role, rank_role])
+                rank, extra_roles = 'Crewman Recruit', ['Non-Division']
             else:  # Associate
-                associate_role = self.get_role('Associate')
-                if associate_role:
-                    roles_to_add.append(associate_role)
+                rank, extra_roles = 'Associate', []
 
-            if not roles_to_add:
+            if not self.get_role(rank) or not all(self.get_role(name) for name in extra_roles):
                 logger.error(f"Could not find required roles for {member_type}")
                 return False, "Required roles not found"
 
-            await member.add_roles(*roles_to_add, reason="Onboarding completion")
-            logger.info(f"Assigned roles to {member}: {[r.name for r in roles_to_add]}")
+            # The rank replaces any existing rank role in the same edit
+            await self.reconciler.reconcile(
+                member, rank=rank, roles=extra_roles, reason="Onboarding completion"
+            )
+            logger.info(f"Assigned roles to {member}: {[rank, *extra_roles]}")
             return True, None
 
         except discord.Forbidden:
@@ -87,7 +77,7 @@ class RoleHandler:
             if len(new_nickname) > 32:
                 new_nickname = f"{rank_abbrev} {base_name[:29-len(rank_abbrev)]}"
             
-            await member.edit(nick=new_nickname)
+            await self.reconciler.reconcile(member, nick=new_nickname, reason="Onboarding nickname")
             logger.info(f"Updated nickname for {member} to {new_nickname}")
             return True, None
 
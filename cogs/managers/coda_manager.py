@@ -7,6 +7,12 @@ from datetime import datetime, timezone, timedelta
 import os
 import json
 
+from ..utils.cache_service import CacheService, row_tag, user_tag
+from ..utils.coda_api import CodaAPIClient, PRIORITY_BULK
+from ..utils.coda_replica import CodaReplica, PROFILES_TABLE
+from ..utils.row_index import CodaRowIndex, PROFILES
+from ..utils.snapshot_store import SnapshotStore
+
 logger = logging.getLogger('coda_manager')
 
 class CodaManager:
@@ -14,9 +20,17 @@ class CodaManager:
     Handles all Coda.io API interactions with enhanced caching and service integration.
     """
     
-    def __init__(self, coda_client, doc_id: str = None, profile_table_id: str = None, promotion_requests_table_id: str = None):
+    def __init__(self, coda_client, doc_id: str = None, profile_table_id: str = None, promotion_requests_table_id: str = None,
+                 row_index: Optional[CodaRowIndex] = None, cache_service: Optional[CacheService] = None,
+                 replica: Optional[CodaReplica] = None):
         self.coda = coda_client
         
+        # Local read replica used for whole-table reports, when synced
+        self.replica = replica
+        
+        # Discord user ID -> profile row ID index (shared service)
+        self.row_index = row_index or CodaRowIndex()
+        
         # Accept parameters directly or get from environment variables
         self.doc_id = doc_id or os.getenv('DOC_ID')
         self.profile_table_id = profile_table_id or os.getenv('TABLE_ID')
@@ -27,64 +41,86 @@ class CodaManager:
         self.accounts_table_id = os.getenv('ACCOUNTS_TABLE_ID')
         self.transactions_table_id = os.getenv('TRANSACTIONS_TABLE_ID')
         
-        # Cache settings
-        self._cache = {}
-        self._cache_lock = asyncio.Lock()
+        # Cache settings: members are served stale for a minute while refreshing
         self._cache_expiry = 300  # 5 minutes
+        self._cache_service = cache_service or CacheService()
+        self._cache = self._cache_service.namespace(
+            'coda.members', maxsize=2000, ttl=self._cache_expiry, stale_ttl=60
+        )
         
         # Column mappings
         self.columns = {}  # Will be populated by initialize_columns
         
-        # Backup settings
+        # Backup settings: deduplicated snapshots, cheap enough to take hourly
+        # (the bot schedules backup_data as an hourly job)
         self._backup_dir = "coda_backups"
-        self._backup_interval = 24 * 60 * 60  # 24 hours
         self._last_backup = None
+        self._snapshots = SnapshotStore(self._backup_dir)
         
         logger.info("CodaManager initialized")
 
     async def get_member_data(self, member_id: int) -> Optional[Dict[str, Any]]:
         """Get member data from Coda with caching."""
+        async def load() -> Optional[Dict[str, Any]]:
+            row = await self._fetch_member_row(member_id)
+            if not row:
+                logger.warning(f"No data found for member {member_id}")
+                return None
+            
+            # Clean and store the data
+            member_data = self._clean_coda_data(row.get('values', {}))
+            member_data['id'] = row['id']  # Include row ID
+            return member_data
+        
         try:
-            # Check cache first
-            cache_key = f"member_{member_id}"
-            async with self._cache_lock:
-                cached_data = self._cache.get(cache_key)
-                if cached_data:
-                    cache_time = cached_data.get('_cache_time', 0)
-                    if datetime.now().timestamp() - cache_time < self._cache_expiry:
-                        logger.debug(f"Returning cached data for member {member_id}")
-                        return cached_data['data']
-
-            # Query Coda using standardized client
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.profile_table_id,
-                query=f'"Discord User ID":"{member_id}"',
-                use_column_names=True,
-                limit=1
+            # Concurrent misses for the same member share one load
+            return await self._cache.get_or_load(
+                f"member_{member_id}",
+                load,
+                tags=lambda data: [user_tag(member_id), row_tag(data['id'])]
             )
-            
-            if rows and len(rows) > 0:
-                # Clean and store the data
-                member_data = self._clean_coda_data(rows[0].get('values', {}))
-                member_data['id'] = rows[0]['id']  # Include row ID
-                
-                # Update cache
-                async with self._cache_lock:
-                    self._cache[cache_key] = {
-                        'data': member_data,
-                        '_cache_time': datetime.now().timestamp()
-                    }
-                
-                return member_data
-
-            logger.warning(f"No data found for member {member_id}")
-            return None
 
         except Exception as e:
             logger.error(f"Error getting member data: {e}", exc_info=True)
             return None
 
+    async def _fetch_member_row(self, member_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch a member's profile row, going straight to the indexed row ID when known."""
+        row_id = self.row_index.get(PROFILES, member_id)
+        if row_id:
+            row = await self.coda.get_row(
+                self.doc_id,
+                self.profile_table_id,
+                row_id,
+                use_column_names=True
+            )
+            discord_id = str((row or {}).get('values', {}).get('Discord User ID', '')).strip('`').strip()
+            if row and discord_id == str(member_id):
+                return row
+            # Row deleted or reassigned: forget it and fall back to a query
+            logger.debug(f"Stale row index entry for member {member_id}")
+            self.row_index.discard(PROFILES, member_id)
+
+        rows = await self.coda.get_rows(
+            self.doc_id,
+            self.profile_table_id,
+            query=f'"Discord User ID":"{member_id}"',
+            use_column_names=True,
+            limit=1
+        )
+        if not rows:
+            return None
+        self.row_index.set(PROFILES, member_id, rows[0]['id'])
+        return rows[0]
+
+    async def get_member_row_id(self, member_id: int) -> Optional[str]:
+        """Return a member's profile row ID, using the index to skip the lookup when possible."""
+        row_id = self.row_index.get(PROFILES, member_id)
+        if row_id:
+            return row_id
+        member_data = await self.get_member_data(member_id)
+        return member_data.get('id') if member_data else None
+
     def _clean_coda_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Clean data received from Coda."""
         cleaned = {}
@@ -344,9 +380,9 @@ class CodaManager:
 
             if success:
                 logger.info(f"Successfully updated Coda records for member {member_id}")
-                # Invalidate cache
-                async with self._cache_lock:
-                    self._cache.pop(f"member_{member_id}", None)
+                # Drop every cached entry for this member and row
+                self._cache_service.invalidate_user(member_id)
+                self._cache_service.invalidate_row(row_id)
                 return True
             else:
                 logger.error(f"Failed to update Coda records for member {member_id}")
@@ -610,8 +646,9 @@ class CodaManager:
             Dict[str, Any]: Dictionary containing certification statistics
         """
         try:
-            # Get all members
-            members = await self.get_all_members()
+            # Get all members; the full scan yields to interactive requests
+            with CodaAPIClient.priority(PRIORITY_BULK):
+                members = await self.get_all_members()
             
             # Initialize counters
             cert_counts = {}
@@ -654,17 +691,23 @@ class CodaManager:
             List[Dict[str, Any]]: List of member data dictionaries
         """
         try:
-            # Get all rows from the member profile table
-            response = await self.coda.get_rows(
-                self.doc_id,
-                self.profile_table_id,
-                limit=1000,  # Set a reasonable limit
-                use_column_names=True
-            )
+            if self.replica and self.replica.is_ready(PROFILES_TABLE):
+                # Serve whole-table reads from the replica without API calls
+                response = self.replica.rows(PROFILES_TABLE)
+            else:
+                # Get all rows from the member profile table, every page
+                response = await self.coda.get_rows(
+                    self.doc_id,
+                    self.profile_table_id,
+                    use_column_names=True
+                )
             
             if not response:
                 logger.error("Failed to fetch members from Coda")
                 return []
+            
+            # A full scan refreshes the whole profile row index
+            self.row_index.learn(PROFILES, response, 'Discord User ID')
                 
             members = []
             for row in response:
@@ -712,45 +755,83 @@ class CodaManager:
     async def _invalidate_member_cache(self, row_id: str) -> None:
         """Invalidate cache for a specific member row."""
         try:
-            async with self._cache_lock:
-                # Find all cache entries for this member
-                related_keys = []
-                for key, cached in self._cache.items():
-                    if key.startswith('member_') and 'data' in cached:
-                        if cached['data'].get('id') == row_id:
-                            related_keys.append(key)
-                            
-                # Remove all related entries
-                for key in related_keys:
-                    logger.debug(f"Invalidating cache for {key}")
-                    self._cache.pop(key, None)
+            removed = self._cache_service.invalidate_row(row_id)
+            if removed:
+                logger.debug(f"Invalidated {removed} cache entries for row {row_id}")
         except Exception as e:
             logger.error(f"Error invalidating member cache: {e}")
             
     # New method for backup functionality
     async def backup_data(self) -> bool:
-        """Create a backup of Coda data."""
+        """Snapshot the member table; only changed rows are written."""
         try:
-            # Ensure backup directory exists
-            os.makedirs(self._backup_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(self._backup_dir, f"coda_backup_{timestamp}.json")
+            # Fold full JSON dumps from before snapshots existed into the store
+            await self._import_legacy_backups()
             
-            # Get all members
-            members = await self.get_all_members()
+            # Get all members; the full scan yields to interactive requests
+            with CodaAPIClient.priority(PRIORITY_BULK):
+                members = await self.get_all_members()
             
-            # Write to file
-            with open(backup_file, 'w') as f:
-                json.dump(members, f, indent=2)
+            snapshot = await self._snapshots.create(members, key_field='Discord User ID', label='coda_backup')
+            await self._snapshots.prune()
+            self._last_backup = datetime.now(timezone.utc)
                 
-            logger.info(f"Created backup with {len(members)} members at {backup_file}")
+            logger.info(
+                f"Created backup {snapshot['id']} with {snapshot['rows']} members "
+                f"({snapshot['added']} changed, {snapshot['bytes']} bytes)"
+            )
             return True
             
         except Exception as e:
             logger.error(f"Error creating backup: {e}")
             return False
     
+    async def restore_backup(self, snapshot_id: Optional[str] = None, at: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+        """Member table as of a snapshot ID, a point in time, or the latest backup."""
+        return await self._snapshots.restore(snapshot_id, at=at)
+    
+    async def _import_legacy_backups(self):
+        """
+        Move coda_backup_*.json dumps into the snapshot store, oldest first.
+        A dump that cannot be imported is renamed to ``.failed`` so it is
+        tried only once, not on every hourly backup.
+        """
+        if not os.path.isdir(self._backup_dir):
+            return
+        legacy = sorted(
+            name for name in os.listdir(self._backup_dir)
+            if name.startswith('coda_backup_') and name.endswith('.json')
+        )
+        imported = 0
+        for name in legacy:
+            path = os.path.join(self._backup_dir, name)
+            try:
+                members = await asyncio.to_thread(self._read_json, path)
+                created_at = datetime.strptime(name[len('coda_backup_'):-len('.json')], "%Y%m%d_%H%M%S")
+                snapshot = await self._snapshots.create(
+                    members, key_field='Discord User ID', label='coda_backup',
+                    created_at=created_at.replace(tzinfo=timezone.utc)
+                )
+                # Only drop the dump once the snapshot reads back identically
+                if await self._snapshots.restore(snapshot['id']) == members:
+                    os.remove(path)
+                    imported += 1
+                    continue
+                logger.error(f"Snapshot of {name} does not match; keeping the original as {name}.failed")
+            except Exception as e:
+                logger.error(f"Error importing legacy backup {name}: {e}")
+            try:
+                os.replace(path, f"{path}.failed")
+            except OSError as e:
+                logger.error(f"Could not set aside legacy backup {name}: {e}")
+        if imported:
+            logger.info(f"Imported {imported} legacy backups into snapshots")
+    
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        with open(path, 'r') as f:
+            return json.load(f)
+    
     # New method for getting promotion requests
     async def get_pending_promotions(self) -> List[Dict[str, Any]]:
         """Get all pending promotion requests."""
@@ -818,6 +899,8 @@ class CodaManager:
             
             if not response:
                 return []
+            
+            self.row_index.learn(PROFILES, response, 'Discord User ID')
                 
             # Process results
             results = []
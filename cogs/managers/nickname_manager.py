@@ -10,6 +10,8 @@ from ..constants import (
     ALL_RANK_ABBREVIATIONS, DIVISION_RANKS, STANDARD_RANK_ABBREVIATIONS,
     RANK_NUMBERS
 )
+from ..utils.member_reconciler import MemberReconciler
+from ..utils.bulk_operations import BulkOperationEngine
 
 logger = logging.getLogger('nickname_manager')
 
@@ -19,8 +21,15 @@ class NicknameManager:
     Updated to work with Service Registry pattern.
     """
 
-    def __init__(self, coda_manager=None):
+    def __init__(
+        self,
+        coda_manager=None,
+        reconciler: Optional[MemberReconciler] = None,
+        bulk_operations: Optional[BulkOperationEngine] = None
+    ):
         self.coda_manager = coda_manager
+        self.reconciler = reconciler or MemberReconciler()
+        self.bulk_operations = bulk_operations or BulkOperationEngine()
         self._cache = {}
         self._cache_lock = asyncio.Lock()  # Added for thread safety
         self._cache_expiry = 3600  # 1 hour cache expiry for nicknames
@@ -287,7 +296,7 @@ class NicknameManager:
                     
                     # Update if different
                     if new_nickname != current_nickname:
-                        await member.edit(nick=new_nickname)
+                        await self.reconciler.reconcile(member, nick=new_nickname, reason=f"Rank update to {new_rank}")
                         logger.info(f"Updated marine nickname for {member.id}: {new_nickname}")
                         
                         # Cache the new nickname
@@ -313,7 +322,7 @@ class NicknameManager:
                     
                     # Update if different
                     if new_nickname != current_nickname:
-                        await member.edit(nick=new_nickname)
+                        await self.reconciler.reconcile(member, nick=new_nickname, reason=f"Rank update to {new_rank}")
                         logger.info(f"Updated nickname for {member.id}: {new_nickname}")
                         
                         # Cache the new nickname
@@ -385,7 +394,7 @@ class NicknameManager:
             
             # Update if different
             if new_nickname != current_name:
-                await member.edit(nick=new_nickname)
+                await self.reconciler.reconcile(member, nick=new_nickname, reason="Rank prefix update")
                 logger.info(f"Updated nickname with prefix for {member.id}: {new_nickname}")
                 
                 # Cache the new nickname
@@ -426,7 +435,13 @@ class NicknameManager:
             return cached['nickname']
     
     # For bulk operations
-    async def bulk_update_nicknames(self, guild: discord.Guild, ranks_data: Dict[int, Dict[str, Any]], limit: int = 0) -> Tuple[int, int]:
+    async def bulk_update_nicknames(
+        self,
+        guild: discord.Guild,
+        ranks_data: Dict[int, Dict[str, Any]],
+        limit: int = 0,
+        interaction: Optional[discord.Interaction] = None
+    ) -> Tuple[int, int]:
         """
         Bulk update nicknames for members based on rank data.
         
@@ -435,13 +450,11 @@ class NicknameManager:
             ranks_data: Dictionary mapping user IDs to rank info dicts with keys:
                         'rank', 'member_type', 'division', 'specialization'
             limit: Maximum number of members to update (0 for all)
+            interaction: Optional interaction to report progress to
             
         Returns:
             Tuple of (success_count, failure_count)
         """
-        success_count = 0
-        failure_count = 0
-        
         try:
             # Get all member IDs to update
             member_ids = list(ranks_data.keys())
@@ -450,49 +463,60 @@ class NicknameManager:
             if limit > 0:
                 member_ids = member_ids[:limit]
                 
-            logger.info(f"Starting bulk nickname update for {len(member_ids)} members")
-            
-            # Process in batches to avoid rate limits
-            batch_size = 10
-            for i in range(0, len(member_ids), batch_size):
-                batch = member_ids[i:i+batch_size]
-                
-                for user_id in batch:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        logger.warning(f"Member {user_id} not found in guild")
-                        failure_count += 1
-                        continue
-                        
-                    # Get rank data
-                    rank_data = ranks_data[user_id]
+            members = []
+            failure_count = 0
+            for user_id in member_ids:
+                member = guild.get_member(user_id)
+                if member:
+                    members.append(member)
+                else:
+                    logger.warning(f"Member {user_id} not found in guild")
+                    failure_count += 1
                     
-                    try:
-                        success, _, _ = await self.update_nickname(
-                            member,
-                            rank_data.get('rank', ''),
-                            rank_data.get('member_type', 'Member'),
-                            rank_data.get('division', ''),
-                            rank_data.get('specialization'),
-                            rank_data.get('id_number')
-                        )
-                        
-                        if success:
-                            success_count += 1
-                        else:
-                            failure_count += 1
-                            
-                    except Exception as e:
-                        logger.error(f"Error updating nickname for {user_id}: {e}")
-                        failure_count += 1
-                        
-                # Sleep between batches to avoid rate limits
-                if i + batch_size < len(member_ids):
-                    await asyncio.sleep(5)
+            logger.info(f"Starting bulk nickname update for {len(members)} members")
+            
+            async def needs_update(member: discord.Member) -> bool:
+                rank_data = ranks_data[member.id]
+                # ID numbers may still need updating in Coda
+                if rank_data.get('id_number'):
+                    return True
+                rank_abbr = self.get_rank_abbreviation(
+                    rank_data.get('rank', ''),
+                    rank_data.get('member_type', 'Member'),
+                    rank_data.get('division', ''),
+                    rank_data.get('specialization')
+                )
+                return not (rank_abbr and member.display_name.startswith(f"{rank_abbr} "))
+            
+            async def update_one(member: discord.Member) -> bool:
+                rank_data = ranks_data[member.id]
+                success, error, _ = await self.update_nickname(
+                    member,
+                    rank_data.get('rank', ''),
+                    rank_data.get('member_type', 'Member'),
+                    rank_data.get('division', ''),
+                    rank_data.get('specialization'),
+                    rank_data.get('id_number')
+                )
+                if not success:
+                    raise RuntimeError(error)
+                return True
+            
+            # Paced by Discord's member edit bucket; nicknames already ranked take no slot
+            result = await self.bulk_operations.run(
+                f"nicknames:{guild.id}",
+                members,
+                update_one,
+                title="Nickname update",
+                interaction=interaction,
+                needs_change=needs_update
+            )
+            success_count = result['changed'] + result['unchanged'] + result['resumed']
+            failure_count += result['failed']
                     
             logger.info(f"Bulk nickname update complete: {success_count} successes, {failure_count} failures")
             return success_count, failure_count
             
         except Exception as e:
             logger.error(f"Error in bulk_update_nicknames: {e}")
-            return success_count, failure_count
\ No newline at end of file
+            return 0, len(ranks_data)
@@ -13,6 +13,7 @@ from ..constants import (
     TIME_IN_GRADE, FLEET_COMPONENTS, DIVISION_CODES,
     DIVISION_TO_FLEET_WING
 )
+from ..utils.member_reconciler import MemberReconciler, UNCHANGED
 
 logger = logging.getLogger('promotion_manager')
 
@@ -21,6 +22,7 @@ class PromotionManager:
     
     def __init__(self, bot):
         self.bot = bot
+        self.reconciler = getattr(bot, 'member_reconciler', None) or MemberReconciler()
         
     async def promote_member(
         self,
@@ -70,7 +72,7 @@ class PromotionManager:
                     )
                     return False
             
-            # Update roles
+            # Update roles and nickname in one edit
             success = await self.update_member_roles(
                 member, component, new_rank, specialization
             )
@@ -115,9 +117,6 @@ class PromotionManager:
                     logger.error(f"Failed to update profile record for {member.name}")
                     # Continue anyway since we've already updated the roles
             
-            # Update nickname
-            await self.update_member_nickname(member, component, new_rank, specialization)
-            
             return True
             
         except Exception as e:
@@ -288,7 +287,8 @@ class PromotionManager:
         specialization: str = None
     ) -> bool:
         """
-        Update a member's roles based on their new rank and fleet component.
+        Update a member's roles and nickname for their new rank and fleet
+        component in a single edit.
         
         Args:
             member: Discord member
@@ -300,40 +300,24 @@ class PromotionManager:
             bool: Success or failure
         """
         try:
-            # Get current roles to remove
-            to_remove = []
-            
-            # Remove all rank roles
-            for rank_name, _ in RANKS:
-                role = discord.utils.get(member.roles, name=rank_name)
-                if role:
-                    to_remove.append(role)
-            
-            # Add new rank role
             rank_role = discord.utils.get(member.guild.roles, name=new_rank)
             if not rank_role:
                 logger.error(f"Could not find role for rank {new_rank}")
                 return False
                 
-            # Remove old specialized roles if needed
-            # This would depend on how your specialized roles are named
-            
-            # Get fleet component role
+            # Keep the fleet component role if it exists
             fleet_component_role = discord.utils.get(member.guild.roles, name=fleet_component)
+            new_nick = self.build_nickname(member, fleet_component, new_rank, specialization)
             
-            # Apply role changes
             try:
-                # Remove old roles
-                if to_remove:
-                    await member.remove_roles(*to_remove, reason=f"Promotion to {new_rank}")
-                
-                # Add new rank role
-                await member.add_roles(rank_role, reason=f"Promotion to {new_rank}")
-                
-                # Add fleet component role if it exists and member doesn't have it
-                if fleet_component_role and fleet_component_role not in member.roles:
-                    await member.add_roles(fleet_component_role, reason=f"Assignment to {fleet_component}")
-                    
+                # The rank replaces any other rank role
+                await self.reconciler.reconcile(
+                    member,
+                    rank=new_rank,
+                    roles=[fleet_component] if fleet_component_role else (),
+                    nick=new_nick if new_nick else UNCHANGED,
+                    reason=f"Promotion to {new_rank}"
+                )
                 return True
             except discord.Forbidden:
                 logger.error(f"Bot lacks permission to modify roles for {member.name}")
@@ -346,6 +330,47 @@ class PromotionManager:
             logger.error(f"Error in update_member_roles: {e}")
             return False
             
+    def build_nickname(
+        self,
+        member: discord.Member,
+        fleet_component: str,
+        new_rank: str,
+        specialization: str = None
+    ) -> Optional[str]:
+        """
+        Build a member's nickname with their new rank abbreviation.
+        
+        Returns:
+            Optional[str]: The nickname, or None if the rank has no abbreviation
+        """
+        # Determine the proper rank abbreviation based on specialization
+        rank_abbrev = None
+        
+        # Check for specialized rank
+        if specialization and fleet_component:
+            key = (fleet_component.lower(), specialization.lower(), new_rank.lower())
+            if key in STANDARD_TO_DIVISION_RANK:
+                _, rank_abbrev = STANDARD_TO_DIVISION_RANK[key]
+        
+        # Fallback to standard abbreviation
+        if not rank_abbrev:
+            rank_abbrev = RANK_ABBREVIATIONS.get(new_rank)
+            
+        if not rank_abbrev:
+            logger.warning(f"Could not find abbreviation for {new_rank}")
+            return None
+            
+        # Get base name (remove any existing rank prefix)
+        current_nick = member.nick or member.name
+        base_name = current_nick
+        
+        for abbrev in RANK_ABBREVIATIONS.values():
+            if current_nick.startswith(f"{abbrev} "):
+                base_name = current_nick[len(abbrev)+1:]
+                break
+        
+        return f"{rank_abbrev} {base_name}"
+            
     async def update_member_nickname(
         self,
         member: discord.Member,
@@ -366,38 +391,13 @@ class PromotionManager:
             bool: Success or failure
         """
         try:
-            # Determine the proper rank abbreviation based on specialization
-            rank_abbrev = None
-            
-            # Check for specialized rank
-            if specialization and fleet_component:
-                key = (fleet_component.lower(), specialization.lower(), new_rank.lower())
-                if key in STANDARD_TO_DIVISION_RANK:
-                    _, rank_abbrev = STANDARD_TO_DIVISION_RANK[key]
-            
-            # Fallback to standard abbreviation
-            if not rank_abbrev:
-                rank_abbrev = RANK_ABBREVIATIONS.get(new_rank)
-                
-            if not rank_abbrev:
-                logger.warning(f"Could not find abbreviation for {new_rank}")
+            new_nick = self.build_nickname(member, fleet_component, new_rank, specialization)
+            if not new_nick:
                 return False
-                
-            # Get base name (remove any existing rank prefix)
-            current_nick = member.nick or member.name
-            base_name = current_nick
-            
-            for abbrev in RANK_ABBREVIATIONS.values():
-                if current_nick.startswith(f"{abbrev} "):
-                    base_name = current_nick[len(abbrev)+1:]
-                    break
-            
-            # Create new nickname
-            new_nick = f"{rank_abbrev} {base_name}"
             
             # Update nickname
             try:
-                await member.edit(nick=new_nick)
+                await self.reconciler.reconcile(member, nick=new_nick, reason=f"Promotion to {new_rank}")
                 return True
             except discord.Forbidden:
                 logger.warning(f"Bot lacks permission to change nickname for {member.name}")
@@ -408,4 +408,4 @@ class PromotionManager:
                 
         except Exception as e:
             logger.error(f"Error in update_member_nickname: {e}")
-            return False
\ No newline at end of file
+            return False
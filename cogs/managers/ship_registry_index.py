@@ -0,0 +1,207 @@
+import heapq
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.autocomplete_index import AutocompleteIndex
+
+# Registry columns with secondary indexes
+SHIP_NAME = 'Ship Name'
+REGISTRY_NUMBER = 'Registry Number'
+DIVISION = 'Division'
+STATUS = 'Status'
+PRIMARY_USE = 'Primary Use'
+COMMISSION_DATE = 'Commission Date'
+FLIGHT_GROUP = 'Flight Group'
+# Flight group and squadron rows share the table, told apart by Type
+ROW_TYPE = 'Type'
+GROUP_NAME = 'Name'
+
+
+def _key(value: Any) -> str:
+    return str(value).strip().casefold() if value not in (None, '') else ''
+
+
+class ShipRegistryIndex:
+    """
+    In-memory copy of the ships registry table.
+
+    Rows are kept as ``{'id': row_id, 'values': {column name: value}}``
+    with exact-match indexes on registry number, ship name, division,
+    status, primary use, flight group and row type (plus flight group and
+    squadron names), and trigram indexes over registry numbers and ship
+    names for free-text search. Rows can be replaced wholesale, upserted
+    from a sync delta or patched after a local write.
+    """
+
+    _MULTI = (DIVISION, STATUS, PRIMARY_USE, FLIGHT_GROUP, ROW_TYPE)
+
+    def __init__(self):
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._by_registry: Dict[str, str] = {}
+        self._by_name: Dict[str, str] = {}
+        self._by_group: Dict[Tuple[str, str], str] = {}
+        self._multi: Dict[str, Dict[str, Set[str]]] = {column: {} for column in self._MULTI}
+        self._registry_text = AutocompleteIndex('registry.numbers')
+        self._name_text = AutocompleteIndex('registry.names')
+        self.loaded_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at > 0
+
+    @property
+    def age(self) -> float:
+        """Seconds since the index was last fully loaded."""
+        return time.monotonic() - self.loaded_at if self.loaded else float('inf')
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def clear(self):
+        self._rows.clear()
+        self._by_registry.clear()
+        self._by_name.clear()
+        self._by_group.clear()
+        for index in self._multi.values():
+            index.clear()
+        self._registry_text.clear()
+        self._name_text.clear()
+        self.loaded_at = 0.0
+
+    def replace(self, rows: Iterable[Dict[str, Any]]):
+        """Replace every row, e.g. after a full load."""
+        self.clear()
+        for row in rows:
+            self._insert(row['id'], dict(row.get('values', {})))
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, row: Dict[str, Any]):
+        """Add or replace one row."""
+        self.remove(row['id'])
+        self._insert(row['id'], dict(row.get('values', {})))
+
+    def patch(self, row_id: str, values: Dict[str, Any]):
+        """Apply changed column values to a known row."""
+        row = self._rows.get(row_id)
+        if row is None:
+            return
+        merged = {**row['values'], **values}
+        self.remove(row_id)
+        self._insert(row_id, merged)
+
+    def remove(self, row_id: str) -> bool:
+        row = self._rows.pop(row_id, None)
+        if row is None:
+            return False
+        values = row['values']
+        for mapping, key in (
+            (self._by_registry, _key(values.get(REGISTRY_NUMBER))),
+            (self._by_name, _key(values.get(SHIP_NAME))),
+            (self._by_group, (_key(values.get(ROW_TYPE)), _key(values.get(GROUP_NAME)))),
+        ):
+            if mapping.get(key) == row_id:
+                del mapping[key]
+        for column, index in self._multi.items():
+            ids = index.get(_key(values.get(column)))
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del index[_key(values.get(column))]
+        self._registry_text.remove(row_id)
+        self._name_text.remove(row_id)
+        return True
+
+    def _insert(self, row_id: str, values: Dict[str, Any]):
+        self._rows[row_id] = {'id': row_id, 'values': values}
+        registry_number = values.get(REGISTRY_NUMBER)
+        ship_name = values.get(SHIP_NAME)
+        if registry_number:
+            self._by_registry[_key(registry_number)] = row_id
+            self._registry_text.add(row_id, str(registry_number), row_id)
+        if ship_name:
+            self._by_name[_key(ship_name)] = row_id
+            self._name_text.add(row_id, str(ship_name), row_id)
+        if values.get(ROW_TYPE) and values.get(GROUP_NAME):
+            self._by_group[(_key(values[ROW_TYPE]), _key(values[GROUP_NAME]))] = row_id
+        for column, index in self._multi.items():
+            key = _key(values.get(column))
+            if key:
+                index.setdefault(key, set()).add(row_id)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return list(self._rows.values())
+
+    def get(self, row_id: str) -> Optional[Dict[str, Any]]:
+        return self._rows.get(row_id)
+
+    def by_name(self, ship_name: str) -> Optional[Dict[str, Any]]:
+        row_id = self._by_name.get(_key(ship_name))
+        return self._rows.get(row_id) if row_id else None
+
+    def by_registry_number(self, registry_number: str) -> Optional[Dict[str, Any]]:
+        row_id = self._by_registry.get(_key(registry_number))
+        return self._rows.get(row_id) if row_id else None
+
+    def group(self, row_type: str, name: str) -> Optional[Dict[str, Any]]:
+        """The flight group or squadron row called ``name``."""
+        row_id = self._by_group.get((_key(row_type), _key(name)))
+        return self._rows.get(row_id) if row_id else None
+
+    def where(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        """Rows whose indexed ``column`` equals ``value`` (case-insensitive)."""
+        return [self._rows[row_id] for row_id in self._multi[column].get(_key(value), ())]
+
+    def count(self, column: str, value: Any) -> int:
+        return len(self._multi[column].get(_key(value), ()))
+
+    def search(self, term: str) -> List[Dict[str, Any]]:
+        """
+        Registry number matches for ``term``, or ship name matches if no
+        registry number matches, best match first.
+        """
+        for text_index in (self._registry_text, self._name_text):
+            found = text_index.search(term, limit=len(text_index))
+            if found:
+                # Entries carry their row ID as the value
+                return [self._rows[row_id] for _, row_id in found]
+        return []
+
+    def statistics(self, latest: int = 10) -> Dict[str, Any]:
+        """Fleet totals and counts per division and primary use."""
+        # Display the first spelling seen for each case-folded value
+        def counts(column: str) -> Dict[str, int]:
+            result = {}
+            for ids in self._multi[column].values():
+                label = self._rows[next(iter(ids))]['values'][column]
+                result[label] = len(ids)
+            return result
+
+        commissioned = (
+            row['values'] for row in self._rows.values()
+            if row['values'].get(COMMISSION_DATE) and row['values'].get(SHIP_NAME)
+        )
+        newest = heapq.nlargest(latest, commissioned, key=lambda values: str(values[COMMISSION_DATE]))
+        return {
+            'total_ships': len(self._rows),
+            'active_ships': self.count(STATUS, 'Active'),
+            'decommissioned_ships': self.count(STATUS, 'Decommissioned'),
+            'divisions': counts(DIVISION),
+            'primary_uses': counts(PRIMARY_USE),
+            'latest_commissions': [
+                {
+                    'ship_name': values[SHIP_NAME],
+                    'commission_date': values[COMMISSION_DATE],
+                    'division': values.get(DIVISION, ''),
+                    'primary_use': values.get(PRIMARY_USE, '')
+                }
+                for values in newest
+            ]
+        }
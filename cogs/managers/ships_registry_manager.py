@@ -2,16 +2,18 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import asyncio
-import re
-import json
+
+from ..utils.coda_api import CodaAPIClient, PRIORITY_BULK
+from ..utils.coda_replica import CodaReplica, SHIPS_TABLE
+from .ship_registry_index import ShipRegistryIndex, DIVISION, FLIGHT_GROUP, ROW_TYPE, STATUS
 
 logger = logging.getLogger('ships_registry')
-logger.setLevel(logging.DEBUG)
 
 class ShipsRegistryManager:
     """Manager for ship registry operations using the existing CodaAPIClient."""
     
-    def __init__(self, coda_client, doc_id: str, ships_table_id: str, users_table_id: str):
+    def __init__(self, coda_client, doc_id: str, ships_table_id: str, users_table_id: str,
+                 replica: Optional[CodaReplica] = None):
         """
         Initialize the ships registry manager.
         
@@ -20,16 +22,25 @@ class ShipsRegistryManager:
             doc_id: The Coda document ID
             ships_table_id: The ships table ID
             users_table_id: The users table ID
+            replica: Local Coda read replica that keeps the registry index current
         """
         self.coda = coda_client
         self.doc_id = doc_id
         self.ships_table_id = ships_table_id
         self.users_table_id = users_table_id
         
-        # Cache for registry data
-        self._registry_cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_expiry = 300  # 5 minutes
-        self._cache_lock = asyncio.Lock()
+        # Local copy of the registry; lookups, searches and stats read from it
+        self.index = ShipRegistryIndex()
+        self._index_lock = asyncio.Lock()
+        self._index_from_replica = False
+        # Full reload interval when there is no replica to feed the index
+        self._refresh_interval = 300  # 5 minutes
+        
+        # The replica applies sync deltas to the index as they arrive
+        self.replica = replica
+        if replica:
+            replica.register_table(SHIPS_TABLE, ships_table_id)
+            replica.add_listener(SHIPS_TABLE, self._on_replica_sync)
         
         # Column IDs (will be populated by initialize)
         self.ship_column_ids: Dict[str, str] = {}
@@ -85,67 +96,70 @@ class ShipsRegistryManager:
         logger.debug(f"Generated registry number: {registry_number}")
         return registry_number
         
+    def _on_replica_sync(self, rows: List[Dict[str, Any]], replace: bool):
+        """Apply a replica sync to the registry index."""
+        if replace or not self._index_from_replica:
+            # The replica's rows already include this delta
+            self.index.replace(self.replica.rows(SHIPS_TABLE))
+            self._index_from_replica = True
+        else:
+            for row in rows:
+                self.index.upsert(row)
+    
+    async def _ensure_index(self) -> ShipRegistryIndex:
+        """
+        Load the registry index if needed: from the replica once it has
+        synced, otherwise with one full read from Coda, repeated every
+        ``_refresh_interval`` seconds while there is no replica.
+        """
+        async with self._index_lock:
+            if self._index_from_replica:
+                return self.index
+            if self.replica and self.replica.is_ready(SHIPS_TABLE):
+                self.index.replace(self.replica.rows(SHIPS_TABLE))
+                self._index_from_replica = True
+            elif self.index.age > self._refresh_interval:
+                with CodaAPIClient.priority(PRIORITY_BULK):
+                    rows = await self.coda.get_rows(self.doc_id, self.ships_table_id, use_column_names=True)
+                self.index.replace(rows)
+                logger.debug(f"Loaded {len(rows)} registry rows from Coda")
+        return self.index
+    
+    def _registry_info(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an index row to registry info keyed by ship column name."""
+        values = row['values']
+        registry_info = {col_name: values.get(col_name) for col_name in self.ship_column_ids}
+        registry_info['id'] = row['id']
+        return registry_info
+    
+    def _apply_cells(self, row_id: str, cells: List[Dict[str, Any]]):
+        """Reflect a successful write in the index ahead of the next sync."""
+        names = {col_id: name for name, col_id in self.ship_column_ids.items()}
+        self.index.patch(row_id, {names.get(cell['column'], cell['column']): cell['value'] for cell in cells})
+    
+    def _insert_row(self, response: Optional[Dict[str, Any]], cells: List[Dict[str, Any]]):
+        """Add a newly created row to the index if Coda returned its ID."""
+        row_ids = (response or {}).get('addedRowIds') or []
+        if row_ids:
+            names = {col_id: name for name, col_id in self.ship_column_ids.items()}
+            self.index.upsert({
+                'id': row_ids[0],
+                'values': {names.get(cell['column'], cell['column']): cell['value'] for cell in cells}
+            })
+    
     async def get_ship_registry_info(self, ship_name: str) -> Optional[Dict[str, Any]]:
-        """Get ship registry information from Coda."""
-        # Check cache first
-        async with self._cache_lock:
-            cached_data = self._registry_cache.get(ship_name)
-            if cached_data:
-                cache_time = cached_data.get('_cache_time', 0)
-                if datetime.now().timestamp() - cache_time < self._cache_expiry:
-                    logger.debug(f"Using cached registry data for ship {ship_name}")
-                    return cached_data['data']
-        
+        """Get ship registry information from the local registry index."""
         if not self.is_initialized():
             logger.error("ShipsRegistryManager not initialized")
             return None
             
         try:
-            # Get all ships and filter in code - more reliable than complex API queries
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=200,  # Adjust based on expected total ships
-                use_column_names=True
-            )
-            
-            if not rows:
-                logger.debug(f"No registry data found")
-                return None
-                
-            # Find the ship by name
-            ship_name_col_name = next((name for name, id in self.ship_column_ids.items() if name == 'Ship Name'), 'Ship Name')
-            matching_row = None
-            
-            for row in rows:
-                values = row.get('values', {})
-                if values.get(ship_name_col_name) == ship_name:
-                    matching_row = row
-                    break
-                    
-            if not matching_row:
+            index = await self._ensure_index()
+            row = index.by_name(ship_name)
+            if not row:
                 logger.debug(f"No registry info found for ship {ship_name}")
                 return None
-                
-            # Map row data to the expected format
-            registry_info = {}
-            values = matching_row.get('values', {})
-            
-            # Map values to column names
-            for col_name in self.ship_column_ids.keys():
-                registry_info[col_name] = values.get(col_name)
-                
-            # Include the row ID
-            registry_info['id'] = matching_row.get('id')
-            
-            # Cache the result
-            async with self._cache_lock:
-                self._registry_cache[ship_name] = {
-                    'data': registry_info,
-                    '_cache_time': datetime.now().timestamp()
-                }
-                
-            return registry_info
+            return self._registry_info(row)
             
         except Exception as e:
             logger.error(f"Error getting registry info for ship {ship_name}: {e}")
@@ -231,10 +245,7 @@ class ShipsRegistryManager:
                 logger.error(f"Failed to commission ship {ship_name}")
                 return None
                 
-            # Clear cache entry
-            async with self._cache_lock:
-                if ship_name in self._registry_cache:
-                    del self._registry_cache[ship_name]
+            self._insert_row(response, cells)
                     
             # Return commissioned ship info
             return {
@@ -309,10 +320,7 @@ class ShipsRegistryManager:
                 logger.error(f"Failed to decommission ship {ship_name}")
                 return None
                 
-            # Clear cache entry
-            async with self._cache_lock:
-                if ship_name in self._registry_cache:
-                    del self._registry_cache[ship_name]
+            self._apply_cells(registry_info['id'], cells)
                     
             # Return decommissioned ship info
             return {
@@ -334,46 +342,8 @@ class ShipsRegistryManager:
             return []
             
         try:
-            # Get all ships and filter by status in code
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=200,
-                use_column_names=True
-            )
-            
-            if not rows:
-                logger.info("No ships found in registry")
-                return []
-                
-            # Filter by status
-            status_col_name = next((name for name, id in self.ship_column_ids.items() if name == 'Status'), 'Status')
-            ship_name_col_name = next((name for name, id in self.ship_column_ids.items() if name == 'Ship Name'), 'Ship Name')
-            
-            ships = []
-            for row in rows:
-                values = row.get('values', {})
-                if values.get(status_col_name) == status:
-                    registry_info = {}
-                    
-                    # Map values to column names
-                    for col_name in self.ship_column_ids.keys():
-                        registry_info[col_name] = values.get(col_name)
-                        
-                    # Include the row ID
-                    registry_info['id'] = row.get('id')
-                    ships.append(registry_info)
-                    
-                    # Update cache
-                    ship_name = values.get(ship_name_col_name)
-                    if ship_name:
-                        async with self._cache_lock:
-                            self._registry_cache[ship_name] = {
-                                'data': registry_info,
-                                '_cache_time': datetime.now().timestamp()
-                            }
-            
-            return ships
+            index = await self._ensure_index()
+            return [self._registry_info(row) for row in index.where(STATUS, status)]
             
         except Exception as e:
             logger.error(f"Error getting ships by status {status}: {e}")
@@ -421,10 +391,7 @@ class ShipsRegistryManager:
                 logger.error(f"Failed to update ship {ship_name}")
                 return False
                 
-            # Clear cache entry
-            async with self._cache_lock:
-                if ship_name in self._registry_cache:
-                    del self._registry_cache[ship_name]
+            self._apply_cells(registry_info['id'], cells)
                     
             logger.info(f"Successfully updated ship {ship_name}")
             return True
@@ -440,50 +407,28 @@ class ShipsRegistryManager:
             return []
             
         try:
-            # Query for ships by division
-            division_col_id = self.ship_column_ids['Division']
-            # Use proper format for column queries
-            query = f'`{division_col_id}` = "{division}"'
+            index = await self._ensure_index()
+            return [self._registry_info(row) for row in index.where(DIVISION, division)]
             
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                query=query,
-                use_column_names=False
-            )
+        except Exception as e:
+            logger.error(f"Error getting ships by division {division}: {e}")
+            return []
             
-            if not rows:
-                logger.info(f"No ships found in division {division}")
-                return []
-                
-            # Convert rows to ship registry info
-            ships = []
-            for row in rows:
-                registry_info = {}
-                
-                # Map row data to column names
-                values = row.get('values', {})
-                for col_name, col_id in self.ship_column_ids.items():
-                    registry_info[col_name] = values.get(col_id)
-                    
-                # Include the row ID
-                registry_info['id'] = row.get('id')
-                
-                ships.append(registry_info)
-                
-                # Update cache for this ship
-                if 'Ship Name' in registry_info and registry_info['Ship Name']:
-                    ship_name = registry_info['Ship Name']
-                    async with self._cache_lock:
-                        self._registry_cache[ship_name] = {
-                            'data': registry_info,
-                            '_cache_time': datetime.now().timestamp()
-                        }
+    async def get_ships_by_flight_group(self, flight_group: str, status: Optional[str] = 'Active') -> List[Dict[str, Any]]:
+        """Get the ships assigned to a flight group, optionally only those with ``status``."""
+        if not self.is_initialized():
+            logger.error("ShipsRegistryManager not initialized")
+            return []
             
-            return ships
+        try:
+            index = await self._ensure_index()
+            return [
+                self._registry_info(row) for row in index.where(FLIGHT_GROUP, flight_group)
+                if status is None or row['values'].get(STATUS) == status
+            ]
             
         except Exception as e:
-            logger.error(f"Error getting ships by division {division}: {e}")
+            logger.error(f"Error getting ships in flight group {flight_group}: {e}")
             return []
             
     async def get_fleet_statistics(self) -> Dict[str, Any]:
@@ -493,81 +438,10 @@ class ShipsRegistryManager:
             return {}
             
         try:
-            # Get all ships
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=1000,
-                use_column_names=False
-            )
-            
-            if not rows:
+            index = await self._ensure_index()
+            if not len(index):
                 logger.info("No ships found in registry")
-                return {
-                    'total_ships': 0,
-                    'active_ships': 0,
-                    'decommissioned_ships': 0,
-                    'divisions': {},
-                    'primary_uses': {},
-                    'latest_commissions': []
-                }
-                
-            # Process statistics
-            total_ships = len(rows)
-            active_ships = 0
-            decommissioned_ships = 0
-            divisions = {}
-            primary_uses = {}
-            latest_commissions = []
-            
-            for row in rows:
-                values = row.get('values', {})
-                
-                # Extract ship details
-                ship_name = values.get(self.ship_column_ids.get('Ship Name', ''), '')
-                status = values.get(self.ship_column_ids.get('Status', ''), '')
-                division = values.get(self.ship_column_ids.get('Division', ''), '')
-                primary_use = values.get(self.ship_column_ids.get('Primary Use', ''), '')
-                commission_date = values.get(self.ship_column_ids.get('Commission Date', ''), '')
-                
-                # Count by status
-                if status == 'Active':
-                    active_ships += 1
-                elif status == 'Decommissioned':
-                    decommissioned_ships += 1
-                    
-                # Count by division
-                if division:
-                    divisions[division] = divisions.get(division, 0) + 1
-                    
-                # Count by primary use
-                if primary_use:
-                    primary_uses[primary_use] = primary_uses.get(primary_use, 0) + 1
-                    
-                # Track latest commissions
-                if commission_date and ship_name:
-                    latest_commissions.append({
-                        'ship_name': ship_name,
-                        'commission_date': commission_date,
-                        'division': division,
-                        'primary_use': primary_use
-                    })
-                    
-            # Sort latest commissions by date (newest first)
-            try:
-                latest_commissions.sort(key=lambda x: x['commission_date'], reverse=True)
-            except Exception:
-                # In case of date parsing issues
-                pass
-                
-            return {
-                'total_ships': total_ships,
-                'active_ships': active_ships,
-                'decommissioned_ships': decommissioned_ships,
-                'divisions': divisions,
-                'primary_uses': primary_uses,
-                'latest_commissions': latest_commissions[:10]  # Only return the 10 most recent
-            }
+            return index.statistics()
             
         except Exception as e:
             logger.error(f"Error getting fleet statistics: {e}")
@@ -591,64 +465,9 @@ class ShipsRegistryManager:
             return []
             
         try:
-            # Sanitize the search term
-            search_term = search_term.replace('"', '\\"')
-            
-            # Instead of complex queries, let's retrieve all registry records and filter in code
-            # This is more reliable than dealing with API query syntax issues
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=200,  # Adjust as needed based on expected number of ships
-                use_column_names=True  # Use column names instead of IDs
-            )
-            
-            if not rows:
-                logger.info("No ships found in registry")
-                return []
-                
-            # Filter results in code to find matching ships
-            results = []
-            registry_col_name = next((name for name, id in self.ship_column_ids.items() if name == 'Registry Number'), 'Registry Number')
-            ship_name_col_name = next((name for name, id in self.ship_column_ids.items() if name == 'Ship Name'), 'Ship Name')
-            
-            for row in rows:
-                values = row.get('values', {})
-                
-                # Check for match in Registry Number (exact match)
-                registry_number = values.get(registry_col_name, '')
-                if registry_number and search_term.lower() in registry_number.lower():
-                    # Found a match
-                    registry_info = {}
-                    
-                    # Map values to column names
-                    for col_name in self.ship_column_ids.keys():
-                        registry_info[col_name] = values.get(col_name)
-                        
-                    # Include the row ID
-                    registry_info['id'] = row.get('id')
-                    results.append(registry_info)
-                    
-            # If no matches found by registry number, try ship name
-            if not results:
-                for row in rows:
-                    values = row.get('values', {})
-                    
-                    # Check for match in Ship Name (partial match)
-                    ship_name = values.get(ship_name_col_name, '')
-                    if ship_name and search_term.lower() in ship_name.lower():
-                        # Found a match
-                        registry_info = {}
-                        
-                        # Map values to column names
-                        for col_name in self.ship_column_ids.keys():
-                            registry_info[col_name] = values.get(col_name)
-                            
-                        # Include the row ID
-                        registry_info['id'] = row.get('id')
-                        results.append(registry_info)
-                        
-            return results
+            # Registry number matches first, ship name matches otherwise
+            index = await self._ensure_index()
+            return [self._registry_info(row) for row in index.search(search_term)]
                 
         except Exception as e:
             logger.error(f"Error searching registry for '{search_term}': {e}", exc_info=True)
@@ -715,13 +534,7 @@ class ShipsRegistryManager:
                 
                 if response:
                     success_count += 1
-                    
-                    # Clear cache for this ship
-                    ship_name = update.get('Ship Name')
-                    if ship_name:
-                        async with self._cache_lock:
-                            if ship_name in self._registry_cache:
-                                del self._registry_cache[ship_name]
+                    self._apply_cells(row_id, cells)
                 else:
                     logger.error(f"Failed to update row {row_id}")
                     failure_count += 1
@@ -734,10 +547,11 @@ class ShipsRegistryManager:
         return {'success': success_count, 'failure': failure_count}
             
     async def clear_cache(self):
-        """Clear the registry cache."""
-        async with self._cache_lock:
-            self._registry_cache.clear()
-        logger.info("Registry cache cleared")
+        """Drop the registry index; it is reloaded on the next lookup."""
+        async with self._index_lock:
+            self.index.clear()
+            self._index_from_replica = False
+        logger.info("Registry index cleared")
 
     async def transfer_ship_ownership(
         self,
@@ -804,10 +618,7 @@ class ShipsRegistryManager:
                 logger.error(f"Failed to transfer ship {ship_name}")
                 return False
                 
-            # Clear cache entry
-            async with self._cache_lock:
-                if ship_name in self._registry_cache:
-                    del self._registry_cache[ship_name]
+            self._apply_cells(registry_info['id'], cells)
                     
             logger.info(f"Successfully transferred ship {ship_name} to user {new_owner_id}")
             return True
@@ -825,23 +636,11 @@ class ShipsRegistryManager:
     ):
         """Create a new flight group."""
         try:
-            # Check if flight group already exists by getting all rows and filtering
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
-            
             # Check if a flight group with this name already exists
-            for row in rows:
-                values = row.get('values', {})
-                row_type = values.get('Type', '')
-                row_name = values.get('Name', '')
-                
-                if row_type == 'Flight Group' and row_name == name:
-                    logger.warning(f"Flight group {name} already exists")
-                    return None
+            index = await self._ensure_index()
+            if index.group('Flight Group', name):
+                logger.warning(f"Flight group {name} already exists")
+                return None
             
             # Create the flight group
             cells = [
@@ -865,6 +664,7 @@ class ShipsRegistryManager:
                 data={'rows': [{'cells': cells}]}
             )
             
+            self._insert_row(response, cells)
             if response and 'id' in response:
                 return {
                     'id': response['id'],
@@ -889,23 +689,11 @@ class ShipsRegistryManager:
     ):
         """Create a new squadron."""
         try:
-            # Check if squadron already exists by getting all rows and filtering
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
-            
             # Check if a squadron with this name already exists
-            for row in rows:
-                values = row.get('values', {})
-                row_type = values.get('Type', '')
-                row_name = values.get('Name', '')
-                
-                if row_type == 'Squadron' and row_name == name:
-                    logger.warning(f"Squadron {name} already exists")
-                    return None
+            index = await self._ensure_index()
+            if index.group('Squadron', name):
+                logger.warning(f"Squadron {name} already exists")
+                return None
             
             # Create the squadron
             cells = [
@@ -929,6 +717,7 @@ class ShipsRegistryManager:
                 data={'rows': [{'cells': cells}]}
             )
             
+            self._insert_row(response, cells)
             if response and 'id' in response:
                 return {
                     'id': response['id'],
@@ -947,31 +736,20 @@ class ShipsRegistryManager:
     async def get_flight_group(self, name: str):
         """Get a flight group by name."""
         try:
-            # Get all rows and filter for flight groups
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
-            
-            # Find the flight group with matching name
-            for row in rows:
-                values = row.get('values', {})
-                row_type = values.get('Type', '')
-                row_name = values.get('Name', '')
-                
-                if row_type == 'Flight Group' and row_name == name:
-                    return {
-                        'id': row.get('id'),
-                        'name': row_name,
-                        'description': values.get('Description', ''),
-                        'fleet_wing': values.get('Fleet Wing', ''),
-                        'commander_id': values.get('Commander ID', ''),
-                        'squadron': values.get('Squadron', ''),
-                        'ships': values.get('Ships', []),
-                        'status': values.get('Status', '')
-                    }
+            index = await self._ensure_index()
+            row = index.group('Flight Group', name)
+            if row:
+                values = row['values']
+                return {
+                    'id': row['id'],
+                    'name': values.get('Name', ''),
+                    'description': values.get('Description', ''),
+                    'fleet_wing': values.get('Fleet Wing', ''),
+                    'commander_id': values.get('Commander ID', ''),
+                    'squadron': values.get('Squadron', ''),
+                    'ships': values.get('Ships', []),
+                    'status': values.get('Status', '')
+                }
                     
             return None
         except Exception as e:
@@ -981,30 +759,19 @@ class ShipsRegistryManager:
     async def get_squadron(self, name: str):
         """Get a squadron by name."""
         try:
-            # Get all rows and filter for squadrons
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
-            
-            # Find the squadron with matching name
-            for row in rows:
-                values = row.get('values', {})
-                row_type = values.get('Type', '')
-                row_name = values.get('Name', '')
-                
-                if row_type == 'Squadron' and row_name == name:
-                    return {
-                        'id': row.get('id'),
-                        'name': row_name,
-                        'description': values.get('Description', ''),
-                        'fleet_wing': values.get('Fleet Wing', ''),
-                        'commander_id': values.get('Commander ID', ''),
-                        'flight_groups': values.get('Flight Groups', []),
-                        'status': values.get('Status', '')
-                    }
+            index = await self._ensure_index()
+            row = index.group('Squadron', name)
+            if row:
+                values = row['values']
+                return {
+                    'id': row['id'],
+                    'name': values.get('Name', ''),
+                    'description': values.get('Description', ''),
+                    'fleet_wing': values.get('Fleet Wing', ''),
+                    'commander_id': values.get('Commander ID', ''),
+                    'flight_groups': values.get('Flight Groups', []),
+                    'status': values.get('Status', '')
+                }
                     
             return None
         except Exception as e:
@@ -1025,11 +792,14 @@ class ShipsRegistryManager:
             fg_row_id = flight_group['id']
             squadron_row_id = squadron['id']
             
+            fg_cells = [{'column': 'Squadron', 'value': squadron_name}]
             fg_update = await self.coda.request(
                 'PUT',
                 f'docs/{self.doc_id}/tables/{self.ships_table_id}/rows/{fg_row_id}',
-                data={'row': {'cells': [{'column': 'Squadron', 'value': squadron_name}]}}
+                data={'row': {'cells': fg_cells}}
             )
+            if fg_update:
+                self._apply_cells(fg_row_id, fg_cells)
             
             # Update squadron's flight groups list
             flight_groups = squadron.get('flight_groups', [])
@@ -1041,11 +811,14 @@ class ShipsRegistryManager:
             if flight_group_name not in flight_groups:
                 flight_groups.append(flight_group_name)
                 
+            squadron_cells = [{'column': 'Flight Groups', 'value': ','.join(flight_groups)}]
             squadron_update = await self.coda.request(
                 'PUT',
                 f'docs/{self.doc_id}/tables/{self.ships_table_id}/rows/{squadron_row_id}',
-                data={'row': {'cells': [{'column': 'Flight Groups', 'value': ','.join(flight_groups)}]}}
+                data={'row': {'cells': squadron_cells}}
             )
+            if squadron_update:
+                self._apply_cells(squadron_row_id, squadron_cells)
             
             return fg_update and squadron_update
         except Exception as e:
@@ -1080,6 +853,8 @@ class ShipsRegistryManager:
                 f'docs/{self.doc_id}/tables/{self.ships_table_id}/rows/{ship_row_id}',
                 data={'row': {'cells': updates}}
             )
+            if ship_update:
+                self._apply_cells(ship_row_id, updates)
             
             # Update flight group's ships list
             fg_row_id = flight_group['id']
@@ -1093,11 +868,14 @@ class ShipsRegistryManager:
             if ship_name not in ships:
                 ships.append(ship_name)
                 
+            fg_cells = [{'column': 'Ships', 'value': ','.join(ships)}]
             fg_update = await self.coda.request(
                 'PUT',
                 f'docs/{self.doc_id}/tables/{self.ships_table_id}/rows/{fg_row_id}',
-                data={'row': {'cells': [{'column': 'Ships', 'value': ','.join(ships)}]}}
+                data={'row': {'cells': fg_cells}}
             )
+            if fg_update:
+                self._apply_cells(fg_row_id, fg_cells)
             
             return ship_update and fg_update
         except Exception as e:
@@ -1107,23 +885,12 @@ class ShipsRegistryManager:
     async def list_flight_groups(self, squadron: Optional[str] = None, fleet_wing: Optional[str] = None):
         """List flight groups, optionally filtered by squadron or fleet wing."""
         try:
-            # Get all rows and filter for flight groups
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
+            index = await self._ensure_index()
             
             flight_groups = []
-            for row in rows:
+            for row in index.where(ROW_TYPE, 'Flight Group'):
                 values = row.get('values', {})
-                row_type = values.get('Type', '')
                 
-                # Check if the row is a flight group
-                if row_type != 'Flight Group':
-                    continue
-                    
                 # Apply filters if provided
                 row_squadron = values.get('Squadron', '')
                 row_fleet_wing = values.get('Fleet Wing', '')
@@ -1154,23 +921,12 @@ class ShipsRegistryManager:
     async def list_squadrons(self, fleet_wing: Optional[str] = None):
         """List squadrons, optionally filtered by fleet wing."""
         try:
-            # Get all rows and filter for squadrons
-            rows = await self.coda.get_rows(
-                self.doc_id,
-                self.ships_table_id,
-                limit=100,
-                use_column_names=True
-            )
+            index = await self._ensure_index()
             
             squadrons = []
-            for row in rows:
+            for row in index.where(ROW_TYPE, 'Squadron'):
                 values = row.get('values', {})
-                row_type = values.get('Type', '')
                 
-                # Check if the row is a squadron
-                if row_type != 'Squadron':
-                    continue
-                    
                 # Apply fleet wing filter if provided
                 row_fleet_wing = values.get('Fleet Wing', '')
                 
@@ -386,7 +386,7 @@ class MissionCogExtensions:
         mission.fleet_assignment.assigned_squadrons.update(fleet_assignment.assigned_squadrons)
         
         # Save mission data
-        cog.save_missions()
+        cog.save_missions(mission)
         
         # Add history entry
         mission.add_history_entry(
@@ -431,7 +431,7 @@ class MissionCogExtensions:
         mission.fleet_assignment.assigned_squadrons -= fleet_assignment.assigned_squadrons
         
         # Save mission data
-        cog.save_missions()
+        cog.save_missions(mission)
         
         # Add history entry
         mission.add_history_entry(
@@ -72,7 +72,7 @@ class FleetAssignmentView(discord.ui.View):
         self.fleet_assignment.assigned_ships = set(select.values)
         
         # Save mission data
-        self.mission_cog.save_missions()
+        self.mission_cog.save_missions(self.mission)
         
         # Acknowledge
         await interaction.followup.send(f"Updated assigned ships for mission '{self.mission.name}'", ephemeral=True)
@@ -94,7 +94,7 @@ class FleetAssignmentView(discord.ui.View):
         self.fleet_assignment.assigned_flight_groups = set(select.values)
         
         # Save mission data
-        self.mission_cog.save_missions()
+        self.mission_cog.save_missions(self.mission)
         
         # Acknowledge
         await interaction.followup.send(f"Updated assigned flight groups for mission '{self.mission.name}'", ephemeral=True)
@@ -116,7 +116,7 @@ class FleetAssignmentView(discord.ui.View):
         self.fleet_assignment.assigned_squadrons = set(select.values)
         
         # Save mission data
-        self.mission_cog.save_missions()
+        self.mission_cog.save_missions(self.mission)
         
         # Acknowledge
         await interaction.followup.send(f"Updated assigned squadrons for mission '{self.mission.name}'", ephemeral=True)
@@ -158,7 +158,7 @@ class RegisteredShipSelectionModal(discord.ui.Modal):
             self.mission.fleet_assignment.assigned_ships = set(valid_ships)
             
             # Save the mission data
-            self.cog.save_missions()
+            self.cog.save_missions(self.mission)
             
             # Create response message
             if invalid_ships:
@@ -234,7 +234,7 @@ class FlightGroupSelectionModal(discord.ui.Modal):
             self.mission.fleet_assignment.assigned_flight_groups = set(valid_flight_groups)
             
             # Save the mission data
-            self.cog.save_missions()
+            self.cog.save_missions(self.mission)
             
             # Create response message
             if invalid_flight_groups:
@@ -310,7 +310,7 @@ class SquadronSelectionModal(discord.ui.Modal):
             self.mission.fleet_assignment.assigned_squadrons = set(valid_squadrons)
             
             # Save the mission data
-            self.cog.save_missions()
+            self.cog.save_missions(self.mission)
             
             # Create response message
             if invalid_squadrons:
@@ -433,7 +433,7 @@ class JoinAsCommanderModal(discord.ui.Modal):
                     )
                     
                     # Save mission data
-                    self.cog.save_missions()
+                    self.cog.save_missions(self.mission)
                     
                     # Update mission view
                     await self.cog.update_mission_view(self.mission)
@@ -473,7 +473,7 @@ class JoinAsCommanderModal(discord.ui.Modal):
                     )
                     
                     # Save mission data
-                    self.cog.save_missions()
+                    self.cog.save_missions(self.mission)
                     
                     # Update mission view
                     await self.cog.update_mission_view(self.mission)
@@ -523,7 +523,7 @@ class JoinAsCommanderModal(discord.ui.Modal):
                     )
                     
                     # Save mission data
-                    self.cog.save_missions()
+                    self.cog.save_missions(self.mission)
                     
                     # Update mission view
                     await self.cog.update_mission_view(self.mission)
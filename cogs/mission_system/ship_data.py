@@ -5,8 +5,9 @@ from typing import Dict, List, Optional, Set, ClassVar
 from dataclasses import dataclass
 import re
 
+from ..utils.autocomplete_index import AutocompleteIndex
+
 logger = logging.getLogger('ship_data')
-logger.setLevel(logging.DEBUG)
 
 @dataclass
 class Ship:
@@ -35,6 +36,8 @@ class Ship:
     _manufacturers: ClassVar[Set[str]] = set()
     _roles: ClassVar[Set[str]] = set()
     _sizes: ClassVar[Set[str]] = set()
+    # Name/manufacturer/role search index used by search_ships
+    _index: ClassVar[AutocompleteIndex] = AutocompleteIndex('ships')
     
     @classmethod
     def load_ships(cls, file_path: str = None) -> bool:
@@ -51,6 +54,7 @@ class Ship:
         cls._manufacturers.clear()
         cls._roles.clear()
         cls._sizes.clear()
+        cls._index.clear()
         
         try:
             with open(file_path, 'r', encoding='utf-8') as csv_file:
@@ -81,6 +85,11 @@ class Ship:
                         cls._sizes.add(ship.size)
                     except (KeyError, ValueError) as e:
                         logger.warning(f"Error processing ship row: {e} - Row: {row}")
+            
+            cls._index.rebuild(
+                (ship.name, ship.name, ship.name, (ship.name, ship.manufacturer, ship.role))
+                for ship in cls._ships_cache.values()
+            )
                 
             logger.info(f"Loaded {len(cls._ships_cache)} ships from {file_path}")
             return True
@@ -104,51 +113,9 @@ class Ship:
             # Return all ships if no search term, up to the limit
             return list(cls._ships_cache.values())[:limit]
         
-        search_term = search_term.lower()
-        exact_matches = []
-        name_starts_with = []
-        name_contains = []
-        manufacturer_matches = []
-        role_matches = []
-        
-        for ship in cls._ships_cache.values():
-            ship_name_lower = ship.name.lower()
-            
-            # Exact match on name
-            if ship_name_lower == search_term:
-                exact_matches.append(ship)
-                continue
-                
-            # Name starts with search term
-            if ship_name_lower.startswith(search_term):
-                name_starts_with.append(ship)
-                continue
-                
-            # Name contains search term
-            if search_term in ship_name_lower:
-                name_contains.append(ship)
-                continue
-                
-            # Manufacturer contains search term
-            if search_term in ship.manufacturer.lower():
-                manufacturer_matches.append(ship)
-                continue
-                
-            # Role contains search term
-            if search_term in ship.role.lower():
-                role_matches.append(ship)
-                continue
-                
-        # Combine results in order of relevance
-        results = (
-            exact_matches +
-            name_starts_with +
-            name_contains +
-            manufacturer_matches +
-            role_matches
-        )
-        
-        return results[:limit]
+        # Ranked exact, prefix, word-start then substring matches on the
+        # name, then on the manufacturer, then on the role
+        return [cls._ships_cache[name] for _, name in cls._index.search(search_term, limit)]
     
     @classmethod
     def get_all_manufacturers(cls) -> List[str]:
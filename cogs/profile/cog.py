@@ -13,10 +13,10 @@ import io
 from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timezone
 from pydantic import ValidationError
-from logging.handlers import RotatingFileHandler
 
 # Import BaseCog instead of commands.Cog
 from cogs.utils.base_cog import BaseCog
+from cogs.utils.row_index import PROFILES
 
 # Import local modules avoiding circular imports
 from .cache import ProfileCache
@@ -42,22 +42,11 @@ from .ui import (
     ComparisonView, AchievementUnlockModal, DivisionReportView, FleetReportView,
     StatusChangeModal, MemberSearchView, AwardGalleryView
 )
+from ..utils.log_pipeline import add_log_file
 
 # Setup Logging
 logger = logging.getLogger('profile')
-logger.setLevel(logging.DEBUG)
-
-handler = RotatingFileHandler(
-    filename='profiles.log',
-    maxBytes=5 * 1024 * 1024,  # 5 MB
-    backupCount=5,
-    encoding='utf-8',
-    mode='a'
-)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'profiles.log')
 
 # Define CODA_COLUMN_MAPPING for column verification
 CODA_COLUMN_MAPPING = {
@@ -95,8 +84,10 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
         super().__init__(bot)
         
         # Initialize services with BaseCog's property accessors
-        self.cache = ProfileCache()  # Maintain custom cache for now
+        self.cache = ProfileCache(cache_service=self.cache_service)
         self.formatter = MilitaryIDFormatter()
+        self.award_index = bot.autocomplete.index('awards')
+        self.award_index.rebuild((aw, aw, aw.split(' - ')[0], None) for aw in AVAILABLE_AWARDS)
         self.watermark = WatermarkGenerator()
         self.db_lock = asyncio.Lock()  # Add a lock for database operations
         logger.info("ProfileCog initialized")
@@ -203,6 +194,8 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
             if rows and len(rows) > 0:
                 member_data = rows[0]
                 await self.cache.set(cache_key, member_data)
+                if self.row_index:
+                    self.row_index.set(PROFILES, discord_user_id, member_data.get('id'))
                 return member_data
             
             # If user is not found in the database but profile is requested,
@@ -359,19 +352,23 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                 member_id_str = str(member.id)
                 
                 async with self.db_lock:  # Add lock for database operations
-                    # Get the row ID
-                    rows = await self.coda_client.get_rows(
-                        doc_id,
-                        table_id,
-                        query=f'"Discord User ID":"{member_id_str}"',
-                        limit=1
-                    )
-                    
-                    if not rows:
-                        logger.error(f"Could not find row for member {member_id_str}")
-                        return False
+                    # Get the row ID, skipping the lookup when it is indexed
+                    row_id = self.row_index.get(PROFILES, member_id_str) if self.row_index else None
+                    if not row_id:
+                        rows = await self.coda_client.get_rows(
+                            doc_id,
+                            table_id,
+                            query=f'"Discord User ID":"{member_id_str}"',
+                            limit=1
+                        )
                         
-                    row_id = rows[0]['id']
+                        if not rows:
+                            logger.error(f"Could not find row for member {member_id_str}")
+                            return False
+                            
+                        row_id = rows[0]['id']
+                        if self.row_index:
+                            self.row_index.set(PROFILES, member_id_str, row_id)
                     
                     # Update the row
                     update_cells = [
@@ -408,15 +405,11 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                     except Exception as log_err:
                         logger.warning(f"Audit log warning (non-critical): {log_err}")
                     
-                    # *** IMPORTANT - Ensure cache is invalidated properly ***
+                    # Drop this member's profile, member and balance entries everywhere
                     try:
-                        # Forcibly invalidate cache
-                        await self.cache.invalidate(member_id_str)
+                        self.cache_service.invalidate_user(member.id)
+                        self.cache_service.invalidate_row(row_id)
                         logger.debug(f"Cache invalidated for {member_id_str}")
-                        
-                        # Double-check: Clear the cache completely for this user
-                        if hasattr(self.cache, 'bulk_invalidate'):
-                            await self.cache.bulk_invalidate([member_id_str])
                     except Exception as cache_err:
                         logger.warning(f"Cache invalidation warning: {cache_err}")
                     
@@ -651,8 +644,14 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                 # Get all rows and build a map of Discord ID -> Row ID
                 discord_to_row = {}
                 
-                # Create query with all Discord IDs
-                discord_ids = list(updates.keys())
+                # Resolve indexed row IDs locally; only query Coda for the rest
+                discord_ids = []
+                for user_id in updates.keys():
+                    row_id = self.row_index.get(PROFILES, user_id) if self.row_index else None
+                    if row_id:
+                        discord_to_row[str(user_id)] = row_id
+                    else:
+                        discord_ids.append(user_id)
                 
                 # Get rows in batches of 25 (Coda API limit)
                 for i in range(0, len(discord_ids), 25):
@@ -668,7 +667,9 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                     for row in rows:
                         discord_id = row.get('values', {}).get('Discord User ID')
                         if discord_id:
-                            discord_to_row[discord_id] = row['id']
+                            discord_to_row[str(discord_id)] = row['id']
+                    if self.row_index:
+                        self.row_index.learn(PROFILES, rows, 'Discord User ID')
                 
                 # Prepare batch updates
                 batch_operations = []
@@ -732,8 +733,11 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                             if user_id and user_id in updates:
                                 results[user_id] = False
             
-            # Invalidate cache for updated users
-            await self.cache.bulk_invalidate([str(user_id) for user_id in updates.keys()])
+            # Invalidate cache for updated users and their rows
+            for user_id in updates:
+                self.cache_service.invalidate_user(user_id)
+            for op in batch_operations:
+                self.cache_service.invalidate_row(op['row_id'])
             
             # Log updates
             logger.info(f"Batch updated {sum(results.values())}/{len(updates)} profiles. Reason: {reason}")
@@ -1427,28 +1431,8 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
         current: str
     ) -> List[app_commands.Choice[str]]:
         """Provides autocomplete suggestions for the 'award' argument."""
-        # We'll build a list of potential matches
-        filtered = [a for a in AVAILABLE_AWARDS if current.lower() in a.lower()]
-    
-        choices = []
-        for aw in filtered:
-            # Truncate the displayed label to 100 characters
-            truncated_label = aw[:100]
-    
-            # The 'value' will be the short name (before the dash), also truncated
-            short_portion = aw.split(' - ')[0]
-            truncated_value = short_portion[:100]
-    
-            # Build the Choice
-            choices.append(
-                app_commands.Choice(
-                    name=truncated_label,
-                    value=truncated_value
-                )
-            )
-    
-        # Return up to 25 results
-        return choices[:25]
+        # Labels are the full award text; values the short name before the dash
+        return self.award_index.choices(current)
 
     async def process_bulk_awards(self, members, award, citation, awarded_by=None):
         """Process awards for multiple members."""
@@ -1629,8 +1613,7 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                 rows = await self.coda_client.get_rows(
                     DOC_ID,
                     TABLE_ID,
-                    query=query,
-                    limit=100  # Increased limit to handle larger wings
+                    query=query
                 )
             
             if not rows:
@@ -2113,8 +2096,7 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                 rows = await self.coda_client.get_rows(
                     DOC_ID,
                     TABLE_ID,
-                    query=query,
-                    limit=100  # Increased limit to handle larger divisions
+                    query=query
                 )
             
             if not rows:
@@ -2197,7 +2179,8 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                     data1.get('values', {}), 
                     data2.get('values', {}),
                     member1.display_name,
-                    member2.display_name
+                    member2.display_name,
+                    pool=getattr(self.bot, 'render_pool', None)
                 )
                 
                 if chart:
@@ -2283,8 +2266,7 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
                 rows = await self.coda_client.get_rows(
                     DOC_ID,
                     TABLE_ID,
-                    query=coda_query,
-                    limit=100
+                    query=coda_query
                 )
             
             if not rows:
@@ -2430,7 +2412,7 @@ class ProfileCog(BaseCog, ProfileCommandExtensions, ShipIntegrationMethods):
             # Try to also generate award chart
             try:
                 from .visualizations import generate_award_chart
-                chart = await generate_award_chart(awards)
+                chart = await generate_award_chart(awards, pool=getattr(self.bot, 'render_pool', None))
                 if chart:
                     await interaction.followup.send(embed=embed, view=view, file=chart)
                 else:
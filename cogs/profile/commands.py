@@ -28,7 +28,9 @@ class ProfileCommandExtensions:
                 raise ValueError("No profile data found")
             
             # Return the PDF bytes buffer
-            return await generate_profile_pdf(member, member_row, self.formatter)
+            return await generate_profile_pdf(
+                member, member_row, self.formatter, pool=getattr(self.bot, 'render_pool', None)
+            )
             
         except ImportError:
             logger.error("ReportLab library not installed - PDF generation not available")
@@ -61,16 +63,19 @@ class ProfileCommandExtensions:
                 'Completed Missions': parse_list_field(values.get('Completed Missions', []))
             }
             
+            # Render off the event loop; repeat views are served from the render cache
+            pool = getattr(self.bot, 'render_pool', None)
+            
             # Create stats chart
-            stats_file = await generate_stats_chart(profile_data)
+            stats_file = await generate_stats_chart(profile_data, pool=pool)
             
             # Create awards chart if there are awards
             awards_file = None
             if profile_data['Awards']:
-                awards_file = await generate_award_chart(profile_data['Awards'])
+                awards_file = await generate_award_chart(profile_data['Awards'], pool=pool)
                 
             # Create career timeline
-            timeline_file = await generate_career_timeline(profile_data)
+            timeline_file = await generate_career_timeline(profile_data, pool=pool)
             
             # Create embed for the stats
             embed = discord.Embed(
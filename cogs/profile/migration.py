@@ -40,8 +40,7 @@ async def run_fleet_system_migration(bot: commands.Bot, guild_id: int, cog) -> b
         logger.info("Fetching all profile records")
         rows = await cog.coda_client.get_rows(
             DOC_ID,
-            TABLE_ID,
-            limit=1000  # Set a high limit to get all records
+            TABLE_ID
         )
         
         if not rows:
@@ -188,7 +187,8 @@ async def run_fleet_system_migration(bot: commands.Bot, guild_id: int, cog) -> b
                     
                     # Invalidate cache
                     try:
-                        await cog.cache.invalidate(str(discord_id))
+                        cog.cache_service.invalidate_user(discord_id)
+                        cog.cache_service.invalidate_row(row_id)
                     except Exception as cache_err:
                         logger.warning(f"Cache invalidation warning: {cache_err}")
                         
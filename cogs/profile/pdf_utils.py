@@ -1,15 +1,22 @@
 """PDF export utilities for the profile system."""
 
+import asyncio
 import io
 import logging
 from typing import Dict, Any, Optional, List
 import discord
 from datetime import datetime, timezone
 
+from ..utils.render_pool import RenderPool
+
 # Setup logging
 logger = logging.getLogger('profile.pdf')
 
-async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, Any], formatter) -> io.BytesIO:
+# Basic information fields shown on the PDF
+PDF_FIELDS = ('ID Number', 'Rank', 'Division', 'Specialization', 'Status', 'Join Date')
+
+async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, Any], formatter,
+                               pool: Optional[RenderPool] = None) -> io.BytesIO:
     """
     Generate a PDF version of a profile.
     
@@ -17,10 +24,43 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
         member: The Discord member
         profile_data: The profile data dictionary
         formatter: The formatter to use for formatting fields
+        pool: Render pool to build the PDF in; a worker thread is used without one
         
     Returns:
         BytesIO object containing the PDF data
     """
+    values = profile_data.get('values', {})
+    
+    # Only the fields the PDF shows, already parsed, so the render can run in
+    # another process and identical profiles hit the render cache
+    payload = {
+        'display_name': member.display_name,
+        'values': {field: values.get(field, 'N/A') for field in PDF_FIELDS},
+        'mission_count': values.get('Mission Count', 0),
+        'completed_missions': formatter.parse_list_field(values.get('Completed Missions', [])),
+        'combat_missions': formatter.parse_list_field(values.get('Combat Missions', [])),
+        'awards': formatter.parse_list_field(values.get('Awards', [])),
+        'certifications': formatter.parse_list_field(values.get('Certifications', [])),
+        # Stamped here rather than in the render, so a cached PDF never shows an old time;
+        # minute resolution still lets repeat requests share one render
+        'generated': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC'),
+    }
+    
+    try:
+        if pool is not None:
+            pdf = await pool.render(_render_profile_pdf, payload)
+        else:
+            pdf = await asyncio.to_thread(_render_profile_pdf, payload)
+        return io.BytesIO(pdf)
+    except ImportError:
+        logger.error("ReportLab library not installed - PDF generation not available")
+        raise ImportError("ReportLab library is required for PDF generation")
+    except Exception as e:
+        logger.error(f"Error generating PDF: {e}", exc_info=True)
+        raise
+
+def _render_profile_pdf(payload: Dict[str, Any]) -> bytes:
+    """Build the profile PDF from a prepared payload. Runs outside the event loop."""
     try:
         # Import reportlab
         from reportlab.lib.pagesizes import letter
@@ -29,7 +69,7 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch
         
-        values = profile_data.get('values', {})
+        values = payload['values']
         
         # Create a buffer for the PDF
         buffer = io.BytesIO()
@@ -68,7 +108,7 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
         
         # Add title
         content.append(Paragraph(f"HLN STARWARD FLEET", title_style))
-        content.append(Paragraph(f"PERSONNEL FILE: {member.display_name}", subtitle_style))
+        content.append(Paragraph(f"PERSONNEL FILE: {payload['display_name']}", subtitle_style))
         content.append(Spacer(1, 0.25*inch))
         
         # Add basic info
@@ -99,10 +139,10 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
         # Add service statistics
         content.append(Paragraph("SERVICE STATISTICS", header_style))
         
-        mission_count = values.get('Mission Count', 0)
-        completed_missions = formatter.parse_list_field(values.get('Completed Missions', []))
-        combat_missions = formatter.parse_list_field(values.get('Combat Missions', []))
-        awards = formatter.parse_list_field(values.get('Awards', []))
+        mission_count = payload['mission_count']
+        completed_missions = payload['completed_missions']
+        combat_missions = payload['combat_missions']
+        awards = payload['awards']
         
         stats_info = [
             ["MISSION COUNT:", str(mission_count)],
@@ -126,7 +166,7 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
         # Add certifications
         content.append(Paragraph("CERTIFICATIONS", header_style))
         
-        certifications = formatter.parse_list_field(values.get('Certifications', []))
+        certifications = payload['certifications']
         if certifications:
             cert_data = []
             for cert in certifications:
@@ -194,20 +234,14 @@ async def generate_profile_pdf(member: discord.Member, profile_data: Dict[str, A
             
         # Add footer
         content.append(Spacer(1, 0.5*inch))
-        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-        content.append(Paragraph(f"Generated: {timestamp}", styles['Normal']))
+        content.append(Paragraph(f"Generated: {payload['generated']}", styles['Normal']))
         content.append(Paragraph("HLN STARWARD FLEET - CONFIDENTIAL", styles['Normal']))
         
         # Build the PDF
         doc.build(content)
         
         # Get the PDF data
-        buffer.seek(0)
-        return buffer
+        return buffer.getvalue()
         
     except ImportError:
-        logger.error("ReportLab library not installed - PDF generation not available")
-        raise ImportError("ReportLab library is required for PDF generation")
-    except Exception as e:
-        logger.error(f"Error generating PDF: {e}", exc_info=True)
-        raise
\ No newline at end of file
+        raise ImportError("ReportLab library is required for PDF generation")
\ No newline at end of file
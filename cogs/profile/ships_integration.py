@@ -4,6 +4,8 @@ import discord
 import logging
 from typing import List, Optional
 
+from cogs.utils.row_index import PROFILES
+
 logger = logging.getLogger('profile.ships_integration')
 
 class ShipIntegrationMethods:
@@ -37,6 +39,9 @@ class ShipIntegrationMethods:
                 query=query
             )
             
+            if getattr(self, 'row_index', None):
+                self.row_index.learn(PROFILES, rows, 'Discord User ID')
+            
             # Extract member IDs and get member objects
             members = []
             for row in rows:
@@ -83,6 +88,9 @@ class ShipIntegrationMethods:
                 query=query
             )
             
+            if getattr(self, 'row_index', None):
+                self.row_index.learn(PROFILES, rows, 'Discord User ID')
+            
             # Extract member IDs and get member objects
             members = []
             for row in rows:
@@ -0,0 +1,315 @@
+# cogs/utils/autocomplete_index.py
+
+import bisect
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger('bot.autocomplete')
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+
+_WHITESPACE = re.compile(r'\s+')
+_WORD_SPLIT = re.compile(r'[^\w]+')
+
+
+def normalize(text: Any) -> str:
+    """Case-fold, strip accents and collapse whitespace for matching."""
+    if text is None:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Entry:
+    __slots__ = ('label', 'value', 'terms', 'weight', 'grams', 'words')
+
+    def __init__(self, label: str, value: Any, terms: Sequence[str], weight: float):
+        self.label = label
+        self.value = value
+        self.terms = terms
+        self.weight = weight
+        self.grams: Set[str] = set()
+        self.words: Set[str] = set()
+        for term in terms:
+            self.grams |= _trigrams(term)
+            self.words.add(term)
+            self.words.update(word for word in _WORD_SPLIT.split(term) if word)
+
+
+class AutocompleteIndex:
+    """
+    Pre-normalized search index for one autocomplete source.
+
+    Every entry has a display label, the value sent back to the command,
+    and one or more search terms (the label first). Queries of three or
+    more characters are answered from a trigram index and verified as
+    substrings; shorter ones from a sorted word list by prefix. Results
+    rank exact matches, then prefix matches, word-start matches and plain
+    substrings, earlier terms before later ones, then by weight.
+    Entries can be added and removed one at a time.
+    """
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._grams: Dict[str, Set[Hashable]] = {}
+        self._words: List[Tuple[str, Hashable]] = []
+        # Label order for empty queries, rebuilt lazily after changes
+        self._default_order: Optional[List[Hashable]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def add(
+        self,
+        key: Hashable,
+        label: str,
+        value: Any = None,
+        terms: Optional[Iterable[Any]] = None,
+        weight: float = 0.0
+    ):
+        """Add or replace an entry. ``terms`` defaults to the label alone."""
+        if key in self._entries:
+            self.remove(key)
+        normalized = []
+        for term in (terms if terms is not None else (label,)):
+            term = normalize(term)
+            if term and term not in normalized:
+                normalized.append(term)
+        entry = _Entry(label, label if value is None else value, tuple(normalized), weight)
+        self._entries[key] = entry
+        for gram in entry.grams:
+            self._grams.setdefault(gram, set()).add(key)
+        for word in entry.words:
+            bisect.insort(self._words, (word, key))
+        self._default_order = None
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove an entry; returns False if it was not indexed."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for gram in entry.grams:
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+        for word in entry.words:
+            i = bisect.bisect_left(self._words, (word, key))
+            if i < len(self._words) and self._words[i] == (word, key):
+                del self._words[i]
+        self._default_order = None
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._grams.clear()
+        self._words.clear()
+        self._default_order = None
+
+    def rebuild(self, entries: Iterable[Tuple[Hashable, str, Any, Optional[Iterable[Any]]]]):
+        """Replace the whole index with ``(key, label, value, terms)`` entries."""
+        self.clear()
+        words: List[Tuple[str, Hashable]] = []
+        for key, label, value, terms in entries:
+            normalized = []
+            for term in (terms if terms is not None else (label,)):
+                term = normalize(term)
+                if term and term not in normalized:
+                    normalized.append(term)
+            entry = _Entry(label, label if value is None else value, tuple(normalized), 0.0)
+            self._entries[key] = entry
+            for gram in entry.grams:
+                self._grams.setdefault(gram, set()).add(key)
+            words.extend((word, key) for word in entry.words)
+        # One sort instead of an insort per word
+        words.sort()
+        self._words = words
+
+    def _candidates(self, query: str) -> Iterable[Hashable]:
+        if len(query) >= 3:
+            sets = []
+            for gram in _trigrams(query):
+                keys = self._grams.get(gram)
+                if not keys:
+                    return ()
+                sets.append(keys)
+            sets.sort(key=len)
+            return set.intersection(*sets) if len(sets) > 1 else sets[0]
+        start = bisect.bisect_left(self._words, (query,))
+        found = []
+        for word, key in self._words[start:]:
+            if not word.startswith(query):
+                break
+            found.append(key)
+        return set(found)
+
+    @staticmethod
+    def _score(entry: _Entry, query: str) -> Optional[Tuple[int, int]]:
+        best = None
+        for priority, term in enumerate(entry.terms):
+            pos = term.find(query)
+            if pos < 0:
+                continue
+            if term == query:
+                kind = 0
+            elif pos == 0:
+                kind = 1
+            else:
+                # Word-start if any occurrence follows a separator
+                kind = 3
+                while pos > 0:
+                    if not term[pos - 1].isalnum():
+                        kind = 2
+                        break
+                    pos = term.find(query, pos + 1)
+            score = (priority, kind)
+            if best is None or score < best:
+                best = score
+        return best
+
+    def search(self, query: str, limit: int = MAX_CHOICES) -> List[Tuple[str, Any]]:
+        """Return up to ``limit`` ``(label, value)`` pairs, best match first."""
+        query = normalize(query)
+        if not query:
+            if self._default_order is None:
+                self._default_order = sorted(
+                    self._entries, key=lambda k: (-self._entries[k].weight, self._entries[k].label.casefold())
+                )
+            return [(self._entries[k].label, self._entries[k].value) for k in self._default_order[:limit]]
+
+        ranked = []
+        for key in self._candidates(query):
+            entry = self._entries[key]
+            score = self._score(entry, query)
+            if score is not None:
+                ranked.append((score, -entry.weight, len(entry.label), entry.label, key))
+        ranked.sort(key=lambda item: item[:4])
+        return [(self._entries[item[4]].label, self._entries[item[4]].value) for item in ranked[:limit]]
+
+    def choices(self, query: str, limit: int = MAX_CHOICES) -> List[app_commands.Choice[str]]:
+        """``search`` as app command choices (labels and values cut to 100 characters)."""
+        return [
+            app_commands.Choice(name=str(label)[:100], value=str(value)[:100])
+            for label, value in self.search(query, limit)
+        ]
+
+
+class MemberDirectory:
+    """
+    Per-guild member indexes for user autocomplete.
+
+    A guild's index is built from its member cache the first time it is
+    searched (and again once the guild finishes chunking), then kept
+    current from member join, leave and update events.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, AutocompleteIndex] = {}
+        self._chunked: Dict[int, bool] = {}
+
+    @staticmethod
+    def _terms(member: discord.Member) -> List[str]:
+        return [member.display_name, member.name, member.nick, getattr(member, 'global_name', None)]
+
+    @staticmethod
+    def _label(member: discord.Member) -> str:
+        return f"{member.display_name} ({member.name})"
+
+    def for_guild(self, guild: discord.Guild) -> AutocompleteIndex:
+        index = self._guilds.get(guild.id)
+        if index is None or (guild.chunked and not self._chunked.get(guild.id)):
+            index = index or AutocompleteIndex(f'members:{guild.id}')
+            index.rebuild(
+                (member.id, self._label(member), str(member.id), self._terms(member))
+                for member in guild.members
+            )
+            self._guilds[guild.id] = index
+            self._chunked[guild.id] = guild.chunked
+            logger.debug(f"Indexed {len(index)} members of guild {guild.id}")
+        return index
+
+    def search(self, guild: discord.Guild, query: str, limit: int = MAX_CHOICES) -> List[app_commands.Choice[str]]:
+        return self.for_guild(guild).choices(query, limit)
+
+    def upsert(self, member: discord.Member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member.id, self._label(member), str(member.id), self._terms(member))
+
+    def remove(self, member: discord.Member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.remove(member.id)
+
+    def forget_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+        self._chunked.pop(guild_id, None)
+
+
+class AutocompleteService:
+    """
+    Shared autocomplete indexes, registered as the ``autocomplete`` service.
+
+    ``index(name)`` returns a named index that its owner fills and updates;
+    ``members`` holds the per-guild member indexes, which this service
+    keeps current from gateway events.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.members = MemberDirectory()
+        self._indexes: Dict[str, AutocompleteIndex] = {}
+        for listener in (self.on_member_join, self.on_member_remove, self.on_member_update,
+                         self.on_user_update, self.on_guild_remove):
+            bot.add_listener(listener)
+
+    def index(self, name: str) -> AutocompleteIndex:
+        """Return the index called ``name``, creating it empty."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = AutocompleteIndex(name)
+            self._indexes[name] = index
+        return index
+
+    async def on_member_join(self, member: discord.Member):
+        self.members.upsert(member)
+
+    async def on_member_remove(self, member: discord.Member):
+        self.members.remove(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick or before.display_name != after.display_name:
+            self.members.upsert(after)
+
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.name == after.name and getattr(before, 'global_name', None) == getattr(after, 'global_name', None):
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                self.members.upsert(member)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.members.forget_guild(guild.id)
+
+    def stats(self) -> Dict[str, int]:
+        """Entries per index."""
+        stats = {name: len(index) for name, index in self._indexes.items()}
+        stats.update({index.name: len(index) for index in self.members._guilds.values()})
+        return stats
@@ -0,0 +1,932 @@
+# cogs/utils/banking_ledger.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from .coda_api import CodaAPIClient, CodaRequestError, PRIORITY_BACKGROUND, PRIORITY_BULK
+
+logger = logging.getLogger('banking.ledger')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    user_id     INTEGER PRIMARY KEY,
+    balance     TEXT    NOT NULL,
+    username    TEXT,
+    row_id      TEXT,
+    updated_at  TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id  TEXT PRIMARY KEY,
+    user_id         INTEGER NOT NULL,
+    payload         TEXT    NOT NULL,
+    created_at      TEXT    NOT NULL,
+    synced          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions (user_id, created_at);
+CREATE TABLE IF NOT EXISTS outbox (
+    kind            TEXT    NOT NULL,
+    key             TEXT    NOT NULL,
+    payload         TEXT    NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL    NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS transaction_rollups (
+    user_id     INTEGER NOT NULL,
+    day         TEXT    NOT NULL,
+    category    TEXT    NOT NULL DEFAULT '',
+    type        TEXT    NOT NULL DEFAULT '',
+    count       INTEGER NOT NULL DEFAULT 0,
+    total_in    TEXT    NOT NULL DEFAULT '0',
+    total_out   TEXT    NOT NULL DEFAULT '0',
+    PRIMARY KEY (user_id, day, category, type)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key     TEXT PRIMARY KEY,
+    value   TEXT
+);
+"""
+
+# Coda column names for the two tables the ledger mirrors
+ACCOUNT_COLUMNS = {
+    'user_id': 'Discord User ID',
+    'balance': 'Balance',
+    'username': 'Username',
+    'last_updated': 'Last Updated',
+}
+TRANSACTION_COLUMNS = {
+    'transaction_id': 'Transaction ID',
+    'user_id': 'Discord User ID',
+    'type': 'Type',
+    'amount': 'Amount',
+    'status': 'Status',
+    'created_at': 'Created At',
+    'target_user_id': 'Target User ID',
+    'description': 'Description',
+    'category': 'Category',
+    'session_id': 'Session ID',
+    'goal_id': 'Goal ID',
+    'loan_id': 'Loan ID',
+}
+
+
+def parse_user_id(value: Any) -> int:
+    """
+    Discord user ID from a Coda cell, which may be wrapped in backticks;
+    0 for a blank cell. Raises ValueError for anything else non-numeric.
+    """
+    return int(str(value or '').strip().strip('`').strip() or 0)
+
+
+class BankingLedger:
+    """
+    Local SQLite (WAL) ledger that is the authoritative hot store for balances
+    and transactions.
+
+    Balance changes and new transactions are committed locally and queued in an
+    outbox; a background task pushes them to the Coda Accounts and Transactions
+    tables with retries. Pending balance writes for the same user are coalesced
+    so only the latest balance is sent. A periodic reconciliation pass compares
+    Coda against the ledger and re-queues any drift.
+
+    The ledger also keeps the full transaction history (pulled incrementally
+    from Coda) with per-user, per-day, per-category/type rollups that are
+    updated in the same local transaction as every insert, so summaries are
+    exact and never touch Coda.
+    """
+
+    def __init__(
+        self,
+        coda_client,
+        doc_id: str,
+        accounts_table_id: str,
+        transactions_table_id: str,
+        db_path: Optional[str] = None,
+        flush_interval: float = 5.0,
+        reconcile_interval: float = 3600.0,
+        batch_size: int = 50,
+        max_backoff: float = 300.0
+    ):
+        self.coda = coda_client
+        self.doc_id = doc_id
+        self.accounts_table_id = accounts_table_id
+        self.transactions_table_id = transactions_table_id
+        self.db_path = db_path or os.getenv('BANKING_LEDGER_PATH', 'banking_ledger.db')
+        self.flush_interval = flush_interval
+        self.reconcile_interval = reconcile_interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+
+        # All SQLite access is serialised on one worker thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='banking-ledger')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._last_reconcile = 0.0
+        self.history_ready = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def open(self):
+        """Open the database and create the schema."""
+        await self._run(self._open_sync)
+        logger.info(f"Banking ledger opened at {self.db_path}")
+
+    def _open_sync(self):
+        if self._conn is not None:
+            return
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+
+        if self._get_meta_sync('rollups_built') is None:
+            # Ledgers created before rollups existed: build them from local history
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM transaction_rollups")
+                for (payload,) in conn.execute("SELECT payload FROM transactions").fetchall():
+                    self._add_to_rollups_sync(json.loads(payload))
+                self._set_meta_sync('rollups_built', _now_iso())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.history_ready = self._get_meta_sync('history_synced') is not None
+
+    def _get_meta_sync(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta_sync(self, key: str, value: Optional[str]):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def start(self):
+        """Start the background write-behind task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info("Started banking ledger sync task")
+
+    async def stop(self):
+        """Stop the sync task, attempt a final flush and close the database."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error during final ledger flush: {e}")
+
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=False)
+        logger.info("Banking ledger stopped")
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # ------------------------------------------------------------------
+    # Balances
+    # ------------------------------------------------------------------
+
+    async def get_balance(self, user_id: int) -> Optional[Decimal]:
+        """Return the ledger balance, or None if the account is not loaded yet."""
+        return await self._run(self._get_balance_sync, user_id)
+
+    def _get_balance_sync(self, user_id: int) -> Optional[Decimal]:
+        row = self._conn.execute(
+            "SELECT balance FROM accounts WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return Decimal(row[0]) if row else None
+
+    async def get_balances(self, user_ids: List[int]) -> Dict[int, Optional[Decimal]]:
+        """Return ledger balances for several users (None for users not loaded)."""
+        return await self._run(self._get_balances_sync, list(set(user_ids)))
+
+    def _get_balances_sync(self, user_ids: List[int]) -> Dict[int, Optional[Decimal]]:
+        balances: Dict[int, Optional[Decimal]] = {user_id: None for user_id in user_ids}
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for user_id, balance in self._conn.execute(
+                f"SELECT user_id, balance FROM accounts WHERE user_id IN ({placeholders})", chunk
+            ):
+                balances[user_id] = Decimal(balance)
+        return balances
+
+    async def get_row_id(self, user_id: int) -> Optional[str]:
+        """Return the cached Coda Accounts row ID for a user, if known."""
+        row = await self._run(
+            lambda: self._conn.execute(
+                "SELECT row_id FROM accounts WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        )
+        return row[0] if row else None
+
+    async def seed_account(
+        self,
+        user_id: int,
+        balance: Decimal,
+        row_id: Optional[str] = None,
+        username: Optional[str] = None,
+        push: bool = False
+    ) -> Decimal:
+        """
+        Load an account into the ledger from Coda (or create a new one).
+
+        An existing ledger balance always wins over the seeded value. If
+        ``push`` is set the account is queued for creation in Coda.
+        """
+        return await self._run(self._seed_account_sync, user_id, balance, row_id, username, push)
+
+    def _seed_account_sync(self, user_id, balance, row_id, username, push) -> Decimal:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT balance FROM accounts WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE accounts SET row_id = COALESCE(row_id, ?), "
+                    "username = COALESCE(?, username) WHERE user_id = ?",
+                    (row_id, username, user_id)
+                )
+                result = Decimal(row[0])
+            else:
+                conn.execute(
+                    "INSERT INTO accounts (user_id, balance, username, row_id, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (user_id, str(balance), username, row_id, _now_iso())
+                )
+                if push:
+                    # No Coda row yet (unless one was passed): the push inserts it
+                    self._enqueue_balance(user_id, balance, None if row_id else username)
+                result = balance
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def apply_delta(self, user_id: int, amount: Decimal) -> Optional[Decimal]:
+        """
+        Atomically add ``amount`` to a loaded account.
+
+        Returns the new balance, or None if the account is not loaded or the
+        change would make the balance negative.
+        """
+        results = await self.apply_deltas([(user_id, amount)])
+        return results[0]
+
+    async def apply_deltas(self, deltas: List[Tuple[int, Decimal]]) -> List[Optional[Decimal]]:
+        """
+        Apply several balance changes in one local transaction.
+
+        Each entry is applied independently; entries that are not loaded or
+        would go negative yield None and leave that balance untouched.
+        """
+        if not deltas:
+            return []
+        results = await self._run(self._apply_deltas_sync, deltas)
+        self._wakeup.set()
+        return results
+
+    def _apply_deltas_sync(self, deltas) -> List[Optional[Decimal]]:
+        conn = self._conn
+        results: List[Optional[Decimal]] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for user_id, amount in deltas:
+                row = conn.execute(
+                    "SELECT balance, username, row_id FROM accounts WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                if not row:
+                    results.append(None)
+                    continue
+                new_balance = Decimal(row[0]) + Decimal(amount)
+                if new_balance < 0:
+                    logger.warning(f"Rejected negative balance for user {user_id}")
+                    results.append(None)
+                    continue
+                conn.execute(
+                    "UPDATE accounts SET balance = ?, updated_at = ? WHERE user_id = ?",
+                    (str(new_balance), _now_iso(), user_id)
+                )
+                self._enqueue_balance(user_id, new_balance, None if row[2] else row[1])
+                results.append(new_balance)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def _enqueue_balance(self, user_id: int, balance: Decimal, username: Optional[str] = None):
+        """
+        Queue (or coalesce) a balance push for a user. Caller holds a
+        transaction. ``username`` is only given while the ledger knows of
+        no Coda row for the user, so the row is created with a name.
+        """
+        payload = json.dumps({'user_id': user_id, 'balance': str(balance), 'username': username})
+        self._conn.execute(
+            "INSERT INTO outbox (kind, key, payload) VALUES ('balance', ?, ?) "
+            "ON CONFLICT(kind, key) DO UPDATE SET payload = excluded.payload, "
+            "attempts = 0, next_attempt_at = 0, last_error = NULL",
+            (str(user_id), payload)
+        )
+
+    # ------------------------------------------------------------------
+    # Transactions
+    # ------------------------------------------------------------------
+
+    async def record_transactions(self, records: List[Dict[str, Any]]):
+        """
+        Store transaction records locally and queue them for Coda.
+
+        Each record uses the keys of ``TRANSACTION_COLUMNS`` and must include
+        ``transaction_id``, ``user_id`` and ``created_at``.
+        """
+        if not records:
+            return
+        await self._run(self._record_transactions_sync, records)
+        self._wakeup.set()
+
+    def _record_transactions_sync(self, records):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for record in records:
+                payload = json.dumps(record, default=str)
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO transactions (transaction_id, user_id, payload, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (record['transaction_id'], int(record['user_id']), payload, record['created_at'])
+                ).rowcount
+                if inserted:
+                    self._add_to_rollups_sync(json.loads(payload))
+                conn.execute(
+                    "INSERT OR IGNORE INTO outbox (kind, key, payload) VALUES ('transaction', ?, ?)",
+                    (record['transaction_id'], payload)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def get_unsynced_transactions(self, user_id: int) -> List[Dict[str, Any]]:
+        """Return transactions for a user that have not reached Coda yet."""
+        rows = await self._run(
+            lambda: self._conn.execute(
+                "SELECT payload FROM transactions WHERE user_id = ? AND synced = 0 "
+                "ORDER BY created_at DESC",
+                (user_id,)
+            ).fetchall()
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    # ------------------------------------------------------------------
+    # History and rollups
+    # ------------------------------------------------------------------
+
+    def _add_to_rollups_sync(self, record: Dict[str, Any]):
+        """Add one transaction to its day bucket. Caller holds a transaction."""
+        try:
+            amount = Decimal(str(record.get('amount') or '0'))
+        except Exception:
+            return
+        day = str(record.get('created_at') or '')[:10]
+        if not day:
+            return
+        key = (int(record['user_id']), day, record.get('category') or '', record.get('type') or '')
+        row = self._conn.execute(
+            "SELECT total_in, total_out FROM transaction_rollups "
+            "WHERE user_id = ? AND day = ? AND category = ? AND type = ?",
+            key
+        ).fetchone()
+        total_in = Decimal(row[0]) if row else Decimal('0')
+        total_out = Decimal(row[1]) if row else Decimal('0')
+        if amount > 0:
+            total_in += amount
+        else:
+            total_out += abs(amount)
+        self._conn.execute(
+            "INSERT INTO transaction_rollups (user_id, day, category, type, count, total_in, total_out) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT(user_id, day, category, type) DO UPDATE SET "
+            "count = count + 1, total_in = excluded.total_in, total_out = excluded.total_out",
+            (*key, str(total_in), str(total_out))
+        )
+
+    async def sync_history(self) -> int:
+        """
+        Pull Coda transactions the ledger has not seen into the local history.
+
+        The first call loads the whole table; later calls only fetch rows
+        changed since the previous one. Returns the number of new transactions.
+        """
+        token = await self._run(self._get_meta_sync, 'transactions_sync_token')
+        try:
+            rows, next_token = await self.coda.get_changed_rows(
+                self.doc_id, self.transactions_table_id, sync_token=token, use_column_names=True
+            )
+        except CodaRequestError as e:
+            if not token or e.status not in (400, 410):
+                raise
+            rows, next_token = await self.coda.get_changed_rows(
+                self.doc_id, self.transactions_table_id, use_column_names=True
+            )
+        added = await self._run(self._import_history_sync, rows, next_token)
+        self.history_ready = True
+        if added:
+            logger.info(f"Imported {added} transactions from Coda into the ledger history")
+        return added
+
+    def _import_history_sync(self, rows, next_token: Optional[str]) -> int:
+        conn = self._conn
+        added = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for item in rows:
+                record = _record_from_values(item.get('values', {}), item.get('id', ''))
+                if record is None:
+                    continue
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO transactions (transaction_id, user_id, payload, created_at, synced) "
+                    "VALUES (?, ?, ?, ?, 1)",
+                    (record['transaction_id'], record['user_id'], json.dumps(record), record['created_at'])
+                ).rowcount
+                if inserted:
+                    self._add_to_rollups_sync(record)
+                    added += 1
+            self._set_meta_sync('transactions_sync_token', next_token)
+            self._set_meta_sync('history_synced', _now_iso())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    async def get_history(
+        self,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        trans_type: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return a user's transaction records from the local history, newest first."""
+        return await self._run(self._get_history_sync, user_id, start, end, trans_type, category, limit)
+
+    def _get_history_sync(self, user_id, start, end, trans_type, category, limit) -> List[Dict[str, Any]]:
+        sql = "SELECT payload FROM transactions WHERE user_id = ?"
+        args: List[Any] = [user_id]
+        if start:
+            sql += " AND created_at >= ?"
+            args.append(_iso(start))
+        if end:
+            sql += " AND created_at <= ?"
+            args.append(_iso(end))
+        if trans_type:
+            sql += " AND json_extract(payload, '$.type') = ?"
+            args.append(trans_type)
+        if category:
+            sql += " AND json_extract(payload, '$.category') = ?"
+            args.append(category)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [json.loads(row[0]) for row in self._conn.execute(sql, args)]
+
+    async def summarize(
+        self,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        category: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregate a user's transactions between ``start`` and ``end``.
+
+        Whole days are read from the rollups; only the partial days at the
+        edges of the range are summed from raw transactions. Returns counts
+        and totals overall, per category and per type, plus the largest and
+        smallest transaction and the first/last transaction time.
+        """
+        return await self._run(self._summarize_sync, user_id, start, end, category)
+
+    def _summarize_sync(self, user_id, start, end, category) -> Dict[str, Any]:
+        conn = self._conn
+        summary = {
+            'count': 0,
+            'total_in': Decimal('0'),
+            'total_out': Decimal('0'),
+            'categories': {},
+            'types': {},
+        }
+
+        def add(cat: str, trans_type: str, count: int, total_in: Decimal, total_out: Decimal):
+            summary['count'] += count
+            summary['total_in'] += total_in
+            summary['total_out'] += total_out
+            for group, name in (('categories', cat), ('types', trans_type)):
+                if not name:
+                    continue
+                bucket = summary[group].setdefault(name, {'count': 0, 'total': Decimal('0')})
+                bucket['count'] += count
+                bucket['total'] += total_in - total_out
+
+        # Whole days inside [start, end] come from the rollups; the partial
+        # days at either edge are summed from raw transactions.
+        first_day = _day_start(start) if start else None
+        if first_day is not None and first_day < _as_utc(start):
+            first_day += timedelta(days=1)
+        last_day = _day_start(end) if end else None  # exclusive
+        raw_ranges = []
+        if first_day is not None and last_day is not None and first_day >= last_day:
+            raw_ranges.append((start, end, True))
+        else:
+            sql = ("SELECT category, type, count, total_in, total_out FROM transaction_rollups "
+                   "WHERE user_id = ?")
+            args: List[Any] = [user_id]
+            if first_day is not None:
+                sql += " AND day >= ?"
+                args.append(first_day.date().isoformat())
+            if last_day is not None:
+                sql += " AND day < ?"
+                args.append(last_day.date().isoformat())
+            if category:
+                sql += " AND category = ?"
+                args.append(category)
+            for cat, trans_type, count, total_in, total_out in conn.execute(sql, args):
+                add(cat, trans_type, count, Decimal(total_in), Decimal(total_out))
+            if start and first_day > _as_utc(start):
+                raw_ranges.append((start, first_day, False))
+            if end:
+                raw_ranges.append((last_day, end, True))
+
+        for range_start, range_end, inclusive in raw_ranges:
+            for record in self._get_history_sync(user_id, range_start, range_end, None, category, None):
+                if not inclusive and record['created_at'] >= _iso(range_end):
+                    continue
+                try:
+                    amount = Decimal(str(record.get('amount') or '0'))
+                except Exception:
+                    continue
+                add(record.get('category') or '', record.get('type') or '', 1,
+                    amount if amount > 0 else Decimal('0'),
+                    abs(amount) if amount <= 0 else Decimal('0'))
+
+        # Extremes and first/last times over the exact range
+        where = "user_id = ?"
+        args = [user_id]
+        if start:
+            where += " AND created_at >= ?"
+            args.append(_iso(start))
+        if end:
+            where += " AND created_at <= ?"
+            args.append(_iso(end))
+        if category:
+            where += " AND json_extract(payload, '$.category') = ?"
+            args.append(category)
+        magnitude = "ABS(CAST(json_extract(payload, '$.amount') AS REAL))"
+        largest = conn.execute(
+            f"SELECT payload FROM transactions WHERE {where} ORDER BY {magnitude} DESC LIMIT 1", args
+        ).fetchone()
+        smallest = conn.execute(
+            f"SELECT payload FROM transactions WHERE {where} ORDER BY {magnitude} ASC LIMIT 1", args
+        ).fetchone()
+        first, last = conn.execute(
+            f"SELECT MIN(created_at), MAX(created_at) FROM transactions WHERE {where}", args
+        ).fetchone()
+        summary['largest'] = json.loads(largest[0]) if largest else None
+        summary['smallest'] = json.loads(smallest[0]) if smallest else None
+        summary['first_created_at'] = first
+        summary['last_created_at'] = last
+        summary['net_change'] = summary['total_in'] - summary['total_out']
+        return summary
+
+    # ------------------------------------------------------------------
+    # Write-behind sync
+    # ------------------------------------------------------------------
+
+    async def pending_count(self) -> int:
+        """Number of writes still waiting to be pushed to Coda."""
+        row = await self._run(lambda: self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone())
+        return row[0]
+
+    async def _flush_loop(self):
+        """Background task that drains the outbox and periodically reconciles."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                try:
+                    # Interactive reads of balances are served from SQLite, so
+                    # write-behind pushes can wait behind user commands
+                    with CodaAPIClient.priority(PRIORITY_BACKGROUND):
+                        await self.flush()
+                    if time.time() - self._last_reconcile >= self.reconcile_interval:
+                        with CodaAPIClient.priority(PRIORITY_BULK):
+                            await self.reconcile()
+                            await self.sync_history()
+                    elif not self.history_ready:
+                        with CodaAPIClient.priority(PRIORITY_BULK):
+                            await self.sync_history()
+                except Exception as e:
+                    logger.error(f"Error in banking ledger sync: {e}", exc_info=True)
+        except asyncio.CancelledError:
+            logger.info("Banking ledger sync task cancelled")
+            raise
+
+    async def flush(self) -> int:
+        """Push due outbox entries to Coda. Returns the number of entries synced."""
+        due = await self._run(self._due_entries_sync, time.time())
+        if not due:
+            return 0
+
+        synced = 0
+        transactions = [entry for entry in due if entry[0] == 'transaction']
+        balances = [entry for entry in due if entry[0] == 'balance']
+
+        for i in range(0, len(transactions), self.batch_size):
+            chunk = transactions[i:i + self.batch_size]
+            synced += await self._push_transactions(chunk)
+
+        for i in range(0, len(balances), self.batch_size):
+            chunk = balances[i:i + self.batch_size]
+            synced += await self._push_balances(chunk)
+
+        if synced:
+            logger.debug(f"Synced {synced} ledger entries to Coda")
+        return synced
+
+    def _due_entries_sync(self, now: float) -> List[Tuple[str, str, str, int]]:
+        return self._conn.execute(
+            "SELECT kind, key, payload, attempts FROM outbox WHERE next_attempt_at <= ? "
+            "ORDER BY kind DESC, rowid LIMIT ?",
+            (now, self.batch_size * 4)
+        ).fetchall()
+
+    async def _push_transactions(self, entries) -> int:
+        rows = []
+        for _, _, payload, _ in entries:
+            record = json.loads(payload)
+            cells = [
+                {'column': column, 'value': str(record[key])}
+                for key, column in TRANSACTION_COLUMNS.items()
+                if record.get(key) not in (None, '')
+            ]
+            rows.append({'cells': cells})
+
+        try:
+            # keyColumns makes a retried batch idempotent
+            response = await self.coda.request(
+                'POST',
+                f'docs/{self.doc_id}/tables/{self.transactions_table_id}/rows',
+                data={'rows': rows, 'keyColumns': [TRANSACTION_COLUMNS['transaction_id']]}
+            )
+        except CodaRequestError as e:
+            response = None
+            error = str(e)
+        else:
+            error = 'no response'
+
+        keys = [entry[1] for entry in entries]
+        if response is None:
+            await self._run(self._mark_failed_sync, entries, error)
+            return 0
+
+        await self._run(self._mark_transactions_synced_sync, keys)
+        return len(keys)
+
+    def _mark_transactions_synced_sync(self, keys: List[str]):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM outbox WHERE kind = 'transaction' AND key = ?", [(k,) for k in keys])
+            conn.executemany("UPDATE transactions SET synced = 1 WHERE transaction_id = ?", [(k,) for k in keys])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _push_balances(self, entries) -> int:
+        """
+        Upsert a batch of balances keyed by Discord User ID in one request.
+        Only the key and balance columns are sent, plus Username for rows
+        the ledger has not seen in Coda yet; other name changes are left to
+        the daily username sync.
+        """
+        rows = []
+        for _, _, payload, _ in entries:
+            record = json.loads(payload)
+            cells = [
+                {'column': ACCOUNT_COLUMNS['user_id'], 'value': str(record['user_id'])},
+                {'column': ACCOUNT_COLUMNS['balance'], 'value': record['balance']},
+                {'column': ACCOUNT_COLUMNS['last_updated'], 'value': _now_iso()},
+            ]
+            if record.get('username'):
+                cells.append({'column': ACCOUNT_COLUMNS['username'], 'value': record['username']})
+            rows.append({'cells': cells})
+
+        try:
+            # keyColumns updates existing account rows and inserts missing ones
+            response = await self.coda.request(
+                'POST',
+                f'docs/{self.doc_id}/tables/{self.accounts_table_id}/rows',
+                data={'rows': rows, 'keyColumns': [ACCOUNT_COLUMNS['user_id']]}
+            )
+            error = 'no response'
+        except CodaRequestError as e:
+            response = None
+            error = str(e)
+
+        if response is None:
+            await self._run(self._mark_failed_sync, entries, error)
+            return 0
+
+        added = response.get('addedRowIds') if isinstance(response, dict) else None
+        if added and len(entries) == 1:
+            # Row IDs of upserted batches are learned by reconciliation instead
+            user_id = int(json.loads(entries[0][2])['user_id'])
+            await self._run(
+                lambda: self._conn.execute(
+                    "UPDATE accounts SET row_id = ? WHERE user_id = ?", (added[0], user_id)
+                )
+            )
+
+        # Only clear entries if no newer balance was queued meanwhile
+        await self._run(
+            lambda: self._conn.executemany(
+                "DELETE FROM outbox WHERE kind = 'balance' AND key = ? AND payload = ?",
+                [(key, payload) for _, key, payload, _ in entries]
+            )
+        )
+        return len(entries)
+
+    async def lookup_account_row(self, user_id: int) -> Optional[str]:
+        """Find (and remember) a user's Coda Accounts row ID."""
+        response = await self.coda.request(
+            'GET',
+            f'docs/{self.doc_id}/tables/{self.accounts_table_id}/rows',
+            params={'query': f'"{ACCOUNT_COLUMNS["user_id"]}":"{user_id}"', 'limit': 1}
+        )
+        items = (response or {}).get('items', [])
+        if not items:
+            return None
+        row_id = items[0]['id']
+        await self._run(
+            lambda: self._conn.execute(
+                "UPDATE accounts SET row_id = ? WHERE user_id = ?", (row_id, user_id)
+            )
+        )
+        return row_id
+
+    def _mark_failed_sync(self, entries, error: str):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, key, payload, attempts in entries:
+                delay = min(self.max_backoff, 2 ** attempts * self.flush_interval)
+                conn.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                    "WHERE kind = ? AND key = ? AND payload = ?",
+                    (time.time() + delay, error[:500], kind, key, payload)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.warning(f"Failed to sync {len(entries)} ledger entries to Coda: {error[:200]}")
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    async def reconcile(self) -> int:
+        """
+        Compare the Coda Accounts table with the ledger.
+
+        Unknown accounts are loaded into the ledger, row IDs are remembered,
+        and any Coda balance that differs from a ledger balance with no
+        pending write is re-queued. Returns the number of accounts re-queued.
+        """
+        self._last_reconcile = time.time()
+        rows = await self.coda.get_rows(self.doc_id, self.accounts_table_id, use_column_names=True)
+        requeued = await self._run(self._reconcile_sync, rows)
+        if requeued:
+            logger.warning(f"Reconciliation re-queued {requeued} drifted account balances")
+            self._wakeup.set()
+        return requeued
+
+    def _reconcile_sync(self, rows) -> int:
+        conn = self._conn
+        pending = {
+            row[0] for row in conn.execute("SELECT key FROM outbox WHERE kind = 'balance'").fetchall()
+        }
+        requeued = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for item in rows:
+                values = item.get('values', {})
+                try:
+                    user_id = parse_user_id(values.get(ACCOUNT_COLUMNS['user_id']))
+                    coda_balance = Decimal(str(values.get(ACCOUNT_COLUMNS['balance'], '0') or '0'))
+                except Exception:
+                    continue
+                if not user_id:
+                    continue
+
+                local = conn.execute(
+                    "SELECT balance FROM accounts WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                if not local:
+                    conn.execute(
+                        "INSERT INTO accounts (user_id, balance, username, row_id, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (user_id, str(coda_balance), values.get(ACCOUNT_COLUMNS['username']),
+                         item.get('id'), _now_iso())
+                    )
+                    continue
+
+                conn.execute(
+                    "UPDATE accounts SET row_id = ? WHERE user_id = ?", (item.get('id'), user_id)
+                )
+                if str(user_id) not in pending and Decimal(local[0]) != coda_balance:
+                    self._enqueue_balance(user_id, Decimal(local[0]))
+                    requeued += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _iso(value: datetime) -> str:
+    """UTC ISO timestamp in the same form as stored ``created_at`` values."""
+    return _as_utc(value).isoformat()
+
+
+def _day_start(value: datetime) -> datetime:
+    """Midnight UTC of the day containing ``value``."""
+    return _as_utc(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _record_from_values(values: Dict[str, Any], row_id: str) -> Optional[Dict[str, Any]]:
+    """Build a ledger transaction record from a Coda Transactions row keyed by column name."""
+    record = {key: values.get(column) for key, column in TRANSACTION_COLUMNS.items()}
+    try:
+        record['user_id'] = parse_user_id(record.get('user_id'))
+        created_at = datetime.fromisoformat(str(record.get('created_at') or '').replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if not record['user_id']:
+        return None
+    record['created_at'] = _iso(created_at)
+    record['transaction_id'] = record.get('transaction_id') or f"coda-{row_id}"
+    amount = str(record.get('amount') or '0').replace(',', '').replace('$', '').strip()
+    record['amount'] = amount or '0'
+    return {key: value for key, value in record.items() if value not in (None, '')}
@@ -100,6 +100,34 @@ class BaseCog(commands.Cog):
             return self.bot.services.get('event_dispatcher')
         return getattr(self.bot, 'event_dispatcher', None)
     
+    @property
+    def row_index(self):
+        """Get the Coda row ID index service."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('row_index'):
+            return self.bot.services.get('row_index')
+        return getattr(self.bot, 'row_index', None)
+    
+    @property
+    def cache_service(self):
+        """Get the shared cache service."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('cache'):
+            return self.bot.services.get('cache')
+        return getattr(self.bot, 'cache_service', None)
+    
+    @property
+    def coda_replica(self):
+        """Get the local Coda read replica service."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_replica'):
+            return self.bot.services.get('coda_replica')
+        return getattr(self.bot, 'coda_replica', None)
+    
+    @property
+    def scheduler(self):
+        """Get the background job scheduler."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('scheduler'):
+            return self.bot.services.get('scheduler')
+        return getattr(self.bot, 'scheduler', None)
+    
     def log_command_use(self, interaction: discord.Interaction, command_name: str):
         """
         Standard method to log command usage.
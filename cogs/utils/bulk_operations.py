@@ -0,0 +1,229 @@
+# cogs/utils/bulk_operations.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+from .rate_limit_manager import RateLimitManager, member_route
+
+logger = logging.getLogger('bot.bulk')
+
+# A mutation returns True if it changed the member, False if there was
+# nothing to do, and raises if it failed
+MemberMutation = Callable[[discord.Member], Awaitable[Optional[bool]]]
+# Returns False for a member already in the desired state
+MemberPrecheck = Callable[[discord.Member], Awaitable[bool]]
+
+STATE_NAMESPACE = 'bulk_operations'
+
+# Workers per operation before Discord has reported the route's bucket size
+DEFAULT_CONCURRENCY = 5
+MAX_CONCURRENCY = 20
+# Seconds between progress message edits and between checkpoints
+PROGRESS_INTERVAL = 3.0
+CHECKPOINT_INTERVAL = 10.0
+# Checkpoints older than this describe a stale guild state and are discarded
+CHECKPOINT_MAX_AGE = 24 * 3600.0
+
+
+class BulkOperationEngine:
+    """
+    Runs one mutation across many guild members, as fast as Discord allows.
+
+    Each operation has a stable ID. Members are handed to a pool of workers
+    sized from the Discord bucket of the route the mutations hit (member
+    edits by default), and every request first takes a slot from that
+    bucket through the ``RateLimitManager``, so pacing follows Discord's
+    own headers rather than fixed batches and sleeps. Progress is edited
+    into a message for the invoking interaction, and finished member IDs
+    are checkpointed to the state manager: running an interrupted
+    operation again skips the members it already did.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimitManager] = None,
+        state_manager=None,
+        max_concurrency: int = MAX_CONCURRENCY
+    ):
+        self.rate_limiter = rate_limiter or RateLimitManager()
+        self.state_manager = state_manager
+        self.max_concurrency = max_concurrency
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def _concurrency(self, route: str) -> int:
+        bucket = self.rate_limiter.route_bucket(route)
+        if bucket is None or bucket.limit <= 0:
+            return DEFAULT_CONCURRENCY
+        return max(1, min(bucket.limit, self.max_concurrency))
+
+    async def _load_checkpoint(self, operation_id: str) -> Dict[str, Any]:
+        if self.state_manager is None:
+            return {}
+        checkpoint = await self.state_manager.get(STATE_NAMESPACE, operation_id, {}) or {}
+        if checkpoint and time.time() - checkpoint.get('started_at', 0) > CHECKPOINT_MAX_AGE:
+            logger.info(f"Discarding stale checkpoint for {operation_id}")
+            await self.state_manager.delete(STATE_NAMESPACE, operation_id)
+            return {}
+        return checkpoint
+
+    async def _save_checkpoint(self, operation_id: str, done: set, started_at: float):
+        if self.state_manager is not None:
+            await self.state_manager.set(
+                STATE_NAMESPACE, operation_id, {'done': sorted(done), 'started_at': started_at}
+            )
+
+    async def run(
+        self,
+        operation_id: str,
+        members: Iterable[discord.Member],
+        mutation: MemberMutation,
+        *,
+        title: str = 'Bulk operation',
+        route: Optional[str] = None,
+        interaction: Optional[discord.Interaction] = None,
+        needs_change: Optional[MemberPrecheck] = None
+    ) -> Dict[str, int]:
+        """
+        Apply ``mutation`` to every member and return the counts: ``total``,
+        ``changed``, ``unchanged``, ``failed`` and ``resumed`` (members done
+        by an earlier, interrupted run).
+
+        ``route`` is the Discord route the mutation writes to; it defaults to
+        member edits in the members' guild. Members for which ``needs_change``
+        returns False count as unchanged without taking a slot on the route.
+        Checkpoints older than ``CHECKPOINT_MAX_AGE`` are not resumed.
+        """
+        members = list(members)
+        if operation_id in self._running:
+            raise RuntimeError(f"{title} is already running")
+        # Claimed before the first await so a second invocation cannot slip in
+        self._running[operation_id] = asyncio.current_task()
+        try:
+            return await self._run(operation_id, members, mutation, title, route, interaction, needs_change)
+        finally:
+            self._running.pop(operation_id, None)
+
+    async def _run(
+        self,
+        operation_id: str,
+        members: List[discord.Member],
+        mutation: MemberMutation,
+        title: str,
+        route: Optional[str],
+        interaction: Optional[discord.Interaction],
+        needs_change: Optional[MemberPrecheck]
+    ) -> Dict[str, int]:
+        if route is None and members:
+            route = member_route(members[0].guild.id)
+
+        # Members an interrupted run already did; failures are retried
+        checkpoint = await self._load_checkpoint(operation_id)
+        started_at = checkpoint.get('started_at', time.time())
+        done = set(checkpoint.get('done', [])) & {member.id for member in members}
+        pending = [member for member in members if member.id not in done]
+        result = {'total': len(members), 'changed': 0, 'unchanged': 0, 'failed': 0, 'resumed': len(done)}
+        if result['resumed']:
+            logger.info(f"Resuming {operation_id}: {result['resumed']} of {len(members)} members already done")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for member in pending:
+            queue.put_nowait(member)
+
+        async def worker():
+            while True:
+                try:
+                    member = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    if needs_change is not None and not await needs_change(member):
+                        changed = False
+                    else:
+                        await self.rate_limiter.acquire_route(route)
+                        changed = await mutation(member)
+                except Exception as e:
+                    result['failed'] += 1
+                    logger.error(f"{title} failed for {member.id}: {e}")
+                else:
+                    result['changed' if changed else 'unchanged'] += 1
+                    done.add(member.id)
+
+        progress = _Progress(title, interaction)
+        workers = [asyncio.create_task(worker()) for _ in range(min(self._concurrency(route), len(pending)))]
+        started = time.monotonic()
+        try:
+            await progress.start(result)
+            last_checkpoint = time.monotonic()
+            while not all(task.done() for task in workers):
+                await asyncio.wait(workers, timeout=PROGRESS_INTERVAL)
+                # Grow the pool once Discord has reported the bucket's size
+                for _ in range(min(self._concurrency(route), queue.qsize() + len(workers)) - len(workers)):
+                    workers.append(asyncio.create_task(worker()))
+                await progress.update(result)
+                if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                    await self._save_checkpoint(operation_id, done, started_at)
+                    last_checkpoint = time.monotonic()
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            # Keep progress so a rerun picks up where this one stopped
+            await self._save_checkpoint(operation_id, done, started_at)
+            raise
+
+        if self.state_manager is not None:
+            await self.state_manager.delete(STATE_NAMESPACE, operation_id)
+        await progress.finish(result)
+        logger.info(
+            f"{title} finished in {time.monotonic() - started:.1f}s: "
+            f"{result['changed']} changed, {result['unchanged']} unchanged, {result['failed']} failed"
+        )
+        return result
+
+    def running(self) -> Dict[str, bool]:
+        """Operations in progress."""
+        return {operation_id: not task.done() for operation_id, task in self._running.items()}
+
+
+class _Progress:
+    """Edits a live progress line into the invoking interaction's followup."""
+
+    def __init__(self, title: str, interaction: Optional[discord.Interaction]):
+        self.title = title
+        self.interaction = interaction
+        self.message: Optional[discord.WebhookMessage] = None
+
+    def _text(self, result: Dict[str, int], finished: bool = False) -> str:
+        icon = '✅' if finished else '⏳'
+        done = result['resumed'] + result['changed'] + result['unchanged'] + result['failed']
+        return (
+            f"{icon} {self.title}: {done}/{result['total']} members\n"
+            f"Updated: {result['changed']} · Unchanged: {result['unchanged']} · Failed: {result['failed']}"
+            + (f" · Resumed: {result['resumed']}" if result['resumed'] else '')
+        )
+
+    async def start(self, result: Dict[str, int]):
+        if self.interaction is None:
+            return
+        try:
+            self.message = await self.interaction.followup.send(
+                self._text(result), ephemeral=True, wait=True
+            )
+        except discord.HTTPException as e:
+            logger.warning(f"Could not post progress for {self.title}: {e}")
+
+    async def update(self, result: Dict[str, int], finished: bool = False):
+        if self.message is None:
+            return
+        try:
+            await self.message.edit(content=self._text(result, finished))
+        except discord.HTTPException as e:
+            # The interaction token expires after 15 minutes; stop reporting
+            logger.warning(f"Stopped progress updates for {self.title}: {e}")
+            self.message = None
+
+    async def finish(self, result: Dict[str, int]):
+        await self.update(result, finished=True)
@@ -0,0 +1,316 @@
+# cogs/utils/cache_service.py
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Union
+
+logger = logging.getLogger('bot.cache')
+
+
+def user_tag(user_id: Any) -> str:
+    """Tag for every cache entry that belongs to a Discord user."""
+    return f"user:{user_id}"
+
+
+def row_tag(row_id: Any) -> str:
+    """Tag for every cache entry built from a Coda row."""
+    return f"row:{row_id}"
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'stale_until', 'tags')
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, tags: Set[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.tags = tags
+
+
+class CacheNamespace:
+    """
+    Size-bounded LRU cache with per-entry TTL.
+
+    Entries past their TTL may still be served for ``stale_ttl`` seconds by
+    ``get_or_load`` while a single background refresh runs. Loads are
+    serialized per key, so a burst of misses for the same key results in one
+    load rather than one per caller. Entries can carry tags (see ``user_tag``
+    and ``row_tag``) and be invalidated by tag. A load that was already
+    running when its key or one of its tags was invalidated returns its
+    value but does not cache it, so a write is never undone by a read that
+    started before it.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entries: 'OrderedDict[Hashable, _CacheEntry]' = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._locks: Dict[Hashable, List[Any]] = {}  # key -> [lock, users]
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+
+        # Invalidation generations, tracked only while loads are running
+        self._generation = 0
+        self._loading = 0
+        self._key_generations: Dict[Hashable, int] = {}
+        self._tag_generations: Dict[str, int] = {}
+        self._cleared_generation = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() < entry.expires_at
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or ``default``."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries when full."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._remove(key)
+        entry = _CacheEntry(value, now + ttl, now + ttl + self.stale_ttl, set(tags))
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one entry. Returns True if it was cached."""
+        if self._loading:
+            self._generation += 1
+            self._key_generations[key] = self._generation
+        return self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry carrying ``tag``. Returns the number dropped."""
+        if self._loading:
+            self._generation += 1
+            self._tag_generations[tag] = self._generation
+        keys = list(self._tags.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        """Drop every entry."""
+        if self._loading:
+            self._generation += 1
+            self._cleared_generation = self._generation
+        self._entries.clear()
+        self._tags.clear()
+
+    def expire(self) -> int:
+        """Drop entries that are past their stale window. Returns the number dropped."""
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if now >= entry.stale_until]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = (),
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached value for ``key``, loading it on a miss.
+
+        A stale entry is returned immediately and refreshed in the background.
+        A ``None`` result from ``loader`` is returned but not cached. ``tags``
+        may be a callable that builds the tags from the loaded value.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    task = asyncio.create_task(self._refresh(key, loader, tags, ttl))
+                    self._refreshing[key] = task
+                    task.add_done_callback(lambda _t, key=key: self._refreshing.pop(key, None))
+                return entry.value
+
+        slot = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                # Another caller may have loaded it while we waited
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() < entry.expires_at:
+                    self.hits += 1
+                    return entry.value
+                self.misses += 1
+                return await self._load(key, loader, tags, ttl)
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                self._locks.pop(key, None)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], tags: Any, ttl: Optional[float]) -> Any:
+        self.loads += 1
+        started = self._generation
+        self._loading += 1
+        try:
+            value = await loader()
+        except Exception:
+            self.load_errors += 1
+            raise
+        finally:
+            self._loading -= 1
+        if value is not None:
+            value_tags = set(tags(value) if callable(tags) else tags)
+            if self._invalidated_since(started, key, value_tags):
+                logger.debug(f"Not caching {self.name}:{key}; invalidated while loading")
+            else:
+                self.set(key, value, value_tags, ttl)
+        if not self._loading:
+            self._key_generations.clear()
+            self._tag_generations.clear()
+        return value
+
+    def _invalidated_since(self, generation: int, key: Hashable, tags: Iterable[str]) -> bool:
+        return (
+            self._cleared_generation > generation
+            or self._key_generations.get(key, 0) > generation
+            or any(self._tag_generations.get(tag, 0) > generation for tag in tags)
+        )
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], tags: Any, ttl: Optional[float]):
+        try:
+            await self._load(key, loader, tags, ttl)
+        except Exception as e:
+            # Keep serving the stale value until it falls out of its window
+            logger.warning(f"Background refresh of {self.name}:{key} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss/eviction counters."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.maxsize,
+            'ttl': self.ttl,
+            'stale_ttl': self.stale_ttl,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0,
+            'loads': self.loads,
+            'load_errors': self.load_errors,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'tags': len(self._tags),
+        }
+
+
+class CacheService:
+    """
+    Registry of named cache namespaces shared by every cog and manager.
+
+    Each namespace is bounded and expires on its own; a background task sweeps
+    expired entries so idle namespaces release memory. Tag invalidation runs
+    across all namespaces, so updating a user can clear their profile, member
+    and balance entries in one call.
+    """
+
+    def __init__(self, sweep_interval: int = 60):
+        self.sweep_interval = sweep_interval
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+        logger.info("Cache service initialized")
+
+    def namespace(self, name: str, maxsize: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0) -> CacheNamespace:
+        """Return the namespace called ``name``, creating it with these settings if needed."""
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            namespace = CacheNamespace(name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+            self._namespaces[name] = namespace
+        return namespace
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop entries carrying ``tag`` from every namespace."""
+        return sum(namespace.invalidate_tag(tag) for namespace in self._namespaces.values())
+
+    def invalidate_user(self, user_id: Any) -> int:
+        """Drop every cached entry for a Discord user."""
+        return self.invalidate_tag(user_tag(user_id))
+
+    def invalidate_row(self, row_id: Any) -> int:
+        """Drop every cached entry built from a Coda row."""
+        return self.invalidate_tag(row_tag(row_id))
+
+    def start(self):
+        """Start the background sweep task."""
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """Stop the background sweep task."""
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+
+    async def _sweep_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(self.sweep_interval)
+                expired = sum(namespace.expire() for namespace in self._namespaces.values())
+                if expired:
+                    logger.debug(f"Cache sweep removed {expired} expired entries")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in cache sweep task: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters for every namespace."""
+        return {name: namespace.stats() for name, namespace in self._namespaces.items()}
@@ -1,73 +1,297 @@
 import aiohttp
 import asyncio
+import contextvars
+import copy
+import heapq
+import itertools
 import logging
 import time
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
+
+from .log_pipeline import Truncated
 
 logger = logging.getLogger('coda_api')
-logger.setLevel(logging.DEBUG)
 
-class CodaRateLimiter:
-    """Handles rate limiting for Coda API requests based on global rate limits."""
-    
-    def __init__(self):
+# Successful requests logged at DEBUG, one in this many
+DEBUG_SAMPLE_RATE = 20
+
+# Largest page the Coda rows endpoint will return in one request
+MAX_PAGE_SIZE = 500
+
+# Priority lanes, lowest value is served first
+PRIORITY_INTERACTIVE = 0   # slash commands, buttons, modals
+PRIORITY_BACKGROUND = 1    # periodic sync loops and write-behind flushes
+PRIORITY_BULK = 2          # backups, full-table scans and reports
+
+# Lane used by requests that do not pass an explicit priority
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    'coda_request_priority', default=PRIORITY_INTERACTIVE
+)
+
+class CodaRequestScheduler:
+    """
+    Token-bucket scheduler shared by every Coda request.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. Waiting requests are
+    served strictly by priority lane and then in arrival order, and the lower
+    lanes may only spend tokens above a reserved floor, so background jobs soak
+    up spare quota while interactive commands always keep a burst available.
+
+    The refill rate adapts to Coda's ``X-RateLimit-Remaining``/``X-RateLimit-Reset``
+    headers when they are present, halves on every 429 and slowly recovers
+    towards ``base_rate`` afterwards.
+    """
+
+    def __init__(
+        self,
+        rate: float = 100 / 6,
+        capacity: int = 20,
+        min_rate: float = 0.5,
+        lane_reserves: Optional[Dict[int, float]] = None
+    ):
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.capacity = capacity
+        self.lane_reserves = lane_reserves or {
+            PRIORITY_INTERACTIVE: 0,
+            PRIORITY_BACKGROUND: capacity * 0.25,
+            PRIORITY_BULK: capacity * 0.5,
+        }
+
+        self.tokens = float(capacity)
+        self._last_refill = time.monotonic()
         self.global_rate_limit_reset = 0.0
-        self.lock = asyncio.Lock()
+        self.last_rate_limited = 0.0
+
+        self._waiters: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+        # Counters for diagnostics
+        self.granted: Dict[int, int] = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _notify(self):
+        """Wake every waiter so the head of the queue can re-check the bucket."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def acquire(self, priority: Optional[int] = None):
+        """Wait for a token in the given lane (defaults to the current lane)."""
+        if priority is None:
+            priority = _current_priority.get()
+        entry = [priority, next(self._sequence)]
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                self._refill()
+                changed = self._changed
+                paused_for = self.global_rate_limit_reset - time.time()
+                needed = 1 + self.lane_reserves.get(priority, 0)
+
+                if self._waiters[0] is entry and paused_for <= 0 and self.tokens >= needed:
+                    heapq.heappop(self._waiters)
+                    self.tokens -= 1
+                    self.granted[priority] = self.granted.get(priority, 0) + 1
+                    self._notify()
+                    return
+
+                if paused_for > 0:
+                    timeout = paused_for
+                elif self._waiters[0] is entry:
+                    timeout = (needed - self.tokens) / self.rate
+                else:
+                    timeout = None
+
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._notify()
+            raise
+
+    def note_rate_limited(self, wait_time: float):
+        """Record a 429 so every caller sharing this scheduler backs off together."""
+        self.last_rate_limited = time.time()
+        self.global_rate_limit_reset = max(self.global_rate_limit_reset, self.last_rate_limited + wait_time)
+        self.tokens = 0.0
+        self.rate = max(self.min_rate, self.rate / 2)
+        logger.warning(f"Coda rate limited; refill rate reduced to {self.rate:.2f}/s")
+        self._notify()
 
-    async def acquire(self):
-        """Wait until the global rate limit has reset."""
-        async with self.lock:
-            now = time.time()
-            if now < self.global_rate_limit_reset:
-                wait_time = self.global_rate_limit_reset - now
-                logger.warning(f"Global rate limit active. Sleeping for {wait_time:.2f} seconds.")
-                await asyncio.sleep(wait_time)
+    def is_rate_limited(self) -> bool:
+        """Return True while a shared back-off from a 429 is in effect."""
+        return time.time() < self.global_rate_limit_reset
 
     def update_limits(self, headers: Dict[str, str]):
-        """Update rate limit info from response headers."""
+        """Adapt the bucket to the rate limit headers of a response."""
         try:
-            limit = headers.get('X-RateLimit-Limit')
             remaining = headers.get('X-RateLimit-Remaining')
             reset = headers.get('X-RateLimit-Reset')
-            
+
+            if remaining is None:
+                # No quota information: recover gradually after a 429
+                if self.rate < self.base_rate:
+                    self.rate = min(self.base_rate, self.rate + 0.1)
+                return
+
+            self._refill()
+            remaining = int(remaining)
+            self.tokens = min(self.tokens, float(remaining))
+
+            reset_in = None
             if reset:
-                reset_time = float(reset)
-                self.global_rate_limit_reset = reset_time
-                logger.debug(f"Rate limit reset time updated to {datetime.fromtimestamp(reset_time)}")
-            
-            if remaining is not None:
-                remaining = int(remaining)
-                logger.debug(f"Rate limit remaining: {remaining}/{limit}")
-                if remaining == 0 and reset:
-                    logger.warning("Rate limit exhausted. Awaiting reset.")
+                reset_value = float(reset)
+                # Coda may send either an epoch timestamp or seconds until reset
+                reset_in = reset_value - time.time() if reset_value > 1e9 else reset_value
+
+            if remaining == 0 and reset_in and reset_in > 0:
+                logger.warning(f"Rate limit exhausted. Pausing Coda requests for {reset_in:.2f}s.")
+                self.global_rate_limit_reset = max(self.global_rate_limit_reset, time.time() + reset_in)
+            elif reset_in and reset_in > 0:
+                # Spread the remaining quota over the rest of the window
+                self.rate = max(self.min_rate, min(self.base_rate, remaining / reset_in))
+            else:
+                self.rate = self.base_rate
+
+            logger.debug(
+                "Rate limit remaining: %s, refill rate %.2f/s", remaining, self.rate,
+                extra={'sample': DEBUG_SAMPLE_RATE}
+            )
         except Exception as e:
             logger.error(f"Error updating rate limits: {e}")
 
+    def stats(self) -> Dict[str, Any]:
+        """Current bucket state, queue depth per lane and grants per lane."""
+        self._refill()
+        queued: Dict[int, int] = {}
+        for priority, _ in self._waiters:
+            queued[priority] = queued.get(priority, 0) + 1
+        return {
+            'tokens': round(self.tokens, 2),
+            'rate': round(self.rate, 2),
+            'rate_limited': self.is_rate_limited(),
+            'queued': queued,
+            'granted': dict(self.granted),
+        }
+
+# Backwards compatible name
+CodaRateLimiter = CodaRequestScheduler
+
 class CodaRequestError(Exception):
     """Custom exception for Coda API request errors."""
-    pass
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
 
 class CodaAPIClient:
-    """Enhanced Coda API client with global rate limiting and robust error handling."""
+    """
+    Enhanced Coda API client with global rate limiting and robust error handling.
+
+    A single instance is registered as the ``coda_client`` service and shared by
+    every cog, so all Coda traffic goes through one keep-alive connection pool
+    and one set of rate-limit state.
+    """
     
-    def __init__(self, api_token: str, base_url: str = "https://coda.io/apis/v1"):
+    def __init__(
+        self,
+        api_token: str,
+        base_url: str = "https://coda.io/apis/v1",
+        connection_limit: int = 20,
+        connection_limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        request_timeout: float = 30.0,
+        coalesce_reads: bool = True
+    ):
         self.api_token = api_token
         self.base_url = base_url.rstrip('/')
         self.session: Optional[aiohttp.ClientSession] = None
-        self.rate_limiter = CodaRateLimiter()
+        self.rate_limiter = CodaRequestScheduler()
         self.session_lock = asyncio.Lock()
 
+        # Connection pool settings
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+
+        # Single-flight: identical in-flight GETs share one upstream call
+        self.coalesce_reads = coalesce_reads
+        self._in_flight: Dict[Tuple[str, Tuple[Tuple[str, str], ...], int], List[Any]] = {}
+        self.coalesced_requests = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create the pooled keep-alive session used for all Coda requests."""
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.connection_limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            headers={
+                'Authorization': f'Bearer {self.api_token}',
+                'Content-Type': 'application/json'
+            }
+        )
+
     async def ensure_session(self):
+        # Fast path: the session is normally already open
+        if self.session is not None and not self.session.closed:
+            return
         async with self.session_lock:
             if self.session is None or self.session.closed:
-                self.session = aiohttp.ClientSession()
+                self.session = self._create_session()
+                logger.info(
+                    f"Coda API session opened (pool limit {self.connection_limit}, "
+                    f"{self.connection_limit_per_host} per host)"
+                )
 
     async def close(self):
         if self.session and not self.session.closed:
             await self.session.close()
             logger.info("Coda API session closed.")
 
+    def _build_url(self, endpoint: str) -> str:
+        """Build a request URL; absolute URLs (e.g. ``nextPageLink``) pass through."""
+        if endpoint.startswith('http://') or endpoint.startswith('https://'):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: int) -> Iterator[None]:
+        """
+        Run every Coda request made inside the block in the given lane.
+
+        The lane is carried in a context variable, so it also applies to
+        requests made through helper methods and to tasks started inside it::
+
+            with coda_client.priority(PRIORITY_BACKGROUND):
+                rows = await coda_client.get_rows(doc_id, table_id)
+        """
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
     async def request(
         self,
         method: str,
@@ -75,38 +299,108 @@ class CodaAPIClient:
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         retries: int = 3,
-        backoff_factor: float = 1.5
+        backoff_factor: float = 1.5,
+        priority: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
+        url = self._build_url(endpoint)
+        if method.upper() != 'GET' or not self.coalesce_reads:
+            return await self._send(method, url, data, params, retries, backoff_factor, priority)
+
+        # Join an identical GET that is already in flight instead of sending another.
+        # Only calls in the same lane are joined, so an interactive read never
+        # waits behind a bulk one.
+        lane = _current_priority.get() if priority is None else priority
+        key = (url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())), lane)
+        flight = self._in_flight.get(key)
+        joined = flight is not None
+        if not joined:
+            flight = [None, 1, None]
+            flight[0] = asyncio.create_task(
+                self._send_shared(key, flight, url, dict(params) if params else None, retries, backoff_factor, lane)
+            )
+            self._in_flight[key] = flight
+            flight[0].add_done_callback(self._finish_flight)
+        else:
+            flight[1] += 1
+            self.coalesced_requests += 1
+            logger.debug(f"Coalesced GET {url} with {flight[1] - 1} in-flight caller(s)")
+
+        # Shield the shared call so one caller cancelling does not cancel the others
+        result = await asyncio.shield(flight[0])
+        if joined and result is not None:
+            # Joiners copy the pristine snapshot, since callers mutate responses
+            return copy.deepcopy(flight[2])
+        return result
+
+    async def _send_shared(
+        self,
+        key: Tuple[str, Tuple[Tuple[str, str], ...], int],
+        flight: List[Any],
+        url: str,
+        params: Optional[Dict[str, Any]],
+        retries: int,
+        backoff_factor: float,
+        priority: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a coalesced GET. The flight is closed to new joiners and, if any
+        joined, a pristine copy taken before the task finishes, so no caller
+        can mutate the result while another is still copying it.
+        """
+        try:
+            result = await self._send('GET', url, None, params, retries, backoff_factor, priority)
+        finally:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        if flight[1] > 1 and result is not None:
+            flight[2] = copy.deepcopy(result)
+        return result
+
+    @staticmethod
+    def _finish_flight(task: asyncio.Task):
+        """Mark a single-flight call's exception retrieved even if every caller went away."""
+        if not task.cancelled():
+            task.exception()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        retries: int,
+        backoff_factor: float,
+        priority: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Send a request with rate limiting and retries."""
         await self.ensure_session()
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        headers = {
-            'Authorization': f'Bearer {self.api_token}',
-            'Content-Type': 'application/json'
-        }
 
         attempt = 0
         while attempt <= retries:
             try:
-                await self.rate_limiter.acquire()
+                await self.rate_limiter.acquire(priority)
 
                 async with self.session.request(
                     method.upper(),
                     url,
-                    headers=headers,
                     json=data,
-                    params=params,
-                    timeout=30
+                    params=params
                 ) as response:
                     self.rate_limiter.update_limits(response.headers)
                     response_text = await response.text()
                     
-                    logger.debug(f"Request URL: {url}")
-                    logger.debug(f"Request Method: {method.upper()}")
-                    logger.debug(f"Request Params: {params}")
-                    logger.debug(f"Request Data: {data}")
-                    logger.debug(f"Response Status: {response.status}")
-                    logger.debug(f"Response Headers: {dict(response.headers)}")
-                    logger.debug(f"Response Text: {response_text}")
+                    # Formatted only if emitted; payloads are capped and
+                    # successful calls sampled
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "%s %s params=%s data=%s -> %s %s",
+                            method.upper(), url, params, Truncated(data), response.status,
+                            Truncated(response_text),
+                            extra={'sample': 1 if response.status >= 300 else DEBUG_SAMPLE_RATE}
+                        )
+
+                    if response.status == 204:
+                        return {}
 
                     if response.status in (200, 201, 202):
                         if response.content_type == 'application/json':
@@ -119,12 +413,12 @@ class CodaAPIClient:
                         retry_after = response.headers.get('Retry-After')
                         if retry_after:
                             wait_time = float(retry_after)
-                            logger.warning(f"Rate limited by Coda API. Retrying after {wait_time}s.")
-                            await asyncio.sleep(wait_time)
                         else:
                             wait_time = backoff_factor ** attempt
-                            logger.warning(f"Rate limited by Coda API. Retrying after {wait_time}s.")
-                            await asyncio.sleep(wait_time)
+                        logger.warning(f"Rate limited by Coda API. Retrying after {wait_time}s.")
+                        # Share the back-off with every other caller of this client;
+                        # the next acquire() waits it out
+                        self.rate_limiter.note_rate_limited(wait_time)
                         attempt += 1
                         continue
 
@@ -137,10 +431,10 @@ class CodaAPIClient:
                             continue
                         else:
                             logger.error(f"Server error ({response.status}) after {retries} retries.")
-                            raise CodaRequestError(f"Server error: {response.status} - {response_text}")
+                            raise CodaRequestError(f"Server error: {response.status} - {response_text}", response.status)
                     else:
-                        logger.error(f"Coda API client error ({response.status}): {response_text}")
-                        raise CodaRequestError(f"Client error: {response.status} - {response_text}")
+                        logger.error("Coda API client error (%s): %s", response.status, Truncated(response_text))
+                        raise CodaRequestError(f"Client error: {response.status} - {response_text}", response.status)
 
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 if attempt < retries:
@@ -160,43 +454,114 @@ class CodaAPIClient:
         logger.error(f"Failed to make request to {url} after {retries} retries.")
         return None
 
-    async def get_rows(
+    async def iter_rows(
         self,
         doc_id: str,
         table_id: str,
         query: Optional[str] = None,
         use_column_names: bool = True,
-        limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        max_rows: Optional[int] = None,
+        page_size: Optional[int] = None,
+        sort_by: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream rows from a table, fetching one page at a time.
+
+        ``max_rows`` caps the total number of rows yielded; paging stops as soon
+        as it is reached, or as soon as the caller stops iterating. The page
+        size defaults to the smaller of ``max_rows`` and the API maximum, so
+        lookups fetch a single small page and full scans use the fewest
+        requests.
+        """
+        if max_rows is not None and max_rows <= 0:
+            return
+
         endpoint = f"docs/{doc_id}/tables/{table_id}/rows"
+        if page_size is None:
+            page_size = min(max_rows, MAX_PAGE_SIZE) if max_rows else MAX_PAGE_SIZE
         params = {
             'useColumnNames': str(use_column_names).lower(),
+            'limit': min(page_size, MAX_PAGE_SIZE),
         }
         if query:
             params['query'] = query
-        if limit:
-            params['limit'] = limit
-
-        rows = []
-        next_page_token = None
+        if sort_by:
+            params['sortBy'] = sort_by
 
+        yielded = 0
         while True:
-            if next_page_token:
-                params['pageToken'] = next_page_token
+            if max_rows is not None:
+                # Never ask for more rows than are still needed
+                params['limit'] = min(params['limit'], max_rows - yielded)
 
             response = await self.request('GET', endpoint, params=params)
             if not response:
                 logger.error("Failed to retrieve rows from Coda.")
-                break
+                return
+
+            for item in response.get('items', []):
+                yield item
+                yielded += 1
+                if max_rows is not None and yielded >= max_rows:
+                    return
+
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                return
+            params['pageToken'] = next_page_token
 
-            items = response.get('items', [])
-            rows.extend(items)
+    async def get_changed_rows(
+        self,
+        doc_id: str,
+        table_id: str,
+        sync_token: Optional[str] = None,
+        use_column_names: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch the rows of a table that changed since ``sync_token``.
 
+        Without a token every row is returned. Rows come back in ``updatedAt``
+        order, together with the ``nextSyncToken`` to pass on the next call.
+        Deleted rows are not reported, so callers need an occasional full pass.
+        """
+        endpoint = f"docs/{doc_id}/tables/{table_id}/rows"
+        params = {
+            'useColumnNames': str(use_column_names).lower(),
+            'limit': MAX_PAGE_SIZE,
+            'sortBy': 'updatedAt',
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+
+        rows: List[Dict[str, Any]] = []
+        while True:
+            response = await self.request('GET', endpoint, params=params)
+            if response is None:
+                raise CodaRequestError(f"Failed to sync rows from table {table_id}")
+            rows.extend(response.get('items', []))
             next_page_token = response.get('nextPageToken')
             if not next_page_token:
-                break
+                return rows, response.get('nextSyncToken')
+            params['pageToken'] = next_page_token
 
-        return rows
+    async def get_rows(
+        self,
+        doc_id: str,
+        table_id: str,
+        query: Optional[str] = None,
+        use_column_names: bool = True,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` rows (all rows if no limit), via iter_rows."""
+        return [
+            row async for row in self.iter_rows(
+                doc_id,
+                table_id,
+                query=query,
+                use_column_names=use_column_names,
+                max_rows=limit
+            )
+        ]
      
     async def update_row(
         self,
@@ -229,11 +594,18 @@ class CodaAPIClient:
         self,
         doc_id: str,
         table_id: str,
-        row_id: str
+        row_id: str,
+        use_column_names: bool = False
     ) -> Optional[Dict[str, Any]]:
-        """Get a single row by ID."""
+        """Get a single row by ID. Returns None if the row no longer exists."""
         endpoint = f'docs/{doc_id}/tables/{table_id}/rows/{row_id}'
-        return await self.request('GET', endpoint)
+        params = {'useColumnNames': 'true'} if use_column_names else None
+        try:
+            return await self.request('GET', endpoint, params=params)
+        except CodaRequestError as e:
+            if e.status == 404:
+                return None
+            raise
     
     async def get_columns(
         self,
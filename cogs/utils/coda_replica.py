@@ -0,0 +1,352 @@
+# cogs/utils/coda_replica.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .coda_api import CodaAPIClient, CodaRequestError, PRIORITY_BACKGROUND, PRIORITY_BULK
+
+logger = logging.getLogger('bot.coda_replica')
+
+# Replicated tables
+PROFILES_TABLE = 'profiles'
+SHIPS_TABLE = 'ships'
+ACCOUNTS_TABLE = 'accounts'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS replica_tables (
+    name            TEXT PRIMARY KEY,
+    table_id        TEXT NOT NULL,
+    sync_token      TEXT,
+    columns         TEXT,
+    last_sync       REAL NOT NULL DEFAULT 0,
+    last_full_sync  REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS replica_rows (
+    name        TEXT NOT NULL,
+    row_id      TEXT NOT NULL,
+    updated_at  TEXT,
+    payload     TEXT NOT NULL,
+    PRIMARY KEY (name, row_id)
+);
+"""
+
+
+class _ReplicaTable:
+    """In-memory state of one replicated table."""
+
+    def __init__(self, name: str, table_id: str):
+        self.name = name
+        self.table_id = table_id
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.columns: Dict[str, str] = {}  # column ID -> column name
+        self.sync_token: Optional[str] = None
+        self.last_sync = 0.0
+        self.last_full_sync = 0.0
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.last_full_sync > 0
+
+    def checksum(self, rows: Optional[Iterable[Dict[str, Any]]] = None) -> str:
+        """Checksum over row IDs and update times."""
+        rows = self.rows.values() if rows is None else rows
+        digest = hashlib.sha256()
+        for key in sorted(f"{row['id']}:{row.get('updatedAt', '')}" for row in rows):
+            digest.update(key.encode())
+        return digest.hexdigest()
+
+
+class CodaReplica:
+    """
+    Local read replica of hot Coda tables.
+
+    Rows are kept in memory for reads and persisted in SQLite so a restart
+    only needs a delta. A background task pulls rows changed since the last
+    sync using Coda sync tokens (rows arrive in ``updatedAt`` order), and a
+    periodic full pass compares a checksum of row IDs and update times to
+    catch deletions and drift. Rows are stored keyed by column ID and
+    translated to column names on read, so renamed columns keep working.
+
+    Only read-only reports should use the replica; it can lag Coda by up
+    to ``sync_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        coda_client: CodaAPIClient,
+        doc_id: str,
+        db_path: Optional[str] = None,
+        sync_interval: float = 300.0,
+        full_sync_interval: float = 6 * 3600.0
+    ):
+        self.coda = coda_client
+        self.doc_id = doc_id
+        self.db_path = db_path or os.getenv('CODA_REPLICA_PATH', 'coda_replica.db')
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+
+        self._tables: Dict[str, _ReplicaTable] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='coda-replica')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._listeners: Dict[str, List[Callable[[List[Dict[str, Any]], bool], None]]] = {}
+
+    def register_table(self, name: str, table_id: Optional[str]):
+        """
+        Replicate ``table_id`` under ``name``. Tables without an ID are skipped.
+
+        Tables may be registered before or after ``open``; persisted rows are
+        loaded on the first sync in the latter case.
+        """
+        if not table_id:
+            logger.warning(f"No table ID configured for replica table '{name}'")
+            return
+        if name not in self._tables:
+            self._tables[name] = _ReplicaTable(name, table_id)
+
+    def add_listener(self, name: str, callback: Callable[[List[Dict[str, Any]], bool], None]):
+        """
+        Call ``callback(rows, replace)`` after each sync of table ``name``.
+
+        ``rows`` are the changed rows keyed by column name; ``replace`` is
+        True after a full sync, when they are the whole table.
+        """
+        self._listeners.setdefault(name, []).append(callback)
+
+    def _notify(self, table: _ReplicaTable, rows: List[Dict[str, Any]], replace: bool):
+        listeners = self._listeners.get(table.name)
+        if not listeners or not (rows or replace):
+            return
+        shaped = [self._shape(table, row, True) for row in rows]
+        for callback in listeners:
+            try:
+                callback(shaped, replace)
+            except Exception as e:
+                logger.error(f"Replica listener for '{table.name}' failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def open(self):
+        """Open the database and load persisted rows into memory."""
+        await self._run(self._open_sync)
+        for table in self._tables.values():
+            await self._run(self._load_table_sync, table)
+        logger.info(
+            f"Coda replica opened at {self.db_path} "
+            f"({sum(len(t.rows) for t in self._tables.values())} rows in {len(self._tables)} tables)"
+        )
+
+    def _open_sync(self):
+        if self._conn is not None:
+            return
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+
+    def _load_table_sync(self, table: _ReplicaTable):
+        if table.loaded:
+            return
+        table.loaded = True
+        state = self._conn.execute(
+            "SELECT table_id, sync_token, columns, last_sync, last_full_sync FROM replica_tables WHERE name = ?",
+            (table.name,)
+        ).fetchone()
+        if not state or state[0] != table.table_id:
+            # Unknown table or the table ID changed: start over
+            self._conn.execute("DELETE FROM replica_rows WHERE name = ?", (table.name,))
+            return
+        table.sync_token = state[1]
+        table.columns = json.loads(state[2]) if state[2] else {}
+        table.last_sync = state[3]
+        table.last_full_sync = state[4]
+        for (payload,) in self._conn.execute("SELECT payload FROM replica_rows WHERE name = ?", (table.name,)):
+            row = json.loads(payload)
+            table.rows[row['id']] = row
+
+    def start(self):
+        """Start the background sync task."""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+            logger.info("Started Coda replica sync task")
+
+    async def stop(self):
+        """Stop the sync task and close the database."""
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=False)
+        logger.info("Coda replica stopped")
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def is_ready(self, name: str) -> bool:
+        """True once a table has completed at least one full sync."""
+        table = self._tables.get(name)
+        return table is not None and table.ready
+
+    def rows(self, name: str, use_column_names: bool = True) -> List[Dict[str, Any]]:
+        """
+        Return every replicated row of a table, shaped like Coda API rows.
+
+        Values are keyed by column name, or by column ID when
+        ``use_column_names`` is False.
+        """
+        table = self._tables.get(name)
+        if table is None:
+            return []
+        return [self._shape(table, row, use_column_names) for row in table.rows.values()]
+
+    def get_row(self, name: str, row_id: str, use_column_names: bool = True) -> Optional[Dict[str, Any]]:
+        """Return one replicated row, or None."""
+        table = self._tables.get(name)
+        row = table.rows.get(row_id) if table else None
+        return self._shape(table, row, use_column_names) if row else None
+
+    @staticmethod
+    def _shape(table: _ReplicaTable, row: Dict[str, Any], use_column_names: bool) -> Dict[str, Any]:
+        values = row.get('values', {})
+        if use_column_names:
+            values = {table.columns.get(column_id, column_id): value for column_id, value in values.items()}
+        else:
+            values = dict(values)
+        return {**row, 'values': values}
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def _sync_loop(self):
+        try:
+            while True:
+                await self.sync_all()
+                await asyncio.sleep(self.sync_interval)
+        except asyncio.CancelledError:
+            logger.info("Coda replica sync task cancelled")
+            raise
+
+    async def sync_all(self):
+        """Sync every table, running a full pass where one is due."""
+        for name, table in list(self._tables.items()):
+            full = not table.sync_token or time.time() - table.last_full_sync >= self.full_sync_interval
+            try:
+                await self.sync_table(name, full=full)
+            except Exception as e:
+                logger.error(f"Error syncing replica table '{name}': {e}")
+
+    async def sync_table(self, name: str, full: bool = False) -> int:
+        """Sync one table. Returns the number of rows changed."""
+        table = self._tables[name]
+        async with table.lock:
+            if not table.loaded:
+                await self._run(self._load_table_sync, table)
+            if full or not table.sync_token:
+                return await self._full_sync(table)
+            try:
+                with CodaAPIClient.priority(PRIORITY_BACKGROUND):
+                    rows, sync_token = await self.coda.get_changed_rows(
+                        self.doc_id, table.table_id, sync_token=table.sync_token
+                    )
+            except CodaRequestError as e:
+                if e.status in (400, 410):
+                    logger.warning(f"Sync token for replica table '{name}' rejected, running a full sync")
+                    return await self._full_sync(table)
+                raise
+
+            for row in rows:
+                table.rows[row['id']] = row
+            table.sync_token = sync_token
+            table.last_sync = time.time()
+            await self._run(self._save_rows_sync, table, rows, False)
+            self._notify(table, rows, False)
+            if rows:
+                logger.debug(f"Replica table '{name}' applied {len(rows)} changed rows")
+            return len(rows)
+
+    async def _full_sync(self, table: _ReplicaTable) -> int:
+        with CodaAPIClient.priority(PRIORITY_BULK):
+            columns = await self.coda.get_columns(self.doc_id, table.table_id)
+            rows, sync_token = await self.coda.get_changed_rows(self.doc_id, table.table_id)
+
+        if table.ready and table.checksum(rows) != table.checksum():
+            remote_ids = {row['id'] for row in rows}
+            logger.warning(
+                f"Replica table '{table.name}' drifted: {len(set(table.rows) - remote_ids)} deleted, "
+                f"{len(remote_ids - set(table.rows))} missing"
+            )
+
+        if columns:
+            table.columns = {column['id']: column['name'] for column in columns}
+        table.rows = {row['id']: row for row in rows}
+        table.sync_token = sync_token
+        table.last_sync = table.last_full_sync = time.time()
+        await self._run(self._save_rows_sync, table, rows, True)
+        self._notify(table, rows, True)
+        logger.info(f"Replica table '{table.name}' fully synced ({len(rows)} rows)")
+        return len(rows)
+
+    def _save_rows_sync(self, table: _ReplicaTable, rows: List[Dict[str, Any]], replace: bool):
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            if replace:
+                conn.execute("DELETE FROM replica_rows WHERE name = ?", (table.name,))
+            conn.executemany(
+                "INSERT INTO replica_rows (name, row_id, updated_at, payload) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name, row_id) DO UPDATE SET updated_at = excluded.updated_at, payload = excluded.payload",
+                [(table.name, row['id'], row.get('updatedAt'), json.dumps(row)) for row in rows]
+            )
+            conn.execute(
+                "INSERT INTO replica_tables (name, table_id, sync_token, columns, last_sync, last_full_sync) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET table_id = excluded.table_id, sync_token = excluded.sync_token, "
+                "columns = excluded.columns, last_sync = excluded.last_sync, last_full_sync = excluded.last_full_sync",
+                (table.name, table.table_id, table.sync_token, json.dumps(table.columns),
+                 table.last_sync, table.last_full_sync)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Row counts and sync ages per table."""
+        now = time.time()
+        return {
+            name: {
+                'rows': len(table.rows),
+                'ready': table.ready,
+                'seconds_since_sync': round(now - table.last_sync) if table.last_sync else None,
+                'seconds_since_full_sync': round(now - table.last_full_sync) if table.last_full_sync else None,
+            }
+            for name, table in self._tables.items()
+        }
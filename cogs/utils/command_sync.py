@@ -0,0 +1,189 @@
+# cogs/utils/command_sync.py
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from .daily_limit_manager import DailyLimitManager
+
+logger = logging.getLogger('sync_commands')
+
+# Keys Discord adds to fetched commands that are not part of the definition
+_IGNORED_KEYS = frozenset({
+    'id', 'application_id', 'guild_id', 'version', 'default_permission',
+    'name_localized', 'description_localized', 'handler',
+})
+# Values Discord treats as the default, whether sent or omitted
+_DEFAULTS = {
+    'dm_permission': True,
+    'nsfw': False,
+    'required': False,
+    'autocomplete': False,
+    'integration_types': [0],
+}
+_MISSING = object()
+
+CommandKey = Tuple[int, str]
+
+
+def canonical(value: Any) -> Any:
+    """
+    Reduce a command payload to the fields that define it, with defaults
+    and empty values dropped, so local and fetched payloads compare equal.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in _IGNORED_KEYS:
+                continue
+            item = canonical(item)
+            if key == 'default_member_permissions' and item is not None:
+                item = str(item)
+            if item is None or item == {} or item == [] or _DEFAULTS.get(key, _MISSING) == item:
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, list):
+        return [canonical(item) for item in value]
+    return value
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """Stable hash of a command's canonical payload."""
+    text = json.dumps(canonical(payload), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _command_payload(command: Any, tree: app_commands.CommandTree) -> Dict[str, Any]:
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py before 2.4 builds the payload without the tree
+        return command.to_dict()
+
+
+class SyncPlan:
+    """The per-command calls needed to make Discord match the local tree."""
+
+    def __init__(self):
+        self.creates: List[Dict[str, Any]] = []
+        self.edits: List[Tuple[str, Dict[str, Any]]] = []
+        self.deletes: List[Tuple[str, str]] = []
+        self.skipped_deletes: List[Tuple[str, str]] = []
+        self.unchanged: List[str] = []
+        self.hashes: Dict[str, str] = {}
+
+    @property
+    def empty(self) -> bool:
+        return not (self.creates or self.edits or self.deletes)
+
+    def summary(self) -> str:
+        parts = []
+        for label, items, name in (
+            ('create', self.creates, lambda payload: payload['name']),
+            ('edit', self.edits, lambda item: item[1]['name']),
+            ('delete', self.deletes, lambda item: item[1]),
+        ):
+            if items:
+                parts.append(f"{label} {', '.join(name(item) for item in items)}")
+        return '; '.join(parts) or 'no changes'
+
+
+class CommandSyncPlanner:
+    """
+    Diffs the local app command tree against Discord's global commands.
+
+    Every local command and group is serialized to the payload Discord
+    would receive and hashed in canonical form; fetched commands are
+    hashed the same way. Only commands that are new, changed or gone are
+    written, one call each, and creates stay within the
+    ``DailyLimitManager`` quota (any over it wait for the next run).
+    """
+
+    def __init__(self, bot: discord.Client, daily_limits: Optional[DailyLimitManager] = None):
+        self.bot = bot
+        self.daily_limits = daily_limits or DailyLimitManager()
+
+    def local_payloads(self) -> Dict[CommandKey, Dict[str, Any]]:
+        tree = self.bot.tree
+        payloads = {}
+        for command in tree.get_commands():
+            payload = _command_payload(command, tree)
+            payloads[(payload.get('type', 1), payload['name'])] = payload
+        return payloads
+
+    def local_hashes(self) -> Dict[str, str]:
+        """Hash of each local command's canonical payload, by name."""
+        return {payload['name']: payload_hash(payload) for payload in self.local_payloads().values()}
+
+    async def remote_commands(self) -> Dict[CommandKey, Dict[str, Any]]:
+        fetched = await self.bot.http.get_global_commands(self.bot.application_id)
+        return {(command.get('type', 1), command['name']): command for command in fetched}
+
+    async def plan(self) -> SyncPlan:
+        local = self.local_payloads()
+        remote = await self.remote_commands()
+        plan = SyncPlan()
+        for key, payload in local.items():
+            digest = payload_hash(payload)
+            plan.hashes[payload['name']] = digest
+            current = remote.get(key)
+            if current is None:
+                plan.creates.append(payload)
+            elif payload_hash(current) != digest:
+                plan.edits.append((current['id'], payload))
+            else:
+                plan.unchanged.append(payload['name'])
+        for key, command in remote.items():
+            if key not in local:
+                plan.deletes.append((command['id'], command['name']))
+        return plan
+
+    async def apply(self, plan: SyncPlan) -> Dict[str, int]:
+        """Send the plan's calls; returns how many of each were made or deferred."""
+        http, application_id = self.bot.http, self.bot.application_id
+        applied = {'created': 0, 'edited': 0, 'deleted': 0, 'deferred': 0}
+
+        for command_id, name in plan.deletes:
+            await http.delete_global_command(application_id, command_id)
+            applied['deleted'] += 1
+            logger.info(f"Deleted command {name}")
+
+        for command_id, payload in plan.edits:
+            await http.edit_global_command(application_id, command_id, payload)
+            applied['edited'] += 1
+            logger.info(f"Updated command {payload['name']}")
+
+        allowed = self.daily_limits.get_remaining()
+        for payload in plan.creates[:allowed]:
+            await http.upsert_global_command(application_id, payload)
+            self.daily_limits.add_commands(1)
+            applied['created'] += 1
+            logger.info(f"Created command {payload['name']}")
+        applied['deferred'] = max(0, len(plan.creates) - allowed)
+        if applied['deferred']:
+            logger.warning(f"Daily command quota reached; {applied['deferred']} new commands wait for the next sync")
+        return applied
+
+    async def sync(self, allow_deletes: bool = True) -> Tuple[SyncPlan, Dict[str, int]]:
+        """
+        Plan and apply a minimal sync. With ``allow_deletes`` off, remote
+        commands missing from the tree are left in place and listed in
+        ``plan.skipped_deletes``: a cog that failed to load would otherwise
+        lose its commands, and recreating them spends the daily create quota.
+        """
+        plan = await self.plan()
+        if not allow_deletes and plan.deletes:
+            plan.skipped_deletes, plan.deletes = plan.deletes, []
+            logger.warning(
+                f"Not deleting commands missing from the tree: "
+                f"{', '.join(name for _, name in plan.skipped_deletes)}. Run /sync_commands to remove them."
+            )
+        logger.info(f"Command sync plan: {plan.summary()} ({len(plan.unchanged)} unchanged)")
+        if plan.empty:
+            return plan, {'created': 0, 'edited': 0, 'deleted': 0, 'deferred': 0}
+        return plan, await self.apply(plan)
@@ -0,0 +1,140 @@
+# cogs/utils/deadline_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger('bot.deadlines')
+
+
+class DeadlineScheduler:
+    """
+    Runs callbacks at absolute times.
+
+    Pending deadlines are kept in a heap ordered by fire time and a single
+    task sleeps until the earliest one, so the cost of an idle scheduler does
+    not depend on how many deadlines (or how much history) exist. Each
+    deadline has a key; scheduling the same key again replaces it, and keys
+    can be grouped (e.g. by mission) so all of an owner's deadlines can be
+    re-armed or cancelled together. Replaced and cancelled entries are
+    dropped lazily when they reach the top of the heap.
+    """
+
+    def __init__(self, name: str = 'deadlines'):
+        self.name = name
+        self._heap: List[List[Any]] = []  # [when, seq, key]
+        self._entries: Dict[Hashable, List[Any]] = {}  # key -> [when, seq, callback, args, group]
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(
+        self,
+        key: Hashable,
+        when: datetime,
+        callback: Callable[..., Awaitable[Any]],
+        *args: Any,
+        group: Optional[Hashable] = None
+    ):
+        """Run ``await callback(*args)`` at ``when``, replacing any deadline with the same key."""
+        self.cancel(key)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        timestamp = when.timestamp()
+        seq = next(self._seq)
+        self._entries[key] = [timestamp, seq, callback, args, group]
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+        heapq.heappush(self._heap, [timestamp, seq, key])
+        if self._heap[0][1] == seq:
+            # New earliest deadline: let the runner recompute its sleep
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel one deadline. Returns True if it was pending."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        group = entry[4]
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+        return True
+
+    def cancel_group(self, group: Hashable) -> int:
+        """Cancel every deadline in ``group``. Returns the number cancelled."""
+        keys = list(self._groups.get(group, ()))
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Fire time of the earliest pending deadline."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0], tz=timezone.utc)
+
+    def start(self):
+        """Start the runner task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the runner task. Pending deadlines are kept."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _discard_stale(self):
+        while self._heap:
+            timestamp, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        try:
+            while True:
+                self._wakeup.clear()
+                self._discard_stale()
+                if not self._heap:
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._heap[0][0] - datetime.now(timezone.utc).timestamp()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                self.cancel(key)
+                self.fired += 1
+                try:
+                    await entry[2](*entry[3])
+                except Exception as e:
+                    logger.error(f"Error running {self.name} deadline {key!r}: {e}", exc_info=True)
+        except asyncio.CancelledError:
+            raise
@@ -0,0 +1,310 @@
+# cogs/utils/document_store.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('bot.documents')
+
+# Upper bound for the back-off between retries of a failing flush
+MAX_RETRY_DELAY = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    name        TEXT PRIMARY KEY,
+    created_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    collection  TEXT NOT NULL,
+    doc_id      TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+"""
+
+
+class DocumentCollection:
+    """
+    One named set of JSON documents inside a ``DocumentStore``.
+
+    ``put`` and ``delete`` only queue the change; the store writes queued
+    changes in the background. Documents whose serialized form has not
+    changed since the last write are skipped, so callers can save freely.
+    """
+
+    def __init__(self, store: 'DocumentStore', name: str):
+        self.store = store
+        self.name = name
+        self._written: Dict[str, int] = {}  # doc_id -> hash of the last queued payload
+
+    def load(self, legacy_loader: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Return every document keyed by ID, in insertion order.
+
+        The first time a collection is used, ``legacy_loader`` (if given) is
+        called to import existing data, e.g. from an old JSON file.
+        """
+        documents = self.store._load_collection(self.name)
+        if documents is None:
+            documents = legacy_loader() if legacy_loader else {}
+            self.store._import_collection(self.name, documents)
+            if documents:
+                logger.info(f"Imported {len(documents)} documents into '{self.name}'")
+            documents = self.store._load_collection(self.name) or {}
+        self._written = {
+            doc_id: hash(json.dumps(document, sort_keys=True, default=str))
+            for doc_id, document in documents.items()
+        }
+        return documents
+
+    def put(self, doc_id: str, document: Dict[str, Any]):
+        """Queue an upsert of one document."""
+        payload = json.dumps(document, sort_keys=True, default=str)
+        digest = hash(payload)
+        if self._written.get(doc_id) == digest:
+            return
+        self._written[doc_id] = digest
+        self.store._queue(self.name, doc_id, payload)
+
+    def delete(self, doc_id: str):
+        """Queue removal of one document."""
+        if self._written.pop(doc_id, None) is not None:
+            self.store._queue(self.name, doc_id, None)
+
+    def sync(self, documents: Dict[str, Dict[str, Any]]):
+        """Queue the changes needed to make the collection equal ``documents``."""
+        for doc_id, document in documents.items():
+            self.put(doc_id, document)
+        for doc_id in [doc_id for doc_id in self._written if doc_id not in documents]:
+            self.delete(doc_id)
+
+
+class DocumentStore:
+    """
+    SQLite-backed store for cog data that used to live in whole-file JSON.
+
+    Each record is its own row, so saving one mission, AAR or order is a
+    single upsert instead of a rewrite of the whole collection. Changes
+    are queued in memory and written in one transaction on a background
+    thread a moment later, coalescing bursts of saves and keeping file I/O
+    off the event loop. The WAL is checkpointed and free pages released
+    periodically and on shutdown.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        flush_delay: float = 0.5,
+        compact_interval: float = 6 * 3600.0
+    ):
+        self.db_path = db_path or os.getenv('DOCUMENT_STORE_PATH', 'data/documents.db')
+        self.flush_delay = flush_delay
+        self.compact_interval = compact_interval
+
+        self._collections: Dict[str, DocumentCollection] = {}
+        self._pending: Dict[Tuple[str, str], Optional[str]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='document-store')
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._closed = False
+        self._last_compact = time.time()
+        self.writes = 0
+        self.flushes = 0
+
+    def collection(self, name: str) -> DocumentCollection:
+        """Return the collection called ``name``."""
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = DocumentCollection(self, name)
+            self._collections[name] = collection
+        return collection
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Begin background flushing, writing anything queued during start-up."""
+        self._started = True
+        if self._pending:
+            self._schedule_flush()
+
+    async def stop(self):
+        """Write queued changes, compact and close the database."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._compact_sync)
+        await loop.run_in_executor(self._executor, self._close_sync)
+        self._closed = True
+        self._executor.shutdown(wait=False)
+        logger.info("Document store closed")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Callers hold self._lock
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _close_sync(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _load_collection(self, name: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            conn = self._connect()
+            if conn.execute("SELECT 1 FROM collections WHERE name = ?", (name,)).fetchone() is None:
+                return None
+            rows = conn.execute(
+                "SELECT doc_id, payload FROM documents WHERE collection = ? ORDER BY rowid", (name,)
+            ).fetchall()
+        documents = {}
+        for doc_id, payload in rows:
+            # Changes still queued are newer than what is on disk
+            pending = self._pending.get((name, doc_id), payload)
+            if pending is not None:
+                documents[doc_id] = json.loads(pending)
+        return documents
+
+    def _import_collection(self, name: str, documents: Dict[str, Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO documents (collection, doc_id, payload, updated_at) VALUES (?, ?, ?, ?)",
+                    [(name, str(doc_id), json.dumps(document, sort_keys=True, default=str), now)
+                     for doc_id, document in documents.items()]
+                )
+                conn.execute("INSERT OR IGNORE INTO collections (name, created_at) VALUES (?, ?)", (name, now))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _queue(self, name: str, doc_id: str, payload: Optional[str]):
+        if self._closed:
+            # Cogs flush their saves before the store stops; nothing should get here
+            logger.error(f"Document store is closed; dropped change to {name}/{doc_id}")
+            return
+        self._pending[(name, str(doc_id))] = payload
+        if self._started:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush())
+        except RuntimeError:
+            # No running loop; picked up by the next flush
+            pass
+
+    async def _delayed_flush(self):
+        # Changes queued while a batch is being written go out in the next one;
+        # a failed batch is re-queued and retried with growing delays
+        delay = self.flush_delay
+        while self._pending:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                delay = self.flush_delay
+            except Exception as e:
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                logger.error(f"Error flushing document store, retrying in {delay:.1f}s: {e}", exc_info=True)
+
+    def _take_pending(self) -> List[Tuple[str, str, Optional[str]]]:
+        batch = [(name, doc_id, payload) for (name, doc_id), payload in self._pending.items()]
+        self._pending.clear()
+        return batch
+
+    async def flush(self) -> int:
+        """Write every queued change now. Returns the number of documents written."""
+        batch = self._take_pending()
+        if not batch:
+            return 0
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write_sync, batch)
+        except Exception:
+            # Re-queue, keeping anything newer that arrived meanwhile
+            for name, doc_id, payload in batch:
+                self._pending.setdefault((name, doc_id), payload)
+            raise
+        if time.time() - self._last_compact >= self.compact_interval:
+            await loop.run_in_executor(self._executor, self._compact_sync)
+        return len(batch)
+
+    def _write_sync(self, batch: List[Tuple[str, str, Optional[str]]]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, doc_id, payload in batch:
+                    if payload is None:
+                        conn.execute("DELETE FROM documents WHERE collection = ? AND doc_id = ?", (name, doc_id))
+                    else:
+                        conn.execute(
+                            "INSERT INTO documents (collection, doc_id, payload, updated_at) VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(collection, doc_id) DO UPDATE SET "
+                            "payload = excluded.payload, updated_at = excluded.updated_at",
+                            (name, doc_id, payload, now)
+                        )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.writes += len(batch)
+        self.flushes += 1
+
+    def _compact_sync(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA incremental_vacuum")
+        self._last_compact = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters."""
+        return {
+            'collections': len(self._collections),
+            'pending': len(self._pending),
+            'writes': self.writes,
+            'flushes': self.flushes,
+        }
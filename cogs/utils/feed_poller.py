@@ -0,0 +1,239 @@
+# cogs/utils/feed_poller.py
+
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import feedparser
+
+from .http_pool import HTTPPool
+
+logger = logging.getLogger('bot.feeds')
+
+
+@dataclass
+class FeedSpec:
+    """One feed to poll and where to post its new entries."""
+    name: str
+    url: str
+    interval: float  # seconds
+    channel_id: int
+
+
+class _FeedState:
+    """Conditional-GET validators and recently seen entry IDs for one feed."""
+
+    def __init__(self, max_seen: int):
+        self.max_seen = max_seen
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.seen: 'OrderedDict[str, None]' = OrderedDict()
+        self.initialized = False
+
+    def observe(self, entry_ids: List[str]) -> List[str]:
+        """
+        Record the IDs currently in the feed; return those not seen before.
+
+        IDs still present in the feed are refreshed, so only entries that
+        have dropped out of the feed are ever evicted.
+        """
+        new = [entry_id for entry_id in entry_ids if entry_id not in self.seen]
+        for entry_id in entry_ids:
+            self.seen[entry_id] = None
+            self.seen.move_to_end(entry_id)
+        while len(self.seen) > max(self.max_seen, len(entry_ids)):
+            self.seen.popitem(last=False)
+        return new
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'seen': list(self.seen),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_seen: int) -> '_FeedState':
+        state = cls(max_seen)
+        state.etag = data.get('etag')
+        state.last_modified = data.get('last_modified')
+        state.seen = OrderedDict((entry_id, None) for entry_id in data.get('seen', [])[-max_seen:])
+        state.initialized = True
+        return state
+
+
+class FeedPoller:
+    """
+    Polls RSS/Atom feeds without blocking the event loop.
+
+    Each feed runs on its own interval using the shared HTTP pool and
+    conditional requests (ETag / If-Modified-Since), so an unchanged feed
+    costs one 304 and no parsing. Changed feeds are parsed in a worker
+    thread. Seen entry IDs and validators are kept per feed, bounded, and
+    saved to ``state_file``. The first poll of a new feed only records its
+    current entries so history is not re-posted.
+    """
+
+    def __init__(
+        self,
+        http: HTTPPool,
+        on_entries: Callable[[FeedSpec, List[Any]], Awaitable[List[str]]],
+        on_error: Optional[Callable[[FeedSpec, str], Awaitable[None]]] = None,
+        state_file: str = 'data/feed_state.json',
+        max_seen: int = 1000
+    ):
+        self.http = http
+        self.on_entries = on_entries
+        self.on_error = on_error
+        self.state_file = state_file
+        self.max_seen = max_seen
+
+        self.feeds: Dict[str, FeedSpec] = {}
+        self._states: Dict[str, _FeedState] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                data = json.load(f)
+            self._states = {
+                name: _FeedState.from_dict(state, self.max_seen) for name, state in data.items()
+            }
+        except Exception as e:
+            logger.error(f"Failed to load feed state: {e}")
+
+    async def save(self):
+        """Write validators and seen IDs to disk."""
+        snapshot = json.dumps({name: state.to_dict() for name, state in self._states.items()})
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            logger.error(f"Failed to save feed state: {e}")
+
+    def _write(self, snapshot: str):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_file, self.state_file)
+
+    def import_seen(self, name: str, entry_ids: List[str]):
+        """Seed a feed's seen IDs, e.g. from an older state file."""
+        state = self._states.get(name)
+        if state is None:
+            state = self._states[name] = _FeedState(self.max_seen)
+        for entry_id in entry_ids[-self.max_seen:]:
+            state.seen[entry_id] = None
+        state.initialized = True
+
+    def add_feed(self, feed: FeedSpec):
+        """Register a feed; it starts polling with ``start``."""
+        self.feeds[feed.name] = feed
+        self._locks.setdefault(feed.name, asyncio.Lock())
+
+    def start(self):
+        """Start one polling task per feed."""
+        for name, feed in self.feeds.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._poll_loop(feed))
+
+    async def stop(self):
+        """Cancel polling and save state."""
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+        await self.save()
+
+    async def _poll_loop(self, feed: FeedSpec):
+        try:
+            while True:
+                await self.poll(feed.name)
+                await asyncio.sleep(feed.interval)
+        except asyncio.CancelledError:
+            raise
+
+    async def poll_all(self) -> int:
+        """Poll every feed now. Returns the number of new entries handled."""
+        results = await asyncio.gather(*(self.poll(name) for name in self.feeds))
+        return sum(results)
+
+    async def poll(self, name: str) -> int:
+        """Poll one feed. Returns the number of new entries handled."""
+        feed = self.feeds[name]
+        async with self._locks[name]:
+            try:
+                return await self._poll(feed)
+            except Exception as e:
+                message = f"An error occurred while fetching feed '{feed.name}': {e}"
+                logger.error(message)
+                if self.on_error:
+                    await self.on_error(feed, message)
+                return 0
+
+    async def _poll(self, feed: FeedSpec) -> int:
+        state = self._states.get(feed.name)
+        if state is None:
+            state = self._states[feed.name] = _FeedState(self.max_seen)
+
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        session = await self.http.session()
+        async with session.get(feed.url, headers=headers) as response:
+            if response.status == 304:
+                logger.debug(f"Feed '{feed.name}' not modified")
+                return 0
+            if response.status != 200:
+                raise RuntimeError(f"status code {response.status}")
+            body = await response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        parsed = await asyncio.to_thread(feedparser.parse, body)
+        if parsed.bozo and not parsed.entries:
+            raise RuntimeError(f"failed to parse feed: {parsed.bozo_exception}")
+
+        entries = [entry for entry in parsed.entries if entry.get('id') or entry.get('link')]
+        entry_ids = [entry.get('id') or entry.get('link') for entry in entries]
+        new_ids = set(state.observe(entry_ids))
+
+        handled = 0
+        complete = True
+        if not state.initialized:
+            state.initialized = True
+            logger.info(f"Feed '{feed.name}' initialized; {len(entry_ids)} existing entries marked as seen")
+        elif new_ids:
+            new_entries = [entry for entry in entries if (entry.get('id') or entry.get('link')) in new_ids]
+            # Oldest first, matching the order they were published
+            posted = await self.on_entries(feed, list(reversed(new_entries)))
+            handled = len(posted)
+            # Entries that failed to post are retried on the next poll
+            for entry_id in new_ids.difference(posted):
+                state.seen.pop(entry_id, None)
+                complete = False
+
+        # Keep the old validators until every new entry was handled, so a
+        # failed post is not hidden behind a 304
+        if complete:
+            state.etag = etag
+            state.last_modified = last_modified
+        await self.save()
+        return handled
@@ -0,0 +1,53 @@
+# cogs/utils/http_pool.py
+
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger('bot.http')
+
+
+class HTTPPool:
+    """
+    Shared keep-alive HTTP session for third-party requests (feeds and the
+    like). Coda traffic has its own authenticated pool in ``CodaAPIClient``.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: float = 30.0,
+        user_agent: str = 'HLNBot (+https://github.com/selco13/HLNBot)'
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it on first use."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=self.limit,
+                        limit_per_host=self.limit_per_host,
+                        enable_cleanup_closed=True
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    headers={'User-Agent': self.user_agent}
+                )
+                logger.info("Shared HTTP session opened")
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("Shared HTTP session closed")
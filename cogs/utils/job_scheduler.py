@@ -0,0 +1,344 @@
+# cogs/utils/job_scheduler.py
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from .deadline_scheduler import DeadlineScheduler
+
+logger = logging.getLogger('bot.scheduler')
+
+# Field ranges for minute, hour, day of month, month and day of week
+# (Sunday may be written 0 or 7)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+_CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_INTERVAL_PATTERN = re.compile(r'^@every\s+(\d+)\s*([smhd])$')
+
+# Seconds to spread caught-up runs over after a restart
+STARTUP_SPREAD = 120.0
+
+
+class CronSchedule:
+    """
+    A five-field cron expression (minute, hour, day of month, month, day of
+    week; Sunday is 0 or 7) evaluated in UTC. Fields take ``*``, numbers,
+    ``a-b`` ranges, ``/step`` and comma lists. As in cron, when both day
+    fields are restricted a day matching either one matches.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, _CRON_FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(','):
+            spec, _, step = part.partition('/')
+            step_size = int(step) if step else 1
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(value) for value in spec.split('-', 1))
+            else:
+                start = int(spec)
+                end = high if step else start
+            if not low <= start <= end <= high or step_size < 1:
+                raise ValueError(f"Invalid cron field {field!r}")
+            values.update(range(start, end + 1, step_size))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # datetime counts Monday as 0; cron counts Sunday as 0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after ``moment``."""
+        moment = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Five years covers any satisfiable expression (e.g. Feb 29)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return self.expression
+
+
+class IntervalSchedule:
+    """
+    Every ``seconds``, aligned to the wall clock: ``@every 15m`` runs at
+    :00, :15, :30 and :45 whenever the bot was started.
+    """
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        timestamp = moment.timestamp()
+        return datetime.fromtimestamp((timestamp // self.seconds + 1) * self.seconds, tz=timezone.utc)
+
+    def __repr__(self) -> str:
+        return f"@every {self.seconds:g}s"
+
+
+def parse_schedule(spec: str):
+    """Parse a cron expression, ``@hourly``/``@daily``/... or ``@every <n><s|m|h|d>``."""
+    spec = spec.strip()
+    match = _INTERVAL_PATTERN.match(spec)
+    if match:
+        return IntervalSchedule(int(match.group(1)) * _INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(_CRON_ALIASES.get(spec, spec))
+
+
+class Job:
+    """A registered job, its schedule and its run metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        schedule,
+        callback: Callable[[], Awaitable[Any]],
+        heavy: bool,
+        jitter: float,
+        catch_up: bool
+    ):
+        self.name = name
+        self.schedule = schedule
+        self.callback = callback
+        self.heavy = heavy
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.last_run: Optional[datetime] = None
+        self.next_run: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'schedule': repr(self.schedule),
+            'heavy': self.heavy,
+            'running': self.task is not None and not self.task.done(),
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'last_duration': round(self.last_duration, 3),
+            'avg_duration': round(self.total_duration / self.runs, 3) if self.runs else 0.0,
+            'max_duration': round(self.max_duration, 3),
+        }
+
+
+class JobScheduler:
+    """
+    Runs the bot's periodic background jobs.
+
+    Jobs are registered by name with a cron expression or a wall-clock
+    aligned interval, and fired through a ``DeadlineScheduler`` so one task
+    sleeps until the next due job. Each firing is pushed back by a random
+    jitter so jobs sharing a schedule do not hit Coda in the same second.
+    Last-run times are saved to ``state_file``; a catch-up job that missed a
+    run while the bot was down runs once, shortly after it is registered
+    again.
+    Heavy jobs share ``max_heavy`` slots, a job never overlaps itself, and
+    per-job run counts and durations are available from ``stats``.
+    """
+
+    def __init__(
+        self,
+        bot=None,
+        state_file: str = 'data/scheduler_state.json',
+        max_heavy: int = 2,
+        default_jitter: float = 30.0
+    ):
+        self.bot = bot
+        self.state_file = state_file
+        self.default_jitter = default_jitter
+        self.jobs: Dict[str, Job] = {}
+        self._deadlines = DeadlineScheduler('jobs')
+        self._heavy = asyncio.Semaphore(max_heavy)
+        self._last_runs: Dict[str, str] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                self._last_runs = json.load(f).get('last_runs', {})
+        except Exception as e:
+            logger.error(f"Failed to load scheduler state: {e}")
+
+    async def save(self):
+        """Write last-run times to disk."""
+        snapshot = json.dumps({'last_runs': self._last_runs})
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            logger.error(f"Failed to save scheduler state: {e}")
+
+    def _write(self, snapshot: str):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_file, self.state_file)
+
+    def add(
+        self,
+        name: str,
+        schedule: str,
+        callback: Callable[[], Awaitable[Any]],
+        *,
+        heavy: bool = False,
+        jitter: Optional[float] = None,
+        catch_up: bool = True
+    ) -> Job:
+        """
+        Register ``await callback()`` to run on ``schedule``, replacing any
+        job with the same name. ``heavy`` jobs (large Coda reads, guild-wide
+        scans) wait for one of the shared heavy slots.
+        """
+        self.remove(name)
+        job = Job(
+            name,
+            parse_schedule(schedule),
+            callback,
+            heavy,
+            self.default_jitter if jitter is None else jitter,
+            catch_up
+        )
+        last_run = self._last_runs.get(name)
+        if last_run:
+            job.last_run = datetime.fromisoformat(last_run)
+        self.jobs[name] = job
+
+        now = datetime.now(timezone.utc)
+        if job.catch_up and job.last_run and job.schedule.next_after(job.last_run) <= now:
+            # Missed while the bot was down: run once, spread over the startup window
+            logger.info(f"Job {name} missed a run since {job.last_run.isoformat()}; catching up")
+            self._arm(job, now + timedelta(seconds=random.uniform(0, STARTUP_SPREAD)))
+        else:
+            self._arm(job, job.schedule.next_after(now))
+        return job
+
+    def remove(self, name: str) -> bool:
+        """Unregister a job and cancel it if it is running."""
+        job = self.jobs.pop(name, None)
+        if job is None:
+            return False
+        self._deadlines.cancel(name)
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+        return True
+
+    def _arm(self, job: Job, when: datetime):
+        if job.jitter > 0:
+            when += timedelta(seconds=random.uniform(0, job.jitter))
+        job.next_run = when
+        self._deadlines.schedule(job.name, when, self._fire, job.name)
+
+    async def _fire(self, name: str):
+        job = self.jobs.get(name)
+        if job is None:
+            return
+        if job.task is not None and not job.task.done():
+            job.skipped += 1
+            logger.warning(f"Job {name} is still running; skipping this run")
+        else:
+            job.task = asyncio.create_task(self._run(job))
+        self._arm(job, job.schedule.next_after(datetime.now(timezone.utc)))
+
+    async def run_now(self, name: str):
+        """Run a job immediately, outside its schedule, and wait for it."""
+        job = self.jobs[name]
+        if job.task is not None and not job.task.done():
+            await job.task
+            return
+        job.task = asyncio.create_task(self._run(job))
+        await job.task
+
+    async def _run(self, job: Job):
+        if self.bot is not None:
+            await self.bot.wait_until_ready()
+        if job.heavy:
+            await self._heavy.acquire()
+        started = time.monotonic()
+        try:
+            await job.callback()
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Error running job {job.name}: {e}", exc_info=True)
+        finally:
+            if job.heavy:
+                self._heavy.release()
+        duration = time.monotonic() - started
+        job.runs += 1
+        job.last_duration = duration
+        job.total_duration += duration
+        job.max_duration = max(job.max_duration, duration)
+        job.last_run = datetime.now(timezone.utc)
+        logger.debug(f"Job {job.name} finished in {duration:.2f}s")
+        if job.catch_up:
+            self._last_runs[job.name] = job.last_run.isoformat()
+            await self.save()
+
+    def start(self):
+        """Start firing jobs."""
+        self._deadlines.start()
+
+    async def stop(self):
+        """Stop firing jobs, cancel running ones and save last-run times."""
+        await self._deadlines.stop()
+        running = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await self.save()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Schedule, run counts and durations for every job."""
+        return {name: job.stats() for name, job in self.jobs.items()}
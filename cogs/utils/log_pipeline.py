@@ -0,0 +1,198 @@
+# cogs/utils/log_pipeline.py
+
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DETAILED_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Default cap for payloads written into log messages
+PAYLOAD_LIMIT = 500
+
+
+class Truncated:
+    """
+    A payload for a log message, rendered only if the record is emitted
+    and cut to ``limit`` characters. Pass it as a ``%s`` argument::
+
+        logger.debug("Response: %s", Truncated(body))
+    """
+
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value: Any, limit: int = PAYLOAD_LIMIT):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... [{len(text)} chars]"
+        return text
+
+    __repr__ = __str__
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in ``N`` records from a call site that logs with
+    ``extra={'sample': N}``; other records always pass. Used on hot paths
+    so per-request debug lines do not flood the queue.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, 'sample', None)
+        if not rate or rate <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % rate == 0
+
+
+class LogPipeline:
+    """
+    Routes every log record through a queue to a listener thread.
+
+    Loggers only enqueue records (after level checks and sampling).
+    ``QueueHandler.prepare`` still renders the message and any traceback
+    on the emitting thread, so payloads should be passed as ``Truncated``
+    arguments rather than pre-formatted; the listener thread applies the
+    sink formats and does all file and console I/O, including rotation.
+    Per-logger files are extra sinks filtered by logger name, so modules
+    no longer attach their own file handlers.
+    """
+
+    def __init__(self):
+        self._queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self._queue)
+        self.queue_handler.addFilter(SamplingFilter())
+        self._sinks: List[logging.Handler] = []
+        self._files: Dict[Tuple[str, str], logging.Handler] = {}
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def add_sink(self, handler: logging.Handler):
+        with self._lock:
+            self._sinks.append(handler)
+            if self._listener is not None:
+                # The listener reads this tuple for every record
+                self._listener.handlers = tuple(self._sinks)
+
+    def add_file(
+        self,
+        logger_name: str,
+        filename: str,
+        fmt: str = DEFAULT_FORMAT,
+        level: int = logging.NOTSET,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 5
+    ) -> logging.Handler:
+        """Write records from ``logger_name`` and its children to ``filename`` as well."""
+        key = (logger_name, os.path.abspath(filename))
+        with self._lock:
+            handler = self._files.get(key)
+        if handler is not None:
+            return handler
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            filename=filename,
+            encoding='utf-8',
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            delay=True
+        )
+        handler.setFormatter(logging.Formatter(fmt))
+        handler.setLevel(level)
+        handler.addFilter(logging.Filter(logger_name))
+        with self._lock:
+            self._files[key] = handler
+        self.add_sink(handler)
+        return handler
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = logging.handlers.QueueListener(
+                    self._queue, *self._sinks, respect_handler_level=True
+                )
+                self._listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the listener thread."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+        for handler in self._sinks:
+            handler.close()
+
+
+_pipeline = LogPipeline()
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, int]:
+    """Parse ``"coda_api=INFO,banking=DEBUG"`` into logger levels."""
+    levels = {}
+    for part in (spec or '').split(','):
+        name, _, level = part.partition('=')
+        name, level = name.strip(), level.strip().upper()
+        if name and isinstance(logging.getLevelName(level), int):
+            levels[name] = logging.getLevelName(level)
+    return levels
+
+
+def configure(
+    level: int = logging.INFO,
+    filename: str = 'bot.log',
+    levels: Optional[Dict[str, int]] = None
+):
+    """
+    Install the pipeline on the root logger: ``filename`` and the console
+    as sinks, ``level`` for the root and ``levels`` per logger. The sinks
+    themselves do not filter by level.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers.clear()
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=filename,
+        encoding='utf-8',
+        maxBytes=5 * 1024 * 1024,  # 5 MB
+        backupCount=5
+    )
+    file_handler.setFormatter(logging.Formatter(DETAILED_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+    # Left at NOTSET: each logger's own level decides what is emitted, so
+    # an override below ``level`` (e.g. coda_api=DEBUG) reaches these sinks
+    _pipeline.add_sink(file_handler)
+    _pipeline.add_sink(console_handler)
+
+    root.addHandler(_pipeline.queue_handler)
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+    _pipeline.start()
+
+
+def add_log_file(logger_name: str, filename: str, fmt: str = DEFAULT_FORMAT, **kwargs) -> logging.Handler:
+    """Give a subsystem its own rotating log file, written off the event loop."""
+    return _pipeline.add_file(logger_name, filename, fmt=fmt, **kwargs)
+
+
+def shutdown():
+    """Flush and stop the pipeline; called once at exit."""
+    _pipeline.stop()
@@ -0,0 +1,231 @@
+# cogs/utils/member_reconciler.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from ..constants import FLEET_COMPONENTS, RANKS
+
+logger = logging.getLogger('bot.reconciler')
+
+# A member holds at most one role from each of these groups. Fleet
+# Command is the admiralty, held alongside a fleet component.
+RANK_ROLES = frozenset(name for name, _ in RANKS)
+FLEET_ROLES = frozenset(FLEET_COMPONENTS) - RANK_ROLES - {'Fleet Command'}
+
+# Discord's nickname length limit
+MAX_NICK_LENGTH = 32
+
+# How long our own edit outranks the member cache while waiting for the
+# gateway to echo it; any member update for that member ends it sooner
+APPLIED_TTL = 60.0
+
+# Marks "leave the nickname alone"; ``nick=None`` clears it
+UNCHANGED: Any = object()
+
+
+class DesiredState:
+    """
+    The roles and nickname a member should end up with. Fields left unset
+    are not touched; later declarations override earlier ones.
+    """
+
+    __slots__ = ('rank', 'division', 'add', 'remove', 'nick', 'reasons')
+
+    def __init__(self):
+        self.rank: Optional[str] = None
+        self.division: Optional[str] = None
+        self.add: Set[str] = set()
+        self.remove: Set[str] = set()
+        self.nick: Any = UNCHANGED
+        self.reasons: List[str] = []
+
+    def merge(
+        self,
+        rank: Optional[str],
+        division: Optional[str],
+        roles: Iterable[str],
+        remove_roles: Iterable[str],
+        nick: Any,
+        reason: Optional[str]
+    ):
+        if rank is not None:
+            self.rank = rank
+        if division is not None:
+            self.division = division
+        for name in roles:
+            self.add.add(name)
+            self.remove.discard(name)
+        for name in remove_roles:
+            self.remove.add(name)
+            self.add.discard(name)
+        if nick is not UNCHANGED:
+            self.nick = nick
+        if reason and reason not in self.reasons:
+            self.reasons.append(reason)
+
+
+class MemberReconciler:
+    """
+    Applies a member's desired roles and nickname in one ``member.edit``.
+
+    Callers declare the target rank, fleet component, extra roles and
+    nickname; the reconciler diffs that against the member's cached state
+    and sends a single edit, or none if nothing changed. Declarations for
+    the same member made while an edit is pending are merged into it, and
+    each member's edits run one at a time. Discord errors from an edit are
+    raised to every caller waiting on it.
+    """
+
+    def __init__(self, bot=None, max_concurrency: int = 5):
+        self._pending: Dict[int, DesiredState] = {}
+        self._members: Dict[int, discord.Member] = {}
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        # State written by our last edit, until the next member update arrives
+        self._applied: Dict[int, Tuple[FrozenSet[int], Optional[str], float]] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.edits = 0
+        self.skipped = 0
+        self.merged = 0
+        if bot is not None:
+            bot.add_listener(self.on_member_update)
+            bot.add_listener(self.on_member_remove)
+
+    async def reconcile(
+        self,
+        member: discord.Member,
+        *,
+        rank: Optional[str] = None,
+        division: Optional[str] = None,
+        roles: Iterable[str] = (),
+        remove_roles: Iterable[str] = (),
+        nick: Any = UNCHANGED,
+        reason: Optional[str] = None
+    ) -> bool:
+        """
+        Declare the target state for ``member`` and wait until it is applied.
+
+        ``rank`` and ``division`` name the member's one rank role and one
+        fleet component role (others in the group are removed); ``roles``
+        and ``remove_roles`` name other roles to hold or drop. Returns True
+        if an edit was sent and False if the member was already in state.
+        """
+        state = self._pending.get(member.id)
+        if state is None:
+            state = self._pending[member.id] = DesiredState()
+        else:
+            self.merged += 1
+        state.merge(rank, division, roles, remove_roles, nick, reason)
+        self._members[member.id] = member
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(member.id, []).append(future)
+        if member.id not in self._workers:
+            self._workers[member.id] = asyncio.create_task(self._run(member.id))
+        return await future
+
+    async def _run(self, member_id: int):
+        try:
+            # Declarations made during an edit queue up as the next one
+            while member_id in self._pending:
+                state = self._pending.pop(member_id)
+                member = self._members.pop(member_id)
+                waiters = self._waiters.pop(member_id, [])
+                try:
+                    async with self._semaphore:
+                        changed = await self._apply(member, state)
+                except Exception as e:
+                    for future in waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result(changed)
+        finally:
+            self._workers.pop(member_id, None)
+
+    async def _apply(self, member: discord.Member, state: DesiredState) -> bool:
+        guild = member.guild
+        member = guild.get_member(member.id) or member
+        applied = self._applied.get(member.id)
+        if applied is not None and time.monotonic() - applied[2] < APPLIED_TTL:
+            current_roles, current_nick, _ = applied
+        else:
+            current_roles = frozenset(role.id for role in member.roles if not role.is_default())
+            current_nick = member.nick
+
+        roles_by_name: Dict[str, discord.Role] = {}
+        for role in guild.roles:
+            roles_by_name.setdefault(role.name, role)
+
+        target = set(current_roles)
+        for group, name in ((RANK_ROLES, state.rank), (FLEET_ROLES, state.division)):
+            if name is None:
+                continue
+            role = roles_by_name.get(name)
+            if role is None:
+                logger.warning(f"Role {name} not found; leaving {member.id}'s current roles in place")
+                continue
+            target.difference_update(r.id for r in guild.roles if r.name in group)
+            target.add(role.id)
+        for names, update in ((state.add, target.add), (state.remove, target.discard)):
+            for name in names:
+                role = roles_by_name.get(name)
+                if role is None:
+                    logger.warning(f"Role {name} not found for {member.id}")
+                    continue
+                update(role.id)
+
+        changes: Dict[str, Any] = {}
+        if target != current_roles:
+            changes['roles'] = [role for role in map(guild.get_role, target) if role is not None]
+        if state.nick is not UNCHANGED:
+            nick = state.nick[:MAX_NICK_LENGTH] if state.nick else None
+            if nick != current_nick:
+                if self._can_rename(member):
+                    changes['nick'] = nick
+                else:
+                    logger.warning(f"Cannot change nickname of {member.id}; skipping it")
+
+        if not changes:
+            self.skipped += 1
+            return False
+
+        await member.edit(reason='; '.join(state.reasons) or None, **changes)
+        self.edits += 1
+        self._applied[member.id] = (frozenset(target), changes.get('nick', current_nick), time.monotonic())
+        logger.debug(f"Reconciled {member.id}: {', '.join(changes)}")
+        return True
+
+    @staticmethod
+    def _can_rename(member: discord.Member) -> bool:
+        guild = member.guild
+        me = guild.me
+        if me is None or member.id == guild.owner_id:
+            return False
+        if member.id == me.id:
+            return me.guild_permissions.change_nickname
+        return me.guild_permissions.manage_nicknames and me.top_role > member.top_role
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Whether this is the echo of our edit or a change made by someone
+        # else, the member cache is now the source of truth; keeping our
+        # record would re-apply it over another moderator's or bot's change
+        self._applied.pop(after.id, None)
+
+    async def on_member_remove(self, member: discord.Member):
+        self._applied.pop(member.id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Edits sent, declarations that needed none and declarations merged."""
+        return {
+            'edits': self.edits,
+            'skipped': self.skipped,
+            'merged': self.merged,
+            'pending': len(self._pending),
+        }
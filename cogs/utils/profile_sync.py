@@ -2,115 +2,405 @@ import discord
 from discord.ext import commands
 import os
 import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 
 from .profile_events import ProfileEvent, ProfileEventType, ProfileUpdateBatch
-# from .shared_utils import AsyncTimer, CodaAPIManager  # Removed CodaAPIManager references
 from .shared_utils import AsyncTimer  # keep this if you still use it
-from .coda_api import CodaAPIClient
+from .coda_api import CodaAPIClient, CodaRequestError, PRIORITY_BACKGROUND
 
 logger = logging.getLogger('profile_sync')
 
+# Profile table column the bulk upserts are keyed on
+MEMBER_KEY_COLUMN = 'Discord User ID'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_updates (
+    member_id           INTEGER PRIMARY KEY,
+    updates             TEXT    NOT NULL,
+    events              TEXT    NOT NULL,
+    requires_role_sync  INTEGER NOT NULL DEFAULT 0,
+    version             INTEGER NOT NULL DEFAULT 1,
+    queued_at           REAL    NOT NULL,
+    attempts            INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at     REAL    NOT NULL DEFAULT 0,
+    last_error          TEXT
+);
+"""
+
+
+def _event_to_dict(event: ProfileEvent) -> Dict[str, Any]:
+    event_type = event.event_type
+    return {
+        'event_type': event_type.value if isinstance(event_type, ProfileEventType) else str(event_type),
+        'member_id': event.member_id,
+        'timestamp': event.timestamp.isoformat(),
+        'data': event.data,
+        'actor_id': event.actor_id,
+        'reason': event.reason,
+    }
+
+
+def _event_from_dict(data: Dict[str, Any]) -> ProfileEvent:
+    try:
+        event_type = ProfileEventType(data['event_type'])
+    except ValueError:
+        # Some callers use ad-hoc string event types
+        event_type = data['event_type']
+    return ProfileEvent(
+        event_type=event_type,
+        member_id=data['member_id'],
+        timestamp=datetime.fromisoformat(data['timestamp']),
+        data=data.get('data') or {},
+        actor_id=data.get('actor_id'),
+        reason=data.get('reason')
+    )
+
+
 class ProfileSyncManager:
-    """Manages synchronization of profile data across systems."""
-    
-    def __init__(self, bot: commands.Bot):
+    """
+    Manages synchronization of profile data across systems.
+
+    Profile events are written to a local SQLite queue before ``queue_update``
+    returns, merged per member (later field values win, events accumulate),
+    and flushed to Coda as multi-row upserts keyed by Discord User ID. The
+    rows per upsert grow when the Coda rate-limit budget is low, so a
+    promotion wave goes out in a handful of requests. Queued work survives a
+    restart and is replayed when the manager starts.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        coda_client: Optional[CodaAPIClient] = None,
+        db_path: Optional[str] = None,
+        flush_interval: float = 5.0,
+        coalesce_delay: float = 0.5,
+        min_batch_size: int = 10,
+        max_batch_size: int = 100,
+        reserved_requests: int = 5,
+        max_backoff: float = 300.0
+    ):
         self.bot = bot
-        self.coda = CodaAPIClient(os.getenv('CODA_API_TOKEN'))
-        self.update_queue: asyncio.Queue[ProfileUpdateBatch] = asyncio.Queue()
-        self.processing = False
-        self.batch_size = 10
-        self.batch_delay = 1.0
-        self.pending_updates: Dict[int, ProfileUpdateBatch] = {}
-        self.lock = asyncio.Lock()
-        
-    async def start(self):
-        self.processing = True
-        asyncio.create_task(self._process_updates())
-        
+        self.coda = coda_client or getattr(bot, 'coda_client', None) or CodaAPIClient(os.getenv('CODA_API_TOKEN'))
+        self.doc_id = os.getenv('DOC_ID')
+        self.table_id = os.getenv('PROFILE_TABLE_ID')
+        self.db_path = db_path or os.getenv('PROFILE_SYNC_PATH', 'data/profile_sync.db')
+        self.flush_interval = flush_interval
+        self.coalesce_delay = coalesce_delay
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.reserved_requests = reserved_requests
+        self.max_backoff = max_backoff
+
+        # All SQLite access is serialised on one worker thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profile-sync')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._urgent = False
+
+        # Counters for diagnostics
+        self.flushed = 0
+        self.failed = 0
+        self.requests = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.last_flush_duration = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the flush task; anything left from the last run is replayed."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info("Started profile sync task")
+
     async def stop(self):
-        self.processing = False
-        
+        """Stop the flush task, attempt a final flush and close the queue."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error during final profile sync flush: {e}")
+
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=False)
+        logger.info("Profile sync stopped")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+
     async def queue_update(self, event: ProfileEvent) -> bool:
         try:
-            member_id = event.member_id
-            async with self.lock:
-                if member_id not in self.pending_updates:
-                    self.pending_updates[member_id] = ProfileUpdateBatch(
-                        member_id=member_id,
-                        updates={},
-                        events=[],
-                        requires_role_sync=False
-                    )
-                batch = self.pending_updates[member_id]
-                batch.events.append(event)
-
-                updates = await self._event_to_updates(event)
-                batch.updates.update(updates)
-                batch.requires_role_sync = batch.requires_role_sync or self._requires_role_sync(event)
-
-                if self._is_high_priority(event):
-                    await self._process_batch(batch)
-                    del self.pending_updates[member_id]
+            updates = await self._event_to_updates(event)
+            await self._run(
+                self._merge_sync,
+                event.member_id,
+                updates,
+                _event_to_dict(event),
+                self._requires_role_sync(event)
+            )
+            if self._is_high_priority(event):
+                self._urgent = True
+            self._wakeup.set()
             return True
         except Exception as e:
             logger.error(f"Error queueing update: {e}")
             return False
 
-    async def _process_updates(self):
-        while self.processing:
+    def _merge_sync(self, member_id: int, updates: Dict[str, Any], event: Dict[str, Any], requires_role_sync: bool):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT updates, events, requires_role_sync FROM pending_updates WHERE member_id = ?",
+                (member_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO pending_updates (member_id, updates, events, requires_role_sync, queued_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (member_id, json.dumps(updates, default=str), json.dumps([event], default=str),
+                     int(requires_role_sync), time.time())
+                )
+            else:
+                merged = json.loads(row[0])
+                merged.update(updates)
+                events = json.loads(row[1])
+                events.append(event)
+                # A new event makes the member due again straight away
+                conn.execute(
+                    "UPDATE pending_updates SET updates = ?, events = ?, requires_role_sync = ?, "
+                    "version = version + 1, next_attempt_at = 0 WHERE member_id = ?",
+                    (json.dumps(merged, default=str), json.dumps(events, default=str),
+                     int(bool(row[2]) or requires_role_sync), member_id)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def _flush_loop(self):
+        """Background task that drains the queue in coalesced bulk upserts."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                if not self._urgent:
+                    # Let a burst of events for the same members merge first
+                    await asyncio.sleep(self.coalesce_delay)
+                self._wakeup.clear()
+                self._urgent = False
+
+                try:
+                    with CodaAPIClient.priority(PRIORITY_BACKGROUND):
+                        await self.flush()
+                except Exception as e:
+                    logger.error(f"Error in update processor: {e}", exc_info=True)
+        except asyncio.CancelledError:
+            logger.info("Profile sync task cancelled")
+            raise
+
+    def _batch_size(self, due: int) -> int:
+        """Rows per upsert, sized so the due work fits in the budget left right now."""
+        stats = self.coda.rate_limiter.stats()
+        requests = 1 if stats['rate_limited'] else max(1, int(stats['tokens']) - self.reserved_requests)
+        size = -(-due // requests)
+        return max(self.min_batch_size, min(self.max_batch_size, size))
+
+    async def flush(self) -> int:
+        """Push every due update to Coda. Returns the number of members synced."""
+        batches = await self._run(self._due_batches_sync, time.time())
+        if not batches:
+            return 0
+
+        synced = 0
+        started = time.monotonic()
+        async with AsyncTimer("Profile Update Batch"):
+            batches.sort(key=lambda entry: self._get_batch_priority(entry[0]))
+            size = self._batch_size(len(batches))
+            for i in range(0, len(batches), size):
+                synced += await self._push_batches(batches[i:i + size])
+        self.last_flush_duration = time.monotonic() - started
+        if synced:
+            logger.debug(f"Synced profile updates for {synced} members in {self.last_flush_duration:.2f}s")
+        return synced
+
+    def _due_batches_sync(self, now: float) -> List[Tuple[ProfileUpdateBatch, int, int, float]]:
+        rows = self._connect().execute(
+            "SELECT member_id, updates, events, requires_role_sync, version, attempts, queued_at "
+            "FROM pending_updates WHERE next_attempt_at <= ? ORDER BY queued_at",
+            (now,)
+        ).fetchall()
+        batches = []
+        for member_id, updates, events, requires_role_sync, version, attempts, queued_at in rows:
+            batch = ProfileUpdateBatch(
+                member_id=member_id,
+                updates=json.loads(updates),
+                events=[_event_from_dict(event) for event in json.loads(events)],
+                requires_role_sync=bool(requires_role_sync)
+            )
+            batches.append((batch, version, attempts, queued_at))
+        return batches
+
+    async def _push_batches(self, entries: List[Tuple[ProfileUpdateBatch, int, int, float]]) -> int:
+        """Upsert a chunk of members in one request, then run their follow-ups."""
+        # Members whose events carry no field changes need no Coda write
+        rows = [
+            {'cells': [{'column': MEMBER_KEY_COLUMN, 'value': str(batch.member_id)}] + [
+                {'column': column, 'value': value} for column, value in batch.updates.items()
+            ]}
+            for batch, _, _, _ in entries if batch.updates
+        ]
+        if rows:
+            error = None
             try:
-                async with AsyncTimer("Profile Update Batch"):
-                    async with self.lock:
-                        batches = list(self.pending_updates.values())
-                        self.pending_updates.clear()
-
-                    if batches:
-                        batches.sort(key=lambda b: self._get_batch_priority(b))
-                        
-                        for i in range(0, len(batches), self.batch_size):
-                            chunk = batches[i:i + self.batch_size]
-                            await asyncio.gather(*(self._process_batch(b) for b in chunk))
-                            await asyncio.sleep(self.batch_delay)
-                await asyncio.sleep(1)
+                self.requests += 1
+                # keyColumns makes a retried batch idempotent
+                response = await self.coda.request(
+                    'POST',
+                    f'docs/{self.doc_id}/tables/{self.table_id}/rows',
+                    data={'rows': rows, 'keyColumns': [MEMBER_KEY_COLUMN]}
+                )
+                if response is None:
+                    error = 'no response'
+            except CodaRequestError as e:
+                error = str(e)
             except Exception as e:
-                logger.error(f"Error in update processor: {e}")
-                await asyncio.sleep(5)
+                # Connection errors and timeouts back off per member like API errors
+                logger.error(f"Error pushing profile updates: {e}")
+                error = f"{type(e).__name__}: {e}"
+            if error:
+                self.failed += len(entries)
+                await self._run(self._mark_failed_sync, entries, error)
+                return 0
+
+        now = time.time()
+        await self._run(self._complete_sync, entries)
+        for _, _, _, queued_at in entries:
+            self.last_flush_latency = now - queued_at
+            self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
+        self.flushed += len(entries)
+
+        await asyncio.gather(*(self._after_update(batch) for batch, _, _, _ in entries))
+        return len(entries)
+
+    def _complete_sync(self, entries: List[Tuple[ProfileUpdateBatch, int, int, float]]):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for batch, version, _, _ in entries:
+                row = conn.execute(
+                    "SELECT updates, events, version FROM pending_updates WHERE member_id = ?",
+                    (batch.member_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                if row[2] == version:
+                    conn.execute("DELETE FROM pending_updates WHERE member_id = ?", (batch.member_id,))
+                    continue
+                # Events arrived while this batch was in flight: keep only what was not sent
+                updates = {
+                    column: value for column, value in json.loads(row[0]).items()
+                    if column not in batch.updates or batch.updates[column] != value
+                }
+                events = json.loads(row[1])[len(batch.events):]
+                conn.execute(
+                    "UPDATE pending_updates SET updates = ?, events = ?, attempts = 0, "
+                    "next_attempt_at = 0, last_error = NULL, queued_at = ? WHERE member_id = ?",
+                    (json.dumps(updates, default=str), json.dumps(events, default=str),
+                     time.time(), batch.member_id)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _mark_failed_sync(self, entries: List[Tuple[ProfileUpdateBatch, int, int, float]], error: str):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for batch, _, attempts, _ in entries:
+                delay = min(self.max_backoff, 2 ** attempts * self.flush_interval)
+                conn.execute(
+                    "UPDATE pending_updates SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                    "WHERE member_id = ?",
+                    (time.time() + delay, error[:500], batch.member_id)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.warning(f"Failed to sync profile updates for {len(entries)} members: {error[:200]}")
 
-    async def _process_batch(self, batch: ProfileUpdateBatch) -> bool:
+    async def _after_update(self, batch: ProfileUpdateBatch):
         try:
-            success = await self._update_coda(batch.member_id, batch.updates)
-            if not success:
-                return False
             if batch.requires_role_sync:
                 await self._sync_roles(batch.member_id)
             await self._notify_cogs(batch)
-            return True
         except Exception as e:
             logger.error(f"Error processing batch for {batch.member_id}: {e}")
-            return False
 
-    async def _update_coda(self, member_id: int, updates: Dict[str, Any]) -> bool:
-        try:
-            data = {
-                'row': {
-                    'cells': [
-                        {'column': k, 'value': v}
-                        for k, v in updates.items()
-                    ]
-                }
-            }
-            response = await self.coda.request(
-                'PUT',
-                f'docs/{os.getenv("DOC_ID")}/tables/{os.getenv("PROFILE_TABLE_ID")}/rows/{member_id}',
-                data=data
-            )
-            return response is not None
-        except Exception as e:
-            logger.error(f"Error updating Coda: {e}")
-            return False
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth, flush latency and request counters."""
+        depth, oldest = await self._run(
+            lambda: self._connect().execute(
+                "SELECT COUNT(*), MIN(queued_at) FROM pending_updates"
+            ).fetchone()
+        )
+        return {
+            'queue_depth': depth,
+            'oldest_pending': round(time.time() - oldest, 2) if oldest else 0.0,
+            'flushed': self.flushed,
+            'failed': self.failed,
+            'requests': self.requests,
+            'last_flush_latency': round(self.last_flush_latency, 2),
+            'max_flush_latency': round(self.max_flush_latency, 2),
+            'last_flush_duration': round(self.last_flush_duration, 2),
+        }
 
     async def _sync_roles(self, member_id: int):
         """Synchronize Discord roles with profile data, if needed."""
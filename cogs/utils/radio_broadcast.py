@@ -0,0 +1,197 @@
+# cogs/utils/radio_broadcast.py
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('bot.radio_broadcast')
+
+# Opus frames are 20 ms
+FRAME_DURATION = 0.02
+# Frames kept for listeners that fall slightly behind (1 second)
+BUFFER_FRAMES = 50
+# Volume levels are shared in steps of this size
+VOLUME_STEP = 0.05
+
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
+
+
+def quantize_volume(volume: float) -> float:
+    """Round a 0.0-1.0 volume to the nearest shared level."""
+    volume = max(0.0, min(1.0, volume))
+    return round(round(volume / VOLUME_STEP) * VOLUME_STEP, 2)
+
+
+class StationBroadcast:
+    """
+    One ffmpeg process transcoding a station to Opus at a fixed volume.
+
+    A pacing thread reads one encoded frame every 20 ms into a short ring
+    buffer; every ``BroadcastListener`` replays frames from that buffer, so
+    decoding, volume scaling (done by ffmpeg's ``volume`` filter) and Opus
+    encoding happen once per station and volume instead of once per guild.
+    """
+
+    def __init__(self, hub: 'RadioBroadcaster', url: str, volume: float):
+        self.hub = hub
+        self.url = url
+        self.volume = volume
+        self.listeners = 0
+        self.frames_sent = 0
+
+        self._frames: deque = deque(maxlen=BUFFER_FRAMES)
+        self._seq = 0  # sequence number of the next frame
+        self._finished = False
+        self._cond = threading.Condition()
+        self._source = discord.FFmpegOpusAudio(
+            url,
+            bitrate=128,
+            before_options=FFMPEG_BEFORE_OPTIONS,
+            options=f'-vn -af volume={volume}'
+        )
+        self._thread = threading.Thread(
+            target=self._pump, name=f'radio-broadcast-{volume}', daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def key(self) -> Tuple[str, float]:
+        return (self.url, self.volume)
+
+    def _pump(self):
+        next_at = time.perf_counter()
+        try:
+            while not self._finished:
+                frame = self._source.read()
+                if not frame:
+                    break
+                with self._cond:
+                    self._frames.append(frame)
+                    self._seq += 1
+                    self._cond.notify_all()
+                self.frames_sent += 1
+                next_at += FRAME_DURATION
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind (e.g. stream stall): restart the clock
+                    next_at = time.perf_counter()
+        except Exception as e:
+            logger.error(f"Broadcast of {self.url} failed: {e}")
+        finally:
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+            self._source.cleanup()
+            self.hub._discard(self)
+
+    def latest_seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def frame(self, seq: int, timeout: float) -> Tuple[Optional[bytes], int]:
+        """
+        Return frame ``seq`` (or the oldest buffered frame if it has been
+        dropped) and the sequence number to ask for next. Returns ``None``
+        when the broadcast has ended.
+        """
+        with self._cond:
+            if seq >= self._seq and not self._finished:
+                self._cond.wait(timeout)
+            if seq >= self._seq:
+                return (None, seq) if self._finished else (b'', seq)
+            oldest = self._seq - len(self._frames)
+            seq = max(seq, oldest)
+            return self._frames[seq - oldest], seq + 1
+
+    def stop(self):
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+        # Kill ffmpeg so a pump blocked on a stalled stream exits promptly
+        self._source.cleanup()
+
+
+class BroadcastListener(discord.AudioSource):
+    """Audio source for one voice client, replaying a shared broadcast."""
+
+    def __init__(self, broadcast: StationBroadcast):
+        self.broadcast = broadcast
+        self._next = broadcast.latest_seq()
+        self._closed = False
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        frame, self._next = self.broadcast.frame(self._next, timeout=1.0)
+        if frame is None:
+            return b''
+        # Send silence rather than ending playback on a brief stall
+        return frame or b'\xf8\xff\xfe'
+
+    def cleanup(self):
+        if not self._closed:
+            self._closed = True
+            self.broadcast.hub._unsubscribe(self.broadcast)
+
+
+class RadioBroadcaster:
+    """
+    Shares station pipelines between every voice client tuned to them.
+
+    ``subscribe`` returns an audio source for a voice client; pipelines start
+    with their first listener and stop when the last one leaves.
+    """
+
+    def __init__(self):
+        self._broadcasts: Dict[Tuple[str, float], StationBroadcast] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, url: str, volume: float) -> BroadcastListener:
+        """Return a source playing ``url`` at ``volume``, reusing a running pipeline."""
+        key = (url, quantize_volume(volume))
+        with self._lock:
+            broadcast = self._broadcasts.get(key)
+            if broadcast is None:
+                broadcast = StationBroadcast(self, *key)
+                self._broadcasts[key] = broadcast
+                logger.info(f"Started broadcast of {url} at volume {key[1]}")
+            broadcast.listeners += 1
+        return BroadcastListener(broadcast)
+
+    def _unsubscribe(self, broadcast: StationBroadcast):
+        with self._lock:
+            broadcast.listeners -= 1
+            if broadcast.listeners > 0:
+                return
+            if self._broadcasts.get(broadcast.key) is broadcast:
+                del self._broadcasts[broadcast.key]
+        broadcast.stop()
+        logger.info(f"Stopped broadcast of {broadcast.url} at volume {broadcast.volume}")
+
+    def _discard(self, broadcast: StationBroadcast):
+        with self._lock:
+            if self._broadcasts.get(broadcast.key) is broadcast:
+                del self._broadcasts[broadcast.key]
+
+    def stop_all(self):
+        """Stop every pipeline."""
+        with self._lock:
+            broadcasts = list(self._broadcasts.values())
+            self._broadcasts.clear()
+        for broadcast in broadcasts:
+            broadcast.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Running pipelines and listeners."""
+        with self._lock:
+            return {
+                'broadcasts': len(self._broadcasts),
+                'listeners': sum(b.listeners for b in self._broadcasts.values()),
+            }
@@ -0,0 +1,194 @@
+# cogs/utils/radio_metadata.py
+
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+import aiohttp
+
+logger = logging.getLogger('bot.radio_metadata')
+
+_STREAM_TITLE = re.compile(r"StreamTitle='(.*?)';", re.DOTALL)
+
+# Callback(station_key, text, guild_ids) run when a station's metadata changes
+MetadataCallback = Callable[[str, Optional[str], Set[int]], Awaitable[None]]
+
+
+def parse_stream_title(block: bytes) -> Optional[str]:
+    """Extract StreamTitle from an ICY metadata block."""
+    text = block.rstrip(b'\x00').decode('utf-8', errors='replace')
+    match = _STREAM_TITLE.search(text)
+    if not match:
+        return None
+    return match.group(1).strip() or None
+
+
+class StationWatcher:
+    """
+    Follows one station's in-band ICY metadata over a single connection.
+
+    With ``Icy-MetaData: 1`` the server interleaves a metadata block after
+    every ``icy-metaint`` audio bytes; the audio is skipped and each
+    StreamTitle change is reported immediately. Streams without ICY
+    metadata only report their header information, re-read periodically.
+    """
+
+    def __init__(self, service: 'RadioMetadataService', key: str, url: str):
+        self.service = service
+        self.key = key
+        self.url = url
+        self.guilds: Set[int] = set()
+        self.header_info: Dict[str, str] = {}
+        self.title: Optional[str] = None
+        self.text: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def describe(self) -> Optional[str]:
+        """Now-playing text in the format used by the now-playing embed."""
+        result = []
+        if self.header_info.get('name'):
+            result.append(f"**{self.header_info['name']}**")
+        if self.title:
+            result.append(f"**Now Playing:** {self.title}")
+        genre = self.header_info.get('genre')
+        if genre and "Variety" not in genre:
+            result.append(f"**Genre:** {genre}")
+        if self.header_info.get('description'):
+            result.append(f"**Info:** {self.header_info['description']}")
+        return "\n".join(result) if result else None
+
+    async def _publish(self):
+        text = self.describe()
+        if text and text != self.text:
+            self.text = text
+            await self.service._notify(self, text)
+
+    async def run(self):
+        delay = self.service.retry_delay
+        try:
+            while self.guilds:
+                try:
+                    if not await self._follow():
+                        # Headers only: check them again later
+                        delay = self.service.retry_delay
+                        await asyncio.sleep(self.service.header_refresh)
+                        continue
+                    delay = self.service.retry_delay
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Metadata connection to {self.url} failed: {e}")
+                # Reconnect with backoff while anyone is still listening
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.service.max_retry_delay)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self.service._watchers.get(self.key) is self:
+                del self.service._watchers[self.key]
+
+    async def _follow(self) -> bool:
+        """Read metadata until the stream ends. Returns False if it has none."""
+        session = await self.service._get_session()
+        async with session.get(self.url, headers={'Icy-MetaData': '1'}) as response:
+            self.header_info = {
+                field: response.headers.get(f'icy-{field}', '').strip()
+                for field in ('name', 'genre', 'description')
+            }
+            try:
+                metaint = int(response.headers.get('icy-metaint', 0))
+            except ValueError:
+                metaint = 0
+
+            await self._publish()
+            if metaint <= 0:
+                logger.info(f"{self.url} does not send ICY metadata")
+                return False
+
+            while self.guilds:
+                await response.content.readexactly(metaint)
+                length = (await response.content.readexactly(1))[0] * 16
+                if not length:
+                    continue
+                title = parse_stream_title(await response.content.readexactly(length))
+                if title and title != self.title:
+                    self.title = title
+                    await self._publish()
+        return True
+
+
+class RadioMetadataService:
+    """
+    Shared now-playing metadata for radio stations.
+
+    One watcher per station (not per guild) holds a persistent connection
+    and pushes track changes to every guild tuned to it through
+    ``on_change``. Watchers stop when their last guild leaves.
+    """
+
+    def __init__(
+        self,
+        on_change: MetadataCallback,
+        retry_delay: float = 5.0,
+        max_retry_delay: float = 300.0,
+        header_refresh: float = 600.0
+    ):
+        self.on_change = on_change
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.header_refresh = header_refresh
+        self._watchers: Dict[str, StationWatcher] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # Streams never end, so only bound connecting and stalls
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None, connect=15, sock_read=60)
+            )
+        return self._session
+
+    def watch(self, key: str, url: str, guild_id: int) -> Optional[str]:
+        """
+        Follow ``key`` for ``guild_id``, leaving any other station it was on.
+
+        Returns the station's last known now-playing text, if any.
+        """
+        self.unwatch(guild_id, keep=key)
+        watcher = self._watchers.get(key)
+        if watcher is None or watcher.url != url:
+            if watcher is not None and watcher.task:
+                watcher.task.cancel()
+            watcher = StationWatcher(self, key, url)
+            self._watchers[key] = watcher
+        watcher.guilds.add(guild_id)
+        if watcher.task is None or watcher.task.done():
+            watcher.task = asyncio.create_task(watcher.run())
+        return watcher.text
+
+    def unwatch(self, guild_id: int, keep: Optional[str] = None):
+        """Stop following metadata for ``guild_id``."""
+        for key, watcher in list(self._watchers.items()):
+            if key == keep or guild_id not in watcher.guilds:
+                continue
+            watcher.guilds.discard(guild_id)
+            if not watcher.guilds:
+                del self._watchers[key]
+                if watcher.task:
+                    watcher.task.cancel()
+
+    async def _notify(self, watcher: StationWatcher, text: str):
+        try:
+            await self.on_change(watcher.key, text, set(watcher.guilds))
+        except Exception as e:
+            logger.error(f"Error publishing metadata for {watcher.key}: {e}")
+
+    async def close(self):
+        """Stop every watcher and close the HTTP session."""
+        for watcher in list(self._watchers.values()):
+            if watcher.task:
+                watcher.task.cancel()
+        self._watchers.clear()
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -1,12 +1,28 @@
 import asyncio
 import logging
+import re
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 import time
+import aiohttp
 import discord
 
 logger = logging.getLogger('rate_limit')
 
+# Snowflakes that are not a route's major parameter share its bucket
+_MINOR_ID = re.compile(r'(?<=/)(?<!/guilds/)(?<!/channels/)(?<!/webhooks/)\d{15,}')
+
+
+def route_key(method: str, path: str) -> str:
+    """Key a Discord API request by the route it counts against, e.g. ``PATCH /guilds/1/members/{id}``."""
+    path = re.sub(r'^/api/v\d+', '', path)
+    return f"{method.upper()} {_MINOR_ID.sub('{id}', path)}"
+
+
+def member_route(guild_id: int) -> str:
+    """The route member edits in ``guild_id`` count against."""
+    return f"PATCH /guilds/{guild_id}/members/{{id}}"
+
 class RateBucket:
     def __init__(self, bucket_hash: str):
         self.bucket_hash = bucket_hash
@@ -34,6 +50,8 @@ class RateBucket:
 class RateLimitManager:
     def __init__(self):
         self.buckets: Dict[str, RateBucket] = {}
+        # Route key -> the bucket hash Discord reported for it
+        self.routes: Dict[str, str] = {}
         self.global_lock = asyncio.Lock()
         self.global_limit_remaining = 50  # Discord's default global limit
         self.global_reset_after = 1.0
@@ -60,6 +78,8 @@ class RateLimitManager:
                         return bucket.reset_time - now
                     if now >= bucket.reset_time:
                         bucket.remaining = bucket.limit
+                    # Reserve a slot until the response headers correct the count
+                    bucket.remaining -= 1
 
             self.global_limit_remaining -= 1
             return 0
@@ -106,6 +126,37 @@ class RateLimitManager:
             
         self.buckets[bucket_hash].update_from_headers(headers)
 
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        An aiohttp trace config for the bot's HTTP session, so every Discord
+        response updates the bucket for its route.
+        """
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params: aiohttp.TraceRequestEndParams):
+            headers = params.response.headers
+            bucket_hash = headers.get('X-RateLimit-Bucket')
+            if not bucket_hash:
+                return
+            self.routes[route_key(params.method, params.url.path)] = bucket_hash
+            await self.update_bucket(dict(headers), bucket_hash)
+
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def route_bucket(self, route: str) -> Optional[RateBucket]:
+        """The bucket Discord has reported for ``route``, if any."""
+        bucket_hash = self.routes.get(route)
+        return self.buckets.get(bucket_hash) if bucket_hash else None
+
+    async def acquire_route(self, route: str):
+        """Wait until the bucket serving ``route`` has room for one more request."""
+        while True:
+            wait_time = await self.pre_request_check(self.routes.get(route, route))
+            if wait_time <= 0:
+                return
+            await asyncio.sleep(wait_time)
+
     async def execute_with_ratelimit(self, bucket_hash: str, coroutine, *args, **kwargs):
         """Execute a coroutine with rate limit handling."""
         max_retries = 5
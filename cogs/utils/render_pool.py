@@ -0,0 +1,109 @@
+# cogs/utils/render_pool.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .cache_service import CacheService
+
+logger = logging.getLogger('bot.render')
+
+# Imported by every worker when it starts, so the first render is not slow
+WARM_MODULES = ('matplotlib.figure', 'matplotlib.backends.backend_agg', 'numpy', 'reportlab.platypus')
+
+
+def _warm_up(modules: Sequence[str]):
+    # Workers log to stderr only; the bot's log files belong to the main process
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - render worker - %(levelname)s - %(message)s')
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    for module in modules:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def render_key(func: Callable[[Any], Any], payload: Any) -> str:
+    """Cache key for rendering ``payload`` with ``func``."""
+    digest = hashlib.blake2b(
+        json.dumps(payload, sort_keys=True, default=str).encode('utf-8'), digest_size=16
+    ).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+
+class RenderPool:
+    """
+    Runs CPU-bound renders (matplotlib charts, reportlab PDFs) in worker
+    processes so they neither block the event loop nor share one core.
+
+    ``render`` takes a module-level function and a JSON-serialisable
+    payload and returns the function's result (PNG/PDF bytes). Results
+    are cached by a hash of the function and payload, and identical
+    renders in flight share one job, so repeat views skip rendering.
+    """
+
+    def __init__(
+        self,
+        cache_service: Optional[CacheService] = None,
+        max_workers: Optional[int] = None,
+        cache_size: int = 256,
+        cache_ttl: float = 6 * 3600.0
+    ):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._cache = (cache_service or CacheService()).namespace('render', maxsize=cache_size, ttl=cache_ttl)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.renders = 0
+        self.failures = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the bot's threads or sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_up,
+                initargs=(WARM_MODULES,)
+            )
+            logger.info(f"Render pool started with {self.max_workers} workers")
+        return self._executor
+
+    async def render(self, func: Callable[[Any], Any], payload: Any, cache: bool = True) -> Any:
+        """Render ``payload`` with ``func`` in a worker, using the cache when allowed."""
+        if not cache:
+            return await self._run(func, payload)
+        return await self._cache.get_or_load(render_key(func, payload), lambda: self._run(func, payload))
+
+    async def _run(self, func: Callable[[Any], Any], payload: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        self.renders += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, payload)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            self.failures += 1
+            logger.error("Render worker crashed; restarting the pool")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            raise
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Render pool stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker count, renders run and cache counters."""
+        return {
+            'workers': self.max_workers,
+            'renders': self.renders,
+            'failures': self.failures,
+            'cache': self._cache.stats(),
+        }
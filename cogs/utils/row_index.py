@@ -0,0 +1,143 @@
+# cogs/utils/row_index.py
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger('bot.row_index')
+
+# Namespaces used across the bot
+PROFILES = 'profiles'
+ACCOUNTS = 'accounts'
+LOANS = 'loans'
+
+
+class CodaRowIndex:
+    """
+    Persistent index from a stable key (usually a Discord user ID) to a Coda row ID.
+
+    Row IDs never change once a row exists, so callers can go straight to
+    ``rows/{row_id}`` instead of running a ``query=`` filter first. The index
+    is filled incrementally from every lookup or table scan and saved to disk
+    in the background. Entries are dropped when Coda reports the row missing.
+    """
+
+    def __init__(self, index_file: str = "coda_row_index.json", save_interval: int = 30):
+        self._index_file = index_file
+        self.save_interval = save_interval
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+        logger.info("Coda row index initialized")
+
+    def _load(self):
+        """Load the index from disk."""
+        if not os.path.exists(self._index_file):
+            return
+        try:
+            with open(self._index_file, 'r') as f:
+                self._index = json.load(f)
+            total = sum(len(entries) for entries in self._index.values())
+            logger.info(f"Loaded {total} row IDs from {self._index_file}")
+        except Exception as e:
+            logger.error(f"Error loading row index: {e}")
+            self._index = {}
+
+    def start(self):
+        """Start the background save task."""
+        if self._save_task is None:
+            self._save_task = asyncio.create_task(self._background_save())
+
+    async def stop(self):
+        """Stop the background save task and save the index."""
+        if self._save_task:
+            self._save_task.cancel()
+            try:
+                await self._save_task
+            except asyncio.CancelledError:
+                pass
+            self._save_task = None
+        await self.save()
+
+    async def save(self):
+        """Write the index to disk if it changed."""
+        if not self._dirty:
+            return
+        snapshot = json.dumps(self._index)
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Error saving row index: {e}")
+
+    def _write(self, snapshot: str):
+        tmp_file = f"{self._index_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_file, self._index_file)
+
+    async def _background_save(self):
+        try:
+            while True:
+                await asyncio.sleep(self.save_interval)
+                await self.save()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in row index save task: {e}")
+
+    def get(self, namespace: str, key: Any) -> Optional[str]:
+        """Return the row ID for a key, or None if it is not indexed."""
+        row_id = self._index.get(namespace, {}).get(str(key))
+        if row_id:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return row_id
+
+    def set(self, namespace: str, key: Any, row_id: Optional[str]):
+        """Record the row ID for a key."""
+        if not row_id or key in (None, ''):
+            return
+        entries = self._index.setdefault(namespace, {})
+        key = str(key)
+        if entries.get(key) != row_id:
+            entries[key] = row_id
+            self._dirty = True
+
+    def discard(self, namespace: str, key: Any):
+        """Forget a key, e.g. after Coda reported its row as deleted."""
+        if self._index.get(namespace, {}).pop(str(key), None) is not None:
+            self._dirty = True
+
+    def learn(self, namespace: str, rows: Iterable[Dict[str, Any]], key_column: str) -> int:
+        """
+        Index rows returned by any Coda rows query.
+
+        Rows must have been fetched with ``useColumnNames`` so ``key_column``
+        is present in their values. Returns the number of rows indexed.
+        """
+        learned = 0
+        for row in rows:
+            key = row.get('values', {}).get(key_column)
+            if isinstance(key, str):
+                key = key.strip('`').strip()
+            if key and row.get('id'):
+                self.set(namespace, key, row['id'])
+                learned += 1
+        return learned
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size per namespace plus hit/miss counters."""
+        return {
+            'sizes': {namespace: len(entries) for namespace, entries in self._index.items()},
+            'hits': self.hits,
+            'misses': self.misses,
+        }
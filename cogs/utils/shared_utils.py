@@ -13,6 +13,8 @@ import pytz
 from pathlib import Path
 import asyncio
 
+from .snapshot_store import SnapshotStore
+
 logger = logging.getLogger('shared_utils')
 
 # CodaAPIManager has been removed. Please use CodaAPIClient from coda_api.py instead:
@@ -141,11 +143,19 @@ class SharedAuditLogger:
             logger.error(f"Error flushing audit logs: {e}")
 
 class BackupManager:
-    """Handles data backups across all systems."""
+    """Handles data backups across all systems, as deduplicated snapshots."""
     
     def __init__(self, base_dir: str = 'backups'):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._stores: Dict[str, SnapshotStore] = {}
+        
+    def _store(self, system_name: str) -> SnapshotStore:
+        store = self._stores.get(system_name)
+        if store is None:
+            store = SnapshotStore(str(self.base_dir / system_name))
+            self._stores[system_name] = store
+        return store
         
     async def create_backup(
         self,
@@ -153,81 +163,52 @@ class BackupManager:
         system_name: str,
         backup_type: str = 'auto'
     ) -> Path:
-        """Create a backup file with versioning."""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_dir = self.base_dir / system_name
-        backup_dir.mkdir(exist_ok=True)
-        
-        filename = f"{backup_type}_{timestamp}.json"
-        filepath = backup_dir / filename
-        
+        """Snapshot ``data``; only rows that changed since the last backup are stored."""
+        store = self._store(system_name)
         try:
-            # Try to use aiofiles (async) but fall back to regular file ops if not available
-            try:
-                import aiofiles
-                async with aiofiles.open(filepath, 'w') as f:
-                    await f.write(json.dumps(data, indent=2))
-            except ImportError:
-                logger.warning("aiofiles not available, using synchronous file operations")
-                with open(filepath, 'w') as f:
-                    f.write(json.dumps(data, indent=2))
+            snapshot = await store.create(data, label=backup_type)
+            # Maintain backup retention
+            await store.prune()
             
-            # Maintain backup rotation
-            await self._rotate_backups(backup_dir, backup_type)
-            
-            logger.info(f"Created backup: {filepath}")
-            return filepath
+            logger.info(f"Created backup {system_name}/{snapshot['id']} ({snapshot['added']} new rows)")
+            return Path(store.base_dir) / 'manifests' / f"{snapshot['id']}.json.gz"
             
         except Exception as e:
             logger.error(f"Backup failed: {e}")
             # Return a default path instead of raising to avoid disrupting operations
             return self.base_dir / "backup_failed.json"
-            
-    async def _rotate_backups(self, backup_dir: Path, backup_type: str, keep: int = 5):
-        """Maintain limited number of backups per type."""
-        pattern = f"{backup_type}_*.json"
-        backups = sorted(backup_dir.glob(pattern))
-        
-        while len(backups) > keep:
-            oldest = backups.pop(0)
-            try:
-                oldest.unlink()
-                logger.info(f"Removed old backup: {oldest}")
-            except Exception as e:
-                logger.error(f"Failed to remove old backup {oldest}: {e}")
+
+    def list_backups(self, system_name: str) -> List[Dict[str, Any]]:
+        """Summaries of a system's snapshots, oldest first."""
+        return self._store(system_name).list_snapshots()
 
     async def restore_from_backup(
         self,
         system_name: str,
-        backup_id: Optional[str] = None
+        backup_id: Optional[str] = None,
+        at: Optional[datetime] = None
     ) -> Optional[Dict[str, Any]]:
-        """Restore data from a backup file."""
+        """
+        Restore data from a snapshot: ``backup_id``, the newest one taken at
+        or before ``at``, or the latest.
+        """
         backup_dir = self.base_dir / system_name
         
-        if not backup_id:
-            # Get latest backup
-            backups = sorted(backup_dir.glob("*.json"))
-            if not backups:
-                return None
-            backup_path = backups[-1]
-        else:
+        # Backups written before snapshots existed are plain JSON files
+        if backup_id and (backup_dir / f"{backup_id}.json").exists():
             backup_path = backup_dir / f"{backup_id}.json"
-            
-        if not backup_path.exists():
-            return None
+            try:
+                data = json.loads(await asyncio.to_thread(backup_path.read_text))
+                logger.info(f"Restored from backup: {backup_path}")
+                return data
+            except Exception as e:
+                logger.error(f"Restore failed: {e}")
+                return None
             
         try:
-            # Try to use aiofiles but fall back to regular file ops if not available
-            try:
-                import aiofiles
-                async with aiofiles.open(backup_path, 'r') as f:
-                    data = json.loads(await f.read())
-            except ImportError:
-                logger.warning("aiofiles not available, using synchronous file operations")
-                with open(backup_path, 'r') as f:
-                    data = json.load(f)
-                    
-            logger.info(f"Restored from backup: {backup_path}")
+            data = await self._store(system_name).restore(backup_id, at=at)
+            if data is not None:
+                logger.info(f"Restored {system_name} from snapshot {backup_id or at or 'latest'}")
             return data
         except Exception as e:
             logger.error(f"Restore failed: {e}")
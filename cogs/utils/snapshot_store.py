@@ -0,0 +1,331 @@
+# cogs/utils/snapshot_store.py
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('bot.snapshots')
+
+
+def _row_hash(row: Any) -> str:
+    payload = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _write_gz(path: str, data: Any):
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'), default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_gz(path: str) -> Any:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SnapshotStore:
+    """
+    Deduplicated, compressed snapshots of tabular data.
+
+    Every row is hashed by content. A snapshot writes only the rows whose
+    hash is not already stored, as one gzip chunk, plus a small manifest
+    listing each row's key, hash and chunk. Any snapshot can be rebuilt
+    from its manifest, so disk use and write time follow the number of
+    changed rows rather than the size of the table.
+
+    Layout under ``base_dir``::
+
+        manifests/<snapshot_id>.json.gz
+        chunks/<chunk_id>.json.gz        {row_hash: row}
+
+    Retention keeps the newest ``keep_last`` snapshots plus the newest one
+    per day, week and month for ``keep_daily``/``keep_weekly``/``keep_monthly``
+    periods; chunks no longer referenced by any manifest are deleted.
+    Manifest metadata is indexed in memory on first use, so listing,
+    lookups and pruning do not decompress every manifest again.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        keep_last: int = 48,
+        keep_daily: int = 30,
+        keep_weekly: int = 12,
+        keep_monthly: int = 12
+    ):
+        self.base_dir = base_dir
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.keep_monthly = keep_monthly
+        self._manifest_dir = os.path.join(base_dir, 'manifests')
+        self._chunk_dir = os.path.join(base_dir, 'chunks')
+        self._lock = threading.Lock()
+
+        # Row hash -> chunk ID for the rows of the latest snapshot
+        self._known: Optional[Dict[str, str]] = None
+        # Snapshot ID -> manifest summary and chunk IDs
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._chunk_cache: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def create(
+        self,
+        data: Any,
+        key_field: Optional[str] = None,
+        label: Optional[str] = None,
+        created_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Store ``data`` (a list of rows or a dict of key -> row) as a snapshot.
+
+        List rows are keyed by ``key_field`` when given. Returns the
+        snapshot's summary (ID, row count, rows added, bytes written).
+        """
+        return await asyncio.to_thread(self._create_sync, data, key_field, label, created_at)
+
+    async def restore(self, snapshot_id: Optional[str] = None, at: Optional[datetime] = None) -> Optional[Any]:
+        """
+        Rebuild a snapshot's data.
+
+        Uses ``snapshot_id`` if given, otherwise the newest snapshot taken at
+        or before ``at``, otherwise the newest snapshot.
+        """
+        return await asyncio.to_thread(self._restore_sync, snapshot_id, at)
+
+    async def prune(self) -> int:
+        """Apply the retention policy. Returns the number of snapshots removed."""
+        return await asyncio.to_thread(self._prune_sync)
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """Summaries of every snapshot, oldest first."""
+        entries = sorted(list(self._load_index().values()), key=lambda entry: entry['id'])
+        return [{key: value for key, value in entry.items() if key != 'chunks'} for entry in entries]
+
+    def find(self, at: datetime) -> Optional[str]:
+        """ID of the newest snapshot taken at or before ``at``."""
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        found = None
+        for snapshot in self.list_snapshots():
+            if datetime.fromisoformat(snapshot['created_at']) <= at:
+                found = snapshot['id']
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot and chunk counts and bytes on disk."""
+        def size(directory: str) -> Tuple[int, int]:
+            if not os.path.isdir(directory):
+                return 0, 0
+            names = [name for name in os.listdir(directory) if name.endswith('.json.gz')]
+            return len(names), sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+
+        manifests, manifest_bytes = size(self._manifest_dir)
+        chunks, chunk_bytes = size(self._chunk_dir)
+        return {
+            'snapshots': manifests,
+            'chunks': chunks,
+            'bytes': manifest_bytes + chunk_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _snapshot_ids(self) -> List[str]:
+        if not os.path.isdir(self._manifest_dir):
+            return []
+        return sorted(name[:-len('.json.gz')] for name in os.listdir(self._manifest_dir) if name.endswith('.json.gz'))
+
+    def _read_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        return _read_gz(os.path.join(self._manifest_dir, f"{snapshot_id}.json.gz"))
+
+    @staticmethod
+    def _summary(manifest: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': manifest['id'],
+            'label': manifest.get('label'),
+            'created_at': manifest['created_at'],
+            'rows': len(manifest['rows']),
+            'added': manifest.get('added', 0),
+            'chunks': list(manifest['chunks']),
+        }
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            index = {}
+            for snapshot_id in self._snapshot_ids():
+                summary = self._summary(self._read_manifest(snapshot_id))
+                summary['id'] = snapshot_id
+                index[snapshot_id] = summary
+            self._index = index
+        return self._index
+
+    def _read_chunk(self, chunk_id: str) -> Dict[str, Any]:
+        chunk = self._chunk_cache.get(chunk_id)
+        if chunk is None:
+            chunk = _read_gz(os.path.join(self._chunk_dir, f"{chunk_id}.json.gz"))
+            if len(self._chunk_cache) >= 64:
+                self._chunk_cache.pop(next(iter(self._chunk_cache)))
+            self._chunk_cache[chunk_id] = chunk
+        return chunk
+
+    def _load_known(self) -> Dict[str, str]:
+        if self._known is None:
+            self._known = {}
+            snapshot_ids = sorted(self._load_index())
+            if snapshot_ids:
+                manifest = self._read_manifest(snapshot_ids[-1])
+                chunks = manifest['chunks']
+                self._known = {row[1]: chunks[row[2]] for row in manifest['rows']}
+        return self._known
+
+    def _create_sync(self, data: Any, key_field: Optional[str], label: Optional[str], created_at: Optional[datetime]) -> Dict[str, Any]:
+        created_at = created_at or datetime.now(timezone.utc)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        if isinstance(data, dict):
+            kind = 'dict'
+            items = [(str(key), row) for key, row in data.items()]
+        else:
+            kind = 'list'
+            items = [
+                (str(row.get(key_field)) if key_field and isinstance(row, dict) else None, row)
+                for row in data
+            ]
+
+        with self._lock:
+            os.makedirs(self._manifest_dir, exist_ok=True)
+            os.makedirs(self._chunk_dir, exist_ok=True)
+            known = self._load_known()
+
+            hashed = [(key, _row_hash(row), row) for key, row in items]
+            new_rows = {row_hash: row for _, row_hash, row in hashed if row_hash not in known}
+
+            chunk_id = None
+            written = 0
+            if new_rows:
+                chunk_id = hashlib.blake2b(''.join(sorted(new_rows)).encode('utf-8'), digest_size=12).hexdigest()
+                chunk_path = os.path.join(self._chunk_dir, f"{chunk_id}.json.gz")
+                if not os.path.exists(chunk_path):
+                    _write_gz(chunk_path, new_rows)
+                    written += os.path.getsize(chunk_path)
+
+            chunk_ids: List[str] = []
+            chunk_pos: Dict[str, int] = {}
+            rows = []
+            current: Dict[str, str] = {}
+            for key, row_hash, _ in hashed:
+                row_chunk = known.get(row_hash, chunk_id)
+                if row_chunk not in chunk_pos:
+                    chunk_pos[row_chunk] = len(chunk_ids)
+                    chunk_ids.append(row_chunk)
+                rows.append([key, row_hash, chunk_pos[row_chunk]])
+                current[row_hash] = row_chunk
+
+            snapshot_id = created_at.strftime('%Y%m%d_%H%M%S')
+            index = self._load_index()
+            existing = set(index)
+            suffix = 1
+            base_id = snapshot_id
+            while snapshot_id in existing:
+                suffix += 1
+                snapshot_id = f"{base_id}_{suffix}"
+
+            manifest = {
+                'id': snapshot_id,
+                'label': label,
+                'created_at': created_at.isoformat(),
+                'kind': kind,
+                'chunks': chunk_ids,
+                'rows': rows,
+                'added': len(new_rows),
+            }
+            manifest_path = os.path.join(self._manifest_dir, f"{snapshot_id}.json.gz")
+            _write_gz(manifest_path, manifest)
+            written += os.path.getsize(manifest_path)
+            index[snapshot_id] = self._summary(manifest)
+
+            if snapshot_id == max(existing | {snapshot_id}):
+                self._known = current
+
+        return {
+            'id': snapshot_id,
+            'rows': len(rows),
+            'added': len(new_rows),
+            'bytes': written,
+        }
+
+    def _restore_sync(self, snapshot_id: Optional[str], at: Optional[datetime]) -> Optional[Any]:
+        with self._lock:
+            if snapshot_id is None:
+                if at is not None:
+                    snapshot_id = self.find(at)
+                else:
+                    snapshot_ids = sorted(self._load_index())
+                    snapshot_id = snapshot_ids[-1] if snapshot_ids else None
+            if snapshot_id is None or not os.path.exists(os.path.join(self._manifest_dir, f"{snapshot_id}.json.gz")):
+                return None
+
+            manifest = self._read_manifest(snapshot_id)
+            chunks = [self._read_chunk(chunk_id) for chunk_id in manifest['chunks']]
+            if manifest['kind'] == 'dict':
+                return {key: chunks[pos][row_hash] for key, row_hash, pos in manifest['rows']}
+            return [chunks[pos][row_hash] for _, row_hash, pos in manifest['rows']]
+
+    def _retained(self, snapshots: List[Dict[str, Any]]) -> set:
+        keep = {snapshot['id'] for snapshot in snapshots[-self.keep_last:]} if self.keep_last else set()
+        now = datetime.now(timezone.utc)
+        periods = [
+            (self.keep_daily, timedelta(days=1), lambda t: t.date()),
+            (self.keep_weekly, timedelta(weeks=1), lambda t: t.isocalendar()[:2]),
+            (self.keep_monthly, timedelta(days=31), lambda t: (t.year, t.month)),
+        ]
+        for count, length, bucket_of in periods:
+            if not count:
+                continue
+            cutoff = now - length * count
+            newest: Dict[Any, str] = {}
+            for snapshot in snapshots:
+                created_at = datetime.fromisoformat(snapshot['created_at'])
+                if created_at >= cutoff:
+                    # Snapshots are oldest first, so the last one per bucket wins
+                    newest[bucket_of(created_at)] = snapshot['id']
+            keep.update(newest.values())
+        return keep
+
+    def _prune_sync(self) -> int:
+        with self._lock:
+            snapshots = self.list_snapshots()
+            keep = self._retained(snapshots)
+            removed = 0
+            for snapshot in snapshots:
+                if snapshot['id'] not in keep:
+                    os.remove(os.path.join(self._manifest_dir, f"{snapshot['id']}.json.gz"))
+                    self._index.pop(snapshot['id'], None)
+                    removed += 1
+            if not removed:
+                return 0
+
+            referenced = set()
+            for entry in self._index.values():
+                referenced.update(entry['chunks'])
+            for name in os.listdir(self._chunk_dir):
+                chunk_id = name[:-len('.json.gz')]
+                if name.endswith('.json.gz') and chunk_id not in referenced:
+                    os.remove(os.path.join(self._chunk_dir, name))
+                    self._chunk_cache.pop(chunk_id, None)
+            self._known = None
+        logger.info(f"Pruned {removed} snapshots from {self.base_dir}")
+        return removed
@@ -15,17 +15,15 @@ import asyncio
 from datetime import datetime
 from decimal import Decimal
 
+from .utils.log_pipeline import add_log_file
+
 if TYPE_CHECKING:
     from discord import Interaction, Member, ButtonStyle, Color
     from discord.ui import Button, Select
     from .banking import TransactionType, TransactionData, BankingCog
 
 logger = logging.getLogger('command_hub')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='command_hub.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+add_log_file(logger.name, 'command_hub.log')
 
 # Guild ID for commands
 GUILD_ID = int(os.getenv('GUILD_ID', 0))
@@ -1392,22 +1390,10 @@ class CommandHubCog(commands.Cog):
     
     async def autocomplete_user(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete handler for user names"""
-        # Get all members in the guild
-        members = interaction.guild.members
-        
-        # Filter members that match the current input
-        matches = []
-        for member in members:
-            if (current.lower() in member.name.lower() or 
-                current.lower() in member.display_name.lower() or
-                (member.nick and current.lower() in member.nick.lower())):
-                matches.append(member)
-        
-        # Return up to 25 choices (Discord's limit)
-        return [
-            app_commands.Choice(name=f"{member.display_name} ({member.name})", value=str(member.id))
-            for member in matches[:25]
-        ]
+        if interaction.guild is None:
+            return []
+        # Served from the shared per-guild member index
+        return self.bot.autocomplete.members.search(interaction.guild, current)
     
     async def autocomplete_mission(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete handler for mission names"""
@@ -322,20 +322,12 @@ class FleetSelectionCog(commands.Cog):
             if not fleet_role:
                 return False, f"Could not find the {fleet_component} role"
                 
-            # Remove other fleet component roles
-            other_fleet_roles = [
-                role for role in member.roles
-                if role.name in ["Command Staff", "Navy Fleet", "Marine Expeditionary Force", 
-                                "Industrial & Logistics Wing", "Support & Medical Fleet", 
-                                "Exploration & Intelligence Wing", "Non-Fleet"]
-                and role.name != fleet_component
-            ]
-            
-            if other_fleet_roles:
-                await member.remove_roles(*other_fleet_roles, reason="Fleet component change")
-                
-            # Add new fleet component role
-            await member.add_roles(fleet_role, reason="Fleet component assignment")
+            # The new fleet component replaces any other one in a single edit
+            await self.bot.services.get('member_reconciler').reconcile(
+                member,
+                division=fleet_component,
+                reason="Fleet component assignment"
+            )
             
             # Update database record - Now with improved error handling
             db_success = await self.update_fleet_in_database(member.id, fleet_component)
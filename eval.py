@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Any, Set, Tuple, TYPE_CHECKING
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import logging
 import os
@@ -14,6 +14,7 @@ from enum import Enum
 
 # Import BaseCog instead of using commands.Cog directly
 from .utils.base_cog import BaseCog
+from .utils.log_pipeline import add_log_file
 
 if TYPE_CHECKING:
     from .utils.profile_utils import calculate_activity_score
@@ -25,12 +26,7 @@ if TYPE_CHECKING:
 
 # Configure logging
 logger = logging.getLogger('evaluation')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='evaluation.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'evaluation.log')
 
 GUILD_ID = int(os.getenv('GUILD_ID'))
 
@@ -284,7 +280,7 @@ class EvaluationCog(BaseCog):
         self.coda = self.coda_client
         self._profile_cog = None
         self.evaluations = {}
-        self.eval_reminder.start()
+        self.scheduler.add('eval.reminder', '0 9 * * *', self.eval_reminder, heavy=True)
 
     @property
     def profile_cog(self):
@@ -293,7 +289,7 @@ class EvaluationCog(BaseCog):
         return self._profile_cog
 
     def cog_unload(self):
-        self.eval_reminder.cancel()
+        self.scheduler.remove('eval.reminder')
 
     def has_command_staff_role(self, member: discord.Member) -> bool:
         return any(role.name in COMMAND_STAFF_ROLES for role in member.roles)
@@ -414,7 +410,6 @@ class EvaluationCog(BaseCog):
             logger.error(f"Error recommending promotion: {e}")
             return False, str(e)
 
-    @tasks.loop(hours=24)
     async def eval_reminder(self):
         """Send reminders for pending evaluations."""
         guild = self.bot.get_guild(GUILD_ID)
@@ -5,45 +5,23 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 import os
-import aiohttp
-import asyncio
 from typing import Optional, Dict, Any
 from urllib.parse import quote
-from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 
+from .utils.coda_api import CodaAPIClient, CodaRequestError
+from .utils.row_index import PROFILES
+from .utils.log_pipeline import add_log_file
+
 # ------------------------------ Logging Setup ------------------------------
 logger = logging.getLogger('fixer')
-logger.setLevel(logging.INFO)
-
-handler = RotatingFileHandler(
-    filename='fixer.log',
-    maxBytes=5 * 1024 * 1024,  # 5 MB
-    backupCount=5,
-    encoding='utf-8',
-    mode='a'
-)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'fixer.log')
 
 # Setup Duplicate Logger for tracking multiple entries
 class DuplicateLogHandler:
     def __init__(self, log_file: str = "duplicate_records.log"):
         self.logger = logging.getLogger('duplicate_handler')
-        self.logger.setLevel(logging.INFO)
-        handler = RotatingFileHandler(
-            filename=log_file,
-            maxBytes=5 * 1024 * 1024,
-            backupCount=5,
-            encoding='utf-8',
-            mode='a'
-        )
-        formatter = logging.Formatter('%(asctime)s - %(message)s')
-        handler.setFormatter(formatter)
-        if not self.logger.handlers:
-            self.logger.addHandler(handler)
+        add_log_file(self.logger.name, log_file, fmt='%(asctime)s - %(message)s')
 
     def log_duplicate(self, discord_user_id: str, discord_username: str, rows: list):
         self.logger.info(f"\nDuplicate Records Found for User ID: {discord_user_id}, Username: {discord_username}")
@@ -78,8 +56,6 @@ DOC_ID = load_env_variable('DOC_ID', required=True)
 TABLE_ID = load_env_variable('TABLE_ID', required=True)
 GUILD_ID = load_env_variable('GUILD_ID', required=True)
 ERROR_CHANNEL_ID = load_env_variable('ERROR_CHANNEL_ID')
-FIXER_BATCH_SIZE = load_env_variable('FIXER_BATCH_SIZE', '3')
-FIXER_BATCH_DELAY = load_env_variable('FIXER_BATCH_DELAY', '20')
 
 # Convert environment variables to integers with validation
 def convert_to_int(value: Optional[str], var_name: str, default: Optional[int] = None, min_value: Optional[int] = None) -> Optional[int]:
@@ -99,8 +75,6 @@ if GUILD_ID_INT is None:
     raise EnvironmentError("Invalid GUILD_ID: must be a positive integer.")
 
 ERROR_CHANNEL_ID_INT = convert_to_int(ERROR_CHANNEL_ID, 'ERROR_CHANNEL_ID') if ERROR_CHANNEL_ID else None
-FIXER_BATCH_SIZE_INT = convert_to_int(FIXER_BATCH_SIZE, 'FIXER_BATCH_SIZE', default=3, min_value=1)
-FIXER_BATCH_DELAY_INT = convert_to_int(FIXER_BATCH_DELAY, 'FIXER_BATCH_DELAY', default=20, min_value=0)
 
 # ------------------------------ Constants ------------------------------
 # Coda.io Column Names
@@ -152,11 +126,8 @@ STANDARD_RANKS = [
 class FixerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.batch_size = FIXER_BATCH_SIZE_INT
-        self.batch_delay = FIXER_BATCH_DELAY_INT
         self.max_retries = 5
         self.backoff_factor = 2
-        self.semaphore = asyncio.Semaphore(5)
         self.duplicate_logger = duplicate_logger
 
         # Create mappings for roles and ranks
@@ -167,56 +138,61 @@ class FixerCog(commands.Cog):
         self.CODA_TO_DISCORD_RANK_ROLE = {rank[0].lower(): rank[0] for rank in STANDARD_RANKS}
         self.CODA_TO_DISCORD_DIVISION_ROLE = {k.lower(): k.title() for k in DIVISION_CODES.keys()}
 
-    async def coda_api_request(self, session: aiohttp.ClientSession, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Make a request to the Coda API with retry logic."""
-        url = f'https://coda.io/apis/v1/{endpoint.strip()}'
-        headers = {
-            'Authorization': f'Bearer {CODA_API_TOKEN}',
-            'Content-Type': 'application/json'
-        }
+    @property
+    def coda_client(self) -> CodaAPIClient:
+        """Shared pooled Coda client from the bot's service registry."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_client'):
+            return self.bot.services.get('coda_client')
+        return self.bot.coda_client
 
-        retries = 0
-        wait_time = 1
-
-        while retries <= self.max_retries:
-            try:
-                async with session.request(method, url, headers=headers, json=data) as response:
-                    if response.status == 429:
-                        retries += 1
-                        retry_after = int(response.headers.get('Retry-After', wait_time))
-                        await asyncio.sleep(retry_after)
-                        wait_time *= self.backoff_factor
-                        continue
-
-                    if 200 <= response.status < 300:
-                        return await response.json() if response.content_type == 'application/json' else {}
-
-                    logger.error(f"HTTP error {response.status} for {method} request to {url}")
-                    return None
+    async def coda_api_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Make a request to the Coda API through the shared client (retries handled there)."""
+        try:
+            return await self.coda_client.request(method, endpoint.strip(), data=data, retries=self.max_retries)
+        except CodaRequestError as err:
+            logger.error(f"Request error occurred: {err} - Endpoint: {endpoint}")
+            return None
 
-            except Exception as err:
-                logger.error(f"Request error occurred: {err} - URL: {url}")
-                return None
+    async def get_member_row(self, discord_user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a member's row from Coda based on Discord ID."""
+        row_index = self.bot.services.get('row_index') if hasattr(self.bot, 'services') else None
 
-        logger.error(f"Failed after {self.max_retries} retries")
-        return None
+        # Go straight to the row when its ID is already indexed
+        row_id = row_index.get(PROFILES, discord_user_id) if row_index else None
+        if row_id:
+            row = await self.coda_api_request(
+                'GET', f'docs/{DOC_ID}/tables/{quote(TABLE_ID)}/rows/{row_id}?useColumnNames=true'
+            )
+            if row and str(row.get('values', {}).get(DISCORD_USER_ID_COLUMN, '')).strip() == discord_user_id:
+                return row
+            row_index.discard(PROFILES, discord_user_id)
 
-    async def get_member_row(self, session: aiohttp.ClientSession, discord_user_id: str) -> Optional[Dict[str, Any]]:
-        """Get a member's row from Coda based on Discord ID."""
-        endpoint = f'docs/{DOC_ID}/tables/{quote(TABLE_ID)}/rows?useColumnNames=true'
         matched_rows = []
+        scanned_rows = []
 
-        while endpoint:
-            response = await self.coda_api_request(session, 'GET', endpoint)
-            if response is not None:
-                for row in response.get('items', []):
-                    values = row.get('values', {})
-                    coda_discord_user_id = str(values.get(DISCORD_USER_ID_COLUMN, '')).strip()
-                    if coda_discord_user_id == discord_user_id:
-                        matched_rows.append(row)
-                endpoint = response.get('nextPageLink')
-            else:
-                break
+        try:
+            # Stream the whole table using the largest page size
+            async for row in self.coda_client.iter_rows(DOC_ID, quote(TABLE_ID), use_column_names=True):
+                values = row.get('values', {})
+                coda_discord_user_id = str(values.get(DISCORD_USER_ID_COLUMN, '')).strip()
+                if coda_discord_user_id == discord_user_id:
+                    matched_rows.append(row)
+                scanned_rows.append(row)
+        except CodaRequestError as err:
+            logger.error(f"Request error occurred while scanning members: {err}")
+
+        # Index everything the scan saw so later members skip the full scan
+        if row_index:
+            seen: Dict[str, int] = {}
+            for row in scanned_rows:
+                key = str(row.get('values', {}).get(DISCORD_USER_ID_COLUMN, '')).strip()
+                seen[key] = seen.get(key, 0) + 1
+            row_index.learn(
+                PROFILES,
+                [row for row in scanned_rows
+                 if seen[str(row.get('values', {}).get(DISCORD_USER_ID_COLUMN, '')).strip()] == 1],
+                DISCORD_USER_ID_COLUMN
+            )
 
         if not matched_rows:
             return None
@@ -226,7 +202,7 @@ class FixerCog(commands.Cog):
             self.duplicate_logger.log_duplicate(discord_user_id, '', matched_rows)
             return matched_rows[0]
 
-    async def update_join_date(self, session: aiohttp.ClientSession, member: discord.Member, member_row: Dict[str, Any]) -> bool:
+    async def update_join_date(self, member: discord.Member, member_row: Dict[str, Any]) -> bool:
         """Update only the join date in Coda, using standard YYYY-MM-DD format."""
         if not member.joined_at:
             return False
@@ -245,7 +221,7 @@ class FixerCog(commands.Cog):
                         'cells': [{'column': JOIN_DATE_COLUMN, 'value': new_join_date}]
                     }
                 }
-                update_response = await self.coda_api_request(session, 'PUT', update_endpoint, data)
+                update_response = await self.coda_api_request('PUT', update_endpoint, data)
                 if update_response is not None:
                     logger.info(f"Updated join date for {member.display_name} to {new_join_date}")
                     return True
@@ -292,55 +268,51 @@ class FixerCog(commands.Cog):
                     if division_role.lower() != desired_division_role.lower() and division_role.lower() in current_role_names:
                         roles_to_remove.append(division_role)
 
-        # Add roles
-        for role_name in roles_to_add:
-            role = discord.utils.get(guild.roles, name=role_name)
-            if role:
-                try:
-                    await member.add_roles(role, reason="Syncing with Coda data")
-                    logger.info(f"Added role {role_name} to {member.display_name}")
-                except Exception as e:
-                    logger.error(f"Failed to add role {role_name} to {member.display_name}: {e}")
-
-        # Remove roles
-        for role_name in roles_to_remove:
-            role = discord.utils.get(guild.roles, name=role_name)
-            if role:
-                try:
-                    await member.remove_roles(role, reason="Syncing with Coda data")
-                    logger.info(f"Removed role {role_name} from {member.display_name}")
-                except Exception as e:
-                    logger.error(f"Failed to remove role {role_name} from {member.display_name}: {e}")
-
-    async def process_member(self, session: aiohttp.ClientSession, member: discord.Member, counters: Dict[str, int]) -> None:
-        """Process a single member, syncing their Discord roles with Coda data and updating join date."""
+        if not roles_to_add and not roles_to_remove:
+            return
+
+        # Apply both lists in one edit
         try:
-            async with self.semaphore:
-                logger.info(f"Processing member: {member.display_name} (ID: {member.id})")
-
-                # Find member's data in Coda
-                member_row = await self.get_member_row(session, str(member.id))
-
-                if not member_row:
-                    logger.warning(f"No Coda entry found for member {member.display_name}")
-                    counters['errors'] += 1
-                    return
-
-                # Update join date in Coda
-                join_date_updated = await self.update_join_date(session, member, member_row)
-
-                # Sync Discord roles with Coda data
-                guild = self.bot.get_guild(GUILD_ID_INT)
-                if guild:
-                    await self.update_discord_roles_based_on_coda(guild, member_row, member)
-                    if join_date_updated:
-                        counters['updated'] += 1
-                else:
-                    logger.error(f"Guild with ID {GUILD_ID_INT} not found.")
-                    counters['errors'] += 1
+            await self.bot.services.get('member_reconciler').reconcile(
+                member,
+                roles=roles_to_add,
+                remove_roles=roles_to_remove,
+                reason="Syncing with Coda data"
+            )
+            logger.info(
+                f"Synced roles for {member.display_name}: added {roles_to_add}, removed {roles_to_remove}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to sync roles for {member.display_name}: {e}")
+
+    async def sync_member(self, member: discord.Member) -> bool:
+        """
+        Sync one member's Discord roles with Coda data and update their join date.
+        Returns True if the join date was updated; raises if the member cannot be synced.
+        """
+        logger.info(f"Processing member: {member.display_name} (ID: {member.id})")
 
-                counters['processed'] += 1
+        # Find member's data in Coda
+        member_row = await self.get_member_row(str(member.id))
+        if not member_row:
+            raise LookupError(f"No Coda entry found for member {member.display_name}")
 
+        # Update join date in Coda
+        join_date_updated = await self.update_join_date(member, member_row)
+
+        # Sync Discord roles with Coda data
+        guild = self.bot.get_guild(GUILD_ID_INT)
+        if not guild:
+            raise LookupError(f"Guild with ID {GUILD_ID_INT} not found.")
+        await self.update_discord_roles_based_on_coda(guild, member_row, member)
+        return bool(join_date_updated)
+
+    async def process_member(self, member: discord.Member, counters: Dict[str, int]) -> None:
+        """Process a single member, syncing their Discord roles with Coda data and updating join date."""
+        try:
+            if await self.sync_member(member):
+                counters['updated'] += 1
+            counters['processed'] += 1
         except Exception as e:
             logger.error(f"Error processing member {member.display_name}: {str(e)}")
             counters['errors'] += 1
@@ -361,50 +333,38 @@ class FixerCog(commands.Cog):
             logger.error("Guild not found.")
             return
 
-        counters = {'processed': 0, 'updated': 0, 'errors': 0}
-
         # Ensure all members are loaded
         if not guild.chunked:
             await guild.chunk()
 
-        members = guild.members
-        batch = []
-
-        async with aiohttp.ClientSession() as session:
-            for member in members:
-                if member.bot:  # Skip bot accounts
-                    continue
-
-                if not member.display_name or member.display_name.strip() == "":
-                    logger.warning(f"Member with ID {member.id} has a blank username. Skipping.")
-                    continue
-
-                batch.append(member)
-                if len(batch) == self.batch_size:
-                    tasks = [self.process_member(session, m, counters) for m in batch]
-                    try:
-                        await asyncio.gather(*tasks)
-                    except Exception as e:
-                        logger.error(f"Error processing batch: {e}")
-                        if ERROR_CHANNEL_ID_INT:
-                            error_channel = self.bot.get_channel(ERROR_CHANNEL_ID_INT)
-                            if error_channel:
-                                await error_channel.send(f"Error processing batch: {e}")
-
-                    await asyncio.sleep(self.batch_delay)
-                    batch = []
-
-            # Process remaining members
-            if batch:
-                tasks = [self.process_member(session, m, counters) for m in batch]
-                try:
-                    await asyncio.gather(*tasks)
-                except Exception as e:
-                    logger.error(f"Error processing final batch: {e}")
-                    if ERROR_CHANNEL_ID_INT:
-                        error_channel = self.bot.get_channel(ERROR_CHANNEL_ID_INT)
-                        if error_channel:
-                            await error_channel.send(f"Error processing final batch: {e}")
+        members = []
+        for member in guild.members:
+            if member.bot:  # Skip bot accounts
+                continue
+
+            if not member.display_name or member.display_name.strip() == "":
+                logger.warning(f"Member with ID {member.id} has a blank username. Skipping.")
+                continue
+
+            members.append(member)
+
+        # Paced by Discord's rate limit buckets; rerunning after an interruption resumes
+        result = await self.bot.services.get('bulk_operations').run(
+            f"fixer:{guild.id}",
+            members,
+            self.sync_member,
+            title="Fixer synchronization",
+            interaction=interaction
+        )
+        counters = {
+            'processed': result['total'] - result['failed'],
+            'updated': result['changed'],
+            'errors': result['failed']
+        }
+        if result['failed'] and ERROR_CHANNEL_ID_INT:
+            error_channel = self.bot.get_channel(ERROR_CHANNEL_ID_INT)
+            if error_channel:
+                await error_channel.send(f"Fixer: {result['failed']} members could not be synchronized; see fixer.log")
 
         # Send completion message
         await interaction.followup.send(
@@ -435,8 +395,7 @@ class FixerCog(commands.Cog):
 
         counters = {'processed': 0, 'updated': 0, 'errors': 0}
 
-        async with aiohttp.ClientSession() as session:
-            await self.process_member(session, member, counters)
+        await self.process_member(member, counters)
 
         await interaction.followup.send(
             f"✅ Test synchronization completed for {member.display_name}.\n"
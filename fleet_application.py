@@ -1,32 +1,20 @@
 # cogs/fleet_application.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import asyncio
 import logging
-import logging.handlers
 import os
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
+from .utils.coda_api import CodaAPIClient, CodaRequestError
+from .utils.log_pipeline import add_log_file
+
 # ------------------------------ Logging Setup ------------------------------
 logger = logging.getLogger('fleet_application')
-logger.setLevel(logging.DEBUG)  # Set to DEBUG for comprehensive logging
-
-handler = logging.handlers.RotatingFileHandler(
-    filename='fleet_application.log',
-    encoding='utf-8',
-    mode='a',
-    maxBytes=5 * 1024 * 1024,  # 5 MB
-    backupCount=5
-)
-handler.setLevel(logging.DEBUG)
-
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+add_log_file(logger.name, 'fleet_application.log')
 
 # ------------------------------ Load Environment Variables ------------------------------
 load_dotenv()
@@ -78,11 +66,13 @@ class FleetApplicationCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
         self.lock = asyncio.Lock()
         self.CODA_COLUMNS = {}  # To store column names and IDs
         self.pending_applicants = {}  # To track users who have started applications
-        self.application_status_check.start()  # Start the background task
+        # Poll for application status changes every 15 minutes
+        bot.services.get('scheduler').add(
+            'fleet_application.status_check', '@every 15m', self.application_status_check, heavy=True
+        )
 
     async def cog_load(self):
         logger.info("FleetApplicationCog is loading. Fetching Coda.io column IDs.")
@@ -100,52 +90,27 @@ class FleetApplicationCog(commands.Cog):
                 logger.error("Could not fetch rows from the table.")
 
     def cog_unload(self):
-        self.application_status_check.cancel()
-        asyncio.create_task(self.session.close())
-        logger.info("FleetApplicationCog has been unloaded and aiohttp session closed.")
+        self.bot.services.get('scheduler').remove('fleet_application.status_check')
+        logger.info("FleetApplicationCog has been unloaded.")
 
     # ------------------------------ Coda.io API Methods ------------------------------
-    async def coda_api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[Dict[str, Any]]:
-        url = f'https://coda.io/apis/v1/{endpoint}'
-        headers = {
-            'Authorization': f'Bearer {CODA_API_TOKEN}',
-            'Content-Type': 'application/json'
-        }
-
-        retries = 0
-        max_retries = 5
-        backoff_factor = 2
-        retry_delay = 1
+    @property
+    def coda_client(self) -> CodaAPIClient:
+        """Shared pooled Coda client from the bot's service registry."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_client'):
+            return self.bot.services.get('coda_client')
+        return self.bot.coda_client
 
-        while retries < max_retries:
-            try:
-                if method.upper() in ['POST', 'PUT']:
-                    logger.debug(f"Request Data: {data}")
-                async with self.session.request(method, url, headers=headers, json=data) as response:
-                    response_text = await response.text()
-                    logger.debug(f"Request URL: {url}")
-                    logger.debug(f"Response Status: {response.status}")
-                    logger.debug(f"Response Text: {response_text}")
-
-                    if response.status in [200, 202]:
-                        logger.debug(f"Coda.io {method} request to {url} successful.")
-                        return await response.json()
-                    elif response.status == 429:
-                        retry_after = int(response.headers.get('Retry-After', retry_delay))
-                        logger.warning(f"Rate limited by Coda.io. Retrying after {retry_after} seconds...")
-                        await asyncio.sleep(retry_after)
-                        retries += 1
-                        retry_delay *= backoff_factor
-                    else:
-                        logger.error(f"Coda.io {method} request to {url} failed with status {response.status}. Response: {response_text}")
-                        return None
-            except Exception as e:
-                logger.error(f"An error occurred during Coda API request to {url}: {e}")
-                await asyncio.sleep(retry_delay)
-                retries += 1
-                retry_delay *= backoff_factor
-        logger.error(f"Failed to complete Coda.io {method} request to {url} after {max_retries} retries.")
-        return None
+    async def coda_api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[Dict[str, Any]]:
+        """Make a Coda request through the shared client, returning None on failure."""
+        try:
+            response = await self.coda_client.request(method, endpoint, data=data)
+        except CodaRequestError as e:
+            logger.error(f"Coda.io {method} request to {endpoint} failed: {e}")
+            return None
+        if response is None:
+            logger.error(f"Failed to complete Coda.io {method} request to {endpoint} after retries.")
+        return response
 
     async def fetch_columns_from_coda(self):
         logger.info("Fetching all columns from Coda.io table.")
@@ -381,7 +346,6 @@ class FleetApplicationCog(commands.Cog):
             await interaction.followup.send("I couldn't send you a DM. Please adjust your privacy settings.", ephemeral=True)
             logger.error(f"Failed to send DM to {interaction.user}")
 
-    @tasks.loop(minutes=15)
     async def application_status_check(self):
         logger.info("Checking for application status updates...")
 
@@ -480,11 +444,6 @@ class FleetApplicationCog(commands.Cog):
         else:
             logger.error("Failed to fetch rows from Coda.io table.")
 
-    @application_status_check.before_loop
-    async def before_application_status_check(self):
-        await self.bot.wait_until_ready()
-        logger.info("Application status check task is starting...")
-
 async def setup(bot: commands.Bot):
     await bot.add_cog(FleetApplicationCog(bot))
     logger.info("FleetApplicationCog has been added to the bot.")
@@ -8,12 +8,8 @@ import logging
 import os
 
 # Setup Logging
+# Records reach bot.log through the root logging pipeline
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='bot.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 class FunCog(commands.Cog):
     """Cog for fun commands."""
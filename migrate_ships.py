@@ -50,7 +50,6 @@ async def backup_data(coda_client, old_table_id: str):
         rows = await coda_client.get_rows(
             config.DOC_ID,
             old_table_id,
-            limit=1000,
             use_column_names=True
         )
         
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Dict, List, Optional, Any, Set, Tuple, Union, TYPE_CHECKING
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import logging
 import os
@@ -12,6 +12,7 @@ from datetime import datetime, timezone, timedelta
 import uuid
 from dateutil.parser import parse as dateutil_parse
 from .utils.profile_events import ProfileEvent, ProfileEventType
+from .utils.deadline_scheduler import DeadlineScheduler
 from enum import Enum
 
 if TYPE_CHECKING:
@@ -28,19 +29,20 @@ from .mission_system.shared import (
     MissionSystemUtilities as utils
 )
 from .mission_system.ship_data import Ship  # For ship lookups
+from .utils.log_pipeline import add_log_file
 
 logger = logging.getLogger('missions')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='missions.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'missions.log')
 
 GUILD_ID = int(os.getenv('GUILD_ID', 0))
 ACTIVE_OPERATIONS_CHANNEL_ID = int(os.getenv('ACTIVE_OPERATIONS_CHANNEL_ID', 0))
 VOICE_OPERATIONS_CHANNEL_ID = int(os.getenv('VOICE_OPERATIONS_CHANNEL_ID', 0))
 
+# Minutes before start at which participants are reminded
+REMINDER_MINUTES = (30, 15, 5)
+# Deadlines missed by less than this (e.g. during a restart) still fire
+DEADLINE_GRACE = timedelta(minutes=1)
+
 
 async def mission_status_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
     choices = []
@@ -54,27 +56,13 @@ async def mission_status_autocomplete(interaction: discord.Interaction, current:
 
 async def mission_id_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
     """Autocomplete for mission IDs - helps users select from existing missions."""
-    choices = []
-    
     # Get reference to the MissionCog
     mission_cog = interaction.client.get_cog('MissionCog')
     if not mission_cog:
-        return choices
+        return []
     
-    # Search through missions by ID and name
-    for mission_id, mission in mission_cog.missions.items():
-        # Match by mission ID (first 8 chars) or mission name
-        if (current.lower() in mission_id[:8].lower() or 
-            current.lower() in mission.name.lower()):
-            # Format the choice: "mission_name (ID: abcd1234)"
-            display_name = f"{mission.name} (ID: {mission_id[:8]})"
-            choices.append(app_commands.Choice(name=display_name, value=mission_id))
-            
-            # Return up to 25 choices (Discord limit)
-            if len(choices) >= 25:
-                break
-                
-    return choices
+    # Match by mission name or ID (first 8 chars), best matches first
+    return mission_cog.mission_index.choices(current)
 
 
 async def ship_name_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
@@ -708,7 +696,7 @@ class ShipsSelect(discord.ui.Select):
         )
         
         # Save mission data
-        self.ships_view.cog.save_missions()
+        self.ships_view.cog.save_missions(self.mission)
 
 
 class PaginationRow(discord.ui.View):
@@ -889,7 +877,7 @@ class JoinMissionModal(discord.ui.Modal):
                 )
                 
                 # Save changes
-                self.cog.save_missions()
+                self.cog.save_missions(self.mission)
                 
                 await interaction.response.send_message(
                     f"✅ You've joined the mission as {role} on {ship}!", 
@@ -931,7 +919,7 @@ class LeaveMissionConfirm(discord.ui.View):
                     interaction.user.id,
                     "Left the mission"
                 )
-                self.cog.save_missions()
+                self.cog.save_missions(self.mission)
                 await interaction.response.send_message("You have left the mission.", ephemeral=True)
                 # Update mission embed
                 await self.cog.update_mission_view(self.mission)
@@ -1220,12 +1208,13 @@ class InteractiveMissionView(discord.ui.View):
             async def confirm_button(self, confirm_interaction: discord.Interaction, button: discord.ui.Button):
                 # Cancel the mission
                 self.parent_view.mission.status = MissionStatus.CANCELLED
+                self.parent_view.cog.arm_mission(self.parent_view.mission)
                 self.parent_view.mission.add_history_entry(
                     "cancel_mission",
                     confirm_interaction.user.id,
                     "Mission cancelled by leader"
                 )
-                self.parent_view.cog.save_missions()
+                self.parent_view.cog.save_missions(self.parent_view.mission)
                 
                 # Notify all participants
                 channel = self.parent_view.cog.bot.get_channel(self.parent_view.mission.channel_id)
@@ -1287,8 +1276,14 @@ class MissionCog(commands.Cog):
         self.coda = bot.coda_client  # Add coda client
         self.missions: Dict[str, Mission] = {}
         self._profile_cog = None  # Profile cog reference
+        self.deadlines = DeadlineScheduler('missions')
+        self._store = bot.document_store.collection('missions')
+        # Autocomplete index over mission names and short IDs
+        self.mission_index = bot.autocomplete.index('missions')
         self.load_missions()
-        self.reminder_task.start()
+        for mission in self.missions.values():
+            self.arm_mission(mission)
+        self.deadlines.start()
         logger.info(f"MissionCog initialized with {len(self.missions)} missions")
     
     @property
@@ -1299,38 +1294,38 @@ class MissionCog(commands.Cog):
         
     def load_missions(self):
         try:
-            if not os.path.exists(MISSIONS_DATA_FILE):
-                logger.info("No missions data file found, creating a new one.")
-                self.missions = {}
-                self.save_missions()
-                return
-            with open(MISSIONS_DATA_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if not content:
-                    logger.info("Missions data file is empty, initializing with empty dictionary.")
-                    self.missions = {}
-                    self.save_missions()
-                    return
+            data = self._store.load(self._load_legacy_missions)
+            self.missions = {}
+            for mission_id, mission_data in data.items():
                 try:
-                    data = json.loads(content)
-                    self.missions = {}
-                    for mission_id, mission_data in data.items():
-                        try:
-                            self.missions[mission_id] = Mission.from_dict(mission_data)
-                        except Exception as e:
-                            logger.error(f"Failed to load mission {mission_id}: {e}")
-                    logger.info(f"Successfully loaded {len(self.missions)} missions.")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON in missions data file: {e}")
-                    logger.info("Creating backup of corrupted file and starting with empty missions.")
-                    backup_name = f"{MISSIONS_DATA_FILE}.backup.{int(datetime.now().timestamp())}"
-                    os.rename(MISSIONS_DATA_FILE, backup_name)
-                    self.missions = {}
-                    self.save_missions()
+                    self.missions[mission_id] = Mission.from_dict(mission_data)
+                except Exception as e:
+                    logger.error(f"Failed to load mission {mission_id}: {e}")
+            self.mission_index.rebuild(self._index_entry(mission) for mission in self.missions.values())
+            logger.info(f"Successfully loaded {len(self.missions)} missions.")
         except Exception as e:
             logger.error(f"Failed to load missions: {e}")
             self.missions = {}
 
+    @staticmethod
+    def _index_entry(mission: Mission) -> Tuple[str, str, str, Tuple[str, str]]:
+        # Format the choice: "mission_name (ID: abcd1234)"
+        short_id = mission.mission_id[:8]
+        return (mission.mission_id, f"{mission.name} (ID: {short_id})", mission.mission_id, (mission.name, short_id))
+
+    def _load_legacy_missions(self) -> Dict[str, dict]:
+        """Read missions from the old JSON file for a one-time import."""
+        if not os.path.exists(MISSIONS_DATA_FILE):
+            return {}
+        with open(MISSIONS_DATA_FILE, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        if not content:
+            return {}
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in missions data file, not importing it: {e}")
+            return {}
         
     async def complete_mission(self, mission_id: str) -> bool:
         """Complete a mission and update its status and participant profiles."""
@@ -1342,6 +1337,7 @@ class MissionCog(commands.Cog):
                 
             # Update mission status
             mission.status = MissionStatus.COMPLETED
+            self.arm_mission(mission)
             mission.add_history_entry(
                 "complete_mission",
                 mission.leader_id,
@@ -1406,38 +1402,63 @@ class MissionCog(commands.Cog):
                     await channel.send(embed=completion_embed)
                     
             # Save mission data
-            self.save_missions()
+            self.save_missions(mission)
             return True
             
         except Exception as e:
             logger.error(f"Error completing mission: {e}")
             return False
 
-    def cog_unload(self):
-        self.reminder_task.cancel()
-        self.save_missions()
-        for mission in self.missions.values():
-            if mission.voice_channel_id:
-                asyncio.create_task(self.cleanup_voice_channel(mission))
+    async def cog_unload(self):
+        await self.deadlines.stop()
+        await asyncio.gather(
+            *(self.cleanup_voice_channel(mission) for mission in self.missions.values() if mission.voice_channel_id),
+            return_exceptions=True
+        )
 
-    @tasks.loop(minutes=1)
-    async def reminder_task(self):
-        try:
-            now = datetime.now(timezone.utc)
-            for mission in list(self.missions.values()):
-                if mission.status not in [MissionStatus.RECRUITING, MissionStatus.READY]:
-                    continue
-                time_until = mission.start_time - now
-                minutes_until = time_until.total_seconds() / 60
-                if minutes_until in [30, 15, 5] and minutes_until not in mission.reminded_at:
-                    await self.send_mission_reminder(mission)
-                    mission.reminded_at.add(minutes_until)
-                    logger.info(f"Sent {int(minutes_until)} minute reminder for mission '{mission.name}'")
-                if 0 <= minutes_until <= 1 and mission.status == MissionStatus.READY:
-                    await self.start_mission(mission)
-                    logger.info(f"Auto-started mission '{mission.name}'")
-        except Exception as e:
-            logger.error(f"Error in reminder task: {e}")
+    def arm_mission(self, mission: Mission):
+        """
+        (Re-)schedule a mission's reminders and auto-start at absolute times.
+
+        Call after creating a mission or changing its start time or status;
+        missions that are no longer recruiting or ready are simply disarmed.
+        """
+        self.deadlines.cancel_group(mission.mission_id)
+        if mission.status not in [MissionStatus.RECRUITING, MissionStatus.READY]:
+            return
+        cutoff = datetime.now(timezone.utc) - DEADLINE_GRACE
+        for minutes in REMINDER_MINUTES:
+            when = mission.start_time - timedelta(minutes=minutes)
+            if minutes in mission.reminded_at or when < cutoff:
+                continue
+            self.deadlines.schedule(
+                (mission.mission_id, 'reminder', minutes), when,
+                self._send_scheduled_reminder, mission.mission_id, minutes,
+                group=mission.mission_id
+            )
+        if mission.start_time >= cutoff:
+            self.deadlines.schedule(
+                (mission.mission_id, 'start'), mission.start_time,
+                self._auto_start_mission, mission.mission_id,
+                group=mission.mission_id
+            )
+
+    async def _send_scheduled_reminder(self, mission_id: str, minutes: int):
+        mission = self.missions.get(mission_id)
+        if not mission or mission.status not in [MissionStatus.RECRUITING, MissionStatus.READY]:
+            return
+        if minutes in mission.reminded_at:
+            return
+        await self.send_mission_reminder(mission)
+        mission.reminded_at.add(minutes)
+        self.save_missions(mission)
+        logger.info(f"Sent {minutes} minute reminder for mission '{mission.name}'")
+
+    async def _auto_start_mission(self, mission_id: str):
+        mission = self.missions.get(mission_id)
+        if mission and mission.status == MissionStatus.READY:
+            await self.start_mission(mission)
+            logger.info(f"Auto-started mission '{mission.name}'")
 
     async def cleanup_voice_channel(self, mission: Mission):
         if mission.voice_channel_id:
@@ -1449,41 +1470,35 @@ class MissionCog(commands.Cog):
             except Exception as e:
                 logger.error(f"Error deleting voice channel for mission {mission.name}: {e}")
 
-    def save_missions(self):
+    def save_missions(self, *missions: Mission):
+        """Persist the missions that changed; the store writes them in the background."""
         try:
-            data = {}
-            for mission_id, mission in self.missions.items():
-                try:
-                    if not isinstance(mission.mission_type, MissionType):
-                        logger.error(f"Invalid mission_type for mission {mission_id}")
-                        continue
-                    if not isinstance(mission.status, MissionStatus):
-                        logger.error(f"Invalid status for mission {mission_id}")
-                        continue
-                    data[mission_id] = mission.to_dict()
-                except Exception as e:
-                    logger.error(f"Failed to serialize mission {mission_id}: {e}")
-                    continue
-            directory = os.path.dirname(MISSIONS_DATA_FILE)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)
-            with open(MISSIONS_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            logger.info(f"Saved {len(self.missions)} missions to {MISSIONS_DATA_FILE}")
+            for mission in missions:
+                self.mission_index.add(*self._index_entry(mission))
+                data = self._serialize_mission(mission)
+                if data is not None:
+                    self._store.put(mission.mission_id, data)
         except Exception as e:
             logger.error(f"Failed to save missions: {e}")
-            try:
-                backup_file = f"{MISSIONS_DATA_FILE}.emergency.{int(datetime.now().timestamp())}"
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f)
-                logger.info(f"Created emergency backup at {backup_file}")
-            except Exception as backup_error:
-                logger.error(f"Failed to create emergency backup: {backup_error}")
+
+    def _serialize_mission(self, mission: Mission) -> Optional[dict]:
+        try:
+            if not isinstance(mission.mission_type, MissionType):
+                logger.error(f"Invalid mission_type for mission {mission.mission_id}")
+                return None
+            if not isinstance(mission.status, MissionStatus):
+                logger.error(f"Invalid status for mission {mission.mission_id}")
+                return None
+            return mission.to_dict()
+        except Exception as e:
+            logger.error(f"Failed to serialize mission {mission.mission_id}: {e}")
+            return None
 
     async def start_mission(self, mission: Mission):
         try:
             mission.status = MissionStatus.IN_PROGRESS
-            self.save_missions()
+            self.arm_mission(mission)
+            self.save_missions(mission)
             channel = self.bot.get_channel(mission.channel_id)
             if channel:
                 try:
@@ -1569,14 +1584,15 @@ class MissionCog(commands.Cog):
                 briefing="Mission created from order."
             )
             self.missions[mission.mission_id] = mission
-            self.save_missions()
+            self.arm_mission(mission)
+            self.save_missions(mission)
             channel = self.bot.get_channel(ACTIVE_OPERATIONS_CHANNEL_ID)
             if channel:
                 view = await create_interactive_mission_view(self, mission, order.author_id)
                 message = await channel.send(embed=mission.to_embed(self.bot), view=view)
                 mission.message_id = message.id
                 mission.channel_id = channel.id
-                self.save_missions()
+                self.save_missions(mission)
         except Exception as e:
             logger.error(f"Error creating mission from order: {e}")
 
@@ -1647,12 +1663,13 @@ class MissionCog(commands.Cog):
                 anticipated_earnings=anticipated_earnings
             )
             self.missions[mission.mission_id] = mission
-            self.save_missions()
+            self.arm_mission(mission)
+            self.save_missions(mission)
             if VOICE_OPERATIONS_CHANNEL_ID:
                 voice_channel = await self.create_voice_channel(interaction.guild, name)
                 if voice_channel:
                     mission.voice_channel_id = voice_channel.id
-                    self.save_missions()
+                    self.save_missions(mission)
             if mission.voice_channel_id:
                 await self.create_scheduled_event(interaction.guild, mission)
             channel = self.bot.get_channel(ACTIVE_OPERATIONS_CHANNEL_ID)
@@ -1665,7 +1682,7 @@ class MissionCog(commands.Cog):
             message = await channel.send(embed=mission.to_embed(self.bot), view=view)
             mission.message_id = message.id
             mission.channel_id = channel.id
-            self.save_missions()
+            self.save_missions(mission)
             success_msg = f"✅ Mission '{name}' created for <t:{int(utc_datetime.timestamp())}:F>!"
             if mission.voice_channel_id:
                 voice_channel = self.bot.get_channel(mission.voice_channel_id)
@@ -1772,7 +1789,7 @@ class MissionCog(commands.Cog):
                 interaction.user.id,
                 "Left the mission via command"
             )
-            self.save_missions()
+            self.save_missions(mission)
             
             # Update mission view
             await self.update_mission_view(mission)
@@ -1903,7 +1920,7 @@ class MissionCog(commands.Cog):
                     privacy_level=discord.PrivacyLevel.guild_only
                 )
                 mission.event_id = event.id
-                self.save_missions()
+                self.save_missions(mission)
         except Exception as e:
             logger.error(f"Failed to create scheduled event: {e}")
 
@@ -1945,10 +1962,11 @@ class MissionCog(commands.Cog):
 
         old_status = mission.status
         mission.status = new_status
+        self.arm_mission(mission)
         mission.add_history_entry("update_status", interaction.user.id, f"Status changed from {old_status.name} to {new_status.name}")
         
         # Save the updated mission data.
-        self.save_missions()
+        self.save_missions(mission)
         
         # Update the mission view so the changes are reflected.
         await self.update_mission_view(mission)
@@ -2024,6 +2042,9 @@ class MissionCog(commands.Cog):
                 if new_datetime:
                     old_time = mission.start_time
                     mission.start_time = new_datetime
+                    # Reminders are relative to the new start time
+                    mission.reminded_at = set()
+                    self.arm_mission(mission)
                     changes.append(f"Time: <t:{int(old_time.timestamp())}:f> → <t:{int(new_datetime.timestamp())}:f>")
             except Exception as e:
                 await interaction.followup.send(f"❌ Error updating time: {e}", ephemeral=True)
@@ -2052,7 +2073,7 @@ class MissionCog(commands.Cog):
             interaction.user.id,
             f"Edited mission details: {', '.join(changes)}"
         )
-        self.save_missions()
+        self.save_missions(mission)
         
         # Update scheduled event if it exists
         if mission.event_id and (name or description or time or duration):
@@ -1,16 +1,17 @@
 # cogs/news_updater.py
 
 import discord
-from discord.ext import commands, tasks
-import feedparser
+from discord.ext import commands
 import logging
 import os
-from typing import Set
+from typing import Any, List
 import json
 from datetime import datetime
-import requests  # Ensure this is installed: pip install requests
 from bs4 import BeautifulSoup  # For parsing HTML
 
+from .utils.feed_poller import FeedPoller, FeedSpec
+from .utils.http_pool import HTTPPool
+
 # Import your configuration
 import config
 
@@ -19,168 +20,137 @@ class NewsUpdaterCog(commands.Cog):
         self.bot = bot
         self.feed_url = 'https://status.robertsspaceindustries.com/index.xml'
         self.seen_entries_file = 'cogs/seen_entries.json'
-        self.seen_entries: Set[str] = set()
         self.game_news_channel_id = config.GAME_NEWS_CHANNEL_ID
         self.admin_notifications_channel_id = config.ADMIN_NOTIFICATIONS_CHANNEL_ID
         self.fetch_interval = config.FETCH_INTERVAL_MINUTES
 
-        # Load seen entries from file if it exists
-        self.load_seen_entries()
-
-        # If starting fresh, mark all current entries as seen without posting
-        if not self.seen_entries:
-            logging.info("No seen entries found. Marking all current feed entries as seen.")
-            self.mark_current_entries_as_seen()
-
-        # Start the background task
-        self.fetch_feed.start()
-
-    def cog_unload(self):
-        self.fetch_feed.cancel()
-        self.save_seen_entries()
-
-    def load_seen_entries(self):
-        """Load seen entries from a JSON file to prevent duplicate postings."""
-        if os.path.exists(self.seen_entries_file):
-            try:
-                with open(self.seen_entries_file, 'r') as f:
-                    self.seen_entries = set(json.load(f))
-                logging.info(f"Loaded {len(self.seen_entries)} seen entries from {self.seen_entries_file}.")
-            except Exception as e:
-                logging.error(f"Failed to load seen entries: {e}")
-        else:
-            self.seen_entries = set()
-            logging.info("No seen entries file found. Starting fresh.")
-
-    def save_seen_entries(self):
-        """Save seen entries to a JSON file."""
+        self.http_pool = getattr(bot, 'http_pool', None) or HTTPPool()
+        self.poller = FeedPoller(self.http_pool, self.post_entries, self.on_feed_error)
+        self.poller.add_feed(FeedSpec(
+            name='rsi-status',
+            url=self.feed_url,
+            interval=self.fetch_interval * 60,
+            channel_id=self.game_news_channel_id
+        ))
+        for feed in self.load_extra_feeds():
+            self.poller.add_feed(feed)
+
+        # Carry over entries seen before feed state was tracked per feed
+        if 'rsi-status' not in self.poller._states:
+            self.import_seen_entries()
+
+    async def cog_load(self):
+        self.bot.loop.create_task(self.start_polling())
+
+    async def start_polling(self):
+        """Wait until the bot is ready, then start polling every feed."""
+        await self.bot.wait_until_ready()
+        logging.info("NewsUpdaterCog is now running.")
+        self.poller.start()
+
+    async def cog_unload(self):
+        await self.poller.stop()
+        if self.http_pool is not getattr(self.bot, 'http_pool', None):
+            await self.http_pool.close()
+
+    def load_extra_feeds(self) -> List[FeedSpec]:
+        """
+        Additional feeds from the NEWS_FEEDS environment variable, a JSON list of
+        {"name", "url", "interval_minutes", "channel_id"} objects.
+        """
+        raw = os.getenv('NEWS_FEEDS')
+        if not raw:
+            return []
         try:
-            with open(self.seen_entries_file, 'w') as f:
-                json.dump(list(self.seen_entries), f)
-            logging.info(f"Saved {len(self.seen_entries)} seen entries to {self.seen_entries_file}.")
+            return [
+                FeedSpec(
+                    name=feed['name'],
+                    url=feed['url'],
+                    interval=float(feed.get('interval_minutes', self.fetch_interval)) * 60,
+                    channel_id=int(feed.get('channel_id', self.game_news_channel_id))
+                )
+                for feed in json.loads(raw)
+            ]
         except Exception as e:
-            logging.error(f"Failed to save seen entries: {e}")
-
-    def mark_current_entries_as_seen(self):
-        """Fetch the current RSS feed and mark all entries as seen without posting."""
+            logging.error(f"Invalid NEWS_FEEDS configuration: {e}")
+            return []
+
+    def import_seen_entries(self):
+        """Import seen entries from the old JSON file to prevent duplicate postings."""
+        if not os.path.exists(self.seen_entries_file):
+            logging.info("No seen entries file found. Current feed entries will be marked as seen.")
+            return
         try:
-            response = requests.get(self.feed_url)
-            response.encoding = 'utf-8'  # Force utf-8 encoding
-
-            if response.status_code != 200:
-                error_message = f"Failed to fetch RSS feed during initialization. Status code: {response.status_code}"
-                logging.error(error_message)
-                # Optionally, notify admins
-                asyncio.create_task(self.notify_admin(error_message))
-                return
-
-            feed = feedparser.parse(response.text)
-
-            if feed.bozo:
-                error_message = f"Failed to parse feed during initialization: {feed.bozo_exception}"
-                logging.error(error_message)
-                asyncio.create_task(self.notify_admin(error_message))
-                return
-
-            for entry in feed.entries:
-                self.seen_entries.add(entry.id)
-
-            self.save_seen_entries()
-            logging.info("All current feed entries have been marked as seen.")
+            with open(self.seen_entries_file, 'r') as f:
+                seen_entries = json.load(f)
+            self.poller.import_seen('rsi-status', seen_entries)
+            logging.info(f"Imported {len(seen_entries)} seen entries from {self.seen_entries_file}.")
         except Exception as e:
-            error_message = f"An error occurred during initialization while marking entries as seen: {e}"
+            logging.error(f"Failed to load seen entries: {e}")
+
+    async def fetch_feed(self) -> int:
+        """Poll every feed now and post new entries."""
+        logging.info("Fetching news feeds...")
+        posted = await self.poller.poll_all()
+        if not posted:
+            logging.info("No new updates found.")
+        return posted
+
+    async def on_feed_error(self, feed: FeedSpec, message: str):
+        await self.notify_admin(message)
+
+    async def post_entries(self, feed: FeedSpec, entries: List[Any]) -> List[str]:
+        """Post new feed entries; returns the IDs that were posted."""
+        channel = self.bot.get_channel(feed.channel_id)
+        if not channel:
+            error_message = f"Game News channel with ID {feed.channel_id} not found."
             logging.error(error_message)
-            asyncio.create_task(self.notify_admin(error_message))
-
-    @tasks.loop(minutes=1.0)  # Placeholder, will be set in before_loop
-    async def fetch_feed(self):
-        """Background task to fetch RSS feed and post updates."""
-        try:
-            logging.info("Fetching RSS feed...")
-            response = requests.get(self.feed_url)
-            response.encoding = 'utf-8'  # Force utf-8 encoding
-
-            if response.status_code != 200:
-                error_message = f"Failed to fetch RSS feed. Status code: {response.status_code}"
-                logging.error(error_message)
-                await self.notify_admin(error_message)
-                return
-
-            feed = feedparser.parse(response.text)
+            await self.notify_admin(error_message)
+            return []
+
+        posted = []
+        for entry in entries:
+            # Format the message by stripping HTML
+            title = self.strip_html(entry.title)
+            link = entry.link
+            summary = self.strip_html(entry.summary) if 'summary' in entry else 'No summary available.'
+
+            embed = discord.Embed(
+                title=title,
+                url=link,
+                description=summary,
+                color=0x00ff00,  # Green color
+            )
+
+            # Add publication timestamp if available
+            if 'published_parsed' in entry and entry.published_parsed:
+                publish_time = datetime(*entry.published_parsed[:6])
+                embed.timestamp = publish_time
+
+            # Add image if available
+            if 'media_content' in entry:
+                media = entry.media_content
+                if isinstance(media, list) and len(media) > 0 and 'url' in media[0]:
+                    embed.set_image(url=media[0]['url'])
+
+            if feed.name == 'rsi-status':
+                embed.set_footer(text="Powered by Roberts Space Industries Status Feed")
+            else:
+                embed.set_footer(text=f"Source: {feed.name}")
 
-            if feed.bozo:
-                error_message = f"Failed to parse feed: {feed.bozo_exception}"
+            try:
+                await channel.send(embed=embed)
+                logging.info(f"Posted new update: {title}")
+                posted.append(entry.get('id') or entry.get('link'))
+            except discord.Forbidden:
+                error_message = f"Missing permissions to send messages in channel ID {feed.channel_id}."
                 logging.error(error_message)
                 await self.notify_admin(error_message)
-                return
-
-            new_entries = [entry for entry in feed.entries if entry.id not in self.seen_entries]
-
-            if not new_entries:
-                logging.info("No new updates found.")
-                return
-
-            channel = self.bot.get_channel(self.game_news_channel_id)
-            if not channel:
-                error_message = f"Game News channel with ID {self.game_news_channel_id} not found."
+            except discord.HTTPException as e:
+                error_message = f"Failed to send message in channel ID {feed.channel_id}: {e}"
                 logging.error(error_message)
                 await self.notify_admin(error_message)
-                return
-
-            for entry in new_entries:
-                # Format the message by stripping HTML
-                title = self.strip_html(entry.title)
-                link = entry.link
-                summary = self.strip_html(entry.summary) if 'summary' in entry else 'No summary available.'
-
-                embed = discord.Embed(
-                    title=title,
-                    url=link,
-                    description=summary,
-                    color=0x00ff00,  # Green color
-                )
-
-                # Add publication timestamp if available
-                if 'published_parsed' in entry and entry.published_parsed:
-                    publish_time = datetime(*entry.published_parsed[:6])
-                    embed.timestamp = publish_time
-
-                # Add image if available
-                if 'media_content' in entry:
-                    media = entry.media_content
-                    if isinstance(media, list) and len(media) > 0 and 'url' in media[0]:
-                        embed.set_image(url=media[0]['url'])
-
-                embed.set_footer(text="Powered by Roberts Space Industries Status Feed")
-
-                try:
-                    await channel.send(embed=embed)
-                    logging.info(f"Posted new update: {title}")
-                    # Mark this entry as seen
-                    self.seen_entries.add(entry.id)
-                except discord.Forbidden:
-                    error_message = f"Missing permissions to send messages in channel ID {self.game_news_channel_id}."
-                    logging.error(error_message)
-                    await self.notify_admin(error_message)
-                except discord.HTTPException as e:
-                    error_message = f"Failed to send message in channel ID {self.game_news_channel_id}: {e}"
-                    logging.error(error_message)
-                    await self.notify_admin(error_message)
-
-            # Save the updated seen entries
-            self.save_seen_entries()
-
-        except Exception as e:
-            error_message = f"An error occurred while fetching the RSS feed: {e}"
-            logging.error(error_message)
-            await self.notify_admin(error_message)
-
-    @fetch_feed.before_loop
-    async def before_fetch_feed(self):
-        """Wait until the bot is ready before starting the task and set fetch interval."""
-        await self.bot.wait_until_ready()
-        logging.info("NewsUpdaterCog is now running.")
-        self.fetch_feed.change_interval(minutes=self.fetch_interval)
+        return posted
 
     async def notify_admin(self, message: str):
         """Send error notifications to the Admin Notifications channel."""
@@ -211,7 +211,7 @@ class OnboardingCog(commands.Cog):
                 # Fallback to user object if no guild context
                 user_to_update = interaction.user
                 
-            # Assign roles
+            # Assign roles and nickname together
             success, error = await self.assign_roles(user_to_update, member_type)
             if not success:
                 logger.error(f"Error assigning roles to {interaction.user.id}: {error}")
@@ -221,12 +221,6 @@ class OnboardingCog(commands.Cog):
                 )
                 return
                 
-            # Update nickname
-            nickname_success = await self.update_nickname(user_to_update, member_type)
-            if not nickname_success:
-                logger.warning(f"Failed to update nickname for {interaction.user.id}")
-                # Continue despite nickname failure - this is non-critical
-                
             # Get current date for Join Date
             current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
                 
@@ -355,64 +349,98 @@ class OnboardingCog(commands.Cog):
             logger.error(f"Error validating token {token}: {e}")
             return None
             
+    async def _resolve_member(self, user: Union[discord.User, discord.Member]) -> Optional[discord.Member]:
+        """Return the guild member for ``user``, fetching it if needed."""
+        # Already a Member object
+        if hasattr(user, 'guild') and user.guild is not None:
+            return user
+            
+        # Get the guild from the bot
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            logger.warning(f"Could not find guild for user {user.id}")
+            return None
+            
+        # Convert User to Member
+        try:
+            return guild.get_member(user.id) or await guild.fetch_member(user.id)
+        except discord.NotFound:
+            logger.warning(f"User {user.id} is not a member of the guild")
+            return None
+            
     async def assign_roles(
         self, 
         user: Union[discord.User, discord.Member], 
         member_type: str
     ) -> Tuple[bool, Optional[str]]:
-        """Assign initial roles based on member type."""
+        """Assign initial roles and nickname based on member type, in one edit."""
         try:
-            # Check if we have a User object instead of a Member object
-            if not hasattr(user, 'guild') or user.guild is None:
-                # Get the guild from the bot
-                guild = self.bot.get_guild(self.guild_id)
-                if not guild:
-                    return False, "Could not find guild"
-                    
-                # Convert User to Member
-                try:
-                    member = await guild.fetch_member(user.id)
-                    if not member:
-                        return False, f"Could not find member with ID {user.id} in guild"
-                except discord.NotFound:
-                    return False, f"User {user.id} is not a member of the guild"
-            else:
-                # Already a Member object
-                member = user
+            member = await self._resolve_member(user)
+            if not member:
+                return False, f"Could not find member with ID {user.id} in guild"
                 
-            # Define roles to assign
-            role_names = ["Non-Division"]  # Everyone gets Non-Division
+            # Everyone gets Non-Division; Members start as Crewman Recruit
+            rank = "Crewman Recruit" if member_type == "Member" else "Associate"
             
-            if member_type == "Member":
-                role_names.append("Crewman Recruit")  # Members get Crewman Recruit
-            else:  # Associate
-                role_names.append("Associate")  # Associates get Associate role
-                
-            # Get role objects
-            roles_to_add = []
             guild = member.guild
-            
-            for role_name in role_names:
-                role = discord.utils.get(guild.roles, name=role_name)
-                if role:
-                    roles_to_add.append(role)
-                else:
-                    logger.warning(f"Role not found: {role_name}")
-                    
-            # Add roles
-            if roles_to_add:
-                await member.add_roles(*roles_to_add, reason="Onboarding completion")
-                logger.info(f"Assigned roles to {member.id}: {[r.name for r in roles_to_add]}")
-                return True, None
-            else:
+            missing = [name for name in ("Non-Division", rank) if not discord.utils.get(guild.roles, name=name)]
+            for role_name in missing:
+                logger.warning(f"Role not found: {role_name}")
+            if len(missing) == 2:
                 return False, "No valid roles found"
                 
+            nickname = await self.build_nickname(member, member_type)
+            reconciler = self.bot.services.get('member_reconciler')
+            await reconciler.reconcile(
+                member,
+                rank=rank if rank not in missing else None,
+                roles=["Non-Division"] if "Non-Division" not in missing else (),
+                nick=nickname,
+                reason="Onboarding completion"
+            )
+            logger.info(f"Assigned roles to {member.id}: {rank}, nickname {nickname}")
+            return True, None
+                
         except discord.Forbidden:
             return False, "Bot lacks permission to assign roles"
         except Exception as e:
             logger.error(f"Error assigning roles to {user.id}: {e}")
             return False, str(e)
             
+    async def build_nickname(self, member: discord.Member, member_type: str) -> str:
+        """Build a new member's nickname from their rank prefix and Star Citizen handle."""
+        # Check for nickname_manager in services
+        if hasattr(self.bot, 'services') and self.bot.services.has('nickname_manager'):
+            nickname_manager = self.bot.services.get('nickname_manager')
+            rank = "Crewman Recruit" if member_type == "Member" else "Associate"
+            # All new members start in Non-Division
+            return await nickname_manager.generate_new_nickname(member, rank, member_type, "Non-Division")
+        
+        # Legacy nickname management if no nickname_manager service
+        # Get the user data from Coda to find their SC handle
+        user_data = await self.get_member_data(member.id)
+        
+        # Get the Star Citizen handle from user data
+        if user_data and 'In-Game Handle' in user_data and user_data['In-Game Handle']:
+            sc_handle = user_data['In-Game Handle']
+        else:
+            # If we can't find the SC handle, use their current name as fallback
+            sc_handle = member.display_name
+            # Remove any existing rank prefix
+            if ' ' in sc_handle:
+                parts = sc_handle.split(' ')
+                if parts[0] in ["CWR", "ASC"]:  # Common prefixes
+                    sc_handle = ' '.join(parts[1:])
+                
+        # Add prefix based on member type
+        if member_type == "Member":
+            new_nickname = f"CWR {sc_handle}"  # Crewman Recruit
+        else:
+            new_nickname = f"ASC {sc_handle}"  # Associate
+            
+        # Ensure nickname is within Discord's limits
+        return new_nickname[:32]
+            
     async def update_nickname(
         self, 
         user: Union[discord.User, discord.Member], 
@@ -420,64 +448,14 @@ class OnboardingCog(commands.Cog):
     ) -> bool:
         """Update member's nickname with rank prefix and their Star Citizen handle."""
         try:
-            # Check if we have a User object instead of a Member object
-            if not hasattr(user, 'guild') or user.guild is None:
-                # Get the guild from the bot
-                guild = self.bot.get_guild(self.guild_id)
-                if not guild:
-                    logger.warning(f"Could not find guild for user {user.id}")
-                    return False
-                    
-                # Convert User to Member
-                try:
-                    member = await guild.fetch_member(user.id)
-                    if not member:
-                        logger.warning(f"Could not find member with ID {user.id} in guild")
-                        return False
-                except discord.NotFound:
-                    logger.warning(f"User {user.id} is not a member of the guild")
-                    return False
-            else:
-                # Already a Member object
-                member = user
-                
-            # Check for nickname_manager in services
-            if hasattr(self.bot, 'services') and self.bot.services.has('nickname_manager'):
-                nickname_manager = self.bot.services.get('nickname_manager')
-                rank_prefix = "CWR" if member_type == "Member" else "ASC"
-                division = "Non-Division"  # All new members start in Non-Division
-                
-                # The method signature requires member_type and division
-                return await nickname_manager.update_nickname(member, member_type, division)
-            
-            # Legacy nickname management if no nickname_manager service
-            # Get the user data from Coda to find their SC handle
-            user_data = await self.get_member_data(member.id)
-            
-            # Get the Star Citizen handle from user data
-            if user_data and 'In-Game Handle' in user_data and user_data['In-Game Handle']:
-                sc_handle = user_data['In-Game Handle']
-            else:
-                # If we can't find the SC handle, use their current name as fallback
-                sc_handle = member.display_name
-                # Remove any existing rank prefix
-                if ' ' in sc_handle:
-                    parts = sc_handle.split(' ')
-                    if parts[0] in ["CWR", "ASC"]:  # Common prefixes
-                        sc_handle = ' '.join(parts[1:])
-                    
-            # Add prefix based on member type
-            if member_type == "Member":
-                new_nickname = f"CWR {sc_handle}"  # Crewman Recruit
-            else:
-                new_nickname = f"ASC {sc_handle}"  # Associate
-                
-            # Ensure nickname is within Discord's limits
-            if len(new_nickname) > 32:
-                new_nickname = new_nickname[:32]
+            member = await self._resolve_member(user)
+            if not member:
+                return False
                 
-            # Update nickname
-            await member.edit(nick=new_nickname)
+            new_nickname = await self.build_nickname(member, member_type)
+            await self.bot.services.get('member_reconciler').reconcile(
+                member, nick=new_nickname, reason="Onboarding nickname"
+            )
             logger.info(f"Updated nickname for {member.id}: {new_nickname}")
             return True
             
@@ -823,9 +823,16 @@ class OrdersCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.scheduler = OrderScheduler(bot)
+        # Legacy JSON files, imported into the document store on first start
         self.orders_file = 'data/orders.json'
         self.cycle_file = 'data/order_cycle.json'
         self._mission_cog = None
+        store = bot.document_store
+        self._order_stores = {
+            group: store.collection(f'orders.{group}')
+            for group in ('mission_pool', 'active_missions', 'major_orders', 'division_orders')
+        }
+        self._cycle_store = store.collection('orders.cycle')
         self._load_orders()
         self._load_cycle()
         self.autonomous_active = False
@@ -836,66 +843,85 @@ class OrdersCog(commands.Cog):
         self.last_major_order_message = None
         self.last_division_order_message = None
 
-    def cog_unload(self):
+    async def cog_unload(self):
         if self.autonomous_task:
             self.autonomous_task.cancel()
-        self._save_orders()
+        # Orders are queued for writing as they change; only the cycle is left
         self._save_cycle()
+        await self._cycle_store.store.flush()
 
     def _load_orders(self):
         try:
-            if not os.path.exists(self.orders_file):
-                return
-            with open(self.orders_file, 'r') as f:
-                data = json.load(f)
+            legacy = {}
+            if os.path.exists(self.orders_file):
+                with open(self.orders_file, 'r') as f:
+                    legacy = json.load(f)
+
+            def documents(group: str) -> Dict[str, Any]:
+                return self._order_stores[group].load(
+                    lambda: {m['order_id']: m for m in legacy.get(group, [])}
+                )
+
             self.scheduler._mission_pool = [
-                MissionOrder.from_dict(m) for m in data.get('mission_pool', [])
+                MissionOrder.from_dict(m) for m in documents('mission_pool').values()
             ]
             self.scheduler._active_missions = {
-                m['order_id']: MissionOrder.from_dict(m)
-                for m in data.get('active_missions', [])
+                order_id: MissionOrder.from_dict(m)
+                for order_id, m in documents('active_missions').items()
             }
             self.scheduler._major_orders = {
-                m['order_id']: MajorOrder.from_dict(m)
-                for m in data.get('major_orders', [])
+                order_id: MajorOrder.from_dict(m)
+                for order_id, m in documents('major_orders').items()
             }
             self.scheduler._division_orders = {
-                m['order_id']: DivisionOrder.from_dict(m)
-                for m in data.get('division_orders', [])
+                order_id: DivisionOrder.from_dict(m)
+                for order_id, m in documents('division_orders').items()
             }
         except Exception as e:
             logger.error(f"Error loading orders: {e}")
 
-    def _save_orders(self):
+    def _save_orders(self, *orders: Order):
+        """Queue writes for the given orders in every group that holds them."""
         try:
-            data = {
-                'mission_pool': [m.to_dict() for m in self.scheduler._mission_pool],
-                'active_missions': [m.to_dict() for m in self.scheduler._active_missions.values()],
-                'major_orders': [m.to_dict() for m in self.scheduler._major_orders.values()],
-                'division_orders': [m.to_dict() for m in self.scheduler._division_orders.values()]
-            }
-            os.makedirs(os.path.dirname(self.orders_file), exist_ok=True)
-            with open(self.orders_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            groups = (
+                ('mission_pool', {m.order_id for m in self.scheduler._mission_pool}),
+                ('active_missions', self.scheduler._active_missions),
+                ('major_orders', self.scheduler._major_orders),
+                ('division_orders', self.scheduler._division_orders),
+            )
+            for order in orders:
+                data = order.to_dict()
+                for group, order_ids in groups:
+                    if order.order_id in order_ids:
+                        self._order_stores[group].put(order.order_id, data)
         except Exception as e:
             logger.error(f"Error saving orders: {e}")
+
+    def _delete_orders(self, group: str, order_ids: List[str]):
+        """Queue removal of orders dropped from ``group``."""
+        try:
+            for order_id in order_ids:
+                self._order_stores[group].delete(order_id)
+        except Exception as e:
+            logger.error(f"Error deleting orders: {e}")
     
     def _load_cycle(self):
         try:
-            if not os.path.exists(self.cycle_file):
-                return
-            with open(self.cycle_file, 'r') as f:
-                data = json.load(f)
-            self.scheduler.monthly_cycle = MonthlyCycle.from_dict(data)
+            def legacy_cycle() -> Dict[str, Any]:
+                if not os.path.exists(self.cycle_file):
+                    return {}
+                with open(self.cycle_file, 'r') as f:
+                    return {'current': json.load(f)}
+
+            data = self._cycle_store.load(legacy_cycle).get('current')
+            if data:
+                self.scheduler.monthly_cycle = MonthlyCycle.from_dict(data)
         except Exception as e:
             logger.error(f"Error loading monthly cycle: {e}")
     
     def _save_cycle(self):
         try:
-            data = self.scheduler.monthly_cycle.to_dict()
-            os.makedirs(os.path.dirname(self.cycle_file), exist_ok=True)
-            with open(self.cycle_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._cycle_store.put('current', self.scheduler.monthly_cycle.to_dict())
         except Exception as e:
             logger.error(f"Error saving monthly cycle: {e}")
 
@@ -1262,6 +1288,7 @@ class OrdersCog(commands.Cog):
         while self.autonomous_active:
             now = datetime.now()
             logger.info(f"Processing autonomous order loop at {now.isoformat()}")
+            changed: List[Order] = []
             
             # Check if we need to advance the weekly cycle
             cycle = self.scheduler.monthly_cycle
@@ -1274,6 +1301,7 @@ class OrdersCog(commands.Cog):
                 major_order = await self.scheduler.setup_new_monthly_cycle(template, self.bot.user.id)
                 
                 if major_order:
+                    changed.append(major_order)
                     # Create embed and post to major orders channel
                     embed = await self.create_order_embed(major_order)
                     self.last_major_order_message = await self.update_channel_message(
@@ -1288,6 +1316,7 @@ class OrdersCog(commands.Cog):
                         major_order, 
                         self.bot.user.id
                     )
+                    changed.extend(div_orders)
                     
                     if div_orders:
                         # Create combined embed for division orders
@@ -1320,6 +1349,8 @@ class OrdersCog(commands.Cog):
                         self.bot.user.id,
                         is_phase_two=True
                     )
+                    changed.append(major_order)
+                    changed.extend(div_orders)
                     
                     if div_orders:
                         # Create combined embed for division orders
@@ -1350,6 +1381,7 @@ class OrdersCog(commands.Cog):
                 mission = await self.scheduler.create_weekly_mission(self.bot.user.id)
                 
                 if mission:
+                    changed.append(mission)
                     embed = await self.create_order_embed(mission)
                     self.last_personal_order_message = await self.update_channel_message(
                         PERSONAL_ORDERS_CHANNEL,
@@ -1373,6 +1405,7 @@ class OrdersCog(commands.Cog):
                 
                 # If major order, update its status
                 if major_order:
+                    changed.append(major_order)
                     if monthly_goal_met:
                         major_order.status = OrderStatus.COMPLETED
                         major_order.completion_data = {
@@ -1410,7 +1443,7 @@ class OrdersCog(commands.Cog):
                     self._save_cycle()
             
             # Save the current state
-            self._save_orders()
+            self._save_orders(*dict.fromkeys(changed))
             self._save_cycle()
             
             # Wait for the next cycle (1 day in testing, 7 days in production)
@@ -1499,7 +1532,7 @@ class OrdersCog(commands.Cog):
             )
             order.status = OrderStatus.ACTIVE
             self.scheduler._active_missions[order.order_id] = order
-            self._save_orders()
+            self._save_orders(order)
             embed = await self.create_order_embed(order)
             self.last_personal_order_message = await self.update_channel_message(
                 PERSONAL_ORDERS_CHANNEL,
@@ -1564,7 +1597,7 @@ class OrdersCog(commands.Cog):
                 major_order.linked_division_orders.append(order_id)
             
             self.scheduler._division_orders[order_id] = order
-            self._save_orders()
+            self._save_orders(order, *([major_order] if major_order else []))
             embed = await self.create_order_embed(order)
             await interaction.followup.send(embed=embed)
             
@@ -1606,7 +1639,7 @@ class OrdersCog(commands.Cog):
             )
             order.status = OrderStatus.ACTIVE
             self.scheduler._major_orders[order_id] = order
-            self._save_orders()
+            self._save_orders(order)
             embed = await self.create_order_embed(order)
             self.last_major_order_message = await self.update_channel_message(
                 MAJOR_ORDERS_CHANNEL,
@@ -1825,7 +1858,7 @@ class OrdersCog(commands.Cog):
                 'completed_at': datetime.now().isoformat(),
                 'notes': completion_notes
             }
-            self._save_orders()
+            self._save_orders(order)
             embed = await self.create_order_embed(order)
             
             # Update appropriate channel based on order type
@@ -1945,7 +1978,7 @@ class OrdersCog(commands.Cog):
                 f"Added {len(new_objectives)} new objectives"
             )
             
-            self._save_orders()
+            self._save_orders(order)
             embed = await self.create_order_embed(order)
             
             # Update appropriate channel based on order type
@@ -2015,9 +2048,12 @@ class OrdersCog(commands.Cog):
                     )
                     
                     # Expire all active division orders
+                    expired = []
                     for order in self.scheduler._division_orders.values():
                         if order.status == OrderStatus.ACTIVE:
                             order.status = OrderStatus.EXPIRED
+                            expired.append(order)
+                    self._save_orders(active_major_order, *expired)
                     
                     # Now create the new cycle
                     await self.create_synchronized_monthly_orders(confirm_interaction, major_order_template)
@@ -2128,7 +2164,7 @@ class OrdersCog(commands.Cog):
                 )
             
             # Save all changes
-            self._save_orders()
+            self._save_orders(major_order, *division_orders)
             self._save_cycle()
             
             await interaction.followup.send(embed=embed)
@@ -2168,7 +2204,7 @@ class OrdersCog(commands.Cog):
             if hasattr(order, 'add_participant'):
                 order.add_participant(interaction.user.id)
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -2378,7 +2414,7 @@ class OrdersCog(commands.Cog):
                     status_note if status_note else f"Completed by {interaction.user.name}"
                 )
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -2501,7 +2537,7 @@ class OrdersCog(commands.Cog):
                 f"Order cancelled: {reason}"
             )
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -2589,7 +2625,7 @@ class OrdersCog(commands.Cog):
                 f"Due date changed from {old_end_date.strftime('%Y-%m-%d')} to {new_end_date.strftime('%Y-%m-%d')}: {reason}"
             )
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -2773,26 +2809,32 @@ class OrdersCog(commands.Cog):
             major_count = 0
             division_count = 0
             
+            removed = {'active_missions': [], 'major_orders': [], 'division_orders': []}
+            
             # Clean up mission orders
             for order_id, order in list(self.scheduler._active_missions.items()):
                 if order.status == OrderStatus.EXPIRED and order.end_date < threshold:
                     self.scheduler._active_missions.pop(order_id)
+                    removed['active_missions'].append(order_id)
                     mission_count += 1
             
             # Clean up major orders
             for order_id, order in list(self.scheduler._major_orders.items()):
                 if order.status == OrderStatus.EXPIRED and order.end_date < threshold:
                     self.scheduler._major_orders.pop(order_id)
+                    removed['major_orders'].append(order_id)
                     major_count += 1
             
             # Clean up division orders
             for order_id, order in list(self.scheduler._division_orders.items()):
                 if order.status == OrderStatus.EXPIRED and order.end_date < threshold:
                     self.scheduler._division_orders.pop(order_id)
+                    removed['division_orders'].append(order_id)
                     division_count += 1
             
             # Save changes
-            self._save_orders()
+            for group, order_ids in removed.items():
+                self._delete_orders(group, order_ids)
             
             total_cleaned = mission_count + major_count + division_count
             
@@ -2850,7 +2892,7 @@ class OrdersCog(commands.Cog):
             if hasattr(order, 'add_participant'):
                 order.add_participant(interaction.user.id)
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -2946,7 +2988,7 @@ class OrdersCog(commands.Cog):
             if hasattr(order, 'add_participant'):
                 order.add_participant(member.id)
             
-            self._save_orders()
+            self._save_orders(order)
             
             # Create updated embed
             embed = await self.create_order_embed(order)
@@ -9,19 +9,17 @@ import os
 import json
 import re
 import time
-from typing import Dict, Any, List, Optional, Tuple
-import aiohttp
+from typing import Dict, Any, List, Optional, Set, Tuple
 from io import BytesIO
 from discord.errors import NotFound
 
+from .utils.radio_broadcast import RadioBroadcaster, quantize_volume
+from .utils.radio_metadata import RadioMetadataService
+from .utils.log_pipeline import add_log_file
+
 # ------------------------------ Logging Setup ------------------------------
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='radio.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.hasHandlers():
-    logger.addHandler(handler)
+add_log_file(logger.name, 'radio.log')
 
 # ------------------------------ Environment Variables ------------------------------
 from dotenv import load_dotenv
@@ -408,7 +406,10 @@ class RadioCog(commands.Cog):
         self.ffmpeg_available = False
         self.guild_volumes: Dict[int, float] = {}
         self.now_playing_messages: Dict[int, Tuple[discord.Message, str]] = {}
-        self.metadata_tasks: Dict[int, asyncio.Task] = {}
+        # One metadata connection per station, shared by all guilds
+        self.metadata = RadioMetadataService(self.on_station_metadata)
+        # One transcode per station and volume level, shared by all guilds
+        self.broadcaster = RadioBroadcaster()
         
         # Initialize with default stations
         self._init_default_stations()
@@ -419,6 +420,10 @@ class RadioCog(commands.Cog):
         # Load custom stations
         self._load_stations()
 
+        # Autocomplete index over station keys, names and genres
+        self.station_index = bot.autocomplete.index('radio_stations')
+        self._reindex_stations()
+
     async def cog_load(self):
         self.ffmpeg_available = await self.is_ffmpeg_available()
         if not self.ffmpeg_available:
@@ -491,6 +496,13 @@ class RadioCog(commands.Cog):
         except Exception as e:
             logger.error(f"Error loading custom stations: {e}")
 
+    def _reindex_stations(self):
+        """Rebuild the station autocomplete index after stations change."""
+        self.station_index.rebuild(
+            (key, f"{station.name} ({station.genre})", key, (key, station.name, station.genre))
+            for key, station in self.stations.items()
+        )
+
     def _save_stations(self):
         """Save custom stations to file."""
         try:
@@ -549,13 +561,7 @@ class RadioCog(commands.Cog):
     @play.autocomplete('station')
     async def station_autocomplete(self, interaction: discord.Interaction, current: str):
         """Provides autocomplete suggestions for station names."""
-        current = current.lower()
-        choices = [
-            app_commands.Choice(name=f"{station.name} ({station.genre})", value=key)
-            for key, station in self.stations.items()
-            if current in key.lower() or current in station.name.lower() or current in station.genre.lower()
-        ]
-        return choices[:25]
+        return self.station_index.choices(current)
 
     @app_commands.command(
         name='stop',
@@ -576,6 +582,7 @@ class RadioCog(commands.Cog):
             if voice_client and voice_client.is_connected():
                 await voice_client.disconnect()
                 del self.voice_clients[interaction.guild.id]
+                self.metadata.unwatch(interaction.guild.id)
                 
                 # Update the now playing message if it exists
                 await self.update_now_playing(interaction.guild.id, stopped=True)
@@ -730,13 +737,8 @@ class RadioCog(commands.Cog):
             # Store the new message
             self.now_playing_messages[guild_id] = (message, current_station.key)
             
-            # Start or restart the metadata update task
-            if guild_id in self.metadata_tasks and not self.metadata_tasks[guild_id].done():
-                self.metadata_tasks[guild_id].cancel()
-            
-            self.metadata_tasks[guild_id] = asyncio.create_task(
-                self.update_metadata_loop(guild_id, current_station)
-            )
+            # Follow track changes for this station
+            self.metadata.watch(current_station.key, current_station.url, guild_id)
         except Exception as e:
             logger.error(f"Error in now playing command: {e}")
             await interaction.followup.send(
@@ -809,6 +811,7 @@ class RadioCog(commands.Cog):
             # Add to stations and save
             self.stations[key] = station
             self._save_stations()
+            self._reindex_stations()
             
             await interaction.followup.send(
                 f"✅ Added custom station: {name}\n"
@@ -871,6 +874,7 @@ class RadioCog(commands.Cog):
             # Remove the station
             del self.stations[station]
             self._save_stations()
+            self._reindex_stations()
             
             await interaction.followup.send(
                 f"✅ Removed station: {target_station.name}",
@@ -954,25 +958,13 @@ class RadioCog(commands.Cog):
             if voice_client.is_playing():
                 voice_client.stop()
                 logger.info("Stopped the currently playing audio.")
-                
-                # Cancel any existing metadata update task
-                if interaction.guild.id in self.metadata_tasks and not self.metadata_tasks[interaction.guild.id].done():
-                    self.metadata_tasks[interaction.guild.id].cancel()
     
-            # FIX: Use FFmpegPCMAudio instead of FFmpegOpusAudio so we can control volume
-            # Create PCM audio source with volume control
-            source = discord.FFmpegPCMAudio(
+            # Join the shared broadcast for this station at the guild's volume
+            audio_source = self.broadcaster.subscribe(
                 self.stations[station].url,
-                options='-vn -b:a 128k'  # Better audio quality
-            )
-            
-            # Wrap it in a volume transformer BEFORE playing
-            audio_source = discord.PCMVolumeTransformer(
-                source, 
-                volume=self.guild_volumes[interaction.guild.id]
+                self.guild_volumes[interaction.guild.id]
             )
             
-            # Play the audio with volume control
             voice_client.play(
                 audio_source,
                 after=lambda e: self.after_playback(interaction.guild.id, e)
@@ -1005,13 +997,8 @@ class RadioCog(commands.Cog):
                 message = await interaction.channel.send(embed=embed, view=view)
                 self.now_playing_messages[interaction.guild.id] = (message, station)
             
-            # Start the metadata update task
-            if interaction.guild.id in self.metadata_tasks and not self.metadata_tasks[interaction.guild.id].done():
-                self.metadata_tasks[interaction.guild.id].cancel()
-            
-            self.metadata_tasks[interaction.guild.id] = asyncio.create_task(
-                self.update_metadata_loop(interaction.guild.id, current_station)
-            )
+            # Follow track changes; switching stations leaves the old watcher
+            self.metadata.watch(current_station.key, current_station.url, interaction.guild.id)
             
             return True, f"▶️ Now playing **{current_station.name}** in **{voice_channel.name}**."
     
@@ -1032,11 +1019,8 @@ class RadioCog(commands.Cog):
             if guild_id in self.voice_clients:
                 del self.voice_clients[guild_id]
             
-            # Cancel metadata update task
-            if guild_id in self.metadata_tasks and not self.metadata_tasks[guild_id].done():
-                self.metadata_tasks[guild_id].cancel()
-                if guild_id in self.metadata_tasks:
-                    del self.metadata_tasks[guild_id]
+            # Stop following metadata for this guild
+            self.metadata.unwatch(guild_id)
     
     async def adjust_volume(self, guild_id: int, adjustment: float, set_directly: bool = False) -> Tuple[bool, float]:
         """Adjust the volume for a guild."""
@@ -1054,8 +1038,13 @@ class RadioCog(commands.Cog):
         else:
             new_volume = max(0.0, min(1.0, self.guild_volumes[guild_id] + adjustment))
         
-        # Apply the new volume
-        voice_client.source.volume = new_volume
+        # Volume is applied by the shared ffmpeg pipeline, so switch this
+        # guild to the broadcast of the same station at the new level
+        new_volume = quantize_volume(new_volume)
+        old_source = voice_client.source
+        if hasattr(old_source, 'broadcast') and quantize_volume(self.guild_volumes[guild_id]) != new_volume:
+            voice_client.source = self.broadcaster.subscribe(old_source.broadcast.url, new_volume)
+            old_source.cleanup()
         self.guild_volumes[guild_id] = new_volume
         
         return True, new_volume
@@ -1138,80 +1127,19 @@ class RadioCog(commands.Cog):
             if guild_id in self.now_playing_messages:
                 del self.now_playing_messages[guild_id]
     
-    async def update_metadata_loop(self, guild_id: int, station: RadioStation):
-        """Loop to update metadata information periodically."""
-        try:
-            while True:
-                # Only perform updates if the bot is still in a voice channel
-                voice_client = self.voice_clients.get(guild_id)
-                if not voice_client or not voice_client.is_connected():
-                    break
-                
-                # Try to fetch metadata
-                new_track = await self.fetch_station_metadata(station)
-                
-                # If metadata changed, update the embed
-                if new_track and new_track != station.current_track:
-                    station.current_track = new_track
-                    station.last_updated = time.time()
-                    await self.update_now_playing(guild_id)
-                    logger.debug(f"Updated metadata for {station.name}: {new_track}")
-                
-                # Wait before next update
-                await asyncio.sleep(30)  # Update every 30 seconds
-        except asyncio.CancelledError:
-            logger.debug(f"Metadata update task for guild {guild_id} was cancelled.")
-        except Exception as e:
-            logger.error(f"Error in metadata update loop: {e}")
-    
-    async def fetch_station_metadata(self, station: RadioStation) -> Optional[str]:
-        """Try to fetch current track metadata from the stream."""
-        try:
-            # This is a simple implementation that works for some Icecast/Shoutcast streams
-            # A more robust solution would use a library like PyIcy or custom parsing
-            async with aiohttp.ClientSession() as session:
-                async with session.get(station.url, headers={'Icy-MetaData': '1'}) as response:
-                    # Check headers for metadata
-                    icy_name = response.headers.get('icy-name', '').strip()
-                    icy_description = response.headers.get('icy-description', '').strip()
-                    icy_genre = response.headers.get('icy-genre', '').strip()
-                    
-                    # Try to get the currently playing track
-                    # Many streams include this in the icy-name or other headers
-                    result = []
-                    if icy_name:
-                        result.append(f"**{icy_name}**")
-                    
-                    # Some stations include the current track in response content
-                    # This is a very simplified approach - many stations require more complex parsing
-                    content_bytes = await response.content.read(4096)  # Read just a sample
-                    content = content_bytes.decode('utf-8', errors='ignore')
-                    
-                    # Look for common metadata patterns
-                    track_patterns = [
-                        r'StreamTitle=\'([^\']+)\'',
-                        r'<nowplaying>([^<]+)</nowplaying>',
-                        r'current_song="([^"]+)"'
-                    ]
-                    
-                    for pattern in track_patterns:
-                        match = re.search(pattern, content)
-                        if match:
-                            current_track = match.group(1).strip()
-                            result.append(f"**Now Playing:** {current_track}")
-                            break
-                    
-                    # Add additional information if available
-                    if icy_genre and "Variety" not in icy_genre:
-                        result.append(f"**Genre:** {icy_genre}")
-                    
-                    if icy_description:
-                        result.append(f"**Info:** {icy_description}")
-                    
-                    return "\n".join(result) if result else None
-        except Exception as e:
-            logger.error(f"Error fetching metadata for {station.name}: {e}")
-            return None
+    async def on_station_metadata(self, station_key: str, text: Optional[str], guild_ids: Set[int]):
+        """Push a station's new now-playing text to every guild tuned to it."""
+        station = self.stations.get(station_key)
+        if not station or not text or text == station.current_track:
+            return
+        station.current_track = text
+        station.last_updated = time.time()
+        logger.debug(f"Updated metadata for {station.name}: {text}")
+        await asyncio.gather(*(
+            self.update_now_playing(guild_id)
+            for guild_id in guild_ids
+            if self.now_playing_messages.get(guild_id, (None, None))[1] == station_key
+        ))
     
     # ------------------------------ Cog Events ------------------------------
     async def cog_unload(self):
@@ -1225,11 +1153,10 @@ class RadioCog(commands.Cog):
             except:
                 pass
         self.voice_clients.clear()
+        self.broadcaster.stop_all()
         
-        # Cancel all metadata tasks
-        for task in self.metadata_tasks.values():
-            if not task.done():
-                task.cancel()
+        # Stop all metadata watchers
+        await self.metadata.close()
         
         logger.info("Cleaned up all voice clients and tasks on cog unload.")
 
@@ -1,7 +1,7 @@
 # cogs/raid_protection.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands, Interaction
 import logging
 import config
@@ -23,8 +23,10 @@ class RaidProtectionCog(commands.Cog):
         # Raid Protection Enabled State
         self.raid_protection_enabled = config.RAID_PROTECTION_ENABLED
 
-        # Start the cleanup task
-        self.cleanup_task.start()
+        # Prune tracking data every minute; nothing to catch up after a restart
+        bot.services.get('scheduler').add(
+            'raid_protection.cleanup', '@every 60s', self.cleanup_task, jitter=0, catch_up=False
+        )
 
         # Compile regex patterns for adult website detection
         self.adult_website_patterns = [
@@ -43,9 +45,8 @@ class RaidProtectionCog(commands.Cog):
 
 
     def cog_unload(self):
-        self.cleanup_task.cancel()
+        self.bot.services.get('scheduler').remove('raid_protection.cleanup')
 
-    @tasks.loop(seconds=60)  # Runs every minute
     async def cleanup_task(self):
         """Cleans up old message and join timestamps to prevent memory leaks."""
         current_time = datetime.utcnow()
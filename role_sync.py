@@ -48,25 +48,30 @@ class RoleSyncCog(commands.Cog):
             logging.info("No members with 'Associate' role to process.")
             return
 
-        # Initialize counters
-        total_processed = 0
-        roles_assigned = 0
-        failed_assignments = 0
-
-        # Iterate through members and assign 'Non-Division' role if they don't have it
-        for member in members_with_associate:
-            total_processed += 1
-            if non_division_role not in member.roles:
-                try:
-                    await member.add_roles(non_division_role, reason="Role synchronization: Associate requires Non-Division role.")
-                    roles_assigned += 1
-                    logging.info(f"Assigned 'Non-Division' role to {member.display_name} (ID: {member.id}).")
-                except discord.Forbidden:
-                    failed_assignments += 1
-                    logging.error(f"Permission denied when assigning 'Non-Division' role to {member.display_name} (ID: {member.id}).")
-                except Exception as e:
-                    failed_assignments += 1
-                    logging.error(f"Unexpected error when assigning 'Non-Division' role to {member.display_name} (ID: {member.id}): {e}")
+        reconciler = self.bot.services.get('member_reconciler')
+
+        async def lacks_non_division(member: discord.Member) -> bool:
+            return non_division_role not in member.roles
+
+        async def assign_non_division(member: discord.Member) -> bool:
+            return await reconciler.reconcile(
+                member,
+                roles=["Non-Division"],
+                reason="Role synchronization: Associate requires Non-Division role."
+            )
+
+        # Runs as fast as Discord's member edit bucket allows, with live progress
+        result = await self.bot.services.get('bulk_operations').run(
+            f"sync_associate_non_division:{guild.id}",
+            members_with_associate,
+            assign_non_division,
+            title="Role synchronization",
+            interaction=interaction,
+            needs_change=lacks_non_division
+        )
+        total_processed = result['total']
+        roles_assigned = result['changed']
+        failed_assignments = result['failed']
 
         # Prepare the result message
         embed = discord.Embed(
@@ -12,7 +12,6 @@ from .managers.ships_registry_manager import ShipsRegistryManager
 import config
 
 logger = logging.getLogger('ships')
-logger.setLevel(logging.DEBUG)
 
 # Constants for pagination
 SHIPS_PER_PAGE = 8
@@ -330,7 +329,8 @@ class ShipsCog(commands.Cog, name="Ships"):
             self.coda_client,
             DOC_ID,
             SHIPS_TABLE_ID,
-            USERS_TABLE_ID
+            USERS_TABLE_ID,
+            replica=getattr(bot, 'coda_replica', None)
         )
         
         # Load ship data
@@ -1631,9 +1631,7 @@ class ShipsCog(commands.Cog, name="Ships"):
                     await interaction.followup.send(f"❌ Flight group '{filter_value}' not found.", ephemeral=True)
                     return
                     
-                # Get all ships
-                all_ships = await self.registry.get_ships_by_status('Active')
-                ships = [ship for ship in all_ships if ship.get('Flight Group') == filter_value]
+                ships = await self.registry.get_ships_by_flight_group(filter_value)
                 
                 title = f"Flight Group Ships Report: {filter_value}"
                 description = f"Ships assigned to flight group: {filter_value}"
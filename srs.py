@@ -3,7 +3,6 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 import os
-import aiohttp
 from typing import Dict, List, Optional, Any, Tuple, Set
 from datetime import datetime
 from enum import Enum
@@ -11,16 +10,13 @@ import pytz
 import json
 import re
 
+from .utils.log_pipeline import add_log_file
+
 # ----------------------------------------------------------------------------
 # Logging setup
 # ----------------------------------------------------------------------------
 logger = logging.getLogger('srs')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename='srs.log', encoding='utf-8', mode='a')
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
+add_log_file(logger.name, 'srs.log')
 
 # ----------------------------------------------------------------------------
 # Environment validation
@@ -155,7 +151,6 @@ class SRSCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
 
         # Data structures for frequency info
         # e.g., ship_frequencies["ShipDesignation"]["StationName"] = {...station data...}
@@ -182,6 +177,13 @@ class SRSCog(commands.Cog):
 
         logger.info("Initializing SRS Cog...")
         
+    @property
+    def coda_client(self):
+        """Shared pooled Coda client from the bot's service registry."""
+        if hasattr(self.bot, 'services') and self.bot.services.has('coda_client'):
+            return self.bot.services.get('coda_client')
+        return self.bot.coda_client
+
     async def cog_load(self):
         """Called when the cog is loaded."""
         await self.load_frequency_tables()
@@ -190,7 +192,6 @@ class SRSCog(commands.Cog):
 
     async def cog_unload(self):
         """Called when the cog is unloaded."""
-        await self.session.close()
         logger.info("SRS Cog unloaded")
         
     # ------------------------------------------------------------------------
@@ -453,23 +454,14 @@ class SRSCog(commands.Cog):
         """Fetch all rows from a Coda table, returning a list of row data."""
         try:
             endpoint = f'docs/{DOC_ID}/tables/{table_id}/rows'
-            headers = {
-                'Authorization': f'Bearer {CODA_API_TOKEN}',
-                'Content-Type': 'application/json'
-            }
             params = {'useColumnNames': 'true', 'limit': 100}
 
-            async with self.session.get(
-                f'https://coda.io/apis/v1/{endpoint}',
-                headers=headers,
-                params=params
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('items', [])
-                else:
-                    logger.error(f"Failed to fetch table {table_id}: status={response.status}")
-                    return []
+            response = await self.coda_client.request('GET', endpoint, params=params)
+            if response is not None:
+                return response.get('items', [])
+            else:
+                logger.error(f"Failed to fetch table {table_id}")
+                return []
         except Exception as e:
             logger.error(f"Error fetching table {table_id}: {e}")
             return []
@@ -9,6 +9,8 @@ import json
 import os
 from datetime import datetime, timedelta
 
+from .utils.command_sync import CommandSyncPlanner
+
 logger = logging.getLogger('sync_commands')
 
 class SyncCommandsCog(commands.Cog):
@@ -21,6 +23,8 @@ class SyncCommandsCog(commands.Cog):
         self.sync_lock = asyncio.Lock()
         self.sync_file = "sync_status.json"
         self.status = self._load_status()
+        daily_limits = bot.services.get('daily_limit') if bot.services.has('daily_limit') else None
+        self.planner = CommandSyncPlanner(bot, daily_limits)
         
         # Strict rate limiting
         self.min_sync_interval = timedelta(days=1)  # Only sync once per day
@@ -46,7 +50,8 @@ class SyncCommandsCog(commands.Cog):
             "commands_synced": 0,
             "total_syncs": 0,
             "errors": [],
-            "known_commands": []
+            "known_commands": [],
+            "command_hashes": {}
         }
         
         if os.path.exists(self.sync_file):
@@ -93,6 +98,48 @@ class SyncCommandsCog(commands.Cog):
         self.status["errors"] = errors[-10:]
         self._save_status()
     
+    async def _run_planned_sync(self, allow_deletes: bool = True):
+        """Apply a minimal sync and record it; returns (plan, applied)."""
+        self.is_syncing = True
+        self.status["last_attempt"] = datetime.now().timestamp()
+        self._save_status()
+        try:
+            plan, applied = await self.planner.sync(allow_deletes=allow_deletes)
+        finally:
+            self.is_syncing = False
+        
+        # Only full bulk syncs count toward the cooldown
+        if not plan.empty:
+            self.status["last_planned_sync"] = datetime.now().timestamp()
+            self.status["commands_synced"] = applied['created'] + applied['edited'] + applied['deleted']
+            self.status["total_syncs"] = self.status.get("total_syncs", 0) + 1
+        self.status["known_commands"] = list(plan.hashes)
+        self.status["command_hashes"] = plan.hashes
+        self._save_status()
+        return plan, applied
+    
+    async def auto_sync(self):
+        """
+        Bring Discord's commands in line with the tree at startup, touching
+        only what changed. Commands missing locally are never deleted here,
+        since a cog may just have failed to load; /sync_commands removes them.
+        """
+        async with self.sync_lock:
+            try:
+                plan, applied = await self._run_planned_sync(allow_deletes=False)
+                if plan.empty:
+                    logger.info("Startup sync: all commands already up to date")
+                else:
+                    logger.info(f"Startup sync: {applied}")
+            except discord.HTTPException as e:
+                error_msg = f"HTTP Error during startup sync: {e.status} {e.text}"
+                logger.error(error_msg)
+                self._record_error(error_msg)
+            except Exception as e:
+                error_msg = f"Error during startup sync: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                self._record_error(error_msg)
+    
     def is_bot_owner():
         """Check if the user is the bot owner"""
         async def predicate(interaction: discord.Interaction) -> bool:
@@ -111,7 +158,8 @@ class SyncCommandsCog(commands.Cog):
         Parameters:
         -----------
         force: bool
-            If True, ignore cooldown restrictions (emergency use only)
+            If True, re-register every command in one bulk overwrite instead of
+            the minimal per-command sync, ignoring the cooldown (emergency use only)
         """
         await interaction.response.defer(ephemeral=True)
         
@@ -125,28 +173,59 @@ class SyncCommandsCog(commands.Cog):
             )
             return
         
-        # Check cooldown
-        if not force and self.status.get("last_sync"):
-            last_sync = datetime.fromtimestamp(self.status["last_sync"])
-            time_since_sync = datetime.now() - last_sync
+        # Default: send only the creates, edits and deletes that are needed
+        if not force:
+            async with self.sync_lock:
+                try:
+                    plan, applied = await self._run_planned_sync()
+                except discord.HTTPException as e:
+                    error_msg = f"HTTP Error during sync: {e.status} {e.text}"
+                    logger.error(error_msg)
+                    self._record_error(error_msg)
+                    await interaction.followup.send(f"❌ {error_msg}", ephemeral=True)
+                    return
+                except Exception as e:
+                    error_msg = f"Error during sync: {str(e)}"
+                    logger.error(error_msg, exc_info=True)
+                    self._record_error(error_msg)
+                    await interaction.followup.send(f"❌ An unexpected error occurred: {str(e)}", ephemeral=True)
+                    return
+            
+            if plan.empty:
+                await interaction.followup.send(
+                    f"✅ All {len(plan.unchanged)} commands already match Discord. Nothing to sync.",
+                    ephemeral=True
+                )
+                return
+            
+            message = (
+                f"✅ Synced changed commands: {plan.summary()}\n\n"
+                f"**Created**: {applied['created']} | **Updated**: {applied['edited']} | "
+                f"**Deleted**: {applied['deleted']} | **Unchanged**: {len(plan.unchanged)}"
+            )
+            if applied['deferred']:
+                message += (
+                    f"\n\n⚠️ {applied['deferred']} new commands exceed today's creation quota "
+                    "and will be created on the next sync."
+                )
+            await interaction.followup.send(message, ephemeral=True)
+            return
+        
+        # Force is the emergency path: the cooldown since the last full sync
+        # only produces a warning, it does not block
+        cooldown_note = ""
+        if self.status.get("last_sync"):
+            time_since_sync = datetime.now() - datetime.fromtimestamp(self.status["last_sync"])
             
             # Emergency cooldown enforces a much longer period between syncs
             required_interval = timedelta(days=7) if self.emergency_cooldown else self.min_sync_interval
             
             if time_since_sync < required_interval:
-                wait_time = required_interval - time_since_sync
-                days = wait_time.days
-                hours = wait_time.seconds // 3600
-                
-                await interaction.followup.send(
-                    f"⚠️ **Rate Limit Protection**: Commands were synced {time_since_sync.days} days and "
-                    f"{time_since_sync.seconds // 3600} hours ago.\n\n"
-                    f"Please wait {days} days and {hours} hours before syncing again to avoid rate limits.\n\n"
-                    "**Note**: Discord strictly limits how often you can sync commands. "
-                    "Excessive syncing can block your bot for up to 24 hours.",
-                    ephemeral=True
+                cooldown_note = (
+                    f"\n\n⚠️ **Rate Limit Protection**: the last full sync was {time_since_sync.days} days and "
+                    f"{time_since_sync.seconds // 3600} hours ago. Discord strictly limits how often you can "
+                    "sync commands; excessive syncing can block your bot for up to 24 hours."
                 )
-                return
         
         # Perform the sync with lock protection
         async with self.sync_lock:
@@ -156,7 +235,7 @@ class SyncCommandsCog(commands.Cog):
                 self._save_status()
                 
                 await interaction.followup.send(
-                    "🔄 Starting command sync... This may take a moment.",
+                    "🔄 Starting command sync... This may take a moment." + cooldown_note,
                     ephemeral=True
                 )
                 
@@ -164,16 +243,6 @@ class SyncCommandsCog(commands.Cog):
                 current_commands = set(cmd.name for cmd in self.bot.tree.get_commands())
                 known_commands = set(self.status.get("known_commands", []))
                 
-                # Only sync if there are new commands or force is used
-                if not force and current_commands.issubset(known_commands):
-                    self.is_syncing = False
-                    await interaction.followup.send(
-                        "✅ No new commands to sync. All commands are already registered with Discord.\n"
-                        "Use `force=True` if you need to sync anyway.",
-                        ephemeral=True
-                    )
-                    return
-                
                 # Log what's happening
                 new_commands = current_commands - known_commands
                 if new_commands:
@@ -193,6 +262,7 @@ class SyncCommandsCog(commands.Cog):
                 self.status["commands_synced"] = len(synced)
                 self.status["total_syncs"] = self.status.get("total_syncs", 0) + 1
                 self.status["known_commands"] = list(current_commands)
+                self.status["command_hashes"] = self.planner.local_hashes()
                 self._save_status()
                 
                 message = (
@@ -254,7 +324,7 @@ class SyncCommandsCog(commands.Cog):
             color=discord.Color.blue()
         )
         
-        # Last sync info
+        # Last full sync info
         if self.status.get("last_sync"):
             last_sync_time = datetime.fromtimestamp(self.status["last_sync"])
             time_since = datetime.now() - last_sync_time
@@ -262,7 +332,7 @@ class SyncCommandsCog(commands.Cog):
             hours = time_since.seconds // 3600
             
             embed.add_field(
-                name="Last Successful Sync",
+                name="Last Full Sync",
                 value=f"{last_sync_time.strftime('%Y-%m-%d %H:%M:%S')} ({days}d {hours}h ago)",
                 inline=False
             )
@@ -285,6 +355,15 @@ class SyncCommandsCog(commands.Cog):
                 inline=False
             )
         
+        # Minimal syncs (startup and the default /sync_commands)
+        if self.status.get("last_planned_sync"):
+            planned_time = datetime.fromtimestamp(self.status["last_planned_sync"])
+            embed.add_field(
+                name="Last Changed-Command Sync",
+                value=planned_time.strftime('%Y-%m-%d %H:%M:%S'),
+                inline=False
+            )
+        
         # Command counts and status
         current_commands = len(self.bot.tree.get_commands())
         known_commands = len(self.status.get("known_commands", []))